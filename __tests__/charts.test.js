@@ -10,13 +10,14 @@ function loadScript(dom, file) {
 }
 
 test('metrics.js populates charts container', async () => {
-  const dom = new JSDOM(`<!DOCTYPE html><div id="metrics-charts"></div>`, { url: 'http://localhost/' });
+  const dom = new JSDOM(`<!DOCTYPE html><div id="metrics-charts"></div>`, { url: 'http://localhost/', runScripts: 'dangerously' });
   const summary = { metrics: [{ name: 'coverage_percent', file: 'coverage_percent.json' }] };
   const series = [{ time: new Date().toISOString(), value: 50 }];
   dom.window.fetch = async (url) => {
     if (url.endsWith('metrics/summary.json')) return { json: async () => summary };
     return { json: async () => series };
   };
+  loadScript(dom, 'charts.js');
   loadScript(dom, 'metrics.js');
   await new Promise(r => setTimeout(r, 0));
   const container = dom.window.document.getElementById('metrics-charts');
@@ -25,13 +26,14 @@ test('metrics.js populates charts container', async () => {
 });
 
 test('security.js populates charts container', async () => {
-  const dom = new JSDOM(`<!DOCTYPE html><div id="security-charts"></div>`, { url: 'http://localhost/' });
+  const dom = new JSDOM(`<!DOCTYPE html><div id="security-charts"></div>`, { url: 'http://localhost/', runScripts: 'dangerously' });
   const summary = { metrics: [{ name: 'severity_critical', file: 'severity_critical.json' }] };
   const series = [{ time: new Date().toISOString(), value: 1 }];
   dom.window.fetch = async (url) => {
     if (url.endsWith('security/summary.json')) return { json: async () => summary };
     return { json: async () => series };
   };
+  loadScript(dom, 'charts.js');
   loadScript(dom, 'security.js');
   await new Promise(r => setTimeout(r, 0));
   const container = dom.window.document.getElementById('security-charts');
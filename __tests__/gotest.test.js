@@ -0,0 +1,63 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const exec = require('@actions/exec');
+const { GoTestStream, runGoTestJson } = require('../src/gotest');
+
+jest.mock('@actions/exec');
+
+const EVENTS = [
+  { Action: 'run', Package: 'example.com/m/a', Test: 'TestOK' },
+  { Action: 'pass', Package: 'example.com/m/a', Test: 'TestOK', Elapsed: 0.01 },
+  { Action: 'output', Package: 'example.com/m/a', Test: 'TestBad', Output: '    a_test.go:9: want 1, got 2\n' },
+  { Action: 'fail', Package: 'example.com/m/a', Test: 'TestBad', Elapsed: 0.02 },
+  { Action: 'skip', Package: 'example.com/m/a', Test: 'TestSkip', Elapsed: 0 },
+  { Action: 'fail', Package: 'example.com/m/a', Elapsed: 0.5 },
+  { Action: 'output', Package: 'example.com/m/b', Test: 'BenchmarkX', Output: 'BenchmarkX-8   \t' },
+  { Action: 'output', Package: 'example.com/m/b', Test: 'BenchmarkX', Output: ' 1000\t  1234 ns/op\t  16 B/op\t  1 allocs/op\n' },
+  { Action: 'pass', Package: 'example.com/m/b', Elapsed: 1.25 },
+]
+  .map((e) => JSON.stringify(e))
+  .join('\n');
+
+describe('GoTestStream', () => {
+  let dir;
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'gotest-'));
+  });
+
+  test('handles events split across chunks', () => {
+    const files = { log: path.join(dir, 'tests.txt'), results: path.join(dir, 'r.jsonl'), bench: path.join(dir, 'bench.out') };
+    const stream = new GoTestStream(files);
+    for (let i = 0; i < EVENTS.length; i += 17) stream.write(Buffer.from(EVENTS.slice(i, i + 17)));
+    const summary = stream.end();
+    expect(summary.totals).toEqual({ passed: 1, failed: 1, skipped: 1, packages: 2 });
+    expect(summary.packages[0]).toMatchObject({ package: 'example.com/m/a', status: 'fail', elapsed: 0.5 });
+    expect(summary.failures[0].output).toContain('want 1, got 2');
+    expect(fs.readFileSync(files.results, 'utf-8').trim().split('\n')).toHaveLength(3);
+    expect(fs.readFileSync(files.bench, 'utf-8')).toMatch(/^BenchmarkX-8\s+1000\s+1234 ns\/op/);
+  });
+
+  test('keeps the benchmark header lines used to fingerprint the machine', () => {
+    const files = { bench: path.join(dir, 'bench.out') };
+    const stream = new GoTestStream(files);
+    const header = ['goos: linux\n', 'goarch: amd64\n', 'pkg: example.com/m/b\n', 'cpu: AMD EPYC 7763 64-Core Processor\n'];
+    stream.write(Buffer.from(header.map((Output) => JSON.stringify({ Action: 'output', Package: 'example.com/m/b', Output })).join('\n') + '\n' + EVENTS + '\n'));
+    stream.end();
+    const lines = fs.readFileSync(files.bench, 'utf-8').split('\n');
+    expect(lines.slice(0, 4)).toEqual(header.map((h) => h.trim()));
+    expect(lines[4]).toMatch(/^BenchmarkX-8\s+1000/);
+  });
+
+  test('runGoTestJson streams stdout and writes the summary', async () => {
+    exec.exec.mockReset().mockImplementation(async (cmd, args, opts) => {
+      opts.listeners.stdout(Buffer.from(EVENTS + '\n'));
+      return 1;
+    });
+    const summaryPath = path.join(dir, 'summary.json');
+    const result = await runGoTestJson(['test', '-json', './...'], { summary: summaryPath });
+    expect(exec.exec.mock.calls[0][0]).toBe('go');
+    expect(result.exitCode).toBe(1);
+    expect(JSON.parse(fs.readFileSync(summaryPath, 'utf-8')).benchmarks).toBe(1);
+  });
+});
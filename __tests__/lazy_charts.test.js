@@ -0,0 +1,94 @@
+const { JSDOM } = require('jsdom');
+const fs = require('fs');
+const path = require('path');
+
+function loadScript(dom, file) {
+  const scriptEl = dom.window.document.createElement('script');
+  scriptEl.textContent = fs.readFileSync(path.join(__dirname, '..', 'scripts', file), 'utf-8');
+  dom.window.document.body.appendChild(scriptEl);
+}
+
+// fetch stub whose series responses stay pending until release() is called
+function benchDom(count) {
+  const dom = new JSDOM(`<!DOCTYPE html><div id="bench-charts"></div>`, { url: 'http://localhost/', runScripts: 'dangerously' });
+  const summary = { benchmarks: Array.from({ length: count }, (_, i) => ({ name: `BenchmarkN${i}`, file: `N${i}.json` })) };
+  // content-addressed names, as published by scripts/assets.py
+  const manifest = { 'summary.json': '../assets/bench/summary.abc.json' };
+  summary.benchmarks.forEach((b, i) => { manifest[`data/${b.file}`] = `../assets/bench/data__N${i}.h${i}.json`; });
+  const state = { requested: [], inFlight: 0, maxInFlight: 0, waiting: [] };
+  dom.window.fetch = (url) => {
+    if (url.endsWith('manifest.json')) return Promise.resolve({ ok: true, json: async () => manifest });
+    if (url.endsWith('summary.abc.json')) return Promise.resolve({ json: async () => summary });
+    state.requested.push(url);
+    state.inFlight++;
+    state.maxInFlight = Math.max(state.maxInFlight, state.inFlight);
+    return new Promise((resolve) => {
+      state.waiting.push(() => {
+        state.inFlight--;
+        resolve({ json: async () => [{ time: 't0', ns_per_op: 10 }, { time: 't1', ns_per_op: 12 }] });
+      });
+    });
+  };
+  return { dom, state };
+}
+
+const tick = () => new Promise((r) => setTimeout(r, 0));
+
+async function drain(state) {
+  while (state.waiting.length) {
+    state.waiting.shift()();
+    await tick();
+  }
+}
+
+test('bench charts fetch only visible series through the manifest, capped in flight', async () => {
+  const { dom, state } = benchDom(200);
+  const observers = [];
+  dom.window.IntersectionObserver = class {
+    constructor(cb) { this.cb = cb; this.targets = new Set(); observers.push(this); }
+    observe(el) { this.targets.add(el); }
+    unobserve(el) { this.targets.delete(el); }
+    show(els) { this.cb(els.map((target) => ({ target, isIntersecting: true }))); }
+  };
+  loadScript(dom, 'charts.js');
+  loadScript(dom, 'bench.js');
+  await tick();
+
+  const root = dom.window.document.getElementById('bench-charts');
+  expect(root.querySelectorAll('.bench-chart').length).toBe(200);
+  expect(state.requested.length).toBe(0);
+  expect(observers[0].targets.size).toBe(200);
+
+  const visible = Array.from(root.querySelectorAll('.bench-chart')).slice(0, 10);
+  observers[0].show(visible);
+  observers[0].show(visible); // repeated intersections do not refetch
+  await tick();
+  expect(state.maxInFlight).toBe(4);
+
+  await drain(state);
+  expect(state.requested).toEqual(Array.from({ length: 10 }, (_, i) => `http://localhost/assets/bench/data__N${i}.h${i}.json`));
+  expect(state.maxInFlight).toBe(4);
+  expect(root.querySelectorAll('[data-loaded="true"]').length).toBe(10);
+  expect(observers[0].targets.size).toBe(190);
+});
+
+test('without IntersectionObserver every series loads eagerly through the same cap', async () => {
+  const { dom, state } = benchDom(12);
+  loadScript(dom, 'charts.js');
+  loadScript(dom, 'bench.js');
+  await tick();
+  expect(state.inFlight).toBe(4);
+  await drain(state);
+  expect(state.requested.length).toBe(12);
+  expect(state.maxInFlight).toBe(4);
+  expect(dom.window.document.querySelectorAll('[data-loaded="true"]').length).toBe(12);
+});
+
+test('summary failure shows the page message', async () => {
+  const dom = new JSDOM(`<!DOCTYPE html><div id="bench-charts"></div>`, { url: 'http://localhost/', runScripts: 'dangerously' });
+  dom.window.fetch = () => Promise.reject(new Error('offline'));
+  loadScript(dom, 'charts.js');
+  loadScript(dom, 'bench.js');
+  await tick();
+  expect(dom.window.document.getElementById('bench-charts').textContent).toBe('Failed to load benchmark history.');
+});
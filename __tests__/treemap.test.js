@@ -0,0 +1,37 @@
+const { JSDOM } = require('jsdom');
+const fs = require('fs');
+const path = require('path');
+
+function loadScript(dom, file) {
+  const scriptEl = dom.window.document.createElement('script');
+  scriptEl.textContent = fs.readFileSync(path.join(__dirname, '..', 'scripts', file), 'utf-8');
+  dom.window.document.body.appendChild(scriptEl);
+}
+
+test('treemap.js lays out one directory level and expands on click', async () => {
+  const dom = new JSDOM(`<!DOCTYPE html><div id="metrics-treemap"></div>`, { url: 'http://localhost/', runScripts: 'dangerously' });
+  const tree = {
+    version: 1,
+    keys: ['files', 'loc', 'tests', 'stmts', 'covered'],
+    tree: ['', [3, 30, 1, 10, 5], [
+      ['pkg', [2, 20, 1, 10, 5], [['a.go', [1, 15, 0, 8, 5]], ['a_test.go', [1, 0, 1]], ['b.go', [0, 5, 0, 2]]]],
+      ['main.go', [1, 10]],
+    ]],
+  };
+  const requested = [];
+  dom.window.fetch = async (url) => {
+    requested.push(url);
+    return { json: async () => tree };
+  };
+  loadScript(dom, 'treemap.js');
+  await new Promise((r) => setTimeout(r, 0));
+  const container = dom.window.document.getElementById('metrics-treemap');
+  expect(requested).toEqual(['tree.json']);
+  let tiles = container.querySelectorAll('div[title]');
+  expect(Array.from(tiles).map((t) => t.title.split('\n')[0])).toEqual(['pkg/', 'main.go']);
+  tiles[0].onclick();
+  tiles = container.querySelectorAll('div[title]');
+  // only the files with lines of code get a tile when sized by LOC
+  expect(Array.from(tiles).map((t) => t.title.split('\n')[0])).toEqual(['a.go', 'b.go']);
+  expect(container.textContent).toMatch(/\(root\) \/ pkg/);
+});
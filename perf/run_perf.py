@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Scaling benchmarks for the action's own scripts.
+
+For each scale a synthetic repository is generated (synth_repo.py) and every
+script in SCRIPTS is run against it in a fresh process. Wall time, throughput
+(units/s, see synth_repo.generate) and peak RSS (from wait4) are recorded.
+
+Regression checks:
+  * growth (exit 1): the empirical exponent log(t2/t1)/log(n2/n1) between
+    consecutive scales exceeds --max-exponent (catches accidental quadratic
+    behaviour), ignored while the larger run is below --noise-floor seconds.
+    A script exiting non-zero also fails here. Both hold on any machine.
+  * baseline (exit 3, only with --check-baseline / PERF_CHECK_BASELINE=true):
+    time exceeds baseline * --tolerance, after scaling the baseline by a CPU
+    calibration ratio so numbers transfer between machines. Wall-clock
+    comparisons stay opt-in because shared runners are too noisy for them.
+
+Usage:
+    run_perf.py [--scales 1000,10000,100000] [--check-baseline] [--baseline perf/baseline.json]
+                [--update-baseline] [--output perf-results.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = pathlib.Path(__file__).resolve().parent
+SCRIPTS_DIR = HERE.parent / 'scripts'
+sys.path.insert(0, str(HERE))
+
+import synth_repo  # noqa: E402
+
+SCRIPTS: dict[str, list[str]] = {
+    'collect_metrics.py': ['--root', '.', '--output-dir', 'site_src', '--metrics', 'coverage,tests,files,loc'],
+    'gen_coverage_md.py': [],
+    'gen_site_structure.py': [],
+    'update_bench.py': [],
+    'collect_security.py': ['--repo', 'acme/synth'],
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--scales', default='1000,10000,100000', help='Comma list of scales')
+    p.add_argument('--scripts', default=','.join(SCRIPTS), help='Comma list of scripts to time')
+    p.add_argument('--baseline', default=str(HERE / 'baseline.json'), help='Baseline JSON (missing = skip check)')
+    p.add_argument('--check-baseline', action='store_true',
+                   default=os.environ.get('PERF_CHECK_BASELINE', '').lower() in ('1', 'true'),
+                   help='Also fail (exit 3) on slowdowns against the calibrated baseline')
+    p.add_argument('--tolerance', type=float, default=float(os.environ.get('PERF_TOLERANCE', '2.5')),
+                   help='Allowed slowdown factor vs calibrated baseline (default 2.5)')
+    p.add_argument('--max-exponent', type=float, default=1.4, help='Max growth exponent between scales (default 1.4)')
+    p.add_argument('--noise-floor', type=float, default=0.25, help='Seconds below which growth is not judged')
+    p.add_argument('--update-baseline', action='store_true', help='Write results as the new baseline')
+    p.add_argument('--output', default='', help='Write results JSON here')
+    return p.parse_args(argv)
+
+
+def calibrate() -> float:
+    """Seconds for a fixed pure-Python workload (best of 5)."""
+    best = math.inf
+    for _ in range(5):
+        start = time.perf_counter()
+        total = 0
+        for i in range(1_000_000):
+            total += i % 7
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_script(script: str, args: list[str], cwd: pathlib.Path, env: dict) -> tuple[float, int, int]:
+    """Run one script; returns (seconds, peak RSS KB, exit code)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(SCRIPTS_DIR / script), *args], cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return elapsed, usage.ru_maxrss, proc.returncode
+
+
+def measure(scales: list[int], scripts: list[str]) -> dict:
+    results: dict[str, dict[str, dict]] = {s: {} for s in scripts}
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f'synth{scale}_') as td:
+            repo = pathlib.Path(td)
+            units = synth_repo.generate(repo, synth_repo.Sizes.for_scale(scale))
+            with synth_repo.AlertStub(synth_repo.Sizes.for_scale(scale).alerts) as stub:
+                env = {k: v for k, v in os.environ.items() if k not in ('PIPELINE_TRACE', 'GITHUB_TOKEN', 'TOKEN')}
+                env.update({'PATH': f"{repo / '.bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+                            'SECURITY_API_BASE': stub.api_base, 'GITHUB_REPOSITORY': 'acme/synth',
+                            'GIT_CEILING_DIRECTORIES': str(repo.parent)})
+                for script in scripts:
+                    seconds, rss, code = run_script(script, SCRIPTS[script], repo, env)
+                    results[script][str(scale)] = {
+                        'seconds': round(seconds, 4),
+                        'units': units[script],
+                        'throughput': round(units[script] / seconds, 1) if seconds else None,
+                        'peak_rss_kb': rss,
+                        'exit': code,
+                    }
+    return {'calibration_s': round(calibrate(), 4), 'python': sys.version.split()[0], 'results': results}
+
+
+def check(current: dict, baseline: dict | None, args: argparse.Namespace) -> tuple[list[str], list[str]]:
+    """(growth and exit failures, baseline slowdowns); the latter stay empty without a baseline."""
+    failures: list[str] = []
+    slowdowns: list[str] = []
+    ratio = 1.0
+    if baseline and baseline.get('calibration_s'):
+        ratio = current['calibration_s'] / baseline['calibration_s']
+    for script, by_scale in current['results'].items():
+        for scale, rec in by_scale.items():
+            if rec['exit'] != 0:
+                failures.append(f'{script} @ {scale}: exit code {rec["exit"]}')
+            base = ((baseline or {}).get('results', {}).get(script) or {}).get(scale)
+            if base:
+                allowed = base['seconds'] * ratio * args.tolerance
+                if rec['seconds'] > allowed and rec['seconds'] > args.noise_floor:
+                    slowdowns.append(f'{script} @ {scale}: {rec["seconds"]:.3f}s > {allowed:.3f}s allowed')
+        scales = sorted(by_scale, key=int)
+        for small, large in zip(scales, scales[1:]):
+            t1, t2 = by_scale[small]['seconds'], by_scale[large]['seconds']
+            n1, n2 = by_scale[small]['units'], by_scale[large]['units']
+            if t2 < args.noise_floor or t1 <= 0 or n2 <= n1:
+                continue
+            exponent = math.log(t2 / t1) / math.log(n2 / n1)
+            by_scale[large]['growth_exponent'] = round(exponent, 3)
+            if exponent > args.max_exponent:
+                failures.append(f'{script}: growth exponent {exponent:.2f} from {small} to {large} '
+                                f'(> {args.max_exponent})')
+    return failures, slowdowns
+
+
+def render(current: dict) -> str:
+    lines = ['| Script | Scale | Seconds | Units/s | Peak RSS (KB) | Growth |',
+             '|--------|-------|---------|---------|---------------|--------|']
+    for script, by_scale in current['results'].items():
+        for scale in sorted(by_scale, key=int):
+            rec = by_scale[scale]
+            lines.append(f"| {script} | {scale} | {rec['seconds']:.3f} | {rec['throughput']} | "
+                         f"{rec['peak_rss_kb']} | {rec.get('growth_exponent', '')} |")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    scales = sorted(int(s) for s in args.scales.split(',') if s.strip())
+    scripts = [s.strip() for s in args.scripts.split(',') if s.strip() in SCRIPTS]
+    current = measure(scales, scripts)
+    baseline_path = pathlib.Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8')) if baseline_path.exists() else None
+    compare = args.check_baseline and not args.update_baseline
+    failures, slowdowns = check(current, baseline if compare else None, args)
+    print(render(current))
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(current, indent=2) + '\n', encoding='utf-8')
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2) + '\n', encoding='utf-8')
+        print(f'Info: baseline written to {baseline_path}')
+    for f in failures:
+        print(f'PERF_REGRESSION: {f}', file=sys.stderr)
+    for f in slowdowns:
+        print(f'PERF_SLOWDOWN: {f}', file=sys.stderr)
+    return 1 if failures else 3 if slowdowns else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Generate synthetic Go repositories for scaling benchmarks of the action scripts.
+
+The repository contains packages of Go source and test files, a cover.out with
+one block per statement group, a bench.out, docs/ pages and a fake `go`
+executable (under .bin/) that answers `go list` and `go doc` instantly, so
+timings measure the scripts rather than the toolchain. Alerts for
+collect_security.py are served by AlertStub.
+
+Usage:
+    synth_repo.py DEST --scale 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import re
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODULE = 'example.com/synth'
+SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+
+@dataclass
+class Sizes:
+    files: int
+    packages: int
+    tests_per_file: int
+    cover_blocks: int
+    bench_lines: int
+    alerts: int
+    docs: int
+
+    @classmethod
+    def for_scale(cls, scale: int) -> 'Sizes':
+        files = max(10, scale // 10)
+        return cls(files=files, packages=max(1, files // 10), tests_per_file=2, cover_blocks=scale,
+                   bench_lines=max(1, scale // 10), alerts=scale, docs=max(1, scale // 100))
+
+
+FAKE_GO = """#!/bin/sh
+# Fake go toolchain for perf runs: canned answers, no compilation.
+here=$(dirname "$0")
+case "$1" in
+  list) case "$*" in *-json*) cat "$here/go_list.json" ;; *) cat "$here/go_list.txt" ;; esac ;;
+  doc) printf 'package synth\\n\\nPackage synth is generated.\\n\\nfunc F() int\\n' ;;
+  version) echo "go version go1.22.0 linux/amd64" ;;
+  *) exit 0 ;;
+esac
+"""
+
+
+def generate(dest: pathlib.Path, sizes: Sizes) -> dict:
+    """Write the synthetic repo under dest; returns the unit counts per script."""
+    dest = dest.resolve()
+    dest.mkdir(parents=True, exist_ok=True)
+    (dest / 'go.mod').write_text(f'module {MODULE}\n\ngo 1.22\n', encoding='utf-8')
+    (dest / 'README.md').write_text('# synth\n\nSynthetic repository.\n', encoding='utf-8')
+    listing: dict[str, dict] = {}
+    files: list[str] = []
+    for i in range(sizes.files):
+        pkg = f'pkg{i % sizes.packages:04d}'
+        pdir = dest / pkg
+        if i < sizes.packages:
+            pdir.mkdir(exist_ok=True)
+            listing[pkg] = {'Dir': str(pdir), 'ImportPath': f'{MODULE}/{pkg}', 'Name': pkg,
+                            'Module': {'Path': MODULE}, 'GoFiles': [], 'TestGoFiles': [], 'Imports': []}
+        listing[pkg]['GoFiles'].append(f'file{i:05d}.go')
+        listing[pkg]['TestGoFiles'].append(f'file{i:05d}_test.go')
+        body = [f'package {pkg}', '']
+        for f in range(5):
+            body += [f'func F{i}_{f}(x int) int {{', '\tif x > 0 {', '\t\treturn x * 2', '\t}', '\treturn x', '}', '']
+        (pdir / f'file{i:05d}.go').write_text('\n'.join(body), encoding='utf-8')
+        tests = [f'package {pkg}', '', 'import "testing"', '']
+        for t in range(sizes.tests_per_file):
+            tests += [f'func TestF{i}_{t}(t *testing.T) {{', f'\t_ = F{i}_0({t})', '}', '']
+        (pdir / f'file{i:05d}_test.go').write_text('\n'.join(tests), encoding='utf-8')
+        files.append(f'{MODULE}/{pkg}/file{i:05d}.go')
+
+    with (dest / 'cover.out').open('w', encoding='utf-8') as f:
+        f.write('mode: atomic\n')
+        for b in range(sizes.cover_blocks):
+            line = 3 + (b // len(files)) * 2
+            f.write(f'{files[b % len(files)]}:{line}.20,{line + 1}.3 2 {b % 3}\n')
+
+    with (dest / 'bench.out').open('w', encoding='utf-8') as f:
+        f.write(f'goos: linux\ngoarch: amd64\npkg: {MODULE}/pkg0000\n')
+        for b in range(sizes.bench_lines):
+            f.write(f'BenchmarkSynth{b:06d}-8   \t 1000000\t {100 + b % 50} ns/op\t 16 B/op\t 1 allocs/op\n')
+        f.write('PASS\n')
+
+    docs = dest / 'docs'
+    for d in range(sizes.docs):
+        sub = docs / f'group{d % 10}'
+        sub.mkdir(parents=True, exist_ok=True)
+        (sub / f'page{d:05d}.md').write_text(f'# Page {d}\n\nSynthetic documentation page.\n', encoding='utf-8')
+
+    bin_dir = dest / '.bin'
+    bin_dir.mkdir(exist_ok=True)
+    (bin_dir / 'go_list.json').write_text(''.join(json.dumps(r, indent='\t') + '\n' for r in listing.values()),
+                                          encoding='utf-8')
+    (bin_dir / 'go_list.txt').write_text(''.join(r['ImportPath'] + '\n' for r in listing.values()), encoding='utf-8')
+    go = bin_dir / 'go'
+    go.write_text(FAKE_GO, encoding='utf-8')
+    go.chmod(0o755)
+    return {
+        'collect_metrics.py': sizes.files * 2,
+        'gen_coverage_md.py': sizes.cover_blocks,
+        'gen_site_structure.py': sizes.packages + sizes.docs,
+        'update_bench.py': sizes.bench_lines,
+        'collect_security.py': sizes.alerts,
+    }
+
+
+class AlertStub:
+    """Local paginated stand-in for the GitHub alert APIs (100 alerts per page)."""
+
+    def __init__(self, alerts: int, per_page: int = 100):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                m = re.search(r'[?&]page=(\d+)', self.path)
+                page = int(m.group(1)) if m else 1
+                path = self.path.split('?', 1)[0]
+                start = (page - 1) * per_page
+                count = max(0, min(per_page, stub.alerts - start))
+                body = [{'number': start + i + 1, 'state': 'open',
+                         'security_advisory': {'severity': SEVERITIES[(start + i) % 4]}} for i in range(count)]
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if start + per_page < stub.alerts:
+                    host = f'http://{self.server.server_address[0]}:{self.server.server_address[1]}'
+                    self.send_header('Link', f'<{host}{path}?state=open&per_page={per_page}&page={page + 1}>; rel="next"')
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def log_message(self, format, *args):
+                return
+
+        self.alerts = alerts
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api_base(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_address[1]}/repos'
+
+    def __enter__(self) -> 'AlertStub':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('dest', help='Destination directory')
+    p.add_argument('--scale', type=int, default=1000, help='Scale factor (cover blocks / alerts; files = scale/10)')
+    args = p.parse_args(argv)
+    units = generate(pathlib.Path(args.dest), Sizes.for_scale(args.scale))
+    print(json.dumps(units, indent=2))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
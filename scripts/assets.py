@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Content-addressed publishing of history data into the site.
+
+Each page's summary.json and data/*.json used to be copied into site_src once
+per URL layout (metrics/ and metrics/metrics/, bench/, security/). Publisher
+instead stores every file once as site_src/assets/<section>/<stem>.<hash><ext>,
+hardlinked from the source when the filesystem allows (copied otherwise), and
+writes manifest.json files mapping logical names ("summary.json",
+"data/loc.json") to those immutable URLs. The chart scripts fetch the manifest
+that sits next to them and resolve every series through it; hashed names never
+change content, so they can be cached forever.
+
+Published files must never be modified in place (a hardlink shares the source
+inode), so history writers use write_atomic(), which replaces the file instead.
+Files of a section that were not published by the current run are pruned.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+
+from pipeline_trace import count
+from site_output import write_text
+
+ASSETS = pathlib.Path('site_src') / 'assets'
+HASH_LEN = 12
+
+
+def write_atomic(path: pathlib.Path, text: str) -> None:
+    """Replace path with text via a temp file + os.replace (never truncates the existing inode)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def file_hash(path: pathlib.Path) -> str:
+    h = hashlib.sha256()
+    with path.open('rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LEN]
+
+
+def link(src: pathlib.Path, dst: pathlib.Path) -> bool:
+    """Hardlink src to dst (copy across filesystems); False when dst already has the same inode."""
+    try:
+        if dst.exists() and os.path.samefile(src, dst):
+            return False
+    except OSError:
+        pass
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f'.{dst.name}.tmp')
+    try:
+        tmp.unlink(missing_ok=True)
+        os.link(src, tmp)
+        count('assets.hardlinked')
+    except OSError:
+        shutil.copyfile(src, tmp)
+        count('assets.copied')
+        count('bytes_written', src.stat().st_size)
+    os.replace(tmp, dst)
+    return True
+
+
+class Publisher:
+    """Publish one section's files; call finish() to write its manifests and prune stale assets."""
+
+    def __init__(self, section: str, root: pathlib.Path | None = None):
+        self.section = section
+        self.dir = (root or ASSETS) / section
+        self.entries: dict[str, pathlib.Path] = {}
+
+    def publish(self, src: pathlib.Path, logical: str) -> pathlib.Path:
+        """Store src under its content hash (once) and record it as logical; returns the asset path."""
+        digest = file_hash(src)
+        name = pathlib.PurePosixPath(logical)
+        # flat per-section directory: data/loc.json -> data__loc.<hash>.json
+        stem = '__'.join([*name.parent.parts, name.stem])
+        dst = self.dir / f'{stem}.{digest}{name.suffix}'
+        if dst.exists():
+            count('assets.reused')
+        else:
+            link(src, dst)
+        self.entries[logical] = dst
+        return dst
+
+    def publish_dir(self, src_dir: pathlib.Path, prefix: str, pattern: str = '*.json') -> int:
+        n = 0
+        if src_dir.is_dir():
+            for p in sorted(src_dir.glob(pattern)):
+                self.publish(p, f'{prefix}{p.name}')
+                n += 1
+        return n
+
+    def url(self, logical: str, base: pathlib.Path) -> str | None:
+        """URL of a published file relative to directory base (e.g. a page or script directory)."""
+        dst = self.entries.get(logical)
+        return os.path.relpath(dst, base).replace(os.sep, '/') if dst is not None else None
+
+    def write_manifest(self, directory: pathlib.Path) -> pathlib.Path:
+        """manifest.json in directory, with URLs relative to it."""
+        mapping = {k: self.url(k, directory) for k in sorted(self.entries)}
+        path = directory / 'manifest.json'
+        write_text(path, json.dumps(mapping, indent=1, sort_keys=True) + '\n')
+        return path
+
+    def finish(self, *manifest_dirs: pathlib.Path) -> None:
+        for d in manifest_dirs:
+            self.write_manifest(d)
+        keep = {p.name for p in self.entries.values()}
+        if self.dir.is_dir():
+            for p in self.dir.iterdir():
+                if p.is_file() and p.name not in keep:
+                    p.unlink()
+                    count('assets.pruned')
+
+
+def publish_section(section: str, site_src: pathlib.Path, summary: pathlib.Path, data_dir: pathlib.Path,
+                    scripts: tuple[str, ...] = ()) -> Publisher:
+    """Publish a history section (summary.json + data/*.json) and its chart scripts.
+
+    Pages reference "<section>/<script>.js" relative to themselves, which resolves
+    to site_src/<section>/ or site_src/<section>/<section>/ depending on
+    use_directory_urls, so the (small) scripts and a manifest go to both; the
+    data itself is stored once under assets/<section>/.
+    """
+    from site_output import copy_file, find_asset
+
+    pub = Publisher(section, site_src / 'assets')
+    if summary.exists():
+        pub.publish(summary, 'summary.json')
+    count('files_copied', pub.publish_dir(data_dir, 'data/'))
+    dest = site_src / section
+    script_dirs = (dest, dest / section)
+    for d in script_dirs:
+        d.mkdir(parents=True, exist_ok=True)
+        for name in scripts:
+            src = find_asset(name)
+            if src is not None:
+                copy_file(src, d / name)
+        # copies written by earlier versions of the generators
+        (d / 'summary.json').unlink(missing_ok=True)
+        if (d / 'data').is_dir():
+            shutil.rmtree(d / 'data')
+    pub.finish(*script_dirs)
+    return pub
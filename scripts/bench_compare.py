@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Compare this run's benchmarks against the base branch's stored results (benchstat-style).
+
+Used on pull requests instead of update_bench.py, so branch results never reach the
+history. Base results are read from the history branch with `git show` (nothing is
+written to it): bench/summary.json and bench/data/<file>. A benchmark's base sample
+is the `samples` list of its latest entry when update_bench.py stored one (runs with
+bench_count > 1), else the ns_per_op of its last --base-runs entries. The PR sample
+is every round in bench.out, so use bench_count >= 5 for meaningful p-values.
+
+Only base entries recorded on this run's machine class are used (bench_env.py;
+history written before entries were tagged counts as one class). When the base
+only has other machine classes and BENCH_REFERENCE is set, both sides are
+compared in normalized units (ns/op divided by the reference benchmark's ns/op
+of the same run); otherwise the row reports "other machine" instead of a delta.
+
+Each benchmark gets a two-sided Mann-Whitney U test (exact for small tie-free
+samples, normal approximation with tie correction otherwise). Rows with p < alpha
+report the change of medians as faster/slower; the rest show "~" like benchstat.
+
+Outputs:
+    bench_compare.md    table embedded at the top of bench.md by gen_bench_md.py
+    bench_compare.json  machine-readable rows
+    $GITHUB_STEP_SUMMARY (appended)
+
+Env / Flags (flags override env):
+    BENCH_BRANCH / --base-branch   history branch (default bench-data)
+    BENCH_REFERENCE / --reference  reference benchmark for normalized comparisons (default none)
+    --base-dir                     read base history from a directory instead of the branch
+    --input (default bench.out)  --alpha (default 0.05)  --base-runs (default 10)
+    --summary (default $GITHUB_STEP_SUMMARY)
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import math
+import os
+import pathlib
+import statistics
+import subprocess
+
+from pipeline_trace import count, log, span
+from update_bench import parse_samples, series_file_name
+import bench_env
+
+ROOT = pathlib.Path.cwd()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--base-branch', default=os.environ.get('BENCH_BRANCH', 'bench-data'), help='History branch')
+    p.add_argument('--base-dir', default='', help='Directory holding bench/summary.json + bench/data (skips git)')
+    p.add_argument('--input', default=str(ROOT / 'bench.out'), help='go test -bench output of this run')
+    p.add_argument('--alpha', type=float, default=0.05, help='Significance level (default 0.05)')
+    p.add_argument('--base-runs', type=int, default=10, help='History entries used when no samples were stored')
+    p.add_argument('--reference', default=os.environ.get('BENCH_REFERENCE', ''),
+                   help='Reference benchmark; enables normalized comparisons across machine classes')
+    p.add_argument('--markdown', default=str(ROOT / 'bench_compare.md'), help='Markdown table output')
+    p.add_argument('--json', default=str(ROOT / 'bench_compare.json'), help='JSON output')
+    p.add_argument('--summary', default=os.environ.get('GITHUB_STEP_SUMMARY', ''), help='Markdown summary file')
+    return p.parse_args(argv)
+
+
+class BaseReader:
+    """Read-only access to the stored history (directory or history branch)."""
+
+    def __init__(self, branch: str, base_dir: str = ''):
+        self.branch = branch
+        self.base_dir = pathlib.Path(base_dir) if base_dir else None
+        if self.base_dir is None:
+            # refresh origin/<branch> only; no worktree, no local branch update
+            subprocess.run(['git', 'fetch', '--quiet', 'origin', branch], capture_output=True)
+
+    def read(self, rel: str) -> str | None:
+        if self.base_dir is not None:
+            path = self.base_dir / rel
+            return path.read_text(encoding='utf-8') if path.exists() else None
+        for ref in (f'origin/{self.branch}', self.branch):
+            try:
+                return subprocess.run(['git', 'show', f'{ref}:{rel}'], capture_output=True, text=True,
+                                      check=True).stdout
+            except (OSError, subprocess.CalledProcessError):
+                continue
+        return None
+
+    def series(self, name: str) -> list[dict]:
+        text = self.read(f'bench/data/{series_file_name(name)}')
+        try:
+            data = json.loads(text) if text else []
+        except ValueError:
+            return []
+        return [e for e in data if isinstance(e, dict)] if isinstance(data, list) else []
+
+
+def base_sample(series: list[dict], runs: int, key: str = 'ns_per_op') -> list[float]:
+    if not series:
+        return []
+    latest = series[-1].get('samples')
+    if key == 'ns_per_op' and isinstance(latest, list) and len(latest) > 1:
+        return [float(v) for v in latest]
+    return [float(e[key]) for e in series[-runs:] if isinstance(e.get(key), (int, float))]
+
+
+@functools.lru_cache(maxsize=None)
+def _u_counts(m: int, n: int) -> tuple[int, ...]:
+    """Number of orderings of m x's and n y's giving each U = 0..m*n."""
+    if m == 0 or n == 0:
+        return (1,)
+    with_x_last = _u_counts(m - 1, n)  # the largest value is an x: it beats all n y's
+    with_y_last = _u_counts(m, n - 1)
+    out = [0] * (m * n + 1)
+    for u, c in enumerate(with_x_last):
+        out[u + n] += c
+    for u, c in enumerate(with_y_last):
+        out[u] += c
+    return tuple(out)
+
+
+def mann_whitney(x: list[float], y: list[float]) -> tuple[float, float]:
+    """Two-sided Mann-Whitney U test; returns (U of x, p-value)."""
+    n1, n2 = len(x), len(y)
+    pooled = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+    ranks = [0.0] * len(pooled)
+    ties: list[int] = []
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    r1 = sum(r for r, (_, group) in zip(ranks, pooled) if group == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    u_min = min(u1, n1 * n2 - u1)
+    if not ties and n1 + n2 <= 40:
+        dist = _u_counts(n1, n2)
+        p = 2 * sum(dist[:int(u_min) + 1]) / math.comb(n1 + n2, n1)
+        return u1, min(1.0, p)
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - sum(t ** 3 - t for t in ties) / (n * (n - 1)))
+    if var <= 0:
+        return u1, 1.0
+    z = max(0.0, abs(u1 - n1 * n2 / 2) - 0.5) / math.sqrt(var)
+    return u1, min(1.0, math.erfc(z / math.sqrt(2)))
+
+
+def compare(pr: dict[str, dict[str, list[float]]], base: BaseReader, alpha: float, runs: int,
+            machine: str = '', reference: str = '') -> list[dict]:
+    """One row per benchmark of this run; base entries are limited to machine (all when empty)."""
+    ref = bench_env.reference_ns({n: {'ns_per_op': statistics.median(v['ns_per_op'])}
+                                  for n, v in pr.items() if v.get('ns_per_op')}, reference)
+    rows = []
+    for name in sorted(pr):
+        new = pr[name].get('ns_per_op', [])
+        if not new:
+            continue
+        series = base.series(name)
+        matching = bench_env.like_for_like(series, machine) if machine else series
+        old = base_sample(matching, runs)
+        normalized = False
+        if not old and series and ref:
+            old = base_sample([e for e in series if 'normalized' in e], runs, 'normalized')
+            new = [v / ref for v in new]
+            normalized = bool(old)
+        row = {'name': name, 'pr': statistics.median(new), 'pr_n': len(new), 'base': None,
+               'base_n': len(old), 'delta_pct': None, 'p': None, 'verdict': 'new', 'normalized': normalized}
+        if not old and series:
+            row['verdict'] = 'other machine'
+        if old:
+            row['base'] = statistics.median(old)
+            row['delta_pct'] = round((row['pr'] - row['base']) / row['base'] * 100, 2) if row['base'] else None
+            row['verdict'] = '~'
+            if len(old) > 1 and len(new) > 1:
+                _, p = mann_whitney(old, new)
+                row['p'] = round(p, 4)
+                if p < alpha and row['delta_pct']:
+                    row['verdict'] = 'slower' if row['delta_pct'] > 0 else 'faster'
+        rows.append(row)
+    count('bench.compared', len(rows))
+    return rows
+
+
+def _fmt(v: float | None) -> str:
+    return '-' if v is None else f'{v:g}'
+
+
+def markdown(rows: list[dict], alpha: float, branch: str, machine: str = '', reference: str = '') -> str:
+    lines = ['## Benchmark Comparison', '',
+             f'This run against the latest results stored on `{branch}` (Mann-Whitney U, α = {alpha:g}).']
+    if machine:
+        lines.append(f'Only base results from the same machine class (`{machine}`) are used.')
+    if any(r.get('normalized') for r in rows):
+        lines.append(f'_Rows marked ≈ compare values normalized to `{reference}` across machine classes._')
+    lines += ['',
+             '| Benchmark | Base ns/op | PR ns/op | Delta | p-value | n | Result |',
+             '|-----------|------------|----------|-------|---------|---|--------|']
+    for r in rows:
+        delta = '-' if r['delta_pct'] is None else f"{r['delta_pct']:+.2f}%"
+        if r['verdict'] == '~' and r['delta_pct'] is not None:
+            delta = f'~ ({delta})'
+        verdict = {'faster': '✅ faster', 'slower': '❌ slower'}.get(r['verdict'], r['verdict'])
+        name = f"`{r['name']}` ≈" if r.get('normalized') else f"`{r['name']}`"
+        lines.append(f"| {name} | {_fmt(r['base'])} | {_fmt(r['pr'])} | {delta} | {_fmt(r['p'])} | "
+                     f"{r['base_n']}+{r['pr_n']} | {verdict} |")
+    if not rows:
+        lines.append('| _no benchmarks in this run_ | | | | | | |')
+    slower = sum(r['verdict'] == 'slower' for r in rows)
+    faster = sum(r['verdict'] == 'faster' for r in rows)
+    lines += ['', f'{slower} significantly slower, {faster} significantly faster, '
+                  f'{len(rows) - slower - faster} unchanged or inconclusive.', '']
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    with span('parse bench.out'):
+        pr = parse_samples(pathlib.Path(args.input))
+    if not pr:
+        log('info', f'no benchmark results in {args.input}; nothing to compare')
+        return 0
+    machine = bench_env.fingerprint(pathlib.Path(args.input))['machine']
+    base = BaseReader(args.base_branch, args.base_dir)
+    with span('compare', benchmarks=len(pr)):
+        rows = compare(pr, base, args.alpha, args.base_runs, machine, args.reference)
+    md = markdown(rows, args.alpha, args.base_branch, machine, args.reference)
+    pathlib.Path(args.markdown).write_text(md, encoding='utf-8')
+    pathlib.Path(args.json).write_text(json.dumps({'alpha': args.alpha, 'machine': machine, 'rows': rows}, indent=2),
+                                       encoding='utf-8')
+    if args.summary:
+        with open(args.summary, 'a', encoding='utf-8') as f:
+            f.write(md + '\n')
+    print(md)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark environment fingerprint and machine classes.
+
+Hosted runners move between CPU generations without notice, and a series that
+mixes them shows regressions and improvements no code change caused. Each
+benchmark run therefore records where it ran:
+
+    goos, goarch, cpu  the header lines `go test -bench` prints per package in
+                       bench.out (pkg lines only count the packages); cpu falls
+                       back to /proc/cpuinfo when the header is missing
+    cores              cores available to the run (affinity mask)
+    go                 `go env GOVERSION`
+    kernel             platform.system() + release
+    image              runner image (ImageOS / ImageVersion) on GitHub-hosted runners
+
+The machine class is the hardware part of it (goos, goarch, cpu model, cores)
+as a readable slug. update_bench.py tags every history entry with it, and
+charts and comparisons only use entries of one class (like_for_like). Go
+version and kernel are kept per run in bench/environments.json but do not
+split series: their effect is real, not noise.
+
+With BENCH_REFERENCE set to a benchmark name (the -N GOMAXPROCS suffix is
+ignored), every entry also stores `normalized`, its ns/op divided by the
+reference's ns/op in the same run. Normalized values stay comparable across
+machine classes, so charts and comparisons can span a runner change.
+
+Usage:
+    bench_env.py [--input bench.out]   prints the fingerprint as JSON
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import platform
+import re
+import subprocess
+
+HEADERS = ('goos', 'goarch', 'cpu')
+PROCS_SUFFIX = re.compile(r'-\d+$')
+MAX_CLASS_LEN = 80
+GOARCH = {'x86_64': 'amd64', 'amd64': 'amd64', 'aarch64': 'arm64', 'arm64': 'arm64', 'i386': '386', 'i686': '386'}
+
+
+def parse_headers(path: pathlib.Path) -> dict:
+    """First goos/goarch/cpu header of bench.out and the number of pkg headers."""
+    out: dict = {'packages': 0}
+    try:
+        f = path.open(encoding='utf-8', errors='replace')
+    except OSError:
+        return out
+    with f:
+        for line in f:
+            key, sep, value = line.partition(':')
+            if not sep or key not in (*HEADERS, 'pkg'):
+                continue
+            if key == 'pkg':
+                out['packages'] += 1
+            else:
+                out.setdefault(key, value.strip())
+    return out
+
+
+def _proc_cpu() -> str:
+    try:
+        for line in pathlib.Path('/proc/cpuinfo').read_text(encoding='utf-8', errors='replace').splitlines():
+            key, _, value = line.partition(':')
+            if key.strip() == 'model name':
+                return value.strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def cores() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def go_version() -> str:
+    try:
+        return subprocess.run(['go', 'env', 'GOVERSION'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def machine_class(env: dict) -> str:
+    """Readable slug of the hardware fields, e.g. linux-amd64-amd-epyc-7763-64-core-processor-4c."""
+    raw = f"{env.get('goos') or 'unknown'}-{env.get('goarch') or 'unknown'}-{env.get('cpu') or 'unknown'}-{env.get('cores', 0)}c"
+    slug = re.sub(r'[^a-z0-9]+', '-', raw.lower()).strip('-')
+    if len(slug) > MAX_CLASS_LEN:
+        slug = slug[:MAX_CLASS_LEN - 9].rstrip('-') + '-' + hashlib.sha256(slug.encode()).hexdigest()[:8]
+    return slug
+
+
+def fingerprint(bench_out: pathlib.Path) -> dict:
+    headers = parse_headers(bench_out)
+    env = {
+        'goos': headers.get('goos') or platform.system().lower(),
+        'goarch': headers.get('goarch') or GOARCH.get(platform.machine().lower(), platform.machine().lower()),
+        'cpu': headers.get('cpu') or _proc_cpu(),
+        'cores': cores(),
+        'go': go_version(),
+        'kernel': f'{platform.system()} {platform.release()}'.strip(),
+        'packages': headers['packages'],
+    }
+    if os.environ.get('ImageOS'):
+        env['image'] = f"{os.environ['ImageOS']} {os.environ.get('ImageVersion', '')}".strip()
+    env['machine'] = machine_class(env)
+    return env
+
+
+def base_name(name: str) -> str:
+    """Benchmark name without the -N GOMAXPROCS suffix."""
+    return PROCS_SUFFIX.sub('', name)
+
+
+def reference_ns(results: dict[str, dict[str, float]], reference: str) -> float | None:
+    """ns/op of the reference benchmark in this run (matched without the -N suffix)."""
+    if not reference:
+        return None
+    want = base_name(reference)
+    for name, rec in results.items():
+        if base_name(name) == want and rec.get('ns_per_op'):
+            return float(rec['ns_per_op'])
+    return None
+
+
+def like_for_like(series: list[dict], machine: str) -> list[dict]:
+    """Entries recorded on machine; series written before entries were tagged are returned whole."""
+    if not any(e.get('machine') for e in series):
+        return series
+    return [e for e in series if e.get('machine') == machine]
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--input', default='bench.out', help='go test -bench output (default bench.out)')
+    args = p.parse_args(argv)
+    print(json.dumps(fingerprint(pathlib.Path(args.input)), indent=2))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
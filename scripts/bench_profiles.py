@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""Capture CPU/memory profiles for selected benchmarks and render flame graphs.
+
+Optional stage, run after update_bench.py. For every benchmark in bench.out
+whose name matches one of the BENCH_PROFILE regexes it re-runs that single
+benchmark with -cpuprofile/-memprofile, converts the pprof data to folded
+stacks via `go tool pprof -raw` and renders static SVG flame graphs:
+
+    site_src/bench/profiles/<stem>.<cpu|mem>.svg       flame graph
+    site_src/bench/profiles/<stem>.<cpu|mem>.diff.svg  differential vs previous run
+    site_src/bench/profiles/<stem>.<cpu|mem>.folded    folded stacks (sorted, diffable)
+
+Folded stacks are also stored under bench/profiles/ and pushed to the history
+branch, so the next run can diff against them.
+
+Env / Flags (flags override env):
+    BENCH_PROFILE / --select   comma list of benchmark name regexes (empty = disabled)
+    BENCH_TIME / --benchtime   optional -benchtime for profiled runs
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import os
+import pathlib
+import re
+import subprocess
+import sys
+import tempfile
+
+import update_bench
+from pipeline_trace import log, span
+from site_output import write_text
+
+ROOT = pathlib.Path.cwd()
+BENCH_OUT = ROOT / 'bench.out'
+HISTORY_DIR = ROOT / 'bench' / 'profiles'
+SITE_DIR = ROOT / 'site_src' / 'bench' / 'profiles'
+KINDS = ('cpu', 'mem')
+
+WIDTH = 1200
+ROW = 16
+MIN_PX = 0.5
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--select', default=os.environ.get('BENCH_PROFILE', ''), help='Comma list of benchmark regexes')
+    p.add_argument('--benchtime', default=os.environ.get('BENCH_TIME', ''), help='Optional -benchtime value')
+    p.add_argument('--bench-out', default=str(BENCH_OUT), help='Benchmark output to select from (default bench.out)')
+    return p.parse_args(argv)
+
+
+def bench_packages(text: str) -> list[tuple[str, str]]:
+    """(package, benchmark name) pairs in bench.out order, deduplicated."""
+    seen: dict[tuple[str, str], None] = {}
+    pkg = ''
+    for line in text.splitlines():
+        if line.startswith('pkg:'):
+            pkg = line.split(':', 1)[1].strip()
+        elif line.startswith('Benchmark') and pkg:
+            seen.setdefault((pkg, line.split()[0]), None)
+    return list(seen)
+
+
+def bench_regex(name: str) -> str:
+    """Anchored -bench regex for one benchmark (GOMAXPROCS suffix stripped)."""
+    base = re.sub(r'-\d+$', '', name)
+    return '/'.join('^' + re.escape(part) + '$' for part in base.split('/'))
+
+
+# --- pprof -raw -> folded stacks -------------------------------------------
+
+_LOC_RE = re.compile(r'^\s*(\d+): 0x[0-9a-fA-F]+ (?:M=\d+ )?(?:\[F\] )?(.*)$')
+_SAMPLE_RE = re.compile(r'^\s*((?:-?\d+\s+)*-?\d+):\s*([\d\s]*)$')
+
+
+def fold_raw(raw: str) -> dict[str, int]:
+    """Convert `go tool pprof -raw` text into folded stacks (root;...;leaf -> value).
+
+    Uses the default sample type (marked [dflt]) or the last one.
+    """
+    section = ''
+    value_idx = -1
+    samples: list[tuple[int, list[int]]] = []
+    frames: dict[int, list[str]] = {}
+    current: list[str] | None = None
+    for line in raw.splitlines():
+        stripped = line.strip()
+        if stripped == 'Samples:':
+            section = 'header'
+            continue
+        if stripped == 'Locations':
+            section = 'locations'
+            continue
+        if stripped == 'Mappings':
+            section = 'mappings'
+            continue
+        if section == 'header':
+            types = stripped.split()
+            value_idx = next((i for i, t in enumerate(types) if t.endswith('[dflt]')), len(types) - 1)
+            section = 'samples'
+        elif section == 'samples':
+            m = _SAMPLE_RE.match(line)
+            if m:
+                values = [int(v) for v in m.group(1).split()]
+                ids = [int(x) for x in m.group(2).split()]
+                samples.append((values[min(value_idx, len(values) - 1)], ids))
+        elif section == 'locations':
+            m = _LOC_RE.match(line)
+            if m:
+                current = frames.setdefault(int(m.group(1)), [])
+                rest = m.group(2).strip()
+                if rest:
+                    current.append(rest.split(' ', 1)[0])
+            elif current is not None and stripped:
+                current.append(stripped.split(' ', 1)[0])
+    folded: dict[str, int] = {}
+    for value, ids in samples:
+        if value <= 0:
+            continue
+        stack: list[str] = []
+        # Sample locations are leaf-first; inlined lines within a location too.
+        for loc in reversed(ids):
+            stack.extend(reversed(frames.get(loc) or ['??']))
+        key = ';'.join(stack)
+        folded[key] = folded.get(key, 0) + value
+    return folded
+
+
+def format_folded(folded: dict[str, int]) -> str:
+    return ''.join(f'{stack} {value}\n' for stack, value in sorted(folded.items()))
+
+
+def parse_folded(text: str) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for line in text.splitlines():
+        stack, _, value = line.rpartition(' ')
+        if stack and value.isdigit():
+            out[stack] = out.get(stack, 0) + int(value)
+    return out
+
+
+# --- flame graph rendering --------------------------------------------------
+
+def _tree(folded: dict[str, int]) -> dict:
+    root: dict = {'v': 0, 'c': {}}
+    for stack, value in folded.items():
+        node = root
+        node['v'] += value
+        for frame in stack.split(';'):
+            node = node['c'].setdefault(frame, {'v': 0, 'c': {}})
+            node['v'] += value
+    return root
+
+
+def _color(name: str) -> str:
+    h = int(hashlib.md5(name.encode()).hexdigest()[:6], 16)
+    return f'rgb({205 + h % 50},{(h >> 8) % 180 + 40},{(h >> 16) % 55})'
+
+
+def _diff_color(delta: float) -> str:
+    # delta is the change in share of total samples; saturate at +-5 points
+    k = min(abs(delta) / 0.05, 1.0)
+    fade = int(255 - 200 * k)
+    return f'rgb(255,{fade},{fade})' if delta > 0 else f'rgb({fade},{fade},255)'
+
+
+def render_flamegraph(folded: dict[str, int], title: str, base: dict[str, int] | None = None) -> str:
+    """Render folded stacks as a static SVG flame graph.
+
+    With base, frames are colored by how their share of samples changed
+    (red = grew, blue = shrank) while widths follow the current profile.
+    """
+    tree = _tree(folded)
+    total = tree['v'] or 1
+    base_tree = _tree(base) if base is not None else None
+    base_total = (base_tree['v'] or 1) if base_tree else 1
+    boxes: list[tuple[float, int, float, str, str, str]] = []
+
+    def walk(node: dict, other: dict | None, name: str, x: float, depth: int) -> None:
+        width = node['v'] / total * WIDTH
+        if width < MIN_PX:
+            return
+        if depth:
+            share = node['v'] / total
+            if base_tree is not None:
+                before = (other['v'] / base_total) if other else 0.0
+                fill = _diff_color(share - before)
+                label = f'{name} ({share * 100:.2f}%, {(share - before) * 100:+.2f} pts)'
+            else:
+                fill = _color(name)
+                label = f'{name} ({node["v"]} samples, {share * 100:.2f}%)'
+            chars = int(width / 7)
+            text = name if len(name) <= chars else (name[:chars - 2] + '..' if chars > 3 else '')
+            boxes.append((x, depth, width, fill, label, text))
+        child_x = x
+        for child_name, child in sorted(node['c'].items()):
+            walk(child, other['c'].get(child_name) if other else None, child_name, child_x, depth + 1)
+            child_x += child['v'] / total * WIDTH
+
+    walk(tree, base_tree, 'all', 0.0, 0)
+    depth_max = max((b[1] for b in boxes), default=0)
+    height = (depth_max + 1) * ROW + 24
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{height}" '
+        f'viewBox="0 0 {WIDTH} {height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="14" font-size="13">{html.escape(title)}</text>',
+    ]
+    for x, depth, width, fill, label, text in boxes:
+        y = height - depth * ROW - 4  # root frames at the bottom
+        parts.append(
+            f'<g><title>{html.escape(label)}</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{ROW - 1}" fill="{fill}" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + ROW - 5}">{html.escape(text)}</text>' if text else '')
+            + '</g>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts) + '\n'
+
+
+# --- capture -----------------------------------------------------------------
+
+def capture(pkg: str, name: str, workdir: pathlib.Path, benchtime: str) -> dict[str, dict[str, int]]:
+    binary = workdir / 'bench.test'
+    cmd = ['go', 'test', '-run=^$', f'-bench={bench_regex(name)}', '-benchmem',
+           '-cpuprofile', str(workdir / 'cpu.pprof'), '-memprofile', str(workdir / 'mem.pprof'),
+           '-o', str(binary)]
+    if benchtime:
+        cmd.append(f'-benchtime={benchtime}')
+    cmd.append(pkg)
+    if subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+        log('warning', f'profiled run failed for {name} ({pkg})')
+        return {}
+    out: dict[str, dict[str, int]] = {}
+    for kind in KINDS:
+        prof = workdir / f'{kind}.pprof'
+        if not prof.exists():
+            continue
+        try:
+            raw = subprocess.check_output(['go', 'tool', 'pprof', '-raw', str(binary), str(prof)],
+                                          text=True, stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.CalledProcessError):
+            log('warning', f'go tool pprof failed for {name} ({kind})')
+            continue
+        out[kind] = fold_raw(raw)
+    return out
+
+
+def publish(stem: str, kind: str, folded: dict[str, int], title: str) -> None:
+    """Write folded stacks to history and SVGs (plus diff vs previous) to the site."""
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    SITE_DIR.mkdir(parents=True, exist_ok=True)
+    hist = HISTORY_DIR / f'{stem}.{kind}.folded'
+    previous = parse_folded(hist.read_text(encoding='utf-8')) if hist.exists() else None
+    text = format_folded(folded)
+    hist.write_text(text, encoding='utf-8')
+    write_text(SITE_DIR / f'{stem}.{kind}.folded', text)
+    write_text(SITE_DIR / f'{stem}.{kind}.svg', render_flamegraph(folded, f'{title} ({kind})'))
+    diff_svg = SITE_DIR / f'{stem}.{kind}.diff.svg'
+    if previous:
+        write_text(diff_svg, render_flamegraph(folded, f'{title} ({kind}, vs previous run)', previous))
+    elif diff_svg.exists():
+        diff_svg.unlink()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    patterns = [re.compile(p.strip()) for p in args.select.split(',') if p.strip()]
+    bench_out = pathlib.Path(args.bench_out)
+    if not patterns or not bench_out.exists():
+        return 0
+    targets = [(pkg, name) for pkg, name in bench_packages(bench_out.read_text(encoding='utf-8'))
+               if any(p.search(name) for p in patterns)]
+    if not targets:
+        log('info', 'no benchmarks matched BENCH_PROFILE; skipping profiles.')
+        return 0
+    for pkg, name in targets:
+        stem = update_bench.series_file_name(name)[:-len('.json')]
+        with span(f'profile {name}', package=pkg), tempfile.TemporaryDirectory(prefix='prof_') as td:
+            profiles = capture(pkg, name, pathlib.Path(td), args.benchtime)
+        for kind, folded in profiles.items():
+            if folded:
+                publish(stem, kind, folded, name)
+    update_bench.commit_history('Update benchmark profiles')
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,171 @@
+// Shared lazy sparkline renderer for the bench, metrics and security pages.
+// Each chart's series is fetched and drawn only when its container scrolls into
+// view (IntersectionObserver), with at most `concurrency` fetches in flight.
+// Browsers without IntersectionObserver fall back to loading everything, still
+// through the same capped queue.
+(function (global) {
+  if (global.DocCharts) return;
+
+  function draw(canvas, values, opts) {
+    const o = opts || {};
+    const ctx = canvas && canvas.getContext && canvas.getContext('2d');
+    if (!ctx) return;
+    const w = canvas.width || 240,
+      h = canvas.height || 60;
+    const color = o.color || '#0366d6';
+    const digits = o.digits === undefined ? 2 : o.digits;
+    if (values.length > 1) {
+      const min = Math.min(...values);
+      const max = Math.max(...values);
+      ctx.strokeStyle = color;
+      ctx.lineWidth = 2;
+      ctx.beginPath();
+      values.forEach((v, i) => {
+        const x = (i / (values.length - 1)) * (w - 10) + 5;
+        const y = h - 5 - (max === min ? 0.5 : (v - min) / (max - min)) * (h - 10);
+        i ? ctx.lineTo(x, y) : ctx.moveTo(x, y);
+      });
+      ctx.stroke();
+      ctx.fillStyle = '#555';
+      ctx.font = '10px sans-serif';
+      ctx.fillText(min.toFixed(digits), 4, h - 2);
+      ctx.fillText(max.toFixed(digits), 4, 10);
+    } else if (values.length === 1) {
+      ctx.fillStyle = color;
+      ctx.beginPath();
+      ctx.arc(w / 2, h / 2, 4, 0, Math.PI * 2);
+      ctx.fill();
+    }
+  }
+
+  // Bounded FIFO of fetch jobs; each job returns a promise.
+  function queue(limit) {
+    const pending = [];
+    let active = 0;
+    function pump() {
+      while (active < limit && pending.length) {
+        const job = pending.shift();
+        active++;
+        Promise.resolve()
+          .then(job)
+          .catch(() => {})
+          .then(() => {
+            active--;
+            pump();
+          });
+      }
+    }
+    return {
+      push(job) {
+        pending.push(job);
+        pump();
+      },
+      get active() {
+        return active;
+      },
+    };
+  }
+
+  // Render one chart per item ({name, url}) into root, loading each lazily.
+  function mount(root, items, opts) {
+    const o = opts || {};
+    const doc = root.ownerDocument;
+    const q = queue(o.concurrency || 4);
+    const pick = typeof o.value === 'function' ? o.value : (s) => s[o.value || 'value'];
+    const wrap = doc.createElement('div');
+    const charts = items.map((item) => {
+      const div = doc.createElement('div');
+      div.className = o.className || 'chart';
+      const title = doc.createElement('h4');
+      title.textContent = item.name;
+      const canvas = doc.createElement('canvas');
+      canvas.width = o.width || 240;
+      canvas.height = o.height || 60;
+      div.appendChild(title);
+      div.appendChild(canvas);
+      wrap.appendChild(div);
+      return { div, canvas, item, queued: false };
+    });
+    root.innerHTML = '';
+    root.appendChild(wrap);
+
+    function load(chart) {
+      if (chart.queued) return;
+      chart.queued = true;
+      q.push(() =>
+        global
+          .fetch(chart.item.url)
+          .then((r) => r.json())
+          .then((series) => {
+            const values = (series || []).map(pick).filter((v) => typeof v === 'number' && isFinite(v));
+            draw(chart.canvas, values, o);
+            chart.div.setAttribute('data-loaded', 'true');
+          }),
+      );
+    }
+
+    const IO = global.IntersectionObserver;
+    if (typeof IO !== 'function') {
+      charts.forEach(load);
+      return { charts, queue: q };
+    }
+    const byDiv = new Map(charts.map((c) => [c.div, c]));
+    const observer = new IO(
+      (entries) => {
+        entries.forEach((e) => {
+          if (!e.isIntersecting) return;
+          observer.unobserve(e.target);
+          load(byDiv.get(e.target));
+        });
+      },
+      { rootMargin: o.rootMargin || '200px 0px' },
+    );
+    charts.forEach((c) => observer.observe(c.div));
+    return { charts, queue: q, observer };
+  }
+
+  // Resolve logical names ("summary.json", "data/x.json") through the manifest.json
+  // written by scripts/assets.py; without a usable manifest fall back to opts.legacy + name.
+  function resolver(opts) {
+    const legacy = (name) => (opts.legacy || '') + name;
+    if (!opts.manifest) return Promise.resolve(legacy);
+    return global
+      .fetch(opts.manifest)
+      .then((r) => {
+        if (r.ok === false) throw new Error('manifest ' + r.status);
+        return r.json();
+      })
+      .then((map) => {
+        if (!map || typeof map !== 'object' || Array.isArray(map)) return legacy;
+        const base = new URL(opts.manifest, global.location.href);
+        return (name) => (map[name] ? new URL(map[name], base).href : legacy(name));
+      })
+      .catch(() => legacy);
+  }
+
+  // Fetch a history summary and mount its series.
+  //   opts.summary   logical summary name    opts.list  summary key holding [{name, file}]
+  //   opts.data      prefix for series files opts.fail  message shown when the summary fails
+  //   opts.manifest  manifest.json URL       opts.legacy  URL prefix used without a manifest
+  //   opts.prepare   optional (summary, opts) => opts, e.g. to pick values per summary
+  function render(rootId, opts) {
+    const root = global.document.getElementById(rootId);
+    if (!root) return Promise.resolve(null);
+    return resolver(opts)
+      .then((resolve) =>
+        global
+          .fetch(resolve(opts.summary))
+          .then((r) => r.json())
+          .then((summary) => {
+            const items = (summary[opts.list] || []).map((m) => ({ name: m.name, url: resolve(opts.data + m.file) }));
+            return mount(root, items, opts.prepare ? opts.prepare(summary, opts) : opts);
+          }),
+      )
+      .catch(() => {
+        root.textContent = opts.fail || 'Failed to load history.';
+        return null;
+      });
+  }
+
+  global.DocCharts = { draw, mount, render, resolver, queue };
+})(typeof window !== 'undefined' ? window : this);
@@ -1,11 +1,22 @@
 #!/usr/bin/env python3
 """Collect repository metrics and write metrics.json + metrics.md with schema validation.
 
+Metrics are gathered by the lazily loaded plugins in collectors/ (one shared
+directory walk); their declared fields extend the schema and the metrics table.
+Go numbers are also rolled up per package (go_packages.py) into packages.json
+and a Packages table, and the per-file numbers of all collectors (with Go
+statement coverage from coverage_files.json when a Go metric is selected) are summed per directory
+(metrics_tree.py) into metrics/tree.json, a Hotspots section (largest, most
+complex and least tested directories) and a treemap (treemap.js).
+
 Env / Flags (flags override env):
-    METRICS / --metrics (comma list)
+    METRICS / --metrics (comma list, e.g. coverage,tests,files,loc,zig_files,zig_tests,zig_loc,todo)
     HIGH_COMPLEXITY_THRESHOLD / --high-complexity-threshold
     --root (default CWD)
     --output-dir (default site_src)
+    METRICS_HISTORY / --history-dir (default metrics/data; feeds the table's Trend column)
+    METRICS_HOTSPOTS / --hotspots (directories per Hotspots table, default 10; 0 disables)
+    INTERACTIVE_CHARTS=false drops the treemap (the Hotspots tables stay)
 
 Exit codes:
     0 success
@@ -13,10 +24,20 @@ Exit codes:
 """
 from __future__ import annotations
 
-import json, os, pathlib, re, subprocess, argparse, sys
+import json, os, pathlib, posixpath, argparse, sys
 from typing import Dict, Any
 
+from pipeline_trace import count, span
+from site_output import copy_file, find_asset, write_text
+import collectors
+import cover_merge
+import go_packages
+import metrics_tree
+import schema_validator
+import sparkline
+
 SCHEMA = pathlib.Path('schema/metrics.schema.json')
+TREEMAP_HTML = '<div id="metrics-treemap">Loading directory treemap...</div>\n<script src="metrics/treemap.js"></script>\n'
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(add_help=True)
@@ -24,23 +45,128 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--high-complexity-threshold', type=int, default=int(os.environ.get('HIGH_COMPLEXITY_THRESHOLD', '10')))
     p.add_argument('--root', default='.', help='Project root (default .)')
     p.add_argument('--output-dir', default='site_src', help='Output directory (default site_src)')
+    p.add_argument('--history-dir', default=os.environ.get('METRICS_HISTORY', 'metrics/data'),
+                   help='Stored metric series used for the Trend column (default metrics/data)')
+    p.add_argument('--hotspots', type=int, default=int(os.environ.get('METRICS_HOTSPOTS', '10') or 10),
+                   help='Directories per Hotspots table (default 10; 0 disables the section)')
     return p.parse_args()
 
-def validate_schema(data: dict) -> bool:
-    try:
-        schema = json.loads(SCHEMA.read_text(encoding='utf-8'))
-    except Exception:
+def validate_schema(data: dict, extra_fields: dict[str, tuple[str, dict]] | None = None) -> bool:
+    path = SCHEMA if SCHEMA.exists() else schema_validator.SCHEMA_DIR / SCHEMA.name
+    validator = schema_validator.load(path)
+    if validator is None:
         return True  # no schema => skip
-    if not isinstance(data, dict):
-        return False
-    for k, v in data.items():
-        if k.endswith('_percent') and not isinstance(v, (int, float)):
-            return False
-        if k in ('test_functions', 'go_files', 'loc', 'high_complexity_functions') and not isinstance(v, int):
-            return False
-        if k == 'avg_cyclomatic_complexity' and not isinstance(v, (int, float)):
-            return False
-    return True
+    if extra_fields:
+        # collectors declare their own fields; extend the closed schema with any it lacks
+        schema = json.loads(path.read_text(encoding='utf-8'))
+        props = schema.setdefault('properties', {})
+        for key, (_, fragment) in extra_fields.items():
+            props.setdefault(key, fragment)
+        validator = schema_validator.compile_schema(schema)
+    err = validator(data)
+    if err:
+        print(f'SCHEMA_ERROR: {err}', file=sys.stderr)
+    return err is None
+
+def render_table(metrics: dict, fields: dict[str, tuple[str, dict]], threshold: int,
+                 history: dict[str, list[float]] | None = None) -> str:
+    """Snapshot table in field order; a Trend column (inline SVG sparkline + delta) when any history exists."""
+    history = history or {}
+    trends = any(len(history.get(k, [])) > 1 for k in metrics)
+    table_lines = [
+        '# Project Metrics',
+        '',
+        '| Metric | Value | Trend |' if trends else '| Metric | Value |',
+        '|--------|-------|-------|' if trends else '|--------|-------|',
+    ]
+    for key, (label, _) in fields.items():
+        if key in metrics:
+            row = f'| {label.format(threshold=threshold)} | {metrics[key]} |'
+            if trends:
+                row += f' {sparkline.trend_cell(history.get(key, []))} |'
+            table_lines.append(row)
+    return '\n'.join(table_lines) + '\n'
+
+PACKAGE_COLUMNS = [
+    ('files', 'Files'),
+    ('loc', 'LOC'),
+    ('tests', 'Test Functions'),
+    ('avg_complexity', 'Avg Complexity'),
+    ('high_complexity', 'Functions > {threshold}'),
+]
+
+def render_packages(packages: dict[str, dict], threshold: int) -> str:
+    """Per-package table (only columns some package has), or '' without packages."""
+    cols = [(k, label) for k, label in PACKAGE_COLUMNS if any(k in rec for rec in packages.values())]
+    if not packages or not cols:
+        return ''
+    lines = [
+        '',
+        '## Packages',
+        '',
+        '| Package | ' + ' | '.join(label.format(threshold=threshold) for _, label in cols) + ' |',
+        '|' + '---|' * (len(cols) + 1),
+    ]
+    for name, rec in packages.items():
+        cells = [str(rec[k]) if k in rec else ('-' if k == 'avg_complexity' else '0') for k, _ in cols]
+        lines.append(f'| `{name}` | ' + ' | '.join(cells) + ' |')
+    return '\n'.join(lines) + '\n'
+
+def go_coverage(root: pathlib.Path, model: go_packages.Model) -> dict[str, dict[str, int]]:
+    """Statements per relative .go path from coverage_files.json (cover.out names files by import path)."""
+    files = cover_merge.load_files_json(root / 'cover.out')
+    if not files:
+        return {}
+    out: dict[str, dict[str, int]] = {}
+    for rec in files:
+        pkg = model.package_for_file(rec['file'])
+        if pkg is None:
+            continue
+        rel = posixpath.normpath(posixpath.join(pkg.dir, posixpath.basename(rec['file'])))
+        out[rel] = {'stmts': rec['stmts'], 'covered': rec['covered']}
+    return out
+
+def _cell(v: float) -> str:
+    return f'{v:.2f}'.rstrip('0').rstrip('.') if isinstance(v, float) else str(v)
+
+def render_hotspots(tree: metrics_tree.Node | None, threshold: int, n: int = 10, interactive: bool = True) -> str:
+    """Top-n directory tables per hotspot query plus the treemap container, or '' without a tree."""
+    if tree is None or n <= 0 or not tree.values:
+        return ''
+    sections = [
+        ('Largest', 'largest', ['LOC', 'Files'], lambda v: [v.get('loc', 0), v.get('files', 0)]),
+        ('Most Complex', 'complex', [f'Functions > {threshold}', 'Avg Complexity', 'Functions'],
+         lambda v: [v.get('high_complexity', 0), round(metrics_tree.avg_complexity(v), 2), v.get('functions', 0)]),
+    ]
+    if tree.values.get('stmts'):
+        sections.append(('Least Tested', 'untested', ['Coverage (%)', 'Stmts'],
+                         lambda v: [round(metrics_tree.coverage(v), 2), v['stmts']]))
+    else:
+        sections.append(('Least Tested', 'untested', ['Tests per 100 LOC', 'LOC'],
+                         lambda v: [round(metrics_tree.density(v), 2), v['loc']]))
+    lines = ['', '## Hotspots', '', '_Directories ranked by the totals of everything below them._']
+    for title, query, labels, cells in sections:
+        rows = metrics_tree.top(tree, query, n)
+        if not rows:
+            continue
+        lines += ['', f'### {title}', '', '| Directory | ' + ' | '.join(labels) + ' |', '|' + '---|' * (len(labels) + 1)]
+        lines += [f'| `{path}/` | ' + ' | '.join(_cell(c) for c in cells(v)) + ' |' for path, v in rows]
+    if interactive:
+        lines += ['', '### Treemap', '', TREEMAP_HTML.rstrip('\n')]
+    return '\n'.join(lines) + '\n'
+
+def write_tree(site_src: pathlib.Path, tree: metrics_tree.Node | None) -> None:
+    """tree.json + treemap.js next to the other metrics scripts (both use_directory_urls layouts)."""
+    text = None if tree is None else metrics_tree.dumps(tree)
+    for d in (site_src / 'metrics', site_src / 'metrics' / 'metrics'):
+        if text is None:
+            (d / 'tree.json').unlink(missing_ok=True)
+            continue
+        d.mkdir(parents=True, exist_ok=True)
+        write_text(d / 'tree.json', text)
+        src = find_asset('treemap.js')
+        if src is not None:
+            copy_file(src, d / 'treemap.js')
 
 def main() -> int:
     args = parse_args()
@@ -50,117 +176,41 @@ def main() -> int:
     selected = {m.strip() for m in args.metrics.split(',') if m.strip()}
     threshold = args.high_complexity_threshold
 
-    metrics: Dict[str, Any] = {}
-
-    def run(cmd):
-        try:
-            return subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL).strip()
-        except Exception:
-            return ''
-
-    if 'coverage' in selected:
-        cov_path = ROOT / '.coverage_percent'
-        if cov_path.exists():
-            try:
-                metrics['coverage_percent'] = float(cov_path.read_text().strip())
-            except Exception:
-                pass
-        zig_cov_idx = SITE_SRC / 'zig_coverage' / 'index.html'
-        if zig_cov_idx.exists():
-            try:
-                import re as _re
-                html = zig_cov_idx.read_text(encoding='utf-8', errors='ignore')
-                m = _re.search(r'Total[^%]{0,200}([0-9]+(?:\.[0-9]+)?)%', html, flags=_re.I|_re.S)
-                if m:
-                    metrics['zig_coverage_percent'] = float(m.group(1))
-            except Exception:
-                pass
-
-    go_files = []
-    for p in ROOT.rglob('*.go'):
-        posix = p.as_posix()
-        if '/vendor/' in posix or posix.startswith('vendor/'):
-            continue
-        go_files.append(p)
-
-    if 'files' in selected:
-        metrics['go_files'] = len(go_files)
-
-    if 'tests' in selected:
-        test_funcs = 0
-        func_re = re.compile(r'^func\s+Test[^(]+\(')
-        for p in go_files:
-            if p.name.endswith('_test.go'):
-                try:
-                    for line in p.read_text(encoding='utf-8').splitlines():
-                        if func_re.match(line):
-                            test_funcs += 1
-                except Exception:
-                    continue
-        metrics['test_functions'] = test_funcs
-
-    if 'loc' in selected:
-        loc = 0
-        for p in go_files:
-            if p.name.endswith('_test.go'):
-                continue
-            try:
-                for line in p.read_text(encoding='utf-8').splitlines():
-                    if line.strip():
-                        loc += 1
-            except Exception:
-                continue
-        metrics['loc'] = loc
-
-    if 'avg_complexity' in selected or 'high_complexity' in selected:
-        if run(['bash', '-c', 'command -v gocyclo || true']):
-            out = run(['gocyclo', *[p.as_posix() for p in go_files]])
-            if out:
-                scores = []
-                high = 0
-                for line in out.splitlines():
-                    parts = line.split()
-                    if not parts:
-                        continue
-                    try:
-                        val = float(parts[0])
-                    except ValueError:
-                        continue
-                    scores.append(val)
-                    if val > threshold:
-                        high += 1
-                if scores and 'avg_complexity' in selected:
-                    metrics['avg_cyclomatic_complexity'] = round(sum(scores)/len(scores), 2)
-                if 'high_complexity' in selected:
-                    metrics['high_complexity_functions'] = high
-
-    if not validate_schema(metrics):
+    modules = collectors.load(selected)
+    ctx = collectors.Context(ROOT, SITE_SRC, selected, threshold)
+    with span('scan', collectors=','.join(m.__name__.rsplit('.', 1)[-1] for m in modules)):
+        metrics: Dict[str, Any] = collectors.scan(ctx, modules)
+    count('metrics.files_scanned', ctx.files_scanned)
+
+    fields = collectors.fields(modules)
+    if not validate_schema(metrics, fields):
         print('SCHEMA_ERROR: metrics snapshot invalid', file=sys.stderr)
         return 2
 
     metrics_json = SITE_SRC / 'metrics.json'
-    metrics_json.write_text(json.dumps(metrics, indent=2) + '\n', encoding='utf-8')
-
-    table_lines = [
-        '# Project Metrics',
-        '',
-        '| Metric | Value |',
-        '|--------|-------|',
-    ]
-    display_order = [
-        ('coverage_percent', 'Coverage (%)'),
-        ('zig_coverage_percent', 'Zig Coverage (%)'),
-        ('test_functions', 'Test Functions'),
-        ('go_files', 'Go Files'),
-        ('loc', 'Lines of Code (non-test)'),
-        ('avg_cyclomatic_complexity', 'Avg Cyclomatic Complexity'),
-        ('high_complexity_functions', f'Functions > {threshold} Complexity'),
-    ]
-    for key, label in display_order:
-        if key in metrics:
-            table_lines.append(f'| {label} | {metrics[key]} |')
-
-    (SITE_SRC / 'metrics.md').write_text('\n'.join(table_lines) + '\n', encoding='utf-8')
+    metrics_text = json.dumps(metrics, indent=2) + '\n'
+    write_text(metrics_json, metrics_text)
+
+    history_dir = pathlib.Path(args.history_dir)
+    history = {key: sparkline.load(history_dir / f'{key}.json') + [float(v)]
+               for key, v in metrics.items() if isinstance(v, (int, float))}
+    packages = ctx.extra.get('packages') or {}
+    if packages:
+        write_text(SITE_SRC / 'packages.json', json.dumps(packages, indent=2) + '\n')
+    per_file = ctx.extra.get('per_file') or {}
+    tree = None
+    if per_file:
+        if 'go_model' in ctx.extra:  # only with the go collector active; reuses its package model
+            for rel, cov in go_coverage(ROOT, ctx.extra['go_model']).items():
+                per_file.setdefault(rel, {'files': 1}).update(cov)
+        with span('directory tree', files=len(per_file)):
+            tree = metrics_tree.build(per_file)
+        count('metrics.tree_directories', sum(1 for _ in metrics_tree.directories(tree)))
+    write_tree(SITE_SRC, tree)
+    interactive = os.environ.get('INTERACTIVE_CHARTS', 'true') != 'false'
+    write_text(SITE_SRC / 'metrics.md', render_table(metrics, fields, threshold, history)
+               + render_packages(packages, threshold)
+               + render_hotspots(tree, threshold, args.hotspots, interactive))
     return 0
 
 if __name__ == '__main__':  # pragma: no cover
@@ -5,16 +5,54 @@ Outputs:
   site_src/security.json
   site_src/security.md
 
+With --store (SECURITY_STORE) alerts are kept in a local JSON store
+(kind -> number -> state, severity, created/updated/fixed timestamps) that is
+synced incrementally: each kind is listed with sort=updated&direction=desc and
+pagination stops at the first page reaching alerts not newer than the
+stored cursor. The snapshot, plus mean time-to-fix and open alert age buckets under
+"alerts", is then computed from the store. A missing store is seeded from
+`git show <branch>:<store>` (METRICS_BRANCH, where update_security.py keeps it).
+
+With --repos (SECURITY_REPOS: comma list or @file, entries may be globs such
+as acme/svc-* expanded via /orgs/{owner}/repos) repositories are collected
+concurrently through one shared token bucket (--rate requests/s). Per-repo
+snapshots go to <output>/security/repos/<owner>__<repo>.json and the roll-up
+to security_org.json / security_org.md. Finished repos are recorded in
+--checkpoint; when --deadline is hit the run stops early and the next run
+resumes from the checkpoint. A repo whose alerts could not all be listed
+(API errors) also stays pending, but only for --max-attempts runs; after that
+it is reported under "failed" so it cannot keep the roll-up incomplete. With --store, it names a directory of per-repo
+stores.
+
+Rate limits are handled by RateLimiter from the response headers:
+X-RateLimit-Remaining/Reset pace requests before the budget is exhausted,
+Retry-After and "secondary rate limit" responses pause all requests, and a 403
+that is none of these is a permission error (not retried). Time spent waiting
+is reported. Pagination gives up only at --deadline (SECURITY_DEADLINE).
+
 Exit codes:
   0 success
   2 schema validation failure (SCHEMA_ERROR logged)
 """
 from __future__ import annotations
-import json, os, pathlib, sys, time, argparse, urllib.request, urllib.error, re
+import json, os, pathlib, sys, time, argparse, urllib.request, urllib.error, urllib.parse, re, subprocess, fnmatch, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+
+from pipeline_trace import count, log, span
+from site_output import write_text
+import schema_validator
 
 ROOT = pathlib.Path.cwd()
 SCHEMA = ROOT / 'schema' / 'security.schema.json'
 DEFAULT_OUTPUT_DIR = ROOT / 'site_src'
+KINDS = {
+    'dependabot': '/dependabot/alerts',
+    'code_scanning': '/code-scanning/alerts',
+    'secret_scanning': '/secret-scanning/alerts',
+}
+AGE_BUCKETS = [('lt_7d', 7), ('7_30d', 30), ('30_90d', 90), ('gt_90d', None)]
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(add_help=True)
@@ -23,6 +61,14 @@ def parse_args() -> argparse.Namespace:
     p.add_argument('--output-dir', default=str(DEFAULT_OUTPUT_DIR), help='Output directory for site_src (default site_src)')
     p.add_argument('--dry-run', action='store_true', help='Fetch & print JSON only (no files written)')
     p.add_argument('--api-base', default=os.environ.get('SECURITY_API_BASE', ''), help='Override API base (tests) e.g. http://localhost:8000/repos')
+    p.add_argument('--store', default=os.environ.get('SECURITY_STORE', ''), help='Alert store JSON for incremental sync (e.g. security/alerts.json)')
+    p.add_argument('--store-branch', default=os.environ.get('METRICS_BRANCH', 'bench-data'), help='Branch to seed a missing store from (default bench-data)')
+    p.add_argument('--repos', default=os.environ.get('SECURITY_REPOS', ''), help='Multi-repo mode: comma list or @file of owner/repo (globs allowed)')
+    p.add_argument('--concurrency', type=int, default=int(os.environ.get('SECURITY_CONCURRENCY', '8')), help='Repos fetched in parallel (default 8)')
+    p.add_argument('--rate', type=float, default=float(os.environ.get('SECURITY_RATE', '10')), help='Shared request budget per second (default 10)')
+    p.add_argument('--deadline', type=float, default=float(os.environ.get('SECURITY_DEADLINE', '900')), help='Seconds before stopping and checkpointing (default 900)')
+    p.add_argument('--checkpoint', default=os.environ.get('SECURITY_CHECKPOINT', '.security_checkpoint.json'), help='Resume file for multi-repo mode')
+    p.add_argument('--max-attempts', type=int, default=int(os.environ.get('SECURITY_REPO_ATTEMPTS', '3')), help='Runs a repo may fail to list before the roll-up gives up on it (default 3)')
     return p.parse_args()
 
 def find_token(names: str) -> str | None:
@@ -32,93 +78,350 @@ def find_token(names: str) -> str | None:
             return v
     return None
 
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` saved."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+            time.sleep(delay)
+
+BUCKET: TokenBucket | None = None
+
+class RateLimiter:
+    """Shared, header-driven pacing for the GitHub REST API.
+
+    update() classifies each response: 'ok', 'retry' (primary limit exhausted,
+    Retry-After, or a secondary rate limit) or 'forbidden' (a 403 that is not
+    rate limiting). wait() blocks until the next request is allowed and paces
+    requests evenly over the reset window once fewer than `pace_below` remain.
+    """
+
+    def __init__(self, pace_below: int = 100, secondary_backoff: float = 60.0):
+        self.pace_below = pace_below
+        self.secondary_backoff = secondary_backoff
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self.last_request = 0.0
+        self.secondary_hits = 0
+        self.throttled = {'primary': 0.0, 'secondary': 0.0, 'pacing': 0.0}
+        self.block_reason = 'secondary'
+        self.lock = threading.Lock()
+
+    def _delay(self, now: float) -> tuple[float, str]:
+        if self.blocked_until > now:
+            return self.blocked_until - now, self.block_reason
+        if self.remaining is not None and self.reset_at > now:
+            if self.remaining <= 0:
+                return self.reset_at - now + 1, 'primary'
+            if self.remaining < self.pace_below:
+                interval = (self.reset_at - now) / self.remaining
+                return max(0.0, self.last_request + interval - now), 'pacing'
+        return 0.0, 'pacing'
+
+    def wait(self, deadline_at: float | None = None) -> bool:
+        """Sleep until a request may be sent; False if that would pass deadline_at."""
+        while True:
+            with self.lock:
+                now = time.time()
+                delay, reason = self._delay(now)
+                if delay <= 0:
+                    self.last_request = now
+                    if self.remaining is not None and self.remaining > 0:
+                        self.remaining -= 1  # reserve our request before concurrent callers read it
+                    return True
+                if deadline_at is not None and now + delay > deadline_at:
+                    return False
+                self.throttled[reason] += delay
+            time.sleep(delay)
+
+    def update(self, status: int, headers: dict, body: str = '') -> str:
+        now = time.time()
+        remaining = headers.get('x-ratelimit-remaining')
+        reset = headers.get('x-ratelimit-reset')
+        retry_after = headers.get('retry-after')
+        with self.lock:
+            if remaining is not None and remaining.isdigit():
+                self.remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self.reset_at = float(reset)
+            if status not in (403, 429):
+                if status == 200:
+                    self.secondary_hits = 0
+                return 'ok'
+            if retry_after is not None:
+                try:
+                    pause = float(retry_after)
+                except ValueError:
+                    pause = self.secondary_backoff
+                self.blocked_until = max(self.blocked_until, now + pause)
+                self.block_reason = 'primary' if remaining == '0' else 'secondary'
+                return 'retry'
+            if remaining == '0' and self.reset_at > now:
+                return 'retry'  # wait() sleeps until X-RateLimit-Reset
+            if remaining == '0' or status == 429 or 'rate limit' in body.lower():
+                # secondary limit, or an exhausted budget without a usable reset: back off exponentially
+                self.secondary_hits += 1
+                pause = self.secondary_backoff * 2 ** (self.secondary_hits - 1)
+                self.blocked_until = max(self.blocked_until, now + pause)
+                self.block_reason = 'primary' if remaining == '0' else 'secondary'
+                return 'retry'
+            return 'forbidden'
+
+    def report(self) -> str:
+        total = sum(self.throttled.values())
+        count('security.throttled_seconds', round(total, 3))
+        parts = ', '.join(f'{k} {v:.1f}s' for k, v in self.throttled.items() if v)
+        return f'{total:.1f}s throttled' + (f' ({parts})' if parts else '')
+
+LIMITER = RateLimiter()
+DEADLINE_AT: float | None = None  # absolute time.time() deadline for all pagination (set by main)
+
 def request_json(url: str, headers: dict) -> tuple[int, object | None, dict]:
+    """GET url; meta carries the Link header, lower-cased response headers and error body."""
+    if BUCKET is not None:
+        BUCKET.acquire()
     req = urllib.request.Request(url, headers=headers)
-    try:
-        with urllib.request.urlopen(req, timeout=20) as r:
-            data = r.read().decode()
-            link = r.headers.get('Link', '')
-            return r.status, json.loads(data), {'link': link}
-    except urllib.error.HTTPError as e:
-        return e.code, None, {}
-    except Exception:
-        return 0, None, {}
-
-def paginate(base_url: str, headers: dict, max_retries: int = 5, deadline_sec: int = 60) -> list[dict]:
+    count('security.http_requests')
+    parts = urllib.parse.urlsplit(url)
+    with span('GET ' + parts.path, query=parts.query) as info:
+        try:
+            with urllib.request.urlopen(req, timeout=20) as r:
+                data = r.read().decode()
+                link = r.headers.get('Link', '')
+                info['status'] = r.status
+                info['bytes'] = len(data)
+                return r.status, json.loads(data), {'link': link, 'headers': {k.lower(): v for k, v in r.headers.items()}}
+        except urllib.error.HTTPError as e:
+            info['status'] = e.code
+            try:
+                body = e.read().decode(errors='replace')
+            except Exception:
+                body = ''
+            return e.code, None, {'headers': {k.lower(): v for k, v in (e.headers or {}).items()}, 'body': body}
+        except Exception:
+            info['status'] = 0
+            return 0, None, {}
+
+def paginate(base_url: str, headers: dict, deadline_sec: float | None = None,
+             stop: Callable[[list[dict]], bool] | None = None, info: dict | None = None) -> list[dict]:
+    """Follow Link rel="next" pages. stop(page) ends early; info['complete'] is False when pages were missed."""
+    info = {} if info is None else info
+    info['complete'] = False
     results: list[dict] = []
     url = base_url
-    backoff = 1.0
-    attempts = 0
-    start = time.time()
+    if deadline_sec is not None:
+        deadline_at = time.time() + deadline_sec
+    else:
+        deadline_at = DEADLINE_AT if DEADLINE_AT is not None else time.time() + 900
     while url:
-        if time.time() - start > deadline_sec:
-            print(f"INFO: pagination deadline reached for {base_url}")
+        if not LIMITER.wait(deadline_at):
+            log('info', f"pagination deadline reached for {base_url} while rate limited")
             break
         status, payload, meta = request_json(url, headers)
-        if status in (403, 429):
-            attempts += 1
-            if attempts > max_retries:
-                print(f"INFO: exceeded retry limit ({max_retries}) for {base_url} (status {status})")
-                break
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 10)
-            continue
-        attempts = 0  # reset on success / different status
+        verdict = LIMITER.update(status, meta.get('headers', {}), meta.get('body', ''))
+        if verdict == 'retry':
+            count('security.rate_limited')
+            continue  # LIMITER.wait() sleeps out the limit or gives up at the deadline
+        if verdict == 'forbidden':
+            log('info', f"permission denied for {base_url} (status {status}); not retrying")
+            info['forbidden'] = True
+            break
         if not isinstance(payload, list):
             break
         results.extend(payload)
+        count('security.alerts_fetched', len(payload))
+        if stop and stop(payload):
+            info['complete'] = True
+            break
         link = meta.get('link', '')
         m = re.search(r'<([^>]+)>;\s*rel="next"', link)
         url = m.group(1) if m else None
+        if url is None:
+            info['complete'] = True
     return results
 
-def build_snapshot(repo: str, token: str | None, api_base: str | None = None) -> dict:
+def _finished(info: dict) -> bool:
+    # a kind we may not read is as complete as it will get
+    return bool(info.get('complete') or info.get('forbidden'))
+
+def build_snapshot(repo: str, token: str | None, api_base: str | None = None, info: dict | None = None) -> dict:
+    """Open alert counts; info['complete'] is False when any listing was cut short."""
+    info = {} if info is None else info
+    info['complete'] = True
     if not repo:
         return {'severity': {}, 'code_scanning': {}, 'secret_scanning': {}}
-    headers = {'Accept': 'application/vnd.github+json'}
-    if token:
-        headers['Authorization'] = f'Bearer {token}'
+    headers = _headers(token)
     api_root = api_base.rstrip('/') if api_base else 'https://api.github.com/repos'
     api = f'{api_root}/{repo}'
     sev_counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
-    dep = paginate(api + '/dependabot/alerts?state=open&per_page=100', headers)
+    kinds = [{}, {}, {}]
+    dep = paginate(api + '/dependabot/alerts?state=open&per_page=100', headers, info=kinds[0])
     for a in dep:
         level = (a.get('security_advisory') or {}).get('severity') or a.get('severity')
         if level in sev_counts:
             sev_counts[level] += 1
-    code = paginate(api + '/code-scanning/alerts?state=open&per_page=100', headers)
-    secret = paginate(api + '/secret-scanning/alerts?state=open&per_page=100', headers)
+    code = paginate(api + '/code-scanning/alerts?state=open&per_page=100', headers, info=kinds[1])
+    secret = paginate(api + '/secret-scanning/alerts?state=open&per_page=100', headers, info=kinds[2])
+    info['complete'] = all(_finished(k) for k in kinds)
     return {
         'severity': sev_counts,
         'code_scanning': {'open': len(code)},
         'secret_scanning': {'open': len(secret)},
     }
 
-def validate_schema(obj: dict) -> bool:
+def _headers(token: str | None) -> dict:
+    headers = {'Accept': 'application/vnd.github+json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return headers
+
+def read_persisted(path: pathlib.Path, branch: str) -> str | None:
+    """Local file, else the copy update_security.py persisted on the history branch."""
+    if path.exists():
+        return path.read_text(encoding='utf-8')
+    if not path.resolve().is_relative_to(ROOT.resolve()):
+        return None
+    rel = path.resolve().relative_to(ROOT.resolve()).as_posix()
+    for ref in (f'origin/{branch}', branch):
+        try:
+            return subprocess.run(['git', 'show', f'{ref}:{rel}'], capture_output=True, text=True, check=True).stdout
+        except (OSError, subprocess.CalledProcessError):
+            continue
+    return None
+
+def load_store(path: pathlib.Path, branch: str) -> dict:
+    """Local store, else the copy persisted on the history branch, else empty."""
+    text = read_persisted(path, branch)
     try:
-        schema = json.loads(SCHEMA.read_text(encoding='utf-8'))
-    except Exception:
+        store = json.loads(text) if text else {}
+    except ValueError:
+        log('warning', f'alert store {path} unreadable; starting a full sync')
+        store = {}
+    store.setdefault('version', 1)
+    store.setdefault('kinds', {})
+    return store
+
+def save_store(store: dict, path: pathlib.Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(store, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+    os.replace(tmp, path)
+
+def alert_record(kind: str, a: dict) -> dict:
+    if kind == 'dependabot':
+        severity = (a.get('security_advisory') or {}).get('severity') or a.get('severity')
+    elif kind == 'code_scanning':
+        rule = a.get('rule') or {}
+        severity = rule.get('security_severity_level') or rule.get('severity')
+    else:
+        severity = None
+    return {
+        'state': a.get('state', 'open'),
+        'severity': severity,
+        'created_at': a.get('created_at'),
+        'updated_at': a.get('updated_at') or a.get('created_at'),
+        'fixed_at': a.get('fixed_at') or a.get('resolved_at'),
+    }
+
+def sync_store(store: dict, repo: str, token: str | None, api_base: str | None = None,
+               info: dict | None = None) -> None:
+    """Upsert alerts updated since each kind's cursor; the cursor only advances after a complete sync.
+
+    info['complete'] is False when any kind's sync was cut short."""
+    info = {} if info is None else info
+    info['complete'] = True
+    api_root = api_base.rstrip('/') if api_base else 'https://api.github.com/repos'
+    headers = _headers(token)
+    for kind, path in KINDS.items():
+        entry = store['kinds'].setdefault(kind, {'cursor': None, 'alerts': {}})
+        cursor = entry.get('cursor')
+        def older(page: list[dict], cursor=cursor) -> bool:
+            return bool(cursor) and any((a.get('updated_at') or '') <= cursor for a in page)
+        listing: dict = {}
+        with span(f'sync {kind}', cursor=cursor) as s:
+            page = paginate(f'{api_root}/{repo}{path}?sort=updated&direction=desc&per_page=100', headers,
+                            stop=older, info=listing)
+            s['fetched'] = len(page)
+        for a in page:
+            if 'number' in a:
+                entry['alerts'][str(a['number'])] = alert_record(kind, a)
+        if listing['complete']:
+            stamps = [a.get('updated_at') or '' for a in page]
+            entry['cursor'] = max([cursor or '', *stamps]) or None
+        info['complete'] = info['complete'] and _finished(listing)
+        count('security.alerts_synced', len(page))
+
+def _ts(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def snapshot_from_store(store: dict, now: datetime | None = None) -> dict:
+    now = now or datetime.now(timezone.utc)
+    kinds = store.get('kinds', {})
+    sev_counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+    open_counts = {}
+    fix_days: list[float] = []
+    ages = {name: 0 for name, _ in AGE_BUCKETS}
+    fixed_30d = 0
+    for kind in KINDS:
+        alerts = (kinds.get(kind) or {}).get('alerts', {})
+        open_counts[kind] = 0
+        for rec in alerts.values():
+            created, fixed = _ts(rec.get('created_at')), _ts(rec.get('fixed_at'))
+            if rec.get('state') == 'open':
+                open_counts[kind] += 1
+                if kind == 'dependabot' and rec.get('severity') in sev_counts:
+                    sev_counts[rec['severity']] += 1
+                if created:
+                    age = (now - created).total_seconds() / 86400
+                    ages[next(name for name, limit in AGE_BUCKETS if limit is None or age < limit)] += 1
+            elif fixed:
+                if created:
+                    fix_days.append((fixed - created).total_seconds() / 86400)
+                if (now - fixed).days < 30:
+                    fixed_30d += 1
+    return {
+        'severity': sev_counts,
+        'code_scanning': {'open': open_counts['code_scanning']},
+        'secret_scanning': {'open': open_counts['secret_scanning']},
+        'alerts': {
+            'mean_time_to_fix_days': round(sum(fix_days) / len(fix_days), 2) if fix_days else None,
+            'fixed_last_30d': fixed_30d,
+            'open_age_days': ages,
+        },
+    }
+
+def validate_schema(obj: dict) -> bool:
+    validator = schema_validator.load(SCHEMA if SCHEMA.exists() else schema_validator.SCHEMA_DIR / SCHEMA.name)
+    if validator is None:
         # If schema missing treat as pass (non-fatal)
         return True
-    # Minimal inline validation (no external lib allowed):
-    if not isinstance(obj, dict):
-        return False
-    required = schema.get('required', [])
-    for r in required:
-        if r not in obj:
-            return False
-    # Basic type checks
-    if not isinstance(obj.get('severity'), dict):
-        return False
-    for k in ['critical', 'high', 'medium', 'low']:
-        if not isinstance(obj['severity'].get(k, 0), int):
-            return False
-    for sec_key in ['code_scanning', 'secret_scanning']:
-        if not isinstance(obj.get(sec_key), dict):
-            return False
-        if not isinstance(obj[sec_key].get('open', 0), int):
-            return False
-    return True
+    err = validator(obj)
+    if err:
+        print(f'SCHEMA_ERROR: {err}', file=sys.stderr)
+    return err is None
 
 def write_markdown(snapshot: dict, md_path: pathlib.Path):
     sev = snapshot.get('severity', {})
@@ -146,22 +449,207 @@ def write_markdown(snapshot: dict, md_path: pathlib.Path):
         lines.append(f"| Open Code Scanning Alerts | {snapshot['code_scanning'].get('open',0)} |")
     if snapshot.get('secret_scanning'):
         lines.append(f"| Open Secret Scanning Alerts | {snapshot['secret_scanning'].get('open',0)} |")
-    md_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    alerts = snapshot.get('alerts')
+    if alerts:
+        if alerts.get('mean_time_to_fix_days') is not None:
+            lines.append(f"| Mean Time to Fix (days) | {alerts['mean_time_to_fix_days']} |")
+        lines.append(f"| Fixed in Last 30 Days | {alerts.get('fixed_last_30d', 0)} |")
+        ages = alerts.get('open_age_days', {})
+        labels = {'lt_7d': '< 7 days', '7_30d': '7-30 days', '30_90d': '30-90 days', 'gt_90d': '> 90 days'}
+        for key, label in labels.items():
+            if key in ages:
+                lines.append(f"| Open Alerts Aged {label} | {ages[key]} |")
+    write_text(md_path, '\n'.join(lines) + '\n')
+
+def collect_repo(repo: str, token: str | None, api_base: str | None, store_path: pathlib.Path | None,
+                 branch: str, save: bool = True, info: dict | None = None) -> dict:
+    """Snapshot for one repo, through the alert store when store_path is given.
+
+    info['complete'] is False when some alerts could not be listed (deadline, errors)."""
+    if store_path is None:
+        return build_snapshot(repo, token, api_base=api_base, info=info)
+    store = load_store(store_path, branch)
+    sync_store(store, repo, token, api_base=api_base, info=info)
+    if save:
+        save_store(store, store_path)
+    return snapshot_from_store(store)
+
+def repo_slug(repo: str) -> str:
+    return repo.replace('/', '__')
+
+def org_repos(owner: str, token: str | None, api_base: str | None) -> list[str]:
+    api_root = api_base.rstrip('/') if api_base else 'https://api.github.com/repos'
+    host = api_root[:-len('/repos')] if api_root.endswith('/repos') else api_root
+    listing = paginate(f'{host}/orgs/{owner}/repos?type=all&per_page=100', _headers(token))
+    return [r['full_name'] for r in listing if isinstance(r, dict) and r.get('full_name') and not r.get('archived')]
+
+def resolve_repos(spec: str, token: str | None, api_base: str | None) -> list[str]:
+    """Comma list or @file (one entry per line, # comments); glob entries are matched against the org listing."""
+    if spec.startswith('@'):
+        entries = pathlib.Path(spec[1:]).read_text(encoding='utf-8').splitlines()
+    else:
+        entries = spec.split(',')
+    entries = [e.split('#', 1)[0].strip() for e in entries]
+    repos: list[str] = []
+    listings: dict[str, list[str]] = {}
+    for e in entries:
+        if '/' not in e:
+            continue
+        if any(ch in e for ch in '*?['):
+            owner = e.split('/', 1)[0]
+            if owner not in listings:
+                listings[owner] = org_repos(owner, token, api_base)
+            repos += fnmatch.filter(listings[owner], e)
+        else:
+            repos.append(e)
+    return sorted(set(repos))
+
+def org_rollup(snapshots: dict[str, dict], pending: list[str], failed: list[str] | None = None) -> dict:
+    totals = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'code_scanning': 0, 'secret_scanning': 0}
+    for snap in snapshots.values():
+        for k, v in snap.get('severity', {}).items():
+            totals[k] = totals.get(k, 0) + v
+        totals['code_scanning'] += snap.get('code_scanning', {}).get('open', 0)
+        totals['secret_scanning'] += snap.get('secret_scanning', {}).get('open', 0)
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'complete': not pending,
+        'pending': pending,
+        'failed': failed or [],
+        'totals': totals,
+        'repos': {r: snapshots[r] for r in sorted(snapshots)},
+    }
+
+def write_org_markdown(rollup: dict, md_path: pathlib.Path) -> None:
+    t = rollup['totals']
+    lines = ['# Organization Security', '',
+             f"{len(rollup['repos'])} repositories · {sum(t[k] for k in ('critical', 'high', 'medium', 'low'))} open vulnerabilities", '']
+    if rollup['pending']:
+        lines += [f"_Partial results: {len(rollup['pending'])} repositories pending (resumes next run)._", '']
+    if rollup.get('failed'):
+        lines += [f"_Not included: alerts of {', '.join(f'`{r}`' for r in rollup['failed'])} could not be listed._", '']
+    lines += ['| Repository | Critical | High | Medium | Low | Code Scanning | Secrets |',
+              '|------------|----------|------|--------|-----|---------------|---------|']
+    def weight(item):
+        sev = item[1].get('severity', {})
+        return (-sev.get('critical', 0), -sev.get('high', 0), -sum(sev.values()), item[0])
+    for repo, snap in sorted(rollup['repos'].items(), key=weight):
+        sev = snap.get('severity', {})
+        lines.append(f"| `{repo}` | {sev.get('critical', 0)} | {sev.get('high', 0)} | {sev.get('medium', 0)} | "
+                     f"{sev.get('low', 0)} | {snap.get('code_scanning', {}).get('open', 0)} | "
+                     f"{snap.get('secret_scanning', {}).get('open', 0)} |")
+    lines.append(f"| **Total** | {t['critical']} | {t['high']} | {t['medium']} | {t['low']} | "
+                 f"{t['code_scanning']} | {t['secret_scanning']} |")
+    write_text(md_path, '\n'.join(lines) + '\n')
+
+def main_multi(args: argparse.Namespace, token: str | None) -> int:
+    global BUCKET
+    BUCKET = TokenBucket(args.rate)
+    start = time.monotonic()
+    api_base = args.api_base or None
+    out_dir = pathlib.Path(args.output_dir)
+    repos = resolve_repos(args.repos, token, api_base)
+    checkpoint = pathlib.Path(args.checkpoint)
+    done: dict[str, dict] = {}
+    try:
+        saved = json.loads(read_persisted(checkpoint, args.store_branch) or '{}')
+    except ValueError:
+        saved = {}
+    attempts: dict[str, int] = {}
+    if saved.get('done') is not None and not saved.get('complete'):
+        done = {r: s for r, s in saved['done'].items() if r in repos}
+        attempts = {r: n for r, n in (saved.get('attempts') or {}).items() if r in repos and r not in done}
+        log('info', f'resuming from {checkpoint} ({len(done)}/{len(repos)} repos done)')
+    lock = threading.Lock()
+    invalid: list[str] = []
+    errored: list[str] = []
+    last_save = [time.monotonic()]
+
+    def save_checkpoint(complete: bool = False) -> None:
+        # A finished run leaves {"complete": true} so a copy persisted on the branch is not resumed.
+        state = {'complete': True} if complete else {'repos': repos, 'done': done, 'attempts': attempts}
+        checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint.write_text(json.dumps(state) + '\n', encoding='utf-8')
+        last_save[0] = time.monotonic()
+
+    def work(repo: str) -> None:
+        if time.monotonic() - start > args.deadline:
+            return
+        store = pathlib.Path(args.store) / f'{repo_slug(repo)}.json' if args.store else None
+        info: dict = {}
+        with span(f'repo {repo}'):
+            snap = collect_repo(repo, token, api_base, store, args.store_branch, save=not args.dry_run, info=info)
+        if not info['complete']:
+            # some alerts were not listed: leave the repo pending; without the deadline it was an error
+            if DEADLINE_AT is None or time.time() < DEADLINE_AT:
+                with lock:
+                    errored.append(repo)
+                    attempts[repo] = attempts.get(repo, 0) + 1
+            return
+        if not validate_schema(snap):
+            invalid.append(repo)
+            return
+        with lock:
+            done[repo] = snap
+            # periodic saves keep progress if the job is killed before the deadline logic runs
+            if not args.dry_run and time.monotonic() - last_save[0] > 10:
+                save_checkpoint()
+        count('security.repos_collected')
+
+    todo = [r for r in repos if r not in done]
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        list(pool.map(work, todo))
+    failed = [r for r in repos if r in errored and attempts[r] >= args.max_attempts]
+    pending = [r for r in repos if r not in done and r not in invalid and r not in failed]
+    retry = [r for r in pending if r in errored]
+    rollup = org_rollup(done, pending, failed)
+    log('info', f'{len(done)}/{len(repos)} repos collected, {BUCKET.waited:.1f}s waiting on the shared rate budget')
+    if args.dry_run:
+        print(json.dumps(rollup, indent=2))
+    else:
+        repo_dir = out_dir / 'security' / 'repos'
+        for repo, snap in done.items():
+            write_text(repo_dir / f'{repo_slug(repo)}.json', json.dumps(snap, indent=2) + '\n')
+        write_text(out_dir / 'security_org.json', json.dumps(rollup, indent=2) + '\n')
+        write_org_markdown(rollup, out_dir / 'security_org.md')
+        save_checkpoint(complete=not pending)
+        if len(pending) > len(retry):
+            log('info', f'deadline reached; {len(pending) - len(retry)} repos pending in {checkpoint}')
+        if retry:
+            log('warning', f"alerts of {len(retry)} repos could not all be listed; retried next run "
+                           f"(pending in {checkpoint}): {' '.join(retry)}")
+        if failed:
+            log('warning', f"giving up on {' '.join(failed)} after {args.max_attempts} incomplete runs; "
+                           'left out of the roll-up')
+    for repo in invalid:
+        print(f'SCHEMA_ERROR: security snapshot invalid for {repo}', file=sys.stderr)
+    return 2 if invalid else 0
 
 def main() -> int:
+    global DEADLINE_AT
     args = parse_args()
+    DEADLINE_AT = time.time() + args.deadline
     out_dir = pathlib.Path(args.output_dir)
     if not args.dry_run:
         out_dir.mkdir(parents=True, exist_ok=True)
     token = find_token(args.token_env)
-    snapshot = build_snapshot(args.repo, token, api_base=args.api_base or None)
+    try:
+        return _main(args, token, out_dir)
+    finally:
+        log('info', f'rate limits: {LIMITER.report()}')
+
+def _main(args: argparse.Namespace, token: str | None, out_dir: pathlib.Path) -> int:
+    if args.repos:
+        return main_multi(args, token)
+    store_path = pathlib.Path(args.store) if args.store and args.repo else None
+    snapshot = collect_repo(args.repo, token, args.api_base or None, store_path, args.store_branch, save=not args.dry_run)
     if not validate_schema(snapshot):
         print('SCHEMA_ERROR: security snapshot invalid', file=sys.stderr)
         return 2
     if args.dry_run:
         print(json.dumps(snapshot, indent=2))
         return 0
-    (out_dir / 'security.json').write_text(json.dumps(snapshot, indent=2) + '\n', encoding='utf-8')
+    write_text(out_dir / 'security.json', json.dumps(snapshot, indent=2) + '\n')
     write_markdown(snapshot, out_dir / 'security.md')
     return 0
 
@@ -0,0 +1,121 @@
+"""Metric collector registry used by collect_metrics.py.
+
+Each collector lives in its own module and is imported only when one of its
+metric names is selected, so unselected languages cost nothing at startup.
+A collector module exposes:
+
+    SUFFIXES   file suffixes it wants to see during the shared walk (may be empty)
+    FIELDS     {metric_key: (table label, JSON-schema fragment)} it can emit;
+               collect_metrics merges these into the schema and metrics table
+    Collector  class built with the Context; feed(path, text) is called once per
+               matching file (text is None when no active collector needs the
+               content) and result() returns the metrics dict. A collector may
+               also define paths() to be fed a known file list (the go collector
+               uses the shared package model, go_packages.py) instead of the walk
+
+All collectors share one directory walk (walk()) and one read per file, done by
+scan(); the walk is skipped when no active collector declares SUFFIXES.
+"""
+from __future__ import annotations
+
+import importlib
+import itertools
+import os
+import pathlib
+import subprocess
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Iterator
+
+# selection token (METRICS / --metrics) -> collector module
+REGISTRY: dict[str, str] = {
+    'coverage': 'coverage',
+    'files': 'go',
+    'tests': 'go',
+    'loc': 'go',
+    'avg_complexity': 'go',
+    'high_complexity': 'go',
+    'zig_files': 'zig',
+    'zig_tests': 'zig',
+    'zig_loc': 'zig',
+    'todo': 'text',
+}
+
+# Never descend into these (dependencies, build output, VCS metadata).
+SKIP_DIRS = {'.git', 'vendor', 'node_modules', 'zig-cache', '.zig-cache', 'zig-out', 'site_src', 'site_build'}
+
+
+@dataclass
+class Context:
+    root: pathlib.Path
+    output_dir: pathlib.Path
+    selected: set[str]
+    high_complexity_threshold: int = 10
+    files_scanned: int = 0
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def run(self, cmd: list[str]) -> str:
+        try:
+            return subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL).strip()
+        except Exception:
+            return ''
+
+
+def load(selected: set[str]) -> list[ModuleType]:
+    """Import the collector modules needed for the selected tokens (unknown tokens are ignored)."""
+    names: list[str] = []
+    for token, name in REGISTRY.items():
+        if token in selected and name not in names:
+            names.append(name)
+    return [importlib.import_module(f'{__name__}.{name}') for name in names]
+
+
+def walk(root: pathlib.Path, suffixes: tuple[str, ...]) -> Iterator[pathlib.Path]:
+    """Files under root ending in one of suffixes, skipping SKIP_DIRS; sorted for stable output."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(suffixes):
+                yield pathlib.Path(dirpath, name)
+
+
+def scan(ctx: Context, modules: list[ModuleType]) -> dict[str, Any]:
+    """Run the collectors over one shared walk and return their merged metrics."""
+    active = [(m.Collector(ctx), tuple(m.SUFFIXES)) for m in modules]
+    listed: dict[pathlib.Path, list] = {}
+    for c, _ in active:
+        for path in c.paths() if hasattr(c, 'paths') else ():
+            listed.setdefault(path, []).append(c)
+    suffixes = tuple(sorted({s for _, sfx in active for s in sfx}))
+    walked = walk(ctx.root, suffixes) if suffixes else iter(())
+    seen: set[pathlib.Path] = set()
+    for path in itertools.chain(walked, (p for p in listed if p not in seen)):
+        seen.add(path)
+        wanted = [c for c, sfx in active if sfx and path.name.endswith(sfx)]
+        wanted += [c for c in listed.get(path, ()) if c not in wanted]
+        ctx.files_scanned += 1
+        text = None
+        if any(getattr(c, 'needs_text', True) for c in wanted):
+            try:
+                text = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                text = None  # still counted as a file; content metrics skip it
+        for c in wanted:
+            c.feed(path, text)
+    metrics: dict[str, Any] = {}
+    for c, _ in active:
+        metrics.update(c.result())
+    return metrics
+
+
+def all_fields() -> dict[str, tuple[str, dict]]:
+    """FIELDS of every registered collector (imports them all; for renderers, not collection)."""
+    return fields(load(set(REGISTRY)))
+
+
+def fields(modules: list[ModuleType]) -> dict[str, tuple[str, dict]]:
+    """Merged FIELDS of the given collectors, in registry order (labels may use {threshold})."""
+    out: dict[str, tuple[str, dict]] = {}
+    for m in modules:
+        out.update(m.FIELDS)
+    return out
@@ -0,0 +1,31 @@
+"""Coverage percentages: Go from .coverage_percent, Zig via zig_coverage.py's cache."""
+from __future__ import annotations
+
+SUFFIXES: tuple[str, ...] = ()
+FIELDS = {
+    'coverage_percent': ('Coverage (%)', {'type': 'number', 'minimum': 0}),
+    'zig_coverage_percent': ('Zig Coverage (%)', {'type': 'number', 'minimum': 0, 'maximum': 100}),
+}
+
+
+class Collector:
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def feed(self, path, text):  # pragma: no cover - no suffixes
+        pass
+
+    def result(self) -> dict:
+        import zig_coverage
+
+        out: dict = {}
+        cov_path = self.ctx.root / '.coverage_percent'
+        if cov_path.exists():
+            try:
+                out['coverage_percent'] = float(cov_path.read_text().strip())
+            except Exception:
+                pass
+        zig = zig_coverage.load([self.ctx.output_dir / 'zig_coverage', *zig_coverage.SEARCH_DIRS[1:]])
+        if zig:
+            out['zig_coverage_percent'] = zig['percent']
+        return out
@@ -0,0 +1,121 @@
+"""Go source metrics: file count, test functions, non-test LOC and gocyclo complexity.
+
+Files come from the shared package model (go_packages.py) rather than the walk,
+so build-ignored and testdata files are excluded and every number can also be
+rolled up per package (ctx.extra['packages'], written to packages.json). The
+per-file numbers go to ctx.extra['per_file'] for the directory tree, and the
+model to ctx.extra['go_model'] so coverage is mapped without loading it again.
+"""
+from __future__ import annotations
+
+import pathlib
+import re
+
+import go_packages
+from pipeline_trace import span
+
+SUFFIXES = ()  # fed from paths(), not the shared walk
+FIELDS = {
+    'test_functions': ('Test Functions', {'type': 'integer', 'minimum': 0}),
+    'go_files': ('Go Files', {'type': 'integer', 'minimum': 0}),
+    'loc': ('Lines of Code (non-test)', {'type': 'integer', 'minimum': 0}),
+    'avg_cyclomatic_complexity': ('Avg Cyclomatic Complexity', {'type': 'number', 'minimum': 0}),
+    'high_complexity_functions': ('Functions > {threshold} Complexity', {'type': 'integer', 'minimum': 0}),
+}
+TEST_FUNC = re.compile(r'^func\s+Test[^(\n]+\(', re.M)
+
+
+class Collector:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        sel = ctx.selected
+        self.needs_text = 'tests' in sel or 'loc' in sel
+        self.model = ctx.extra['go_model'] = go_packages.load(ctx.root)
+        self.seen: list = []
+        self.tests = 0
+        self.loc = 0
+        self.per_file: dict[str, dict[str, float]] = {}
+
+    def paths(self) -> list:
+        return [self.ctx.root / rel for rel in self.model.files()]
+
+    def _rel(self, path) -> str:
+        try:
+            return path.relative_to(self.ctx.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def feed(self, path, text):
+        self.seen.append(path)
+        rec = self.per_file.setdefault(self._rel(path), {'files': 0})
+        rec['files'] += 1
+        if text is None:
+            return
+        if path.name.endswith('_test.go'):
+            n = len(TEST_FUNC.findall(text))
+            self.tests += n
+            rec['tests'] = n
+        else:
+            n = sum(1 for line in text.splitlines() if line.strip())
+            self.loc += n
+            rec['loc'] = n
+
+    def result(self) -> dict:
+        sel = self.ctx.selected
+        out: dict = {}
+        if 'tests' in sel:
+            out['test_functions'] = self.tests
+        if 'files' in sel:
+            out['go_files'] = len(self.seen)
+        if 'loc' in sel:
+            out['loc'] = self.loc
+        if ('avg_complexity' in sel or 'high_complexity' in sel) and self.seen:
+            out.update(self.complexity())
+        self.ctx.extra['packages'] = self.packages()
+        self.ctx.extra.setdefault('per_file', {}).update(self.per_file)
+        return out
+
+    def packages(self) -> dict[str, dict]:
+        """Per-package rollup of the per-file numbers (average complexity recomputed from sums)."""
+        rollup = self.model.rollup(self.per_file)
+        for rec in rollup.values():
+            funcs = rec.pop('functions', 0)
+            total = rec.pop('complexity_sum', 0)
+            if funcs:
+                rec['avg_complexity'] = round(total / funcs, 2)
+            for k, v in rec.items():
+                if isinstance(v, float) and v.is_integer():
+                    rec[k] = int(v)
+        return rollup
+
+    def complexity(self) -> dict:
+        ctx = self.ctx
+        if not ctx.run(['bash', '-c', 'command -v gocyclo || true']):
+            return {}
+        with span('gocyclo', files=len(self.seen)):
+            out = ctx.run(['gocyclo', *[p.as_posix() for p in self.seen]])
+        if not out:
+            return {}
+        scores = []
+        for line in out.splitlines():
+            parts = line.split()
+            if not parts:
+                continue
+            try:
+                score = float(parts[0])
+            except ValueError:
+                continue
+            scores.append(score)
+            # "<score> <pkg> <func> <file>:<line>:<col>"
+            if len(parts) >= 4:
+                rec = self.per_file.setdefault(self._rel(pathlib.Path(parts[-1].rsplit(':', 2)[0])), {'files': 0})
+                rec['functions'] = rec.get('functions', 0) + 1
+                rec['complexity_sum'] = rec.get('complexity_sum', 0) + score
+                if score > ctx.high_complexity_threshold:
+                    rec['high_complexity'] = rec.get('high_complexity', 0) + 1
+        metrics: dict = {}
+        if scores and 'avg_complexity' in ctx.selected:
+            metrics['avg_cyclomatic_complexity'] = round(sum(scores) / len(scores), 2)
+        if 'high_complexity' in ctx.selected:
+            metrics['high_complexity_functions'] = sum(1 for s in scores if s > ctx.high_complexity_threshold)
+        return metrics
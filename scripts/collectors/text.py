@@ -0,0 +1,25 @@
+"""Language-agnostic text metrics: TODO/FIXME/XXX/HACK markers in source files."""
+from __future__ import annotations
+
+import re
+
+SUFFIXES = ('.go', '.zig', '.py', '.js', '.ts', '.c', '.h', '.cc', '.cpp', '.rs', '.sh')
+FIELDS = {
+    'todo_markers': ('TODO/FIXME Markers', {'type': 'integer', 'minimum': 0}),
+}
+MARKER = re.compile(r'\b(?:TODO|FIXME|XXX|HACK)\b')
+
+
+class Collector:
+    needs_text = True
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.markers = 0
+
+    def feed(self, path, text):
+        if text is not None:
+            self.markers += len(MARKER.findall(text))
+
+    def result(self) -> dict:
+        return {'todo_markers': self.markers}
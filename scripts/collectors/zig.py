@@ -0,0 +1,54 @@
+"""Zig source metrics: file count, `test` blocks and non-blank lines.
+
+Per-file numbers go to ctx.extra['per_file'] for the directory tree.
+"""
+from __future__ import annotations
+
+import re
+
+SUFFIXES = ('.zig',)
+FIELDS = {
+    'zig_files': ('Zig Files', {'type': 'integer', 'minimum': 0}),
+    'zig_tests': ('Zig Test Blocks', {'type': 'integer', 'minimum': 0}),
+    'zig_loc': ('Zig Lines of Code', {'type': 'integer', 'minimum': 0}),
+}
+# test "name" { ... }, test { ... } and decltests (test ident { ... })
+TEST_BLOCK = re.compile(r'^\s*test\s*(?:"(?:[^"\\]|\\.)*"|[A-Za-z_]\w*)?\s*\{', re.M)
+
+
+class Collector:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.needs_text = 'zig_tests' in ctx.selected or 'zig_loc' in ctx.selected
+        self.files = 0
+        self.tests = 0
+        self.loc = 0
+        self.per_file: dict[str, dict[str, int]] = {}
+
+    def feed(self, path, text):
+        self.files += 1
+        try:
+            rel = path.relative_to(self.ctx.root).as_posix()
+        except ValueError:
+            rel = path.as_posix()
+        rec = self.per_file[rel] = {'files': 1}
+        if text is None:
+            return
+        tests = len(TEST_BLOCK.findall(text))
+        loc = sum(1 for line in text.splitlines() if line.strip())
+        self.tests += tests
+        self.loc += loc
+        rec['tests'] = tests
+        rec['loc'] = loc
+
+    def result(self) -> dict:
+        sel = self.ctx.selected
+        out: dict = {}
+        if 'zig_files' in sel:
+            out['zig_files'] = self.files
+        if 'zig_tests' in sel:
+            out['zig_tests'] = self.tests
+        if 'zig_loc' in sel:
+            out['zig_loc'] = self.loc
+        self.ctx.extra.setdefault('per_file', {}).update(self.per_file)
+        return out
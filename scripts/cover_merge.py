@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Merge any number of Go coverage profiles into one cover.out.
+
+Profiles from several jobs (unit and integration runs, per-OS matrix legs, test
+shards) are streamed, never loaded whole: each input is read in chunks of
+COVER_MERGE_CHUNK blocks that are sorted by (file, start, end); an input larger
+than one chunk is spilled to sorted temporary runs. All runs are then k-way
+merged with a heap, so equal blocks arrive next to each other and are combined
+on the fly: counts are summed for mode: count/atomic and OR-ed for mode: set.
+Memory is bounded by one chunk per input plus one row per file, and already
+sorted input (one `go test` profile per file group) sorts in linear time.
+
+The per-file totals are collected while the merged profile is written, and
+stored in coverage_files.json together with the size and mtime of the profile
+they describe; gen_coverage_md.py uses them instead of parsing cover.out again.
+
+Mode headers must agree: count and atomic merge (atomic wins), set only merges
+with set. The same block with different statement counts means the profiles
+come from different sources and is rejected.
+
+Usage:
+    cover_merge.py [--output cover.out] [--files coverage_files.json] PROFILE|GLOB ...
+
+Env:
+    COVER_PROFILES      inputs when none are given (globs, comma or space separated)
+    COVER_MERGE_CHUNK   blocks sorted in memory per input (default 200000)
+
+Exit codes:
+    0 success (also when there is nothing to merge)
+    2 invalid profile or incompatible modes
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import heapq
+import json
+import os
+import pathlib
+import tempfile
+from typing import Iterable, Iterator
+
+from pipeline_trace import count, log, span
+
+MODES = ('set', 'count', 'atomic')
+CHUNK = int(os.environ.get('COVER_MERGE_CHUNK', '200000') or 200000)
+FILES_JSON = 'coverage_files.json'
+
+Block = tuple  # (file, start line, start col, end line, end col, statements, count)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('profiles', nargs='*', help='Coverage profiles or globs (default COVER_PROFILES)')
+    p.add_argument('--output', default='cover.out', help='Merged profile (default cover.out)')
+    p.add_argument('--files', default=FILES_JSON, help=f'Per-file totals JSON (default {FILES_JSON})')
+    return p.parse_args(argv)
+
+
+def expand(patterns: Iterable[str]) -> list[pathlib.Path]:
+    """Existing files matching the patterns, in order and without duplicates."""
+    out: list[pathlib.Path] = []
+    seen: set[pathlib.Path] = set()
+    for pattern in patterns:
+        for name in sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]:
+            path = pathlib.Path(name)
+            if path.is_file() and path.resolve() not in seen:
+                seen.add(path.resolve())
+                out.append(path)
+    return out
+
+
+def parse_line(line: str) -> Block | None:
+    name, _, rest = line.rpartition(':')
+    parts = rest.split()
+    if not name or len(parts) != 3:
+        return None
+    start, _, end = parts[0].partition(',')
+    sl, _, sc = start.partition('.')
+    el, _, ec = end.partition('.')
+    try:
+        return (name, int(sl), int(sc), int(el), int(ec), int(parts[1]), int(parts[2]))
+    except ValueError:
+        return None
+
+
+def format_block(b: Block) -> str:
+    return f'{b[0]}:{b[1]}.{b[2]},{b[3]}.{b[4]} {b[5]} {b[6]}\n'
+
+
+def read_mode(path: pathlib.Path) -> str:
+    with path.open(encoding='utf-8') as f:
+        header = f.readline().strip()
+    mode = header[5:].strip() if header.startswith('mode:') else ''
+    if mode not in MODES:
+        raise ValueError(f'{path}: not a coverage profile (header {header!r})')
+    return mode
+
+
+def combined_mode(modes: Iterable[str]) -> str:
+    kinds = set(modes)
+    if 'set' in kinds and len(kinds) > 1:
+        raise ValueError(f"incompatible modes: {', '.join(sorted(kinds))} (set only merges with set)")
+    return 'set' if kinds == {'set'} else 'atomic' if 'atomic' in kinds else 'count'
+
+
+def _run(path: str) -> Iterator[Block]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            yield parse_line(line)
+
+
+def _spill(blocks: list[Block], tmp: str) -> str:
+    fd, path = tempfile.mkstemp(dir=tmp, suffix='.run')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.writelines(format_block(b) for b in blocks)
+    count('cover_merge.spilled_runs')
+    return path
+
+
+def sorted_blocks(path: pathlib.Path, tmp: str, chunk: int = CHUNK) -> Iterator[Block]:
+    """Blocks of one profile in key order: sorted in memory when it fits one chunk, else via spilled runs."""
+    runs: list[str] = []
+    buf: list[Block] = []
+    with path.open(encoding='utf-8') as f:
+        f.readline()
+        for line in f:
+            block = parse_line(line)
+            if block is None:
+                continue
+            buf.append(block)
+            if len(buf) >= chunk:
+                buf.sort()
+                runs.append(_spill(buf, tmp))
+                buf = []
+    buf.sort()
+    if not runs:
+        return iter(buf)
+    if buf:
+        runs.append(_spill(buf, tmp))
+    return heapq.merge(*(_run(r) for r in runs))
+
+
+def merge(paths: list[pathlib.Path], output: pathlib.Path, chunk: int = CHUNK) -> dict:
+    """Write the merged profile to output; returns its mode, per-file totals and block count.
+
+    Raises ValueError for invalid profiles, incompatible modes or conflicting blocks.
+    """
+    mode = combined_mode(read_mode(p) for p in paths)
+    files: list[dict] = []
+    blocks = 0
+    tmp_out = output.with_name(output.name + '.tmp')  # inputs may include output itself
+    try:
+        with tempfile.TemporaryDirectory() as tmp, tmp_out.open('w', encoding='utf-8') as out:
+            out.write(f'mode: {mode}\n')
+            current: list | None = None
+
+            def emit(b: list) -> None:
+                nonlocal blocks
+                out.write(format_block(b))
+                blocks += 1
+                if not files or files[-1]['file'] != b[0]:
+                    files.append({'file': b[0], 'stmts': 0, 'covered': 0})
+                files[-1]['stmts'] += b[5]
+                if b[6] > 0:
+                    files[-1]['covered'] += b[5]
+
+            for b in heapq.merge(*(sorted_blocks(p, tmp, chunk) for p in paths)):
+                if current is not None and b[:5] == tuple(current[:5]):
+                    if b[5] != current[5]:
+                        raise ValueError(f'{b[0]}:{b[1]}.{b[2]}: block has {current[5]} and {b[5]} statements '
+                                         '(profiles of different sources?)')
+                    current[6] = (1 if current[6] or b[6] else 0) if mode == 'set' else current[6] + b[6]
+                    continue
+                if current is not None:
+                    emit(current)
+                current = list(b)
+            if current is not None:
+                emit(current)
+    except BaseException:
+        tmp_out.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_out, output)
+    return {'mode': mode, 'files': files, 'blocks': blocks}
+
+
+def write_files_json(result: dict, profile: pathlib.Path, path: pathlib.Path) -> None:
+    st = profile.stat()
+    doc = {'profile': {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}, 'mode': result['mode'],
+           'stmts': sum(f['stmts'] for f in result['files']),
+           'covered': sum(f['covered'] for f in result['files']), 'files': result['files']}
+    path.write_text(json.dumps(doc, separators=(',', ':')) + '\n', encoding='utf-8')
+
+
+def load_files_json(profile: pathlib.Path, path: pathlib.Path | None = None) -> list[dict] | None:
+    """Per-file totals recorded by the last merge, if they still describe profile."""
+    path = path or profile.with_name(FILES_JSON)
+    try:
+        doc = json.loads(path.read_text(encoding='utf-8'))
+        st = profile.stat()
+    except (OSError, ValueError):
+        return None
+    if doc.get('profile') != {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}:
+        return None
+    return doc.get('files')
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    patterns = args.profiles or os.environ.get('COVER_PROFILES', '').replace(',', ' ').split()
+    paths = expand(patterns)
+    if not paths:
+        log('info', 'no coverage profiles to merge')
+        return 0
+    output = pathlib.Path(args.output)
+    try:
+        with span('merge coverage profiles', inputs=len(paths)):
+            result = merge(paths, output)
+    except (ValueError, OSError) as e:
+        log('error', str(e))
+        return 2
+    if args.files:
+        write_files_json(result, output, pathlib.Path(args.files))
+    count('cover_merge.inputs', len(paths))
+    count('cover_merge.blocks', result['blocks'])
+    stmts = sum(f['stmts'] for f in result['files'])
+    covered = sum(f['covered'] for f in result['files'])
+    pct = covered / stmts * 100 if stmts else 0.0
+    log('info', f"merged {len(paths)} profiles (mode: {result['mode']}) into {output}: "
+                f"{result['blocks']} blocks, {len(result['files'])} files, {pct:.1f}% of statements")
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -3,15 +3,21 @@
 
 If repository provides .github/scripts/gen_bench_md.py we defer to it.
 Else we build a page using bench/summary.json and bench/data/*.json produced by update_bench.py.
+A bench_compare.md left by bench_compare.py (pull request runs) is placed at the top of the page.
+The latest results and charts only use entries of the latest run's machine class (bench_env.py);
+with a reference benchmark the table gains a Normalized column and the charts plot normalized values.
 """
 from __future__ import annotations
 
 import importlib.util
 import json
 import pathlib
-import shutil
 import sys
 
+from assets import publish_section
+from site_output import write_text
+import bench_env
+
 ROOT = pathlib.Path.cwd()
 CUSTOM = ROOT / '.github' / 'scripts' / 'gen_bench_md.py'
 if CUSTOM.exists():
@@ -27,11 +33,11 @@ BENCH_SRC = ROOT / 'bench'
 SUMMARY = BENCH_SRC / 'summary.json'
 DEST = SITE_SRC / 'bench'
 BENCH_MD = SITE_SRC / 'bench.md'
-ASSET_JS = ROOT / 'gh-pages-action' / 'scripts' / 'bench.js'
-ALT_JS = ROOT / 'scripts' / 'bench.js'
+COMPARE = ROOT / 'bench_compare.md'
+HEADER = '# Benchmarks\n\n' + (COMPARE.read_text(encoding='utf-8') + '\n' if COMPARE.exists() else '')
 
 if not SUMMARY.exists():
-    BENCH_MD.write_text('# Benchmarks\n\n_No benchmark history yet._\n', encoding='utf-8')
+    write_text(BENCH_MD, HEADER + '_No benchmark history yet._\n')
     # Ensure a destination dir exists for consistency
     DEST.mkdir(parents=True, exist_ok=True)
     # No summary/data to copy; page exists so nav can show it
@@ -40,45 +46,70 @@ if not SUMMARY.exists():
 try:
     summary = json.loads(SUMMARY.read_text(encoding='utf-8'))
     if not summary.get('benchmarks'):
-        BENCH_MD.write_text('# Benchmarks\n\n_Benchmark summary empty._\n', encoding='utf-8')
+        write_text(BENCH_MD, HEADER + '_Benchmark summary empty._\n')
         sys.exit(0)
 except Exception:
-    BENCH_MD.write_text('# Benchmarks\n\n_Benchmark summary unreadable._\n', encoding='utf-8')
+    write_text(BENCH_MD, HEADER + '_Benchmark summary unreadable._\n')
     sys.exit(0)
 
-DEST.mkdir(parents=True, exist_ok=True)
-shutil.copy2(SUMMARY, DEST / 'summary.json')
 DATA_DIR = BENCH_SRC / 'data'
-if DATA_DIR.exists():
-    (DEST / 'data').mkdir(exist_ok=True)
-    for p in DATA_DIR.glob('*.json'):
-        shutil.copy2(p, DEST / 'data' / p.name)
-if ASSET_JS.exists():
-    shutil.copy2(ASSET_JS, DEST / 'bench.js')
-elif ALT_JS.exists():
-    shutil.copy2(ALT_JS, DEST / 'bench.js')
-else:
-    bench_js = (
-        "(function(){"
-        "var root=document.getElementById('bench-charts'); if(!root) return;"
-        "fetch('bench/summary.json').then(function(r){return r.json();}).then(function(s){"
-        "var list=document.createElement('div');"
-        "(s.benchmarks||[]).forEach(function(b){var div=document.createElement('div'); div.className='bench-chart'; div.innerHTML='<h4>'+b.name+'</h4><canvas width=240 height=60></canvas>'; list.appendChild(div); fetch('bench/data/'+b.file).then(function(r){return r.json();}).then(function(series){"
-        "var c=div.querySelector('canvas'); var ctx=c.getContext('2d'); var w=c.width,h=c.height;"
-        "var pts=series.map(function(s){return {t:new Date(s.time), v:s.ns_per_op||0};}); if(!pts.length) return;"
-        "var min=Math.min.apply(null, pts.map(function(p){return p.v;})); var max=Math.max.apply(null, pts.map(function(p){return p.v;}));"
-        "ctx.strokeStyle='#2f81f7'; ctx.lineWidth=2; ctx.beginPath(); for(var i=0;i<pts.length;i++){var x=(i/(pts.length-1))*(w-10)+5; var y=h-5-((max===min?0.5:(pts[i].v-min)/(max-min))*(h-10)); if(i){ctx.lineTo(x,y);}else{ctx.moveTo(x,y);}} ctx.stroke(); ctx.fillStyle='#555'; ctx.font='10px sans-serif'; ctx.fillText(min.toFixed(2),4,h-2); ctx.fillText(max.toFixed(2),4,10);"
-        "}).catch(function(){});});"
-        "root.innerHTML=''; root.appendChild(list);"
-        "}).catch(function(){root.textContent='Failed to load benchmark history.';});"
-        "})();"
-    )
-    (DEST / 'bench.js').write_text(bench_js + '\n', encoding='utf-8')
-
-BENCH_MD.write_text(
-    '# Benchmarks\n\nBenchmark performance over time.\n\n'
-    '[summary.json](bench/summary.json)\n\n'
+# history stored once under assets/bench/ and resolved through manifest.json by bench.js
+published = publish_section('bench', SITE_SRC, SUMMARY, DATA_DIR, ('bench.js', 'charts.js'))
+MACHINE = summary.get('machine') or ''
+REFERENCE = summary.get('reference') or ''
+
+
+def _fmt(rec: dict, key: str) -> str:
+    return f'{rec[key]:g}' if isinstance(rec.get(key), (int, float)) else '-'
+
+
+def latest_table() -> list[str]:
+    """Latest sample per benchmark, linking any flame graphs from bench_profiles.py."""
+    norm = ' Normalized |' if REFERENCE else ''
+    rows = ['| Benchmark | ns/op |' + norm + ' B/op | allocs/op | Profile |',
+            '|-----------|-------|' + ('------------|' if REFERENCE else '') + '------|-----------|---------|']
+    for b in summary.get('benchmarks', []):
+        try:
+            series = json.loads((DATA_DIR / b['file']).read_text(encoding='utf-8'))
+            series = bench_env.like_for_like(series, MACHINE) if MACHINE else series
+            last = series[-1] if series else {}
+        except Exception:
+            last = {}
+        stem = b['file'][:-len('.json')]
+        links = []
+        for kind in ('cpu', 'mem'):
+            if (DEST / 'profiles' / f'{stem}.{kind}.svg').exists():
+                links.append(f'[{kind}](bench/profiles/{stem}.{kind}.svg)')
+                if (DEST / 'profiles' / f'{stem}.{kind}.diff.svg').exists():
+                    links.append(f'[{kind} diff](bench/profiles/{stem}.{kind}.diff.svg)')
+        rows.append(f"| `{b['name']}` | {_fmt(last, 'ns_per_op')} |" + (f" {_fmt(last, 'normalized')} |" if REFERENCE else '')
+                    + f" {_fmt(last, 'bytes_per_op')} | "
+                    f"{_fmt(last, 'allocs_per_op')} | "
+                    f"{' · '.join(links) or '-'} |")
+    return rows
+
+
+def environment() -> str:
+    """Where the latest results were measured, and which results the charts plot."""
+    env = summary.get('environment') or {}
+    if not MACHINE:
+        return ''
+    details = ', '.join(str(v) for v in (env.get('cpu'), f"{env['cores']} cores" if env.get('cores') else '',
+                                         env.get('go'), env.get('kernel'), env.get('image')) if v)
+    line = f'Latest run on machine class `{MACHINE}`' + (f' ({details})' if details else '') + '. '
+    if REFERENCE:
+        line += f'Charts plot ns/op relative to `{REFERENCE}` in the same run, across all machine classes.'
+    else:
+        line += 'Charts only plot results from this machine class.'
+    return line + '\n\n'
+
+
+write_text(
+    BENCH_MD,
+    HEADER + 'Benchmark performance over time.\n\n'
+    + environment() +
+    f"[summary.json]({published.url('summary.json', SITE_SRC)})\n\n"
+    + '\n'.join(latest_table()) + '\n\n'
     '<div id="bench-charts">Loading benchmark history...</div>\n'
-    '<script src="bench/bench.js"></script>\n',
-    encoding='utf-8'
+    '<script src="bench/bench.js"></script>\n'
 )
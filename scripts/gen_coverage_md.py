@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Wrapper script importing project coverage generator if present, else inline fallback.
-Supports Go cover.out and Zig HTML coverage (zig build test -Dcoverage).
+Supports Go cover.out and Zig kcov coverage (zig build test -Dcoverage, see zig_coverage.py).
+Go per-file totals come from coverage_files.json when cover_merge.py wrote it for
+the current cover.out; otherwise cover.out is parsed here.
 """
 from __future__ import annotations
 
@@ -8,7 +10,12 @@ import importlib.util
 import pathlib
 import os
 import sys
-import re
+
+from pipeline_trace import count, span
+from site_output import write_text
+import cover_merge
+import go_packages
+import zig_coverage
 
 ROOT = pathlib.Path.cwd()
 SCRIPT = ROOT / '.github' / 'scripts' / 'gen_coverage_md.py'
@@ -35,6 +42,9 @@ per_file_available = False
 def parse_go_cover() -> tuple[list[tuple[str,int,int,float]], float] | tuple[None, None]:
     if not cover_profile.exists():
         return None, None
+    merged = cover_merge.load_files_json(cover_profile)
+    if merged is not None:
+        return summarize({f['file']: f for f in merged})
     totals = {}
     try:
         with cover_profile.open(encoding='utf-8') as f:
@@ -58,6 +68,10 @@ def parse_go_cover() -> tuple[list[tuple[str,int,int,float]], float] | tuple[Non
                     rec['covered'] += stmts
     except Exception:
         return None, None
+    return summarize(totals)
+
+
+def summarize(totals: dict) -> tuple[list[tuple[str,int,int,float]], float]:
     rows = []
     total_stmts = total_cov = 0
     for fp, rec in sorted(totals.items()):
@@ -75,30 +89,17 @@ def find_zig_cov_dir() -> pathlib.Path | None:
     return None
 
 
-def extract_zig_percent(index_html: str) -> float | None:
-    # Heuristics: look for a percent near a Total row
-    # Try common patterns
-    patterns = [
-        r'Total[^%]{0,200}([0-9]+(?:\.[0-9]+)?)%'
-    ]
-    for pat in patterns:
-        m = re.search(pat, index_html, flags=re.I|re.S)
-        if m:
-            try:
-                return float(m.group(1))
-            except Exception:
-                pass
-    # Fallback: first percentage in file
-    m = re.search(r'([0-9]+(?:\.[0-9]+)?)%', index_html)
-    if m:
-        try:
-            return float(m.group(1))
-        except Exception:
-            return None
-    return None
+def color(p: float) -> str:
+    return '#d9534f' if p < 50 else '#f0ad4e' if p < 70 else '#5bc0de' if p < 80 else '#5cb85c'
+
+
+def bar(p: float) -> str:
+    return f'<div style="background:#eee;border:1px solid #ccc;width:120px;height:10px"><div style="background:{color(p)};height:100%;width:{p:.2f}%"></div></div>'
 
 # Compute Go coverage if available
-rows, overall = parse_go_cover()
+with span('parse cover.out'):
+    rows, overall = parse_go_cover()
+count('coverage.files', len(rows or []))
 per_file_available = bool(rows)
 
 parts = ['# Coverage Report', '']
@@ -113,15 +114,11 @@ if overall is not None:
 
 # Zig coverage section
 zig_cov_dir = find_zig_cov_dir()
+zig = zig_coverage.load(zig_cov_dir_candidates) if zig_cov_dir else None
 if zig_cov_dir:
-    try:
-        idx = (zig_cov_dir / 'index.html').read_text(encoding='utf-8', errors='ignore')
-    except Exception:
-        idx = ''
-    zig_pct = extract_zig_percent(idx) if idx else None
     parts += ['', '## Zig Coverage', '']
-    if zig_pct is not None:
-        parts.append(f'Overall Zig coverage: **{zig_pct:.2f}%**')
+    if zig is not None:
+        parts.append(f"Overall Zig coverage: **{zig['percent']:.2f}%**")
     rel = zig_cov_dir.relative_to(site_src) if zig_cov_dir.is_relative_to(site_src) else pathlib.Path('reference/zig/index.html')
     # If coverage dir is under site_src (preferred), link directly
     if (site_src / rel).exists():
@@ -132,19 +129,35 @@ if zig_cov_dir:
         # Fallback generic link if copied under reference/zig
         parts.append('[Open Zig docs/coverage](reference/zig/index.html)')
 
-# Per-file table for Go
+# Per-package and per-file tables for Go (cover.out names files by import path)
 if per_file_available:
-    def color(p: float) -> str:
-        return '#d9534f' if p < 50 else '#f0ad4e' if p < 70 else '#5bc0de' if p < 80 else '#5cb85c'
-    def bar(p: float) -> str:
-        return f'<div style="background:#eee;border:1px solid #ccc;width:120px;height:10px"><div style="background:{color(p)};height:100%;width:{p:.2f}%"></div></div>'
+    model = go_packages.load(ROOT)
+    packages = model.rollup({fp: {'stmts': s, 'covered': c} for fp, s, c, _ in rows})
+    table = ['| Package | Stmts | Covered | % | Graph |', '|---------|-------|---------|----|-------|']
+    for name, rec in packages.items():
+        s, c = int(rec['stmts']), int(rec['covered'])
+        pct = (c / s * 100) if s else 0.0
+        table.append(f'| `{name}` | {s} | {c} | {pct:.2f}% | {bar(pct)} |')
+    parts += ['', '## Per-package Go Coverage', '', *table]
     table = ['| File | Stmts | Covered | % | Graph |', '|------|-------|---------|----|-------|']
     for fp, s, c, pct in rows:
         table.append(f'| `{fp}` | {s} | {c} | {pct:.2f}% | {bar(pct)} |')
     parts += ['', '## Per-file Go Coverage', '', *table]
 
+# Per-directory and per-file tables for Zig (kcov cobertura/json only)
+if zig and zig['files']:
+    table = ['| Directory | Lines | Covered | % | Graph |', '|-----------|-------|---------|----|-------|']
+    for d in zig['dirs']:
+        table.append(f"| `{d['dir']}` | {d['lines']} | {d['covered']} | {d['percent']:.2f}% | {bar(d['percent'])} |")
+    parts += ['', '## Per-directory Zig Coverage', '', *table]
+    table = ['| File | Lines | Covered | % | Graph |', '|------|-------|---------|----|-------|']
+    for f in zig['files']:
+        table.append(f"| `{f['file']}` | {f['lines']} | {f['covered']} | {f['percent']:.2f}% | {bar(f['percent'])} |")
+    parts += ['', '## Per-file Zig Coverage', '', *table]
+
 if not per_file_available and not zig_cov_dir:
     parts = ['# Coverage Report', '', 'No coverage profile produced.', '']
 
 parts += ['', '_Auto-generated by action._']
-md.write_text('\n'.join([p for p in parts if p is not None]), encoding='utf-8')
+page = '\n'.join([p for p in parts if p is not None])
+write_text(md, page)
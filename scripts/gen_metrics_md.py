@@ -3,15 +3,21 @@
 
 If repo provides custom .github/scripts/gen_metrics_md.py use that instead.
 Expects metrics/summary.json and metrics/data/*.json produced by update_metrics.py.
+
+The snapshot table gets a Trend column of build-time SVG sparklines (sparkline.py),
+so trends are visible without JS; INTERACTIVE_CHARTS=false drops the JS charts.
 """
 from __future__ import annotations
 
 import importlib.util
 import json
+import os
 import pathlib
-import shutil
 import sys
-import os
+
+from assets import publish_section
+from site_output import write_text
+import sparkline
 
 ROOT = pathlib.Path.cwd()
 CUSTOM = ROOT / '.github' / 'scripts' / 'gen_metrics_md.py'
@@ -26,68 +32,60 @@ SITE_SRC = ROOT / 'site_src'
 SITE_SRC.mkdir(exist_ok=True)
 METRICS_SRC = ROOT / 'metrics'
 SUMMARY = METRICS_SRC / 'summary.json'
-DEST = SITE_SRC / 'metrics'
 METRICS_MD = SITE_SRC / 'metrics.md'
-ASSET_JS = ROOT / 'gh-pages-action' / 'scripts' / 'metrics.js'
+INTERACTIVE = os.environ.get('INTERACTIVE_CHARTS', 'true') != 'false'
 
 if not SUMMARY.exists():
     if not METRICS_MD.exists():  # leave existing if snapshot table already created
-        METRICS_MD.write_text('# Metrics\n\n_No metrics history yet._\n', encoding='utf-8')
+        write_text(METRICS_MD, '# Metrics\n\n_No metrics history yet._\n')
     sys.exit(0)
 
 try:
     summary = json.loads(SUMMARY.read_text(encoding='utf-8'))
 except Exception:
-    METRICS_MD.write_text('# Metrics\n\n_Metrics summary unreadable._\n', encoding='utf-8')
+    write_text(METRICS_MD, '# Metrics\n\n_Metrics summary unreadable._\n')
     sys.exit(0)
 
 # Do not early-exit if metrics key missing; still produce trends container so acceptance test passes.
 
-DEST.mkdir(parents=True, exist_ok=True)
-shutil.copy2(SUMMARY, DEST / 'summary.json')
 DATA_DIR = METRICS_SRC / 'data'
-if DATA_DIR.exists():
-    (DEST / 'data').mkdir(exist_ok=True)
-    for p in DATA_DIR.glob('*.json'):
-        shutil.copy2(p, DEST / 'data' / p.name)
-
-# Ensure the metrics.js asset is available from one of several locations
-copied_asset = False
-if ASSET_JS.exists():
-    shutil.copy2(ASSET_JS, DEST / 'metrics.js')
-    copied_asset = True
-else:
-    action_asset = pathlib.Path(os.environ.get('GITHUB_ACTION_PATH', '')) / 'scripts' / 'metrics.js'
-    if action_asset.exists():
-        shutil.copy2(action_asset, DEST / 'metrics.js')
-        copied_asset = True
-    else:
-        repo_asset = ROOT / 'scripts' / 'metrics.js'
-        if repo_asset.exists():
-            shutil.copy2(repo_asset, DEST / 'metrics.js')
-            copied_asset = True
+# history stored once under assets/metrics/ and resolved through manifest.json by metrics.js
+publish_section('metrics', SITE_SRC, SUMMARY, DATA_DIR, ('metrics.js', 'charts.js'))
 
-# Also mirror into nested folder to satisfy relative URLs from /metrics/
-NEST = DEST / 'metrics'
-NEST.mkdir(exist_ok=True)
-shutil.copy2(DEST / 'summary.json', NEST / 'summary.json')
-if (DEST / 'data').exists():
-    (NEST / 'data').mkdir(exist_ok=True)
-    for p in (DEST / 'data').glob('*.json'):
-        shutil.copy2(p, NEST / 'data' / p.name)
-if (DEST / 'metrics.js').exists():
-    shutil.copy2(DEST / 'metrics.js', NEST / 'metrics.js')
+# Re-render the snapshot table (collect_metrics.py wrote it before this run's point was stored) so its
+# Trend column covers the full history, then add the optional interactive charts section
+CHARTS_HTML = '<div id="metrics-charts">Loading metrics history...</div>\n<script src="metrics/metrics.js"></script>\n'
+SNAPSHOT = SITE_SRC / 'metrics.json'
+snapshot = None
+if SNAPSHOT.exists():
+    try:
+        snapshot = json.loads(SNAPSHOT.read_text(encoding='utf-8'))
+    except Exception:
+        snapshot = None
+if isinstance(snapshot, dict):
+    import collect_metrics
+    import collectors
+    import metrics_tree
 
-# Keep initial snapshot table (metrics.md appended earlier by collect script) and add charts section
-if METRICS_MD.exists():
+    history = {key: sparkline.load(DATA_DIR / f'{key}.json') for key in snapshot}
+    threshold = int(os.environ.get('HIGH_COMPLEXITY_THRESHOLD', '10') or 10)
+    base = collect_metrics.render_table(snapshot, collectors.all_fields(), threshold, history)
+    try:
+        packages = json.loads((SITE_SRC / 'packages.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        packages = {}
+    if isinstance(packages, dict):
+        base += collect_metrics.render_packages(packages, threshold)
+    hotspots = int(os.environ.get('METRICS_HOTSPOTS', '10') or 10)
+    base += collect_metrics.render_hotspots(metrics_tree.load(SITE_SRC / 'metrics' / 'tree.json'), threshold,
+                                            hotspots, INTERACTIVE)
+    if INTERACTIVE:
+        base += '\n## Trends\n\n' + CHARTS_HTML
+    write_text(METRICS_MD, base)
+elif METRICS_MD.exists():
     base = METRICS_MD.read_text(encoding='utf-8')
-    if 'id="metrics-charts"' not in base:
-        base += '\n## Trends\n\n<div id="metrics-charts">Loading metrics history...</div>\n<script src="metrics/metrics.js"></script>\n'
-        METRICS_MD.write_text(base, encoding='utf-8')
+    if INTERACTIVE and 'id="metrics-charts"' not in base:
+        base += '\n## Trends\n\n' + CHARTS_HTML
+        write_text(METRICS_MD, base)
 else:
-    METRICS_MD.write_text(
-        '# Metrics\n\nProject metrics over time.\n\n'
-        '<div id="metrics-charts">Loading metrics history...</div>\n'
-        '<script src="metrics/metrics.js"></script>\n',
-        encoding='utf-8'
-    )
+    write_text(METRICS_MD, '# Metrics\n\nProject metrics over time.\n\n' + (CHARTS_HTML if INTERACTIVE else ''))
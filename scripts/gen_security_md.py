@@ -1,32 +1,40 @@
 #!/usr/bin/env python3
-"""Append trends section for security if history present."""
+"""Append trends section for security if history present.
+
+A table of build-time SVG sparklines (sparkline.py) per series, then the JS charts
+unless INTERACTIVE_CHARTS=false.
+"""
 from __future__ import annotations
-import json, pathlib, shutil, os
+import json, os, pathlib
+from assets import publish_section
+from site_output import write_text
+import sparkline
 ROOT=pathlib.Path.cwd(); SITE=ROOT/'site_src'; SEC_SRC=ROOT/'security'
-SUMMARY=SEC_SRC/'summary.json'; DEST=SITE/'security'; SEC_MD=SITE/'security.md'
-ASSET=ROOT/'gh-pages-action'/'scripts'/'security.js'
+SUMMARY=SEC_SRC/'summary.json'; SEC_MD=SITE/'security.md'
+INTERACTIVE=os.environ.get('INTERACTIVE_CHARTS','true')!='false'
 if not SUMMARY.exists(): raise SystemExit(0)
 try: summary=json.loads(SUMMARY.read_text())
 except Exception: raise SystemExit(0)
-DEST.mkdir(parents=True, exist_ok=True)
-shutil.copy2(SUMMARY, DEST/'summary.json')
 DATA=SEC_SRC/'data'
-if DATA.exists():
-    (DEST/'data').mkdir(exist_ok=True)
-    for p in DATA.glob('*.json'): shutil.copy2(p, DEST/'data'/p.name)
-# Try repository asset path, else fall back to action bundle path
-copied=False
-if ASSET.exists():
-    shutil.copy2(ASSET, DEST/'security.js'); copied=True
-else:
-    action_asset = pathlib.Path(os.environ.get('GITHUB_ACTION_PATH',''))/'scripts'/'security.js'
-    if action_asset.exists():
-        shutil.copy2(action_asset, DEST/'security.js'); copied=True
-    else:
-        repo_asset = ROOT/'scripts'/'security.js'
-        if repo_asset.exists():
-            shutil.copy2(repo_asset, DEST/'security.js'); copied=True
+# history stored once under assets/security/ and resolved through manifest.json by security.js
+publish_section('security', SITE, SUMMARY, DATA, ('security.js','charts.js'))
+LABELS={'total_vulns':'Total Vulnerabilities','code_scanning_open':'Code Scanning Open',
+        'secret_scanning_open':'Secret Scanning Open','mean_time_to_fix_days':'Mean Time to Fix (days)',
+        'fixed_last_30d':'Fixed (last 30d)'}
+def trend_rows():
+    # build-time sparklines: trends are visible with no JS and no extra requests
+    rows=['| Series | Latest | Trend |','|--------|--------|-------|']
+    for m in summary.get('metrics',[]) if isinstance(summary,dict) else []:
+        vals=sparkline.load(DATA/m['file'])
+        if not vals: continue
+        label=LABELS.get(m['name'], m['name'].replace('_',' ').title())
+        rows.append(f"| {label} | {sparkline.fmt(vals[-1])} | {sparkline.trend_cell(vals, '#d73a49')} |")
+    return rows if len(rows)>2 else []
 content = SEC_MD.read_text() if SEC_MD.exists() else '# Security\n\n'
-if 'id="security-charts"' not in content:
-    content += '\n## Trends\n\n<div id="security-charts">Loading security history...</div>\n<script src="security/security.js"></script>\n'
-SEC_MD.write_text(content)
+content = content.split('\n## Trends\n')[0].rstrip('\n')+'\n'  # regenerate our section on every run
+rows=trend_rows()
+if rows or INTERACTIVE:
+    content += '\n## Trends\n\n'
+    if rows: content += '\n'.join(rows)+'\n'
+    if INTERACTIVE: content += ('\n' if rows else '')+'<div id="security-charts">Loading security history...</div>\n<script src="security/security.js"></script>\n'
+write_text(SEC_MD, content)
@@ -1,4 +1,12 @@
 #!/usr/bin/env python3
+"""Generate the site skeleton: home page, API reference, extra docs and mkdocs.yml.
+
+Env:
+    SITE_STAGES         comma list of home,reference,zig,docs to (re)generate (default all);
+                        mkdocs.yml is always rewritten (unchanged content is not touched)
+    REFERENCE_PACKAGES  comma list of package directories (relative, '.' = root) whose
+                        reference page gets a fresh `go doc`; others reuse their existing page
+"""
 from __future__ import annotations
 
 import os
@@ -6,6 +14,10 @@ import pathlib
 import subprocess
 import shutil
 
+import go_packages
+from pipeline_trace import count, span
+from site_output import copy_file, copy_tree, write_text
+
 ROOT = pathlib.Path.cwd()
 SITE_SRC = ROOT / 'site_src'
 SITE_SRC.mkdir(exist_ok=True)
@@ -17,14 +29,18 @@ repo_name = repo.split('/', 1)[-1] if repo else ROOT.name
 site_name_override = os.environ.get('SITE_NAME', '').strip()
 site_name = site_name_override or f"{repo_name} — Go Package Site"
 extra_docs = os.environ.get('EXTRA_DOCS', 'true').lower() == 'true'
-nav_order_cfg = [p.strip().lower() for p in os.environ.get('NAV_ORDER', 'home,reference,coverage,metrics,security,bench,docs,kb,specs').split(',') if p.strip()]
+STAGES = {t.strip() for t in (os.environ.get('SITE_STAGES') or 'home,reference,zig,docs').split(',') if t.strip()}
+PACKAGES = {t.strip().strip('/') or '.' for t in os.environ.get('REFERENCE_PACKAGES', '').split(',') if t.strip()}
+nav_order_cfg = [p.strip().lower() for p in os.environ.get('NAV_ORDER', 'home,reference,coverage,tests,metrics,security,bench,docs,kb,specs').split(',') if p.strip()]
 
 readme = ROOT / 'README.md'
 index_md = SITE_SRC / 'index.md'
-if readme.exists():
-    index_md.write_text(readme.read_text(encoding='utf-8'), encoding='utf-8')
+if 'home' not in STAGES:
+    pass
+elif readme.exists():
+    write_text(index_md, readme.read_text(encoding='utf-8'))
 else:
-    index_md.write_text(f"# {repo_name}\n", encoding='utf-8')
+    write_text(index_md, f"# {repo_name}\n")
 
 zig_bin = shutil.which('zig')
 zig_build_file = ROOT / 'build.zig'
@@ -41,21 +57,15 @@ if both_langs:
     REFERENCE_GO.mkdir(parents=True, exist_ok=True)
 
 pkg_entries: list[tuple[str,str]] = []
-if go_present:
-    try:
-        listing = subprocess.check_output([go_bin, 'list', '-f', '{{.Dir}}||{{.ImportPath}}', './...'], text=True).strip().splitlines()
-        for line in listing:
-            if '||' not in line:
-                continue
-            d, ip = line.split('||', 1)
-            if '/vendor/' in d:
-                continue
-            pkg_entries.append((d, ip))
-    except subprocess.CalledProcessError:
-        pkg_entries = []
+if go_present and 'reference' in STAGES:
+    # shared package model (one cached `go list -json -deps`); see go_packages.py
+    model = go_packages.load(ROOT)
+    if model.from_toolchain:
+        pkg_entries = [(str(ROOT / pkg.dir), pkg.import_path) for pkg in model.packages]
 
 root_dir = ROOT.resolve()
 links = []
+root_page = ''
 if pkg_entries:
     for d, import_path in sorted(pkg_entries):
         p = pathlib.Path(d).resolve()
@@ -78,17 +88,25 @@ if pkg_entries:
             link_target = (f"go/{rel}/index.md" if both_langs else f"{rel}/index.md")
         idx = outdir / 'index.md'
 
+        if PACKAGES and rel not in PACKAGES and idx.exists():
+            # unchanged package: keep its page (for the root, minus the package list rebuilt below)
+            if rel == '.':
+                root_page = idx.read_text(encoding='utf-8').split('\n## Packages\n', 1)[0]
+            links.append(f"- [{'root' if rel == '.' else rel}]({link_target})")
+            continue
+
         title = 'Root Package' if rel == '.' else f'Package {rel}'
         doc_blocks: list[str] = []
-        try:
-            detailed = subprocess.check_output(['go', 'doc', '-all', import_path], text=True, stderr=subprocess.DEVNULL)
-        except Exception:
-            detailed = ''
-        if not detailed:
+        with span(f'go doc {import_path}'):
             try:
-                detailed = subprocess.check_output(['go', 'doc', import_path], text=True, stderr=subprocess.DEVNULL)
+                detailed = subprocess.check_output(['go', 'doc', '-all', import_path], text=True, stderr=subprocess.DEVNULL)
             except Exception:
-                detailed = 'Documentation unavailable.'
+                detailed = ''
+            if not detailed:
+                try:
+                    detailed = subprocess.check_output(['go', 'doc', import_path], text=True, stderr=subprocess.DEVNULL)
+                except Exception:
+                    detailed = 'Documentation unavailable.'
         synopsis = ''
         if detailed:
             for line in detailed.splitlines():
@@ -106,26 +124,29 @@ if pkg_entries:
         doc_blocks.append(detailed.rstrip() + '\n')
         doc_blocks.append('```\n')
 
-        idx.write_text('\n'.join(doc_blocks), encoding='utf-8')
+        page = '\n'.join(doc_blocks)
+        write_text(idx, page)
+        count('reference.pages')
+        if rel == '.':
+            root_page = page
         display = 'root' if rel == '.' else rel
         links.append(f"- [{display}]({link_target})")
 
 ref_index = (REFERENCE_GO if both_langs else REFERENCE) / 'index.md'
-if ref_index.exists():
-    with ref_index.open('a', encoding='utf-8') as f:
-        f.write('\n## Packages\n')
-        f.write('\n'.join(links) + '\n')
+# Build from this run's root page (not the file on disk) so a cached site_src never accumulates package lists.
+if 'reference' not in STAGES:
+    pass
+elif root_page:
+    write_text(ref_index, root_page + '\n## Packages\n' + '\n'.join(links) + '\n')
+elif links:
+    write_text(ref_index, '# Reference\n\n## Packages\n' + '\n'.join(links) + '\n')
 else:
-    with ref_index.open('w', encoding='utf-8') as f:
-        f.write('# Reference\n\n')
-        if links:
-            f.write('## Packages\n')
-            f.write('\n'.join(links) + '\n')
-        else:
-            f.write('_No Go packages found or API docs not generated._\n')
+    write_text(ref_index, '# Reference\n\n_No Go packages found or API docs not generated._\n')
 
 zig_nav_target = None
-if zig_present:
+if zig_present and 'zig' not in STAGES:
+    zig_nav_target = 'reference/zig/index.html' if (REFERENCE_ZIG / 'index.html').exists() else 'reference/zig/index.md'
+elif zig_present:
     try:
         subprocess.run([zig_bin, 'build', 'docs'], check=False)
     except Exception:
@@ -139,30 +160,26 @@ if zig_present:
     dest = REFERENCE_ZIG
     dest.mkdir(parents=True, exist_ok=True)
     if doc_src:
-        for child in dest.iterdir():
-            if child.is_file():
+        for child in list(dest.rglob('*')):
+            if child.is_file() and not (doc_src / child.relative_to(dest)).is_file():
                 child.unlink()
-            elif child.is_dir():
-                shutil.rmtree(child)
-        shutil.copytree(doc_src, dest, dirs_exist_ok=True)
+        copy_tree(doc_src, dest)
         zig_nav_target = 'reference/zig/index.html'
     else:
-        (dest / 'index.md').write_text('# Zig Reference\n\n_No Zig docs were produced by the build script._\n', encoding='utf-8')
+        write_text(dest / 'index.md', '# Zig Reference\n\n_No Zig docs were produced by the build script._\n')
         zig_nav_target = 'reference/zig/index.md'
 
 def copy_and_group(src: pathlib.Path, dest: pathlib.Path, title: str) -> None:
     if not src.is_dir():
         return
     try:
-        subprocess.run(['rsync', '-aL', str(src) + '/', str(dest) + '/'], check=True)
+        subprocess.run(['rsync', '-aL', '--delete', '--filter', 'P /index.md', '--filter', 'P /README.md',
+                        str(src) + '/', str(dest) + '/'], check=True)
     except Exception:
         for p in src.rglob('*'):
             if p.is_file():
-                rel = p.relative_to(src)
-                target = dest / rel
-                target.parent.mkdir(parents=True, exist_ok=True)
                 try:
-                    target.write_text(p.read_text(encoding='utf-8'), encoding='utf-8')
+                    copy_file(p, dest / p.relative_to(src))
                 except Exception:
                     pass
     idx = dest / 'index.md'
@@ -195,10 +212,7 @@ def copy_and_group(src: pathlib.Path, dest: pathlib.Path, title: str) -> None:
         for p in files:
             rel = p.relative_to(dest).as_posix()
             lines.append(f"- [{display_title(p)}]({rel})")
-    if not idx.exists():
-        idx.write_text('\n'.join(lines) + '\n', encoding='utf-8')
-    else:
-        idx.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    write_text(idx, '\n'.join(lines) + '\n')
 
 DOCS_SRC = ROOT / 'docs'
 KB_SRC = ROOT / 'kb'
@@ -207,22 +221,26 @@ SPECS_SRC = ROOT / 'specs'
 docs_index_exists = False
 if extra_docs and DOCS_SRC.is_dir():
     dest_docs = SITE_SRC / 'docs'
-    copy_and_group(DOCS_SRC, dest_docs, 'Documentation')
+    if 'docs' in STAGES:
+        with span('copy docs'):
+            copy_and_group(DOCS_SRC, dest_docs, 'Documentation')
     docs_index_exists = (dest_docs / 'index.md').exists()
     docs_readme_stub = dest_docs / 'README.md'
     if not docs_readme_stub.exists() and index_md.exists():
-        docs_readme_stub.write_text('# README Alias\n\nThis page aliases the project root README.\n\n[View project README](../index.md)\n', encoding='utf-8')
+        write_text(docs_readme_stub, '# README Alias\n\nThis page aliases the project root README.\n\n[View project README](../index.md)\n')
 
 kb_index_exists = False
 if extra_docs and KB_SRC.is_dir():
     dest_kb = SITE_SRC / 'kb'
-    copy_and_group(KB_SRC, dest_kb, 'KB')
+    if 'docs' in STAGES:
+        copy_and_group(KB_SRC, dest_kb, 'KB')
     kb_index_exists = (dest_kb / 'index.md').exists()
 
 specs_index_exists = False
 if extra_docs and SPECS_SRC.is_dir():
     dest_specs = SITE_SRC / 'specs'
-    copy_and_group(SPECS_SRC, dest_specs, 'Specs')
+    if 'docs' in STAGES:
+        copy_and_group(SPECS_SRC, dest_specs, 'Specs')
     specs_index_exists = (dest_specs / 'index.md').exists()
 
 sections = {}
@@ -238,19 +256,27 @@ if both_langs:
         reference_nav_lines.append('    - Zig: reference/zig/index.md')
     sections['reference'] = '\n'.join(reference_nav_lines)
 else:
-    if zig_present and not pkg_entries:
+    # without the reference stage go.mod stands in for the package listing
+    has_go_pkgs = bool(pkg_entries) if 'reference' in STAGES else go_mod.exists()
+    if zig_present and not has_go_pkgs:
         if zig_nav_target:
             sections['reference'] = f'- Reference: {zig_nav_target}'
         else:
             sections['reference'] = '- Reference: reference/zig/index.md'
         if not (REFERENCE / 'index.md').exists():
-            (REFERENCE / 'index.md').write_text('# Reference\n\n', encoding='utf-8')
+            write_text(REFERENCE / 'index.md', '# Reference\n\n')
     else:
         sections['reference'] = '- Reference: reference/index.md' if (REFERENCE / 'index.md').exists() else None
 
 sections['coverage'] = '- Coverage: coverage.md'
+sections['tests'] = '- Tests: tests.md' if (SITE_SRC / 'tests.md').exists() else None
 sections['metrics'] = '- Metrics: metrics.md' if (SITE_SRC / 'metrics.md').exists() else None
 sections['security'] = '- Security: security.md' if (SITE_SRC / 'security.md').exists() else None
+if (SITE_SRC / 'security_org.md').exists():
+    if sections['security']:
+        sections['security'] = '- Security:\n    - Repository: security.md\n    - Organization: security_org.md'
+    else:
+        sections['security'] = '- Security: security_org.md'
 sections['bench'] = '- Benchmarks: bench.md' if (SITE_SRC / 'bench.md').exists() else None
 sections['docs'] = '- Docs: docs/index.md' if (extra_docs and docs_index_exists) else None
 sections['kb'] = '- KB: kb/index.md' if (extra_docs and kb_index_exists) else None
@@ -287,8 +313,8 @@ if security_json.exists():
         "if(d.secret_scanning && d.secret_scanning.open) header.appendChild(badge('Secrets', d.secret_scanning.open,'#fbca04'));",
         "}).catch(()=>{});"
     ]
-    (SITE_SRC / 'extra_badges.js').write_text('\n'.join(js)+'\n', encoding='utf-8')
+    write_text(SITE_SRC / 'extra_badges.js', '\n'.join(js)+'\n')
 else:
-    (SITE_SRC / 'extra_badges.js').write_text('// no security data\n', encoding='utf-8')
+    write_text(SITE_SRC / 'extra_badges.js', '// no security data\n')
 
-(ROOT / 'mkdocs.yml').write_text(mkdocs_yml, encoding='utf-8')
+write_text(ROOT / 'mkdocs.yml', mkdocs_yml)
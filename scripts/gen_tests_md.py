@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Render the Go test results page (site_src/tests.md) from test-summary.json.
+
+src/gotest.js streams `go test -json` events into site_src/tests.txt (full log),
+test-results.jsonl (one line per test) and test-summary.json (per-package
+counts and durations plus the output tail of up to 50 failed tests), so this
+script only reads the small summary.
+
+When update_tests.py has written the duration/outcome history, the page also
+lists the slowest tests, tests getting slower and flaky tests (pass/fail flips
+across the stored runs), with build-time sparklines of each test's durations.
+
+Env / Flags (flags override env):
+    TEST_SUMMARY / --summary   summary JSON (default test-summary.json)
+    TESTS_HISTORY / --history  history JSON (default test_history/history.json)
+    --output-dir               site directory (default site_src)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+
+from pipeline_trace import log
+from site_output import write_text
+import sparkline
+import update_tests
+
+STATUS = {'pass': '✅ pass', 'fail': '❌ fail', 'skip': '⏭ skip', 'running': '⚠️ incomplete'}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--summary', default=os.environ.get('TEST_SUMMARY', 'test-summary.json'), help='Summary JSON')
+    p.add_argument('--history', default=os.environ.get('TESTS_HISTORY', 'test_history/history.json'),
+                   help='Test duration/outcome history JSON')
+    p.add_argument('--output-dir', default='site_src', help='Output directory (default site_src)')
+    return p.parse_args(argv)
+
+
+def duration(seconds: float) -> str:
+    return f'{seconds:.2f}s' if seconds < 60 else f'{int(seconds // 60)}m{seconds % 60:04.1f}s'
+
+
+def ms(v: float) -> str:
+    return duration(v / 1000) if v >= 1000 else f'{sparkline.fmt(v)}ms'
+
+
+def render_history(history: dict) -> list[str]:
+    """Slowest / getting slower / flaky sections from update_tests.py history."""
+    runs = len(history.get('runs', []))
+    if not runs:
+        return []
+    lines = ['', f'_Trends over the last {runs} default-branch runs._']
+    slow = update_tests.slowest(history)
+    if slow:
+        lines += ['', '## Slowest Tests', '', '| Test | Package | Median | Latest | Trend |',
+                  '|------|---------|--------|--------|-------|']
+        for r in slow:
+            lines.append(f"| `{r['test']}` | `{r['package']}` | {ms(r['median_ms'])} | {ms(r['latest_ms'])} | "
+                         f"{sparkline.trend_cell(r['durations'])} |")
+    slower = update_tests.trending(history)
+    if slower:
+        lines += ['', '## Getting Slower', '', '| Test | Package | Before | Recent | Change | Trend |',
+                  '|------|---------|--------|--------|--------|-------|']
+        for r in slower:
+            change = f"+{r['change_pct']}%" if r['change_pct'] is not None else '-'
+            lines.append(f"| `{r['test']}` | `{r['package']}` | {ms(r['before_ms'])} | {ms(r['recent_ms'])} | "
+                         f"{change} | {sparkline.trend_cell(r['durations'], '#d73a49')} |")
+    flaky = update_tests.flaky(history)
+    if flaky:
+        lines += ['', '## Flaky Tests', '', 'Oldest run first: P pass, F fail, S skip, . not run.', '',
+                  '| Test | Package | Flips | Failures | Outcomes |',
+                  '|------|---------|-------|----------|----------|']
+        for r in flaky:
+            lines.append(f"| `{r['test']}` | `{r['package']}` | {r['flips']} | {r['failures']}/{r['runs']} | "
+                         f"`{r['outcomes'][-30:]}` |")
+    return lines
+
+
+def render(summary: dict, log_link: bool = True, history: dict | None = None) -> str:
+    totals = summary.get('totals', {})
+    packages = summary.get('packages', [])
+    failures = summary.get('failures', [])
+    elapsed = sum(p.get('elapsed', 0) for p in packages)
+    lines = [
+        '# Tests',
+        '',
+        f"**{totals.get('passed', 0)} passed · {totals.get('failed', 0)} failed · {totals.get('skipped', 0)} skipped** "
+        f"in {len(packages)} packages ({duration(elapsed)} package time)",
+        '',
+    ]
+    if packages:
+        lines += ['| Package | Result | Passed | Failed | Skipped | Duration |',
+                  '|---------|--------|--------|--------|---------|----------|']
+        for p in packages:
+            lines.append(f"| `{p.get('package', '')}` | {STATUS.get(p.get('status'), p.get('status', '-'))} | "
+                         f"{p.get('passed', 0)} | {p.get('failed', 0)} | {p.get('skipped', 0)} | "
+                         f"{duration(p.get('elapsed', 0))} |")
+    if failures:
+        lines += ['', '## Failures', '']
+        for f in failures:
+            lines += [f"### `{f.get('test', '')}` ({f.get('package', '')})", '', '```text',
+                      (f.get('output') or '(no output)').rstrip().replace('```', "'''"), '```', '']
+        if totals.get('failed', 0) > len(failures):
+            lines.append(f"_{totals['failed'] - len(failures)} more failures; see the full log._")
+    if history:
+        lines += render_history(history)
+    if log_link:
+        lines += ['', '[Full test log](tests.txt)']
+    return '\n'.join(lines).rstrip() + '\n'
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    path = pathlib.Path(args.summary)
+    if not path.exists():
+        log('info', f'no test summary at {path}; skipping tests page')
+        return 0
+    try:
+        summary = json.loads(path.read_text(encoding='utf-8'))
+    except ValueError as e:
+        log('warning', f'unreadable test summary {path}: {e}')
+        return 0
+    history = update_tests.load_history(pathlib.Path(args.history))
+    out = pathlib.Path(args.output_dir)
+    write_text(out / 'tests.md', render(summary, (out / 'tests.txt').exists(), history))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Shared Go package model, built from one `go list -json -deps ./...` call.
+
+gen_site_structure.py (reference pages), the go metrics collector and
+gen_coverage_md.py (per-package coverage) all consume this model instead of
+rediscovering packages with their own walks and toolchain calls.
+
+The model is cached in .go_packages.json, keyed by the contents of go.mod and
+go.sum plus the list of .go files, so `go list` only runs again when a module
+requirement changes or a file is added, removed or renamed. Without the Go
+toolchain (or when `go list` fails) the model is derived from the file walk:
+one package per directory, import paths from the go.mod module path.
+
+Usage:
+    go_packages.py [--root DIR] [--refresh] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import pathlib
+import posixpath
+import shutil
+import subprocess
+from dataclasses import asdict, dataclass, field
+
+from collectors import walk
+from pipeline_trace import count, log, span
+
+ROOT = pathlib.Path.cwd()
+CACHE_NAME = '.go_packages.json'
+VERSION = 1
+_loaded: dict[str, 'Model'] = {}
+
+
+@dataclass
+class Package:
+    import_path: str
+    dir: str  # relative POSIX directory, '.' for the module root
+    name: str = ''
+    doc: str = ''
+    go_files: list[str] = field(default_factory=list)  # relative POSIX paths
+    test_files: list[str] = field(default_factory=list)  # _test.go files (in-package and external tests)
+    imports: list[str] = field(default_factory=list)
+    deps: list[str] = field(default_factory=list)
+
+    @property
+    def files(self) -> list[str]:
+        return self.go_files + self.test_files
+
+
+class Model:
+    def __init__(self, module: str, packages: list[Package], external: list[str], from_toolchain: bool):
+        self.module = module
+        self.packages = sorted(packages, key=lambda p: p.import_path)
+        self.external = external
+        self.from_toolchain = from_toolchain
+        self.key = ''  # cache key it was loaded or built for
+        self.by_import = {p.import_path: p for p in self.packages}
+        self.by_dir = {p.dir: p for p in self.packages}
+
+    def files(self) -> list[str]:
+        return sorted(f for p in self.packages for f in p.files)
+
+    def package_for_file(self, path: str) -> Package | None:
+        """Package of a relative path or an import-path style name (as used in cover.out)."""
+        parent = posixpath.dirname(path.replace('\\', '/')) or '.'
+        return self.by_dir.get(parent) or self.by_import.get(parent)
+
+    def rollup(self, per_file: dict[str, dict[str, float]]) -> dict[str, dict[str, float]]:
+        """Sum per-file numbers per package (keyed by import path; unknown files by their directory)."""
+        out: dict[str, dict[str, float]] = {}
+        for path, values in per_file.items():
+            pkg = self.package_for_file(path)
+            key = pkg.import_path if pkg else (posixpath.dirname(path) or '.')
+            rec = out.setdefault(key, {})
+            for k, v in values.items():
+                rec[k] = rec.get(k, 0) + v
+        return dict(sorted(out.items()))
+
+    def to_json(self) -> dict:
+        return {'module': self.module, 'from_toolchain': self.from_toolchain, 'external': self.external,
+                'packages': [asdict(p) for p in self.packages]}
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Model':
+        return cls(data.get('module', ''), [Package(**p) for p in data.get('packages', [])],
+                   data.get('external', []), bool(data.get('from_toolchain')))
+
+
+def module_path(root: pathlib.Path) -> str:
+    try:
+        for line in (root / 'go.mod').read_text(encoding='utf-8').splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[0] == 'module':
+                return parts[1].strip('"')
+    except OSError:
+        pass
+    return ''
+
+
+def source_files(root: pathlib.Path) -> list[str]:
+    """Relative .go paths, skipping what the go tool ignores (testdata, _ and . directories)."""
+    out = []
+    for path in walk(root, ('.go',)):
+        rel = path.relative_to(root).as_posix()
+        dirs = rel.split('/')[:-1]
+        if any(d == 'testdata' or d.startswith(('_', '.')) for d in dirs):
+            continue
+        out.append(rel)
+    return out
+
+
+def cache_key(root: pathlib.Path, files: list[str]) -> str:
+    h = hashlib.sha256(f'v{VERSION}\n'.encode())
+    for name in ('go.mod', 'go.sum'):
+        try:
+            h.update((root / name).read_bytes())
+        except OSError:
+            pass
+        h.update(b'\0')
+    h.update('\n'.join(files).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _decode_stream(text: str) -> list[dict]:
+    """`go list -json` prints concatenated JSON objects."""
+    decoder = json.JSONDecoder()
+    records, pos = [], 0
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos >= len(text):
+            return records
+        obj, pos = decoder.raw_decode(text, pos)
+        records.append(obj)
+
+
+def go_list(root: pathlib.Path) -> list[dict] | None:
+    go = shutil.which('go')
+    if not go:
+        return None
+    with span('go list -json -deps'):
+        proc = subprocess.run([go, 'list', '-e', '-json', '-deps', './...'], cwd=root, capture_output=True, text=True)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        log('warning', f'go list failed ({proc.returncode}); deriving packages from the file walk')
+        return None
+    try:
+        records = _decode_stream(proc.stdout)
+    except ValueError as e:
+        log('warning', f'unreadable go list output: {e}')
+        return None
+    # -e reports load failures (no go.mod, missing toolchain download, ...) as
+    # records with only an Error and still exits 0
+    main = [r for r in records if not r.get('Standard') and not r.get('DepOnly')]
+    if not any(r.get('Dir') and (r.get('GoFiles') or r.get('TestGoFiles') or r.get('XTestGoFiles')) for r in main):
+        err = next((r['Error'].get('Err', '') for r in records if isinstance(r.get('Error'), dict)), '')
+        log('warning', f'go list found no packages of the main module{f" ({err})" if err else ""}; '
+                       'deriving packages from the file walk')
+        return None
+    return records
+
+
+def from_go_list(root: pathlib.Path, records: list[dict]) -> Model:
+    root = root.resolve()
+    module = module_path(root)
+    packages, external = [], set()
+    for rec in records:
+        if rec.get('Standard'):
+            continue
+        if rec.get('DepOnly'):
+            mod = (rec.get('Module') or {}).get('Path', '')
+            if mod != module:
+                external.add(rec.get('ImportPath', ''))
+            continue
+        pkg_dir = pathlib.Path(rec.get('Dir', ''))
+        try:
+            rel = pkg_dir.resolve().relative_to(root).as_posix() or '.'
+        except ValueError:
+            continue
+        if '/vendor/' in f'/{rel}/':
+            continue
+        join = (lambda n: n) if rel == '.' else (lambda n: f'{rel}/{n}')
+        packages.append(Package(
+            import_path=rec.get('ImportPath', ''), dir=rel, name=rec.get('Name', ''), doc=rec.get('Doc', ''),
+            go_files=[join(n) for n in rec.get('GoFiles', []) + rec.get('CgoFiles', [])],
+            test_files=[join(n) for n in rec.get('TestGoFiles', []) + rec.get('XTestGoFiles', [])],
+            imports=rec.get('Imports', []), deps=rec.get('Deps', []),
+        ))
+    return Model(module, packages, sorted(external - {''}), True)
+
+
+def from_walk(root: pathlib.Path, files: list[str]) -> Model:
+    module = module_path(root)
+    by_dir: dict[str, Package] = {}
+    for rel in files:
+        d = posixpath.dirname(rel) or '.'
+        pkg = by_dir.get(d)
+        if pkg is None:
+            ip = module if d == '.' else (f'{module}/{d}' if module else d)
+            pkg = by_dir[d] = Package(import_path=ip or '.', dir=d)
+        (pkg.test_files if rel.endswith('_test.go') else pkg.go_files).append(rel)
+    return Model(module, list(by_dir.values()), [], False)
+
+
+def load(root: pathlib.Path | None = None, refresh: bool = False) -> Model:
+    """Package model of the module at root (default CWD), from cache when go.mod/go.sum/file list match."""
+    root = (root or ROOT).resolve()
+    with span('go packages walk'):
+        files = source_files(root)
+    key = cache_key(root, files)
+    memo = _loaded.get(str(root))
+    if memo is not None and not refresh and memo.key == key:
+        return memo
+    cache = root / CACHE_NAME
+    model = None
+    if not refresh:
+        try:
+            cached = json.loads(cache.read_text(encoding='utf-8'))
+            if cached.get('key') == key:
+                model = Model.from_json(cached['model'])
+                count('go_packages.cache_hit')
+        except (OSError, ValueError, KeyError, TypeError):
+            model = None
+    if model is None:
+        records = go_list(root) if files else None
+        model = from_go_list(root, records) if records is not None else from_walk(root, files)
+        try:
+            cache.write_text(json.dumps({'key': key, 'model': model.to_json()}) + '\n', encoding='utf-8')
+        except OSError:
+            pass
+    count('go_packages.packages', len(model.packages))
+    model.key = key
+    _loaded[str(root)] = model
+    return model
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--root', default='.', help='Module root (default .)')
+    p.add_argument('--refresh', action='store_true', help='Ignore the cache')
+    p.add_argument('--json', action='store_true', help='Print the full model as JSON')
+    args = p.parse_args(argv)
+    model = load(pathlib.Path(args.root), args.refresh)
+    if args.json:
+        print(json.dumps(model.to_json(), indent=2))
+    else:
+        source = 'go list' if model.from_toolchain else 'file walk'
+        print(f'{len(model.packages)} packages, {len(model.files())} files, '
+              f'{len(model.external)} external deps ({source})')
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Directory tree of per-file metrics, with top-N hotspot queries.
+
+collect_metrics.py feeds it the per-file numbers of the collectors (Go and Zig
+files, plus Go statement coverage from coverage_files.json) and it sums them
+into a prefix tree keyed by path segment, in one bottom-up pass, so every
+directory carries the totals of its subtree. Chains of directories holding a
+single subdirectory and no files (cmd/tool/internal/...) are collapsed into
+one node, as in a radix tree, which keeps the tree and the treemap shallow.
+
+Hotspot queries rank directories (not the root) by their subtree totals:
+    largest   most non-test lines of code
+    complex   most functions above the complexity threshold, then highest average complexity
+    untested  lowest statement coverage; test functions per 100 lines without coverage data
+Each walks the directories once and keeps the top N in a heap.
+
+The tree is exported as compact JSON for the treemap on the metrics page
+(treemap.js): {"version": 1, "keys": [...], "tree": [name, values, children]},
+values aligned with keys with trailing zeros dropped, files as [name, values].
+
+Usage:
+    metrics_tree.py [--input site_src/metrics/tree.json] [--query largest] [-n 10]
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import pathlib
+from typing import Callable, Iterator
+
+from pipeline_trace import log
+
+VERSION = 1
+TREE_JSON = pathlib.Path('site_src') / 'metrics' / 'tree.json'
+# preferred column order of the exported values; other keys follow sorted
+KEY_ORDER = ('files', 'loc', 'tests', 'functions', 'complexity_sum', 'high_complexity', 'stmts', 'covered')
+
+
+class Node:
+    __slots__ = ('name', 'values', 'children')
+
+    def __init__(self, name: str, directory: bool = True):
+        self.name = name
+        self.values: dict[str, float] = {}
+        self.children: dict[str, Node] | None = {} if directory else None  # None for files
+
+    @property
+    def is_dir(self) -> bool:
+        return self.children is not None
+
+
+def _add(into: dict[str, float], values: dict[str, float]) -> None:
+    for k, v in values.items():
+        into[k] = into.get(k, 0) + v
+
+
+def _total(node: Node) -> None:
+    for child in node.children.values():
+        if child.is_dir:
+            _total(child)
+        _add(node.values, child.values)
+
+
+def _collapse(node: Node) -> None:
+    for key in list(node.children):
+        child = node.children[key]
+        if not child.is_dir:
+            continue
+        while len(child.children) == 1:
+            only = next(iter(child.children.values()))
+            if not only.is_dir:
+                break
+            only.name = f'{child.name}/{only.name}'
+            child = only
+        node.children[key] = child
+        _collapse(child)
+
+
+def build(per_file: dict[str, dict[str, float]]) -> Node:
+    """Prefix tree of relative POSIX paths with subtree totals on every directory."""
+    root = Node('')
+    for path, values in per_file.items():
+        *dirs, name = path.strip('/').split('/')
+        node = root
+        for d in dirs:
+            node = node.children.setdefault(d, Node(d))
+        _add(node.children.setdefault(name, Node(name, directory=False)).values, values)
+    _total(root)
+    _collapse(root)
+    return root
+
+
+def directories(root: Node) -> Iterator[tuple[str, Node]]:
+    """(path, node) of every directory below root, parents first."""
+    stack = [(c.name, c) for c in reversed(list(root.children.values())) if c.is_dir]
+    while stack:
+        path, node = stack.pop()
+        yield path, node
+        stack.extend((f'{path}/{c.name}', c) for c in reversed(list(node.children.values())) if c.is_dir)
+
+
+def avg_complexity(values: dict[str, float]) -> float:
+    funcs = values.get('functions', 0)
+    return values.get('complexity_sum', 0) / funcs if funcs else 0.0
+
+
+def coverage(values: dict[str, float]) -> float:
+    stmts = values.get('stmts', 0)
+    return values.get('covered', 0) / stmts * 100 if stmts else 0.0
+
+
+def density(values: dict[str, float]) -> float:
+    """Test functions per 100 non-test lines."""
+    loc = values.get('loc', 0)
+    return values.get('tests', 0) / loc * 100 if loc else 0.0
+
+
+def _query(root: Node, name: str) -> tuple[Callable[[dict], bool], Callable[[dict], tuple], bool] | None:
+    """(filter, sort key, largest-first) of a hotspot query, or None when the tree lacks its data."""
+    totals = root.values
+    if name == 'largest':
+        return (lambda v: v.get('loc', 0) > 0), (lambda v: (v.get('loc', 0), v.get('files', 0))), True
+    if name == 'complex':
+        if not totals.get('functions'):
+            return None
+        return ((lambda v: v.get('functions', 0) > 0),
+                (lambda v: (v.get('high_complexity', 0), avg_complexity(v))), True)
+    if name == 'untested':
+        if totals.get('stmts'):
+            return (lambda v: v.get('stmts', 0) > 0), (lambda v: (coverage(v), -v['stmts'])), False
+        if 'tests' in totals:
+            return (lambda v: v.get('loc', 0) > 0), (lambda v: (density(v), -v['loc'])), False
+        return None
+    raise ValueError(f'unknown query {name!r} (expected one of {", ".join(QUERIES)})')
+
+
+QUERIES = ('largest', 'complex', 'untested')
+
+
+def top(root: Node, name: str, n: int = 10) -> list[tuple[str, dict[str, float]]]:
+    """The n directories ranking first for query name ([] when the tree has no data for it)."""
+    query = _query(root, name)
+    if query is None:
+        return []
+    keep, key, largest = query
+    candidates = ((path, node.values) for path, node in directories(root) if keep(node.values))
+    pick = heapq.nlargest if largest else heapq.nsmallest
+    return pick(n, candidates, key=lambda item: key(item[1]))
+
+
+def _number(v: float) -> float:
+    return int(v) if float(v).is_integer() else round(v, 2)
+
+
+def to_json(root: Node) -> dict:
+    present = set(root.values)
+    keys = [k for k in KEY_ORDER if k in present] + sorted(present - set(KEY_ORDER))
+
+    def encode(node: Node) -> list:
+        values = [_number(node.values.get(k, 0)) for k in keys]
+        while values and not values[-1]:
+            values.pop()
+        if not node.is_dir:
+            return [node.name, values]
+        children = sorted(node.children.values(), key=lambda c: c.name)
+        return [node.name, values, [encode(c) for c in children]]
+
+    return {'version': VERSION, 'keys': keys, 'tree': encode(root)}
+
+
+def dumps(root: Node) -> str:
+    return json.dumps(to_json(root), separators=(',', ':')) + '\n'
+
+
+def from_json(doc: dict) -> Node:
+    keys = doc.get('keys', [])
+
+    def decode(item: list) -> Node:
+        node = Node(item[0], directory=len(item) > 2)
+        node.values = {k: v for k, v in zip(keys, item[1]) if v}
+        for child in item[2] if len(item) > 2 else ():
+            c = decode(child)
+            node.children[c.name] = c
+        return node
+
+    return decode(doc['tree'])
+
+
+def load(path: pathlib.Path = TREE_JSON) -> Node | None:
+    try:
+        doc = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(doc, dict) or doc.get('version') != VERSION or not isinstance(doc.get('tree'), list):
+        return None
+    return from_json(doc)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--input', default=str(TREE_JSON), help=f'Tree written by collect_metrics.py (default {TREE_JSON})')
+    p.add_argument('--query', choices=QUERIES, default='largest')
+    p.add_argument('-n', type=int, default=10, help='Directories to list (default 10)')
+    args = p.parse_args(argv)
+    root = load(pathlib.Path(args.input))
+    if root is None:
+        log('warning', f'no metrics tree at {args.input}')
+        return 0
+    for path, values in top(root, args.query, args.n):
+        print(path, json.dumps({k: _number(v) for k, v in values.items()}, separators=(',', ':')))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
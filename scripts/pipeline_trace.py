@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Structured tracing shared by the pipeline scripts and src/index.js.
+
+When PIPELINE_TRACE names a file, every importing script appends JSON Lines
+events to it:
+
+    {"type": "span", "name": ..., "ts": <epoch us>, "dur": <us>, "pid": ..., "tid": ..., "args": {...}}
+    {"type": "counter", "name": <script>, "ts": ..., "pid": ..., "values": {...}}
+    {"type": "log", "level": "INFO", "msg": ..., "ts": ..., "pid": ..., ...}
+
+The scripts print their Info/Warning/Error lines through log(), so the same
+messages land in the trace as log events. Each process also records one span
+covering its whole run with peak RSS (and the tracemalloc peak when
+PIPELINE_TRACE_MALLOC=1). Without PIPELINE_TRACE the helpers only print (log)
+or do nothing.
+
+Run as a script to export the collected events:
+
+    pipeline_trace.py [--input trace.jsonl] [--output trace.json] [--top 15] [--summary FILE]
+
+which writes a Chrome trace (Perfetto / chrome://tracing) and a markdown table
+of the slowest spans to --summary (default $GITHUB_STEP_SUMMARY).
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+from typing import Any, Iterator
+
+TRACE_FILE = os.environ.get('PIPELINE_TRACE', '')
+ENABLED = bool(TRACE_FILE)
+SCRIPT = pathlib.Path(sys.argv[0]).name if sys.argv and sys.argv[0] else 'python'
+
+_counters: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def _emit(event: dict) -> None:
+    line = json.dumps(event, separators=(',', ':'), default=str) + '\n'
+    with _lock:
+        try:
+            with open(TRACE_FILE, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError:
+            pass
+
+
+def record(name: str, ts_us: int, dur_us: int, **args: Any) -> None:
+    """Record an already-measured span (e.g. a child process polled elsewhere)."""
+    if ENABLED:
+        _emit({'type': 'span', 'name': name, 'cat': SCRIPT, 'ts': ts_us, 'dur': max(0, dur_us),
+               'pid': os.getpid(), 'tid': threading.get_native_id(), 'args': args})
+
+
+@contextlib.contextmanager
+def span(name: str, **args: Any) -> Iterator[dict]:
+    """Time a block; the yielded dict can be filled with extra args before exit."""
+    if not ENABLED:
+        yield args
+        return
+    ts = now_us()
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    finally:
+        record(name, ts, (time.perf_counter_ns() - start) // 1000, **args)
+
+
+def count(name: str, n: float = 1) -> None:
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def log(level: str, msg: str, **fields: Any) -> None:
+    """Print an "Info: ..." / "Warning: ..." / "Error: ..." line (errors to stderr) and record it as a log event."""
+    print(f'{level.capitalize()}: {msg}', file=sys.stderr if level == 'error' else sys.stdout, flush=True)
+    if ENABLED:
+        _emit({'type': 'log', 'level': level.upper(), 'msg': msg, 'ts': now_us(), 'pid': os.getpid(),
+               'script': SCRIPT, **fields})
+
+
+def _peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - non-POSIX
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _finish(ts: int, start: int) -> None:
+    args: dict[str, Any] = {'argv': sys.argv[1:], 'peak_rss_kb': _peak_rss_kb()}
+    if os.environ.get('PIPELINE_TRACE_MALLOC') == '1':
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            args['tracemalloc_peak_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+    record(SCRIPT, ts, (time.perf_counter_ns() - start) // 1000, process=True, **args)
+    if _counters:
+        _emit({'type': 'counter', 'name': SCRIPT, 'ts': now_us(), 'pid': os.getpid(), 'values': dict(_counters)})
+
+
+if ENABLED and __name__ != '__main__':
+    if os.environ.get('PIPELINE_TRACE_MALLOC') == '1':
+        import tracemalloc
+        tracemalloc.start()
+    atexit.register(_finish, now_us(), time.perf_counter_ns())
+
+
+# --- export -------------------------------------------------------------------
+
+def load_events(path: pathlib.Path) -> list[dict]:
+    events = []
+    if not path.exists():
+        return events
+    for line in path.read_text(encoding='utf-8').splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events
+
+
+def to_chrome(events: list[dict]) -> dict:
+    """Convert JSON Lines events to the Chrome trace event format."""
+    out: list[dict] = []
+    named: set[int] = set()
+    for e in events:
+        pid = e.get('pid', 0)
+        if e.get('type') == 'span':
+            out.append({'name': e['name'], 'cat': e.get('cat', ''), 'ph': 'X', 'ts': e['ts'], 'dur': e['dur'],
+                        'pid': pid, 'tid': e.get('tid', pid), 'args': e.get('args', {})})
+            if (e.get('args') or {}).get('process') and pid not in named:
+                named.add(pid)
+                out.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': e['name']}})
+        elif e.get('type') == 'counter':
+            out.append({'name': e['name'], 'ph': 'C', 'ts': e['ts'], 'pid': pid, 'args': e.get('values', {})})
+        elif e.get('type') == 'log':
+            out.append({'name': e.get('msg', ''), 'ph': 'i', 's': 'p', 'ts': e['ts'], 'pid': pid,
+                        'args': {k: v for k, v in e.items() if k not in ('type', 'ts', 'pid')}})
+    return {'traceEvents': out, 'displayTimeUnit': 'ms'}
+
+
+def slowest(events: list[dict], top: int) -> list[dict]:
+    spans = [e for e in events if e.get('type') == 'span']
+    return sorted(spans, key=lambda e: e.get('dur', 0), reverse=True)[:top]
+
+
+def summary_markdown(events: list[dict], top: int) -> str:
+    lines = ['### Pipeline trace: slowest spans', '', '| Span | Source | Duration (ms) | Peak RSS (KB) |',
+             '|------|--------|---------------|---------------|']
+    for e in slowest(events, top):
+        rss = (e.get('args') or {}).get('peak_rss_kb')
+        lines.append(f"| `{e['name']}` | {e.get('cat', '')} | {e['dur'] / 1000:.1f} | {rss if rss is not None else ''} |")
+    totals: dict[str, float] = {}
+    for e in events:
+        if e.get('type') == 'counter':
+            for k, v in (e.get('values') or {}).items():
+                totals[k] = totals.get(k, 0) + v
+    if totals:
+        lines += ['', '| Counter | Total |', '|---------|-------|']
+        lines += [f'| {k} | {v:g} |' for k, v in sorted(totals.items())]
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--input', default=TRACE_FILE or 'trace.jsonl', help='JSON Lines trace (default $PIPELINE_TRACE)')
+    p.add_argument('--output', default='trace.json', help='Chrome trace output (default trace.json)')
+    p.add_argument('--top', type=int, default=15, help='Slowest spans to summarize (default 15)')
+    p.add_argument('--summary', default=os.environ.get('GITHUB_STEP_SUMMARY', ''), help='Markdown summary file')
+    args = p.parse_args(argv)
+    events = load_events(pathlib.Path(args.input))
+    if not events:
+        print(f'Info: no trace events in {args.input}')
+        return 0
+    pathlib.Path(args.output).write_text(json.dumps(to_chrome(events)), encoding='utf-8')
+    md = summary_markdown(events, args.top)
+    if args.summary:
+        with open(args.summary, 'a', encoding='utf-8') as f:
+            f.write(md)
+    print(md)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
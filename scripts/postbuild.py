@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Post-process the built site: minify JSON, precompress, report sizes, enforce budgets.
+
+Runs after `mkdocs build --site-dir site_build`:
+
+  1. JSON files are re-serialized without whitespace (skipped when already minimal).
+  2. Text assets >= --min-size get `.gz` siblings (gzip -9, mtime 0 so output is
+     reproducible) and `.br` siblings when the `brotli` module is importable.
+     Compression runs in a process pool; siblings newer than their source are kept.
+  3. A per-section size report (reference, coverage, bench, metrics, security,
+     other) is printed, written to --output and appended to $GITHUB_STEP_SUMMARY.
+  4. Budgets (raw bytes of the uncompressed files) are checked.
+
+Env / Flags (flags override env):
+    --site-dir (default site_build)
+    SIZE_BUDGET / --budget      total budget, e.g. 50M
+    SIZE_BUDGETS / --budgets    per section, e.g. "reference=10M,coverage=5M,total=50M"
+    --workers (default CPU count)
+    --no-compress
+
+Exit codes:
+    0 success
+    3 a size budget was exceeded (BUDGET_EXCEEDED logged)
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from pipeline_trace import count, log, span
+from site_output import write_bytes
+
+try:  # optional dependency
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+BUDGET_EXCEEDED = 3
+SECTIONS = ('reference', 'coverage', 'bench', 'metrics', 'security')
+SECTION_ALIASES = {'zig_coverage': 'coverage', 'cover': 'coverage'}
+COMPRESSIBLE = {'.html', '.css', '.js', '.json', '.svg', '.xml', '.txt', '.map', '.folded'}
+UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2, 'G': 1024 ** 3, 'GB': 1024 ** 3}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--site-dir', default='site_build', help='Built site directory (default site_build)')
+    p.add_argument('--budget', default=os.environ.get('SIZE_BUDGET', ''), help='Total byte budget (e.g. 50M)')
+    p.add_argument('--budgets', default=os.environ.get('SIZE_BUDGETS', ''), help='Per-section budgets: name=size,...')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Compression processes')
+    p.add_argument('--min-size', type=int, default=1024, help='Skip compressing files smaller than this (bytes)')
+    p.add_argument('--no-compress', action='store_true', help='Only minify and report')
+    p.add_argument('--output', default='size-report.json', help='JSON report path (default size-report.json)')
+    p.add_argument('--summary', default=os.environ.get('GITHUB_STEP_SUMMARY', ''), help='Markdown summary file')
+    return p.parse_args(argv)
+
+
+def parse_size(text: str) -> int:
+    """'512', '200K', '1.5M' -> bytes."""
+    text = text.strip().upper()
+    num = text.rstrip('KMGB')
+    unit = text[len(num):]
+    if unit not in UNITS or not num:
+        raise ValueError(f'invalid size: {text!r}')
+    return int(float(num) * UNITS[unit])
+
+
+def parse_budgets(total: str, per_section: str) -> dict[str, int]:
+    budgets: dict[str, int] = {}
+    if total.strip():
+        budgets['total'] = parse_size(total)
+    for item in per_section.split(','):
+        if '=' in item:
+            name, size = item.split('=', 1)
+            budgets[name.strip().lower()] = parse_size(size)
+    return budgets
+
+
+def section_of(rel: pathlib.PurePath) -> str:
+    if rel.parts[0] == 'assets' and len(rel.parts) > 2:
+        rel = pathlib.PurePath(*rel.parts[1:])  # assets/<section>/... published by assets.py
+    head = rel.parts[0] if len(rel.parts) > 1 else rel.stem
+    head = SECTION_ALIASES.get(head, head)
+    return head if head in SECTIONS else 'other'
+
+
+def minify_json(path: pathlib.Path) -> int:
+    """Rewrite a JSON file compactly; returns bytes saved."""
+    raw = path.read_bytes()
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return 0
+    compact = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(compact) >= len(raw):
+        return 0
+    write_bytes(path, compact)
+    return len(raw) - len(compact)
+
+
+def _fresh(sibling: pathlib.Path, source_mtime: int) -> bool:
+    try:
+        return sibling.stat().st_mtime_ns >= source_mtime
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path_str: str) -> tuple[str, int, int | None, int | None]:
+    """Write .gz/.br siblings when smaller than the source; returns (path, raw, gz, br) sizes."""
+    path = pathlib.Path(path_str)
+    st = path.stat()
+    data: bytes | None = None
+    sizes: list[int | None] = []
+    for ext, enabled in (('.gz', True), ('.br', brotli is not None)):
+        sibling = path.with_name(path.name + ext)
+        if not enabled:
+            sizes.append(None)
+            continue
+        if _fresh(sibling, st.st_mtime_ns):
+            sizes.append(sibling.stat().st_size)
+            continue
+        if data is None:
+            data = path.read_bytes()
+        packed = gzip.compress(data, 9, mtime=0) if ext == '.gz' else brotli.compress(data, quality=11)
+        if len(packed) >= len(data):
+            sibling.unlink(missing_ok=True)
+            sizes.append(None)
+            continue
+        tmp = sibling.with_name(f'.{sibling.name}.tmp')
+        tmp.write_bytes(packed)
+        os.replace(tmp, sibling)
+        sizes.append(len(packed))
+    return path_str, st.st_size, sizes[0], sizes[1]
+
+
+def site_files(site: pathlib.Path) -> list[pathlib.Path]:
+    return sorted(p for p in site.rglob('*') if p.is_file() and p.suffix not in ('.gz', '.br'))
+
+
+def compress_all(files: list[pathlib.Path], workers: int, min_size: int) -> dict[str, tuple[int | None, int | None]]:
+    targets = [str(p) for p in files if p.suffix in COMPRESSIBLE and p.stat().st_size >= min_size]
+    if not targets:
+        return {}
+    if workers <= 1 or len(targets) < 8:
+        results = map(compress_file, targets)
+        return {path: (gz, br) for path, _, gz, br in results}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(compress_file, targets, chunksize=max(1, len(targets) // (workers * 4)))
+        return {path: (gz, br) for path, _, gz, br in results}
+
+
+def build_report(site: pathlib.Path, files: list[pathlib.Path],
+                 compressed: dict[str, tuple[int | None, int | None]]) -> dict[str, dict[str, int]]:
+    report: dict[str, dict[str, int]] = {}
+    for p in files:
+        raw = p.stat().st_size
+        gz, br = compressed.get(str(p), (None, None))
+        for name in (section_of(p.relative_to(site)), 'total'):
+            rec = report.setdefault(name, {'files': 0, 'raw': 0, 'gzip': 0, 'brotli': 0})
+            rec['files'] += 1
+            rec['raw'] += raw
+            rec['gzip'] += gz if gz is not None else raw
+            rec['brotli'] += br if br is not None else (gz if gz is not None else raw)
+    return report
+
+
+def _human(n: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024 or unit == 'MB':
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} MB'  # pragma: no cover
+
+
+def render_report(report: dict[str, dict[str, int]], budgets: dict[str, int]) -> str:
+    lines = ['### Site size report', '', '| Section | Files | Raw | Gzip | Brotli | Budget |',
+             '|---------|-------|-----|------|--------|--------|']
+    for name in [*SECTIONS, 'other', 'total']:
+        rec = report.get(name)
+        if not rec:
+            continue
+        budget = budgets.get(name)
+        mark = '' if budget is None else (f'{_human(budget)} ✅' if rec['raw'] <= budget else f'{_human(budget)} ❌')
+        lines.append(f"| {name} | {rec['files']} | {_human(rec['raw'])} | {_human(rec['gzip'])} | "
+                     f"{_human(rec['brotli']) if brotli is not None else '-'} | {mark} |")
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    try:
+        budgets = parse_budgets(args.budget, args.budgets)
+    except ValueError as e:
+        log('warning', f'ignoring size budgets ({e})')
+        budgets = {}
+    site = pathlib.Path(args.site_dir)
+    if not site.is_dir():
+        log('info', f'{site} not found; skipping post-build')
+        return 0
+    with span('minify json') as s:
+        saved = sum(minify_json(p) for p in site.rglob('*.json'))
+        s['bytes_saved'] = saved
+        count('postbuild.json_bytes_saved', saved)
+    files = site_files(site)
+    compressed: dict[str, tuple[int | None, int | None]] = {}
+    if not args.no_compress:
+        with span('precompress', workers=args.workers, brotli=brotli is not None):
+            compressed = compress_all(files, args.workers, args.min_size)
+        count('postbuild.files_compressed', len(compressed))
+    report = build_report(site, files, compressed)
+    md = render_report(report, budgets)
+    print(md)
+    if args.summary:
+        with open(args.summary, 'a', encoding='utf-8') as f:
+            f.write(md)
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps({'sections': report, 'budgets': budgets}, indent=2) + '\n',
+                                             encoding='utf-8')
+    over = [(name, report.get(name, {}).get('raw', 0), limit) for name, limit in budgets.items()
+            if report.get(name, {}).get('raw', 0) > limit]
+    for name, size, limit in over:
+        print(f'BUDGET_EXCEEDED: {name} is {size} bytes (budget {limit})', file=sys.stderr)
+    return BUDGET_EXCEEDED if over else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
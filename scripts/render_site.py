@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""Built-in static renderer: site_src + mkdocs.yml nav -> HTML, without mkdocs.
+
+An alternative to `mkdocs build` for large generated sites. It reads the same
+inputs (the docs_dir and nav that gen_site_structure.py writes to mkdocs.yml),
+renders the Markdown the generators emit (headings with permalinks, pipe tables,
+fenced code, lists, admonitions, raw HTML such as the sparkline SVGs) with a
+stdlib-only renderer, and wraps each page in a minimal theme (nav sidebar, page
+table of contents). Pages are rendered across a process pool; other files in
+site_src are copied.
+
+Builds are incremental: .render_manifest.json (next to mkdocs.yml, so it is not
+published with the site) records each source's size and mtime (site_output.py leaves both untouched for unchanged content), so
+only new or changed pages are rendered, and outputs of removed sources are
+deleted. A changed nav, site name, site dir or renderer version re-renders
+every page.
+
+Output differs from mkdocs in one respect: pages are written as <name>.html
+next to where the .md was (no directory URLs), and links to .md files are
+rewritten to .html, so relative links to assets keep working unchanged.
+
+Usage:
+    render_site.py [--config mkdocs.yml] [--site-dir site_build] [--workers N] [--full]
+    render_site.py --bench   time a full build with 1 and N workers and `mkdocs build`
+                             (when installed) on the same input; appends the table to
+                             $GITHUB_STEP_SUMMARY
+
+Env:
+    RENDER_WORKERS   worker processes (default: CPU count)
+"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import hashlib
+import html
+import json
+import os
+import pathlib
+import posixpath
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pipeline_trace import count, log, span
+
+VERSION = 1
+MANIFEST = '.render_manifest.json'
+ASSET_DIR = '_render'
+PARALLEL_MIN = 32  # below this many pages a pool costs more than it saves
+
+CSS = """\
+*{box-sizing:border-box}body{margin:0;font:15px/1.6 -apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,sans-serif;color:#1f2328}
+header{display:flex;gap:1em;align-items:center;padding:.6em 1.2em;background:#3f51b5;color:#fff}
+header a{color:#fff;text-decoration:none}header .site{font-weight:600;font-size:1.1em}header .repo{margin-left:auto;opacity:.85}
+.layout{display:flex;max-width:1400px;margin:0 auto}
+nav.nav{flex:0 0 230px;padding:1em;font-size:.92em}nav.nav ul{list-style:none;margin:0;padding-left:.9em}nav.nav>ul{padding:0}
+nav.nav a{color:#444;text-decoration:none}nav.nav a.active{color:#3f51b5;font-weight:600}nav.nav .section{font-weight:600;color:#222}
+main{flex:1;min-width:0;padding:1em 2em 3em}aside.toc{flex:0 0 210px;padding:1em;font-size:.85em}aside.toc ul{list-style:none;padding-left:.8em}
+aside.toc a{color:#555;text-decoration:none}
+table{border-collapse:collapse;margin:1em 0;display:block;overflow-x:auto}th,td{border:1px solid #d0d7de;padding:.3em .7em}th{background:#f6f8fa}
+code{background:#f6f8fa;padding:.1em .3em;border-radius:4px;font-size:.9em}pre{background:#f6f8fa;padding:.8em;overflow-x:auto;border-radius:6px}pre code{padding:0}
+a.headerlink{margin-left:.3em;opacity:0;text-decoration:none}h1:hover a.headerlink,h2:hover a.headerlink,h3:hover a.headerlink,h4:hover a.headerlink{opacity:.5}
+.admonition{border-left:4px solid #448aff;background:#f5f8ff;padding:.2em 1em;margin:1em 0}.admonition-title{font-weight:600}
+.admonition.warning,.admonition.caution{border-color:#ff9100;background:#fff8ef}.admonition.danger,.admonition.error{border-color:#ff1744;background:#fff3f3}
+blockquote{border-left:4px solid #d0d7de;margin:1em 0;padding:0 1em;color:#555}
+@media (max-width:900px){.layout{display:block}nav.nav,aside.toc{display:none}}
+"""
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--config', default='mkdocs.yml', help='mkdocs.yml written by gen_site_structure.py')
+    p.add_argument('--site-dir', default='site_build', help='Output directory (default site_build)')
+    p.add_argument('--workers', type=int, default=int(os.environ.get('RENDER_WORKERS', '0') or 0),
+                   help='Worker processes (default: CPU count)')
+    p.add_argument('--full', action='store_true', help='Ignore the manifest and render every page')
+    p.add_argument('--bench', action='store_true', help='Time this renderer against mkdocs build')
+    return p.parse_args(argv)
+
+
+# --- mkdocs.yml (the subset gen_site_structure.py writes) ---------------------------------------
+
+def _scalar(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def read_config(path: pathlib.Path) -> dict:
+    """site_name, repo_url, docs_dir, extra_javascript and nav [(title, path | children)]."""
+    config: dict = {'site_name': '', 'repo_url': '', 'docs_dir': 'docs', 'extra_javascript': [], 'nav': []}
+    key = None
+    stack: list[tuple[int, list]] = []
+    for raw in path.read_text(encoding='utf-8').splitlines():
+        if not raw.strip() or raw.lstrip().startswith('#'):
+            continue
+        indent = len(raw) - len(raw.lstrip())
+        line = raw.strip()
+        if indent == 0:
+            key, _, value = line.partition(':')
+            if value.strip() and key in config and isinstance(config[key], str):
+                config[key] = _scalar(value)
+            stack = [(-1, config['nav'])] if key == 'nav' else []
+            continue
+        if key == 'extra_javascript' and line.startswith('- '):
+            config['extra_javascript'].append(_scalar(line[2:]))
+        elif key == 'nav' and line.startswith('- '):
+            while stack and indent <= stack[-1][0]:
+                stack.pop()
+            title, sep, target = line[2:].partition(':')
+            if not sep:  # bare path
+                title, target = '', title
+            entry: list = [_scalar(title), _scalar(target) if target.strip() else []]
+            stack[-1][1].append(entry)
+            if isinstance(entry[1], list):
+                stack.append((indent, entry[1]))
+    return config
+
+
+def nav_titles(nav: list, out: dict | None = None) -> dict[str, str]:
+    out = {} if out is None else out
+    for title, target in nav:
+        if isinstance(target, list):
+            nav_titles(target, out)
+        else:
+            out.setdefault(target, title)
+    return out
+
+
+# --- Markdown ----------------------------------------------------------------------------------
+
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'canvas', 'details', 'div', 'dl', 'fieldset',
+              'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'iframe',
+              'noscript', 'ol', 'p', 'pre', 'script', 'section', 'style', 'summary', 'svg', 'table', 'ul',
+              'video', '!--'}
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*([\w+.-]*)')
+HR = re.compile(r'^ {0,3}([-*_])(?:\s*\1){2,}\s*$')
+LIST_ITEM = re.compile(r'^( *)([-*+]|\d{1,9}[.)])(\s+|$)')
+TABLE_DELIM = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+ADMONITION = re.compile(r'^!!!\s+([\w-]+)(?:\s+"(.*)")?\s*$')
+HTML_START = re.compile(r'^ {0,3}<(/?)([A-Za-z][\w-]*|!--)')
+
+CODE_SPAN = re.compile(r'(`+)(.+?)(?<!`)\1(?!`)', re.S)
+ESCAPE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!|<>~])')
+AUTOLINK = re.compile(r'<((?:https?|mailto):[^<>\s]+)>')
+INLINE_HTML = re.compile(r'<!--.*?-->|</?[A-Za-z][\w-]*(?:\s+[^<>]*?)?/?>', re.S)
+AMP = re.compile(r'&(?!#?\w+;)')
+IMAGE = re.compile(r'!\[([^\]]*)\]\(\s*([^)\s]+)(?:\s+"([^"]*)")?\s*\)')
+LINK = re.compile(r'\[([^\]]+)\]\(\s*([^)\s]*)(?:\s+"([^"]*)")?\s*\)')
+STRONG = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)')
+EM = re.compile(r'\*(?=[^\s*])(.+?)(?<=[^\s*])\*|(?<!\w)_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)')
+PLACEHOLDER = re.compile('\x00(\\d+)\x00')
+TAGS = re.compile(r'<[^>]+>')
+
+
+def rewrite_url(url: str) -> str:
+    """Relative links to .md pages point at their .html output."""
+    if re.match(r'^[a-z][\w+.-]*:|^/|^#', url):
+        return url
+    path, sep, frag = url.partition('#')
+    if path.endswith('.md'):
+        path = path[:-3] + '.html'
+    return path + sep + frag
+
+
+def inline(text: str) -> str:
+    stash: list[str] = []
+
+    def keep(s: str) -> str:
+        stash.append(s)
+        return f'\x00{len(stash) - 1}\x00'
+
+    text = CODE_SPAN.sub(lambda m: keep(f'<code>{html.escape(m.group(2).strip(), quote=False)}</code>'), text)
+    text = ESCAPE.sub(lambda m: keep(html.escape(m.group(1))), text)
+    text = AUTOLINK.sub(lambda m: keep(f'<a href="{html.escape(m.group(1))}">{html.escape(m.group(1))}</a>'), text)
+    text = INLINE_HTML.sub(lambda m: keep(m.group(0)), text)
+    text = AMP.sub('&amp;', text).replace('<', '&lt;').replace('>', '&gt;')
+
+    def attr(url: str) -> str:
+        return rewrite_url(url).replace('"', '&quot;')
+
+    def image(m: re.Match) -> str:
+        title = f' title="{m.group(3)}"' if m.group(3) else ''
+        return keep(f'<img src="{attr(m.group(2))}" alt="{m.group(1)}"{title}>')
+
+    def link(m: re.Match) -> str:
+        title = f' title="{m.group(3)}"' if m.group(3) else ''
+        return keep(f'<a href="{attr(m.group(2))}"{title}>') + m.group(1) + keep('</a>')
+
+    text = IMAGE.sub(image, text)
+    text = LINK.sub(link, text)
+    text = STRONG.sub(lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>', text)
+    text = EM.sub(lambda m: f'<em>{m.group(1) or m.group(2)}</em>', text)
+    text = re.sub(r' {2,}\n', '<br>\n', text)
+    while '\x00' in text:
+        text = PLACEHOLDER.sub(lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def slugify(text: str) -> str:
+    text = html.unescape(TAGS.sub('', text)).strip().lower()
+    return re.sub(r'[\s-]+', '-', re.sub(r'[^\w\s-]', '', text)).strip('-') or 'section'
+
+
+def split_row(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    cells, buf, in_code = [], [], False
+    for i, ch in enumerate(line):
+        if ch == '`':
+            in_code = not in_code
+        if ch == '|' and not in_code and (i == 0 or line[i - 1] != '\\'):
+            cells.append(''.join(buf).strip())
+            buf = []
+        else:
+            buf.append(ch)
+    cells.append(''.join(buf).strip())
+    return cells
+
+
+class Page:
+    """Markdown -> HTML for one page; collects headings for the table of contents."""
+
+    def __init__(self):
+        self.toc: list[tuple[int, str, str]] = []  # (level, id, html)
+        self.ids: dict[str, int] = {}
+        self.title = ''
+
+    def heading(self, level: int, text: str) -> str:
+        content = inline(text)
+        slug = slugify(content)
+        n = self.ids.get(slug, 0)
+        self.ids[slug] = n + 1
+        hid = f'{slug}_{n}' if n else slug
+        if level == 1 and not self.title:
+            self.title = html.unescape(TAGS.sub('', content))
+        if level in (2, 3):
+            self.toc.append((level, hid, TAGS.sub('', content)))
+        return f'<h{level} id="{hid}">{content}<a class="headerlink" href="#{hid}" title="Permanent link">&para;</a></h{level}>'
+
+    def render(self, text: str) -> str:
+        return '\n'.join(self.blocks(text.replace('\r\n', '\n').replace('\t', '    ').split('\n')))
+
+    def blocks(self, lines: list[str]) -> list[str]:
+        out: list[str] = []
+        para: list[str] = []
+        i, n = 0, len(lines)
+
+        def flush() -> None:
+            if para:
+                out.append(f"<p>{inline(chr(10).join(para).strip())}</p>")
+                para.clear()
+
+        while i < n:
+            line = lines[i]
+            stripped = line.strip()
+            if not stripped:
+                flush()
+                i += 1
+                continue
+            m = FENCE.match(line)
+            if m:
+                flush()
+                fence, lang = m.group(1), m.group(2)
+                body = []
+                i += 1
+                while i < n and not (lines[i].strip().startswith(fence[0] * len(fence))
+                                     and not lines[i].strip().strip(fence[0])):
+                    body.append(lines[i])
+                    i += 1
+                cls = f' class="language-{html.escape(lang)}"' if lang else ''
+                out.append(f'<pre><code{cls}>{html.escape(chr(10).join(body), quote=False)}</code></pre>')
+                i += 1
+                continue
+            m = HEADING.match(line)
+            if m and len(line) - len(line.lstrip()) < 4:
+                flush()
+                out.append(self.heading(len(m.group(1)), m.group(2)))
+                i += 1
+                continue
+            if HR.match(line):
+                flush()
+                out.append('<hr>')
+                i += 1
+                continue
+            if '|' in line and i + 1 < n and TABLE_DELIM.match(lines[i + 1]) and '-' in lines[i + 1]:
+                flush()
+                i = self.table(lines, i, out)
+                continue
+            m = ADMONITION.match(line)
+            if m:
+                flush()
+                body = []
+                i += 1
+                while i < n and (not lines[i].strip() or lines[i].startswith('    ')):
+                    body.append(lines[i][4:])
+                    i += 1
+                kind = m.group(1).lower()
+                title = m.group(2) if m.group(2) is not None else kind.capitalize()
+                head = f'<p class="admonition-title">{inline(title)}</p>' if title else ''
+                out.append(f'<div class="admonition {html.escape(kind)}">{head}{"".join(self.blocks(body))}</div>')
+                continue
+            if stripped.startswith('>'):
+                flush()
+                body = []
+                while i < n and lines[i].strip().startswith('>'):
+                    body.append(re.sub(r'^\s*> ?', '', lines[i]))
+                    i += 1
+                out.append('<blockquote>' + '\n'.join(self.blocks(body)) + '</blockquote>')
+                continue
+            m = LIST_ITEM.match(line)
+            if m and (not para or m.group(2) in '-*+' or m.group(2).startswith('1')):
+                flush()
+                i = self.list(lines, i, out)
+                continue
+            m = HTML_START.match(line)
+            if m and not para and m.group(2).lower() in BLOCK_TAGS:
+                while i < n and lines[i].strip():
+                    out.append(lines[i])
+                    i += 1
+                continue
+            if line.startswith('    ') and not para:
+                body = []
+                while i < n and (lines[i].startswith('    ') or not lines[i].strip()):
+                    body.append(lines[i][4:])
+                    i += 1
+                while body and not body[-1].strip():
+                    body.pop()
+                out.append(f'<pre><code>{html.escape(chr(10).join(body), quote=False)}</code></pre>')
+                continue
+            para.append(line)
+            i += 1
+        flush()
+        return out
+
+    def table(self, lines: list[str], i: int, out: list[str]) -> int:
+        header = split_row(lines[i])
+        aligns = []
+        for cell in split_row(lines[i + 1]):
+            left, right = cell.startswith(':'), cell.endswith(':')
+            aligns.append(' style="text-align:center"' if left and right else ' style="text-align:right"' if right
+                          else ' style="text-align:left"' if left else '')
+        rows = ['<table>', '<thead><tr>' + ''.join(
+            f'<th{aligns[j] if j < len(aligns) else ""}>{inline(c)}</th>' for j, c in enumerate(header)) + '</tr></thead>',
+            '<tbody>']
+        i += 2
+        while i < len(lines) and lines[i].strip() and '|' in lines[i]:
+            cells = split_row(lines[i])
+            cells += [''] * (len(header) - len(cells))
+            rows.append('<tr>' + ''.join(f'<td{aligns[j] if j < len(aligns) else ""}>{inline(c)}</td>'
+                                         for j, c in enumerate(cells[:len(header)])) + '</tr>')
+            i += 1
+        rows.append('</tbody></table>')
+        out.append('\n'.join(rows))
+        return i
+
+    def list(self, lines: list[str], i: int, out: list[str]) -> int:
+        first = LIST_ITEM.match(lines[i])
+        indent = len(first.group(1))
+        ordered = first.group(2)[0].isdigit()
+        items: list[list[str]] = []
+        loose = False
+        n = len(lines)
+        while i < n:
+            m = LIST_ITEM.match(lines[i])
+            if not m or len(m.group(1)) != indent or m.group(2)[0].isdigit() != ordered:
+                break
+            content = indent + len(m.group(2)) + max(1, min(len(m.group(3)), 4))
+            body = [lines[i][m.end():]]
+            i += 1
+            while i < n:
+                line = lines[i]
+                if not line.strip():
+                    nxt = lines[i + 1] if i + 1 < n else ''
+                    if nxt.strip() and len(nxt) - len(nxt.lstrip()) >= content:
+                        body.append('')
+                        loose = loose or not LIST_ITEM.match(nxt)
+                        i += 1
+                        continue
+                    break
+                lead = len(line) - len(line.lstrip())
+                if lead >= content:
+                    body.append(line[content:])
+                elif LIST_ITEM.match(line) or HEADING.match(line) or FENCE.match(line):
+                    break
+                else:
+                    body.append(line.strip())  # lazy continuation
+                i += 1
+            items.append(body)
+            if i < n and not lines[i].strip() and i + 1 < n:
+                nxt = LIST_ITEM.match(lines[i + 1])
+                if nxt and len(nxt.group(1)) == indent and nxt.group(2)[0].isdigit() == ordered:
+                    loose = True
+                    i += 1
+        tag = 'ol' if ordered else 'ul'
+        start = int(first.group(2)[:-1]) if ordered else 1
+        html_items = []
+        for body in items:
+            inner = self.blocks(body)
+            if not loose and inner and inner[0].startswith('<p>'):
+                inner[0] = inner[0][3:-4]
+            html_items.append('<li>' + '\n'.join(inner) + '</li>')
+        attrs = f' start="{start}"' if ordered and start != 1 else ''
+        out.append(f'<{tag}{attrs}>\n' + '\n'.join(html_items) + f'\n</{tag}>')
+        return i
+
+
+def render_markdown(text: str) -> tuple[str, str, list]:
+    """(body html, first h1 text, [(level, id, text)] of h2/h3)."""
+    page = Page()
+    body = page.render(text)
+    return body, page.title, page.toc
+
+
+# --- Theme -------------------------------------------------------------------------------------
+
+def _href(target: str, page_dir: str) -> str:
+    if re.match(r'^[a-z][\w+.-]*:', target):
+        return target
+    return posixpath.relpath(rewrite_url(target), page_dir or '.')
+
+
+def nav_html(nav: list, current: str, page_dir: str) -> str:
+    items = []
+    for title, target in nav:
+        if isinstance(target, list):
+            items.append(f'<li><span class="section">{html.escape(title)}</span>{nav_html(target, current, page_dir)}</li>')
+        else:
+            cls = ' class="active"' if target == current else ''
+            items.append(f'<li><a{cls} href="{html.escape(_href(target, page_dir))}">{html.escape(title or target)}</a></li>')
+    return '<ul>' + ''.join(items) + '</ul>'
+
+
+def page_html(config: dict, rel: str, text: str) -> str:
+    body, h1, toc = render_markdown(text)
+    page_dir = posixpath.dirname(rel)
+    root = posixpath.relpath('.', page_dir or '.')
+    root = '' if root == '.' else root + '/'
+    site = html.escape(config['site_name'] or 'Documentation')
+    title = html.escape(h1 or config['titles'].get(rel) or posixpath.splitext(posixpath.basename(rel))[0])
+    repo = f'<a class="repo" href="{html.escape(config["repo_url"])}">Repository</a>' if config['repo_url'] else ''
+    toc_html = ''
+    if toc:
+        toc_html = '<ul>' + ''.join(f'<li style="margin-left:{(lvl - 2) * .8}em"><a href="#{hid}">{t}</a></li>'
+                                    for lvl, hid, t in toc) + '</ul>'
+    scripts = ''.join(f'<script src="{root}{html.escape(js)}"></script>' for js in config['extra_javascript'])
+    return (f'<!doctype html>\n<html lang="en"><head><meta charset="utf-8">'
+            f'<meta name="viewport" content="width=device-width,initial-scale=1">'
+            f'<title>{title} - {site}</title><link rel="stylesheet" href="{root}{ASSET_DIR}/site.css"></head>\n'
+            f'<body><header class="md-header__inner"><a class="site" href="{root}index.html">{site}</a>{repo}</header>\n'
+            f'<div class="layout"><nav class="nav">{nav_html(config["nav"], rel, page_dir)}</nav>\n'
+            f'<main>\n{body}\n</main><aside class="toc">{toc_html}</aside></div>\n{scripts}</body></html>\n')
+
+
+# --- Build -------------------------------------------------------------------------------------
+
+_config: dict = {}
+
+
+def _init(config: dict) -> None:
+    global _config
+    _config = config
+
+
+def _render_one(job: tuple[str, str, str]) -> str:
+    src, dest, rel = job
+    text = pathlib.Path(src).read_text(encoding='utf-8', errors='replace')
+    out = pathlib.Path(dest)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(page_html(_config, rel, text), encoding='utf-8')
+    return rel
+
+
+def output_name(rel: str) -> str:
+    return rel[:-3] + '.html' if rel.endswith('.md') else rel
+
+
+def build(config_path: pathlib.Path, site_dir: pathlib.Path, workers: int = 0, full: bool = False,
+          manifest_path: pathlib.Path | None = None) -> dict:
+    """Render docs_dir into site_dir; returns counts of rendered, copied, removed and unchanged files."""
+    config = read_config(config_path)
+    config['titles'] = nav_titles(config['nav'])
+    docs = config_path.parent / config['docs_dir']
+    key = hashlib.sha256(json.dumps([VERSION, CSS, config, str(site_dir)], sort_keys=True).encode()).hexdigest()[:16]
+    manifest_path = manifest_path or config_path.parent / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        manifest = {}
+    old = manifest.get('sources', {}) if not full and manifest.get('key') == key else {}
+    old_all = manifest.get('sources', {})
+
+    sources: dict[str, list[int]] = {}
+    pages, copies = [], []
+    with span('render scan'):
+        for dirpath, dirnames, filenames in os.walk(docs):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for name in filenames:
+                if name.startswith('.'):
+                    continue
+                path = pathlib.Path(dirpath) / name
+                rel = path.relative_to(docs).as_posix()
+                st = path.stat()
+                sources[rel] = [st.st_size, st.st_mtime_ns]
+                if old.get(rel) == sources[rel] and (site_dir / output_name(rel)).exists():
+                    continue
+                (pages if rel.endswith('.md') else copies).append(rel)
+
+    removed = 0
+    for rel in set(old_all) - set(sources):
+        try:
+            (site_dir / output_name(rel)).unlink()
+            removed += 1
+        except OSError:
+            pass
+    site_dir.mkdir(parents=True, exist_ok=True)
+    (site_dir / ASSET_DIR).mkdir(exist_ok=True)
+    css = site_dir / ASSET_DIR / 'site.css'
+    if not css.exists() or css.read_text(encoding='utf-8') != CSS:
+        css.write_text(CSS, encoding='utf-8')
+
+    with span('render copy', files=len(copies)):
+        for rel in copies:
+            dest = site_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(docs / rel, dest)
+
+    # largest pages first so the pool does not end on one big page
+    jobs = [(str(docs / rel), str(site_dir / output_name(rel)), rel)
+            for rel in sorted(pages, key=lambda r: -sources[r][0])]
+    workers = workers or os.cpu_count() or 1
+    with span('render pages', pages=len(jobs), workers=workers):
+        if workers > 1 and len(jobs) >= PARALLEL_MIN:
+            chunk = max(1, len(jobs) // (workers * 8))
+            with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init, initargs=(config,)) as pool:
+                for _ in pool.map(_render_one, jobs, chunksize=chunk):
+                    pass
+        else:
+            _init(config)
+            for job in jobs:
+                _render_one(job)
+
+    manifest_path.write_text(json.dumps({'version': VERSION, 'key': key, 'sources': sources},
+                                        separators=(',', ':')), encoding='utf-8')
+    stats = {'rendered': len(jobs), 'copied': len(copies), 'removed': removed,
+             'unchanged': len(sources) - len(jobs) - len(copies)}
+    for name, value in stats.items():
+        count(f'render.{name}', value)
+    return stats
+
+
+def bench(config_path: pathlib.Path, workers: int) -> list[tuple[str, float | None]]:
+    """Seconds for full builds of the same input: builtin serial, builtin pool, mkdocs."""
+    results: list[tuple[str, float | None]] = []
+    workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [('builtin, 1 process', 1)] + ([(f'builtin, {workers} processes', workers)] if workers > 1 else [])
+        for label, n in runs:
+            start = time.perf_counter()
+            out = pathlib.Path(tmp) / label.replace(' ', '_').replace(',', '')
+            build(config_path, out, n, full=True, manifest_path=out.with_suffix('.json'))
+            results.append((label, time.perf_counter() - start))
+        if shutil.which('mkdocs'):
+            start = time.perf_counter()
+            proc = subprocess.run(['mkdocs', 'build', '--quiet', '--config-file', str(config_path),
+                                   '--site-dir', str(pathlib.Path(tmp) / 'mkdocs')], capture_output=True)
+            results.append(('mkdocs build', time.perf_counter() - start if proc.returncode == 0 else None))
+        else:
+            results.append(('mkdocs build', None))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    config_path = pathlib.Path(args.config)
+    if not config_path.exists():
+        log('warning', f'{config_path} not found; run gen_site_structure.py first')
+        return 1
+    if args.bench:
+        docs = config_path.parent / read_config(config_path)['docs_dir']
+        pages = sum(1 for _ in docs.rglob('*.md'))
+        lines = [f'### Site render benchmark ({pages} pages)', '', '| Renderer | Full build |', '|----------|-----------|']
+        for label, secs in bench(config_path, args.workers):
+            lines.append(f"| {label} | {f'{secs:.2f}s' if secs is not None else 'n/a'} |")
+        text = '\n'.join(lines) + '\n'
+        print(text)
+        summary = os.environ.get('GITHUB_STEP_SUMMARY')
+        if summary:
+            with open(summary, 'a', encoding='utf-8') as f:
+                f.write(text + '\n')
+        return 0
+    stats = build(config_path, pathlib.Path(args.site_dir), args.workers, args.full)
+    log('info', f"rendered {stats['rendered']} pages, copied {stats['copied']} files, "
+                f"removed {stats['removed']}, {stats['unchanged']} unchanged")
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Run Go benchmarks sharded across isolated, CPU-pinned workers.
+
+Each worker owns a dedicated set of cores. Benchmark jobs (one package, one
+round) are pinned to those cores via sched_setaffinity (or `taskset` when the
+platform lacks it) with GOMAXPROCS matched to the core count. Repeated rounds
+are interleaved across packages so slow machine drift is spread over every
+benchmark instead of hitting one package's samples back to back.
+
+The merged output is plain `go test -bench` text, so update_bench.parse_bench
+consumes it directly (repeated rounds are reduced to their median there).
+
+Env / Flags (flags override env):
+    BENCH_WORKERS / --workers       parallel workers, or auto (default: cores // BENCH_CPUS)
+    BENCH_CPUS / --cpus-per-worker  cores pinned to each worker (default 1)
+    BENCH_COUNT / --count           interleaved rounds per package (default 1)
+    BENCH_PATTERN / --bench         -bench regex (default .)
+    BENCH_TIME / --benchtime        optional -benchtime value
+    --packages                      package pattern passed to `go list` (default ./...)
+    --output                        merged result file (default bench.out)
+
+Exit codes:
+    0 success (failed jobs are logged while others still produced results)
+    1 no benchmark job succeeded
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import IO
+
+from pipeline_trace import log, now_us, record
+
+ROOT = pathlib.Path.cwd()
+
+
+def _workers(value: str) -> int:
+    value = (value or '').strip().lower()
+    return 0 if value in ('', 'auto') else int(value)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--workers', type=_workers, default=_workers(os.environ.get('BENCH_WORKERS', '')),
+                   help='Parallel workers (auto/0 = derive from available cores)')
+    p.add_argument('--cpus-per-worker', type=int, default=int(os.environ.get('BENCH_CPUS', '1') or 1),
+                   help='Cores pinned to each worker (default 1)')
+    p.add_argument('--count', type=int, default=int(os.environ.get('BENCH_COUNT', '1') or 1),
+                   help='Interleaved rounds per package (default 1)')
+    p.add_argument('--bench', default=os.environ.get('BENCH_PATTERN', '.'), help='-bench regex (default .)')
+    p.add_argument('--benchtime', default=os.environ.get('BENCH_TIME', ''), help='Optional -benchtime value')
+    p.add_argument('--packages', default='./...', help='Package pattern for go list (default ./...)')
+    p.add_argument('--output', default=str(ROOT / 'bench.out'), help='Merged output file (default bench.out)')
+    p.add_argument('--no-pin', action='store_true', help='Disable CPU pinning (GOMAXPROCS is still matched)')
+    return p.parse_args(argv)
+
+
+def available_cpus() -> list[int]:
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(cpus: list[int], workers: int, per_worker: int) -> list[list[int]]:
+    """Split cpus into disjoint groups of per_worker cores, at most workers groups.
+
+    Always returns at least one group; when fewer cores than requested exist the
+    single group gets whatever is available.
+    """
+    per_worker = max(1, per_worker)
+    max_groups = max(1, len(cpus) // per_worker)
+    groups = max(1, min(workers, max_groups)) if workers > 0 else max_groups
+    out = [cpus[i * per_worker:(i + 1) * per_worker] for i in range(groups)]
+    return [g for g in out if g] or [cpus[:per_worker] or [0]]
+
+
+def schedule(packages: list[str], rounds: int) -> list[tuple[int, str]]:
+    """Round-major job order; each round is rotated so no package always runs first."""
+    jobs: list[tuple[int, str]] = []
+    n = len(packages)
+    for r in range(max(1, rounds)):
+        shift = r % n if n else 0
+        for pkg in packages[shift:] + packages[:shift]:
+            jobs.append((r, pkg))
+    return jobs
+
+
+def list_packages(pattern: str) -> list[str]:
+    try:
+        out = subprocess.check_output(['go', 'list', pattern], text=True, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return [line.strip() for line in out.splitlines() if line.strip() and '/vendor/' not in line]
+
+
+def pin_command(cmd: list[str], cores: list[int], pin: bool):
+    """Return (cmd, preexec_fn) applying CPU affinity for the child process."""
+    if not pin:
+        return cmd, None
+    if hasattr(os, 'sched_setaffinity'):
+        def _pin() -> None:  # runs in the forked child before exec
+            os.sched_setaffinity(0, cores)
+        return cmd, _pin
+    if shutil.which('taskset'):
+        return ['taskset', '-c', ','.join(str(c) for c in cores), *cmd], None
+    return cmd, None
+
+
+def bench_command(pkg: str, args: argparse.Namespace) -> list[str]:
+    cmd = ['go', 'test', '-run=^$', f'-bench={args.bench}', '-benchmem', '-count=1']
+    if args.benchtime:
+        cmd.append(f'-benchtime={args.benchtime}')
+    cmd.append(pkg)
+    return cmd
+
+
+def merge_outputs(packages: list[str], outputs: dict[tuple[int, str], str]) -> str:
+    """Concatenate job outputs grouped by package, rounds in order."""
+    chunks: list[str] = []
+    for pkg in packages:
+        rounds = sorted(r for (r, p) in outputs if p == pkg)
+        for r in rounds:
+            text = outputs[(r, pkg)]
+            if text and not text.endswith('\n'):
+                text += '\n'
+            chunks.append(text)
+    return ''.join(chunks)
+
+
+def run_jobs(jobs: list[tuple[int, str]], groups: list[list[int]], args: argparse.Namespace,
+             workdir: pathlib.Path) -> tuple[dict[tuple[int, str], str], int]:
+    """Run jobs with one child per core group; returns outputs and failure count.
+
+    Children are polled from this single thread (no helper threads) so the
+    preexec_fn used for pinning stays safe.
+    """
+    pending = list(jobs)
+    free = list(range(len(groups)))
+    running: dict[int, tuple[subprocess.Popen, tuple[int, str], pathlib.Path, IO[str], int]] = {}
+    outputs: dict[tuple[int, str], str] = {}
+    failures = 0
+    seq = 0
+    while pending or running:
+        while pending and free:
+            slot = free.pop(0)
+            job = pending.pop(0)
+            cores = groups[slot]
+            cmd, preexec = pin_command(bench_command(job[1], args), cores, not args.no_pin)
+            env = {**os.environ, 'GOMAXPROCS': str(len(cores))}
+            out_path = workdir / f'job{seq}.out'
+            seq += 1
+            fh = out_path.open('w', encoding='utf-8')
+            try:
+                proc = subprocess.Popen(cmd, stdout=fh, stderr=subprocess.STDOUT, env=env, preexec_fn=preexec)
+            except OSError as e:
+                fh.close()
+                log('warning', f"failed to start benchmark for {job[1]}: {e}")
+                failures += 1
+                free.append(slot)
+                continue
+            running[slot] = (proc, job, out_path, fh, now_us())
+        done = [s for s, (proc, *_rest) in running.items() if proc.poll() is not None]
+        if not done:
+            time.sleep(0.05)
+            continue
+        for slot in done:
+            proc, job, out_path, fh, started_us = running.pop(slot)
+            fh.close()
+            record(f'bench {job[1]}', started_us, now_us() - started_us, round=job[0], cores=groups[slot],
+                   exit=proc.returncode)
+            if proc.returncode != 0:
+                failures += 1
+                log('warning', f"benchmarks failed for {job[1]} (round {job[0]}, exit {proc.returncode})")
+            outputs[job] = out_path.read_text(encoding='utf-8', errors='replace')
+            free.append(slot)
+    return outputs, failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    packages = list_packages(args.packages)
+    if not packages:
+        log('info', 'no Go packages found; skipping benchmarks.')
+        return 0
+    groups = partition_cpus(available_cpus(), args.workers, args.cpus_per_worker)
+    jobs = schedule(packages, args.count)
+    log('info', f'running {len(jobs)} benchmark jobs on {len(groups)} workers '
+                f'({len(groups[0])} cores each, pinning {"off" if args.no_pin else "on"})')
+    started = time.monotonic()
+    with tempfile.TemporaryDirectory(prefix='bench_') as td:
+        outputs, failures = run_jobs(jobs, groups, args, pathlib.Path(td))
+    merged = merge_outputs(packages, outputs)
+    out = pathlib.Path(args.output)
+    out.write_text(merged, encoding='utf-8')
+    sys.stdout.write(merged)
+    log('info', f'benchmarks finished in {time.monotonic() - started:.1f}s ({failures} failed jobs)')
+    if failures == len(jobs):
+        log('error', 'every benchmark job failed; no results to record')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
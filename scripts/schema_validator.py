@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Dependency-free validator for the JSON Schema (draft-07) subset used in schema/.
+
+compile_schema() turns a schema into a closure once; calling it returns None
+for a valid instance or a short error message ("$.severity.high: expected
+integer"). Supported keywords: type (single or list), enum, const, properties,
+required, additionalProperties (bool or schema), items (single schema),
+minItems/maxItems, minimum/maximum, exclusiveMinimum/exclusiveMaximum,
+minLength/maxLength, pattern and local $ref (#/definitions/...). Annotation
+keywords ($schema, title, description, format, ...) are ignored.
+
+load() caches compiled validators per file so each process compiles once;
+filter_valid()/read_series() check history series in bulk (a 100k-entry series
+validates well under a second) so one corrupt entry cannot break the charts.
+
+Usage:
+    schema_validator.py SCHEMA FILE [FILE ...]   # exit 2 when any file is invalid
+    schema_validator.py --items SCHEMA FILE      # validate each entry of a JSON array
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import pathlib
+import re
+import sys
+from typing import Any, Callable
+
+from pipeline_trace import log
+
+Validator = Callable[[Any], 'str | None']
+
+_TYPES: dict[str, Callable[[Any], bool]] = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+_PY_TYPES: dict[str, tuple[type, ...]] = {
+    'object': (dict,), 'array': (list,), 'string': (str,), 'integer': (int,),
+    'number': (int, float), 'boolean': (bool,), 'null': (type(None),),
+}
+_EXACT_TYPES = ('object', 'array', 'string')
+
+
+class SchemaError(ValueError):
+    """The schema itself uses something this validator does not understand."""
+
+
+def _type_check(types: list[str]) -> Callable[[Any], bool]:
+    for t in types:
+        if t not in _TYPES:
+            raise SchemaError(f'unsupported type: {t}')
+    if len(types) == 1:
+        return _TYPES[types[0]]
+    if 'integer' not in types or 'number' in types:
+        # plain isinstance on a tuple; bool is an int subclass so exclude it unless allowed
+        py = tuple(t for name in types for t in _PY_TYPES[name])
+        if 'boolean' in types or not any(name in ('number', 'integer') for name in types):
+            return lambda v: isinstance(v, py)
+        return lambda v: isinstance(v, py) and v is not True and v is not False
+    checks = [_TYPES[t] for t in types]
+    return lambda v: any(c(v) for c in checks)
+
+
+def compile_schema(schema: dict | bool, root: dict | None = None, where: str = '$') -> Validator:
+    """Compile schema (sub-schemas resolved against root) into a validator closure."""
+    if schema is True or schema == {}:
+        return lambda v: None
+    if schema is False:
+        return lambda v: f'{where}: not allowed'
+    root = schema if root is None else root
+    if '$ref' in schema:
+        ref = schema['$ref']
+        if not ref.startswith('#/'):
+            raise SchemaError(f'only local $ref is supported: {ref}')
+        target: Any = root
+        for part in ref[2:].split('/'):
+            target = target[part]
+        cell: list[Validator] = []
+        # lazily compiled so recursive definitions terminate
+        return lambda v: (cell or cell.append(compile_schema(target, root, where)) or cell)[0](v)
+
+    checks: list[Validator] = []
+    types = schema.get('type')
+    if types is not None:
+        types = [types] if isinstance(types, str) else list(types)
+        if len(types) == 1 and types[0] in _EXACT_TYPES:
+            exact = _PY_TYPES[types[0]]
+            name = types[0]
+            checks.append(lambda v: None if isinstance(v, exact) else f'{where}: expected {name}')
+        else:
+            ok = _type_check(types)
+            label = '|'.join(types)
+            checks.append(lambda v: None if ok(v) else f'{where}: expected {label}')
+    if 'enum' in schema:
+        allowed = list(schema['enum'])
+        checks.append(lambda v: None if v in allowed else f'{where}: not one of {allowed}')
+    if 'const' in schema:
+        const = schema['const']
+        checks.append(lambda v: None if v == const else f'{where}: expected {const!r}')
+
+    num = (int, float)
+    if 'minimum' in schema:
+        lo_n = schema['minimum']
+        checks.append(lambda v: f'{where}: {v} < {lo_n}' if isinstance(v, num) and v < lo_n else None)
+    if 'maximum' in schema:
+        hi_n = schema['maximum']
+        checks.append(lambda v: f'{where}: {v} > {hi_n}' if isinstance(v, num) and v > hi_n else None)
+    if 'exclusiveMinimum' in schema:
+        xlo = schema['exclusiveMinimum']
+        checks.append(lambda v: f'{where}: {v} <= {xlo}' if isinstance(v, num) and v <= xlo else None)
+    if 'exclusiveMaximum' in schema:
+        xhi = schema['exclusiveMaximum']
+        checks.append(lambda v: f'{where}: {v} >= {xhi}' if isinstance(v, num) and v >= xhi else None)
+    if 'minLength' in schema or 'maxLength' in schema or 'pattern' in schema:
+        lo, hi = schema.get('minLength', 0), schema.get('maxLength')
+        rx = re.compile(schema['pattern']) if 'pattern' in schema else None
+        def check_str(v: Any) -> str | None:
+            if not isinstance(v, str):
+                return None
+            if len(v) < lo or (hi is not None and len(v) > hi):
+                return f'{where}: length {len(v)} out of range'
+            if rx is not None and not rx.search(v):
+                return f'{where}: does not match {rx.pattern}'
+            return None
+        checks.append(check_str)
+
+    props = schema.get('properties', {})
+    required = list(schema.get('required', []))
+    additional = schema.get('additionalProperties', True)
+    if props or required or additional is not True:
+        compiled = {k: compile_schema(s, root, f'{where}.{k}') for k, s in props.items()}
+        extra = None if additional in (True, False) else compile_schema(additional, root, f'{where}.*')
+        closed = additional is False
+        def check_obj(v: Any) -> str | None:
+            if not isinstance(v, dict):
+                return None
+            for r in required:
+                if r not in v:
+                    return f'{where}: missing required {r!r}'
+            for k, item in v.items():
+                sub = compiled.get(k)
+                if sub is not None:
+                    err = sub(item)
+                elif closed:
+                    return f'{where}: unexpected property {k!r}'
+                elif extra is not None:
+                    err = extra(item)
+                else:
+                    continue
+                if err:
+                    return err
+            return None
+        checks.append(check_obj)
+
+    if 'items' in schema or 'minItems' in schema or 'maxItems' in schema:
+        if isinstance(schema.get('items'), list):
+            raise SchemaError('tuple-form items is not supported')
+        item_check = compile_schema(schema['items'], root, f'{where}[]') if 'items' in schema else None
+        lo, hi = schema.get('minItems', 0), schema.get('maxItems')
+        def check_arr(v: Any) -> str | None:
+            if not isinstance(v, list):
+                return None
+            if len(v) < lo or (hi is not None and len(v) > hi):
+                return f'{where}: {len(v)} items out of range'
+            if item_check is not None:
+                for item in v:
+                    err = item_check(item)
+                    if err:
+                        return err
+            return None
+        checks.append(check_arr)
+
+    if not checks:
+        return lambda v: None
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        a, b = checks
+        return lambda v: a(v) or b(v)
+
+    def run_all(v: Any) -> str | None:
+        for c in checks:
+            err = c(v)
+            if err:
+                return err
+        return None
+    return run_all
+
+
+SCHEMA_DIR = pathlib.Path(__file__).resolve().parent.parent / 'schema'
+
+
+def schema_file(name: str) -> pathlib.Path:
+    """schema/<name> in the working tree when present, else the copy shipped with the action."""
+    local = pathlib.Path('schema') / name
+    return local if local.exists() else SCHEMA_DIR / name
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path: str, mtime_ns: int, items: bool) -> Validator:
+    schema = json.loads(pathlib.Path(path).read_text(encoding='utf-8'))
+    if items:
+        return compile_schema(schema.get('items', {}), schema, '$[]')
+    return compile_schema(schema)
+
+
+def load(path: pathlib.Path | str, items: bool = False) -> Validator | None:
+    """Compiled validator for a schema file (cached per process); None if the file is missing or unreadable.
+
+    items=True compiles the schema's `items` sub-schema, i.e. a validator for one
+    entry of a history series rather than for the whole array.
+    """
+    p = pathlib.Path(path)
+    try:
+        return _load(str(p.resolve()), p.stat().st_mtime_ns, items)
+    except (OSError, ValueError):
+        return None
+
+
+def filter_valid(validator: Validator | None, entries: Any) -> tuple[list, int]:
+    """(valid entries, number dropped); a non-list history counts as one dropped entry."""
+    if not isinstance(entries, list):
+        return [], 1
+    if validator is None:
+        return entries, 0
+    kept = [e for e in entries if validator(e) is None]
+    return kept, len(entries) - len(kept)
+
+
+def read_series(path: pathlib.Path, validator: Validator | None) -> list:
+    """Load a history series, dropping (with a warning) entries that fail validation.
+
+    A missing file is an empty series; an unparsable one is treated the same so a
+    single bad write cannot wedge every later run.
+    """
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        log('warning', f'{path} is not valid JSON; starting a new series')
+        return []
+    kept, dropped = filter_valid(validator, data)
+    if dropped:
+        log('warning', f'dropped {dropped} invalid entries from {path}')
+    return kept
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('schema', help='Schema file')
+    p.add_argument('files', nargs='+', help='JSON files to validate')
+    p.add_argument('--items', action='store_true', help='Validate each entry of a JSON array against the schema')
+    args = p.parse_args(argv)
+    validator = load(args.schema, items=args.items)
+    if validator is None:
+        print(f'SCHEMA_ERROR: cannot load {args.schema}', file=sys.stderr)
+        return 2
+    failed = False
+    for f in args.files:
+        data = json.loads(pathlib.Path(f).read_text(encoding='utf-8'))
+        if args.items:
+            _, dropped = filter_valid(validator, data)
+            if dropped:
+                failed = True
+                print(f'SCHEMA_ERROR: {f}: {dropped} invalid entries', file=sys.stderr)
+        else:
+            err = validator(data)
+            if err:
+                failed = True
+                print(f'SCHEMA_ERROR: {f}: {err}', file=sys.stderr)
+    return 2 if failed else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
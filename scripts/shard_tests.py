@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Split the module's Go packages into duration-balanced test shards and merge their outputs.
+
+plan: every package of the shared package model (go_packages.py) gets an
+estimated cost, the sum of its top-level tests' recent durations from the test
+history (update_tests.py; the local test_history/history.json, else read from the
+history branch) plus a fixed per-package overhead for building the test binary.
+Packages without history cost the median of the known ones. Packages are then
+assigned longest first to the currently lightest shard (LPT), which keeps the
+slowest shard within 4/3 of the optimum.
+
+src/index.js runs the shards of a plan in parallel (test_shards) or one shard per
+matrix leg (test_shard=i/N). Each shard writes cover.out, test-results.jsonl,
+tests.txt and test-summary.json into <dir>/shard-<i>/.
+
+merge: combines the shard outputs into the files a single `go test ./...` run
+writes. Every shard runs with -coverpkg ./..., so each profile lists the blocks
+of all packages; cover_merge.py sums the counts of the same block and the
+coverage totals equal the single-process run's.
+
+Usage:
+    shard_tests.py plan --shards N [--output test-shards/plan.json] [--history FILE]
+    shard_tests.py packages --index I [--plan test-shards/plan.json]
+    shard_tests.py merge [--dir test-shards] [--output-dir .]
+
+Env:
+    BENCH_BRANCH        history branch read when there is no local history (default bench-data)
+    TESTS_HISTORY       local history file (default test_history/history.json)
+    SHARD_OVERHEAD      per-package overhead in seconds (default 1)
+    GITHUB_OUTPUT       plan appends `matrix` ({"shard": [0, ...]}) and `shards`
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import pathlib
+import re
+import statistics
+from collections import Counter
+
+import cover_merge
+import go_packages
+from pipeline_trace import count, log, span
+from update_tests import parse_history, split_key
+
+ROOT = pathlib.Path.cwd()
+SHARD_DIR = 'test-shards'
+MAX_FAILURES = 50  # same cap as src/gotest.js
+OVERHEAD = float(os.environ.get('SHARD_OVERHEAD', '1') or 1)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    sub = p.add_subparsers(dest='command', required=True)
+    plan_p = sub.add_parser('plan', help='Write a shard plan')
+    plan_p.add_argument('--shards', type=int, required=True, help='Number of shards')
+    plan_p.add_argument('--output', default=f'{SHARD_DIR}/plan.json', help='Plan JSON')
+    plan_p.add_argument('--history', default=os.environ.get('TESTS_HISTORY', 'test_history/history.json'),
+                        help='Test history (falls back to the history branch)')
+    pkg_p = sub.add_parser('packages', help='Print the packages of one shard')
+    pkg_p.add_argument('--index', type=int, required=True, help='Shard index')
+    pkg_p.add_argument('--plan', default=f'{SHARD_DIR}/plan.json', help='Plan JSON')
+    merge_p = sub.add_parser('merge', help='Merge shard outputs')
+    merge_p.add_argument('--dir', default=SHARD_DIR, help='Directory holding shard-<i>/ outputs')
+    merge_p.add_argument('--output-dir', default='.', help='Where merged files are written')
+    return p.parse_args(argv)
+
+
+def read_history(path: pathlib.Path) -> dict:
+    if path.exists():
+        return parse_history(path.read_text(encoding='utf-8'), str(path))
+    from bench_compare import BaseReader
+    reader = BaseReader(os.environ.get('BENCH_BRANCH', 'bench-data'))
+    return parse_history(reader.read('test_history/history.json'), 'history branch')
+
+
+def package_durations(history: dict, window: int = 5) -> dict[str, float]:
+    """Seconds per package: sum over top-level tests of their median recent duration."""
+    out: dict[str, float] = {}
+    for key, rec in history.get('tests', {}).items():
+        package, test = split_key(key)
+        if '/' in test:  # subtests are included in their parent's duration
+            continue
+        vals = [d for d in rec['d'] if d is not None][-window:]
+        if vals:
+            out[package] = out.get(package, 0.0) + statistics.median(vals) / 1000
+    return out
+
+
+def plan(packages: list[tuple[str, bool]], durations: dict[str, float], shards: int,
+         overhead: float = OVERHEAD) -> list[dict]:
+    """LPT assignment of (import path, has tests) pairs to at most `shards` shards."""
+    shards = max(1, min(shards, len(packages)))
+    known = [durations[p] for p, _ in packages if p in durations]
+    default = statistics.median(known) if known else 1.0
+    costs = {p: overhead + (durations.get(p, default) if tested else 0.0) for p, tested in packages}
+    out = [{'index': i, 'packages': [], 'estimate_s': 0.0} for i in range(shards)]
+    heap = [(0.0, i) for i in range(shards)]
+    for pkg in sorted(costs, key=lambda p: (-costs[p], p)):
+        load, i = heapq.heappop(heap)
+        out[i]['packages'].append(pkg)
+        heapq.heappush(heap, (load + costs[pkg], i))
+    for s in out:
+        s['packages'].sort()
+        s['estimate_s'] = round(sum(costs[p] for p in s['packages']), 3)
+    return out
+
+
+def cmd_plan(args: argparse.Namespace) -> int:
+    with span('load package model'):
+        model = go_packages.load(ROOT)
+    packages = [(p.import_path, bool(p.test_files)) for p in model.packages]
+    if not packages:
+        log('warning', 'no Go packages found; nothing to shard')
+        return 1
+    with span('read test history'):
+        history = read_history(pathlib.Path(args.history))
+    durations = package_durations(history)
+    shards = plan(packages, durations, args.shards)
+    doc = {'version': 1, 'history_runs': len(history.get('runs', [])), 'shards': shards}
+    output = pathlib.Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(doc, indent=1) + '\n', encoding='utf-8')
+    count('shards', len(shards))
+    for s in shards:
+        log('info', f"shard {s['index']}: {len(s['packages'])} packages, ~{s['estimate_s']:.1f}s")
+    gh_out = os.environ.get('GITHUB_OUTPUT')
+    if gh_out:
+        with open(gh_out, 'a', encoding='utf-8') as f:
+            f.write(f"matrix={json.dumps({'shard': [s['index'] for s in shards]})}\n")
+            f.write(f'shards={len(shards)}\n')
+    return 0
+
+
+def cmd_packages(args: argparse.Namespace) -> int:
+    shards = json.loads(pathlib.Path(args.plan).read_text(encoding='utf-8'))['shards']
+    for s in shards:
+        if s['index'] == args.index:
+            print(' '.join(s['packages']))
+            return 0
+    log('error', f'no shard {args.index} in {args.plan}')
+    return 1
+
+
+def merge_summaries(summaries: list[dict]) -> dict:
+    totals = {'passed': 0, 'failed': 0, 'skipped': 0}
+    packages: list[dict] = []
+    failures: list[dict] = []
+    benchmarks = 0
+    for s in summaries:
+        for key in totals:
+            totals[key] += s.get('totals', {}).get(key, 0)
+        packages += s.get('packages', [])
+        failures += s.get('failures', [])
+        benchmarks += s.get('benchmarks', 0)
+    packages.sort(key=lambda p: p.get('package', ''))
+    return {'totals': {**totals, 'packages': len(packages)}, 'packages': packages,
+            'failures': failures[:MAX_FAILURES], 'benchmarks': benchmarks}
+
+
+def shard_dirs(base: pathlib.Path) -> list[pathlib.Path]:
+    dirs = [d for d in base.glob('shard-*') if d.is_dir() and re.fullmatch(r'shard-\d+', d.name)]
+    return sorted(dirs, key=lambda d: int(d.name[6:]))
+
+
+def cmd_merge(args: argparse.Namespace) -> int:
+    dirs = shard_dirs(pathlib.Path(args.dir))
+    if not dirs:
+        log('warning', f'no shard outputs in {args.dir}')
+        return 1
+    out = pathlib.Path(args.output_dir)
+    with span('merge cover profiles', shards=len(dirs)):
+        profiles = [d / 'cover.out' for d in dirs if (d / 'cover.out').exists()]
+        try:
+            if profiles:
+                cover_merge.merge(profiles, out / 'cover.out')
+        except ValueError as e:
+            log('warning', f'cannot merge coverage: {e}')
+    with span('merge test results'):
+        with (out / 'test-results.jsonl').open('w', encoding='utf-8') as f:
+            for d in dirs:
+                if (d / 'test-results.jsonl').exists():
+                    f.write((d / 'test-results.jsonl').read_text(encoding='utf-8'))
+        log = out / 'site_src' / 'tests.txt'
+        log.parent.mkdir(parents=True, exist_ok=True)
+        with log.open('w', encoding='utf-8') as f:
+            for d in dirs:
+                if (d / 'tests.txt').exists():
+                    f.write((d / 'tests.txt').read_text(encoding='utf-8'))
+    summaries, planned = [], set()
+    for d in dirs:
+        try:
+            summaries.append(json.loads((d / 'test-summary.json').read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            log('warning', f'{d} has no test summary')
+        try:
+            planned.update(json.loads((d / 'plan.json').read_text(encoding='utf-8')).get('packages', []))
+        except (OSError, ValueError):
+            pass
+    summary = merge_summaries(summaries)
+    (out / 'test-summary.json').write_text(json.dumps(summary, indent=1) + '\n', encoding='utf-8')
+    seen = Counter(p.get('package') for p in summary['packages'])
+    dupes = sorted(p for p, n in seen.items() if n > 1)
+    missing = sorted(planned - set(seen))
+    if dupes:
+        log('warning', f"packages tested by more than one shard (legs used different plans?): {' '.join(dupes)}")
+    if missing:
+        log('warning', f"planned packages without results: {' '.join(missing)}")
+    count('shards_merged', len(dirs))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    return {'plan': cmd_plan, 'packages': cmd_packages, 'merge': cmd_merge}[args.command](args)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
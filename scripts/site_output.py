@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Content-aware, atomic writer for generated site files.
+
+write_text/write_bytes/copy_file only touch a file when its content changes:
+unchanged files keep their bytes and mtime, changed files are written to a
+temp file in the same directory and os.replace()d into place, so readers
+never observe partial output.
+
+Several scripts rewrite the same page during one pipeline run (e.g.
+collect_metrics.py writes metrics.md and gen_metrics_md.py appends to it).
+The first time a run touches a path its original hash and mtime are kept in
+the manifest; if the final content matches the original again the mtime is
+restored, so incremental `mkdocs build --dirty` still sees it as unchanged.
+
+Manifest (.site_changes.json in CWD):
+    {"run_id": ..., "files": {path: {"orig": sha|null, "mtime_ns": int|null, "sha": sha}}, "changed": [...]}
+
+SITE_RUN_ID groups the scripts of one pipeline run (src/index.js sets it);
+without it each process starts a fresh manifest.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+
+from pipeline_trace import count
+
+ROOT = pathlib.Path.cwd()
+MANIFEST = ROOT / '.site_changes.json'
+RUN_ID = os.environ.get('SITE_RUN_ID') or f'pid-{os.getpid()}'
+
+_state: dict | None = None
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _key(path: pathlib.Path) -> str:
+    p = path.resolve()
+    try:
+        return p.relative_to(ROOT.resolve()).as_posix()
+    except ValueError:
+        return p.as_posix()
+
+
+def _load() -> dict:
+    global _state
+    if _state is None:
+        try:
+            data = json.loads(MANIFEST.read_text(encoding='utf-8'))
+        except Exception:
+            data = {}
+        if data.get('run_id') != RUN_ID:
+            data = {'run_id': RUN_ID, 'files': {}}
+        _state = data
+        atexit.register(flush)
+    return _state
+
+
+def flush() -> None:
+    """Persist the manifest (called automatically at exit)."""
+    if _state is None:
+        return
+    _state['changed'] = changed()
+    try:
+        MANIFEST.write_text(json.dumps(_state, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+    except OSError:
+        pass
+
+
+def changed() -> list[str]:
+    """Paths whose content differs from what they held before this run."""
+    files = _load()['files']
+    return sorted(k for k, v in files.items() if v['sha'] != v['orig'])
+
+
+def _default_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_bytes(path: pathlib.Path | str, data: bytes) -> bool:
+    """Write data unless identical; returns True when the file content changed."""
+    path = pathlib.Path(path)
+    state = _load()
+    key = _key(path)
+    entry = state['files'].get(key)
+    current: bytes | None = None
+    try:
+        st = path.stat()
+        if st.st_size == len(data):
+            current = path.read_bytes()
+    except FileNotFoundError:
+        st = None
+    if entry is None:
+        if st is not None:
+            orig = _sha(current) if current is not None else _sha(path.read_bytes())
+            entry = {'orig': orig, 'mtime_ns': st.st_mtime_ns}
+        else:
+            entry = {'orig': None, 'mtime_ns': None}
+        state['files'][key] = entry
+    new_sha = _sha(data)
+    entry['sha'] = new_sha
+    if current is not None and current == data:
+        count('site.files_unchanged')
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = (st.st_mode & 0o777) if st is not None else _default_mode()
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if new_sha == entry['orig'] and entry['mtime_ns'] is not None:
+        os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+    count('site.files_written')
+    count('bytes_written', len(data))
+    return True
+
+
+def write_text(path: pathlib.Path | str, text: str) -> bool:
+    return write_bytes(path, text.encode('utf-8'))
+
+
+def copy_file(src: pathlib.Path | str, dst: pathlib.Path | str) -> bool:
+    """Copy src to dst through write_bytes (skip when identical)."""
+    return write_bytes(dst, pathlib.Path(src).read_bytes())
+
+
+def copy_tree(src: pathlib.Path | str, dst: pathlib.Path | str, pattern: str = '*') -> int:
+    """copy_file for every file under src matching pattern; returns files changed."""
+    src, dst = pathlib.Path(src), pathlib.Path(dst)
+    n = 0
+    for p in src.rglob(pattern):
+        if p.is_file():
+            n += copy_file(p, dst / p.relative_to(src))
+    return n
+
+
+def find_asset(name: str) -> pathlib.Path | None:
+    """Locate a bundled JS asset: repo override, then the action checkout, then next to this script."""
+    for base in (ROOT / 'gh-pages-action' / 'scripts',
+                 pathlib.Path(os.environ.get('GITHUB_ACTION_PATH', '')) / 'scripts',
+                 ROOT / 'scripts',
+                 pathlib.Path(__file__).resolve().parent):
+        if (base / name).is_file():
+            return base / name
+    return None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Build-time inline SVG sparklines and delta arrows for markdown tables.
+
+Pages show the recent trend of each metric without fetching any series in the
+browser: the table writers call trend_cell() with the stored history and embed
+the returned HTML (a one-line <svg> plus an arrow and the change since the
+previous sample) directly in a table cell.
+
+Env:
+    SPARKLINE_POINTS  number of most recent samples drawn (default 30)
+
+Usage (debugging):
+    sparkline.py metrics/data/loc.json [--key value]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+from typing import Iterable
+
+POINTS = int(os.environ.get('SPARKLINE_POINTS', '30') or 30)
+WIDTH, HEIGHT = 80, 18
+
+
+def values(series: Iterable, key: str = 'value') -> list[float]:
+    """Numeric samples of a history series (entries without a number are skipped)."""
+    out = []
+    for entry in series or []:
+        v = entry.get(key) if isinstance(entry, dict) else None
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out.append(float(v))
+    return out
+
+
+def load(path: pathlib.Path, key: str = 'value') -> list[float]:
+    try:
+        return values(json.loads(path.read_text(encoding='utf-8')), key)
+    except (OSError, ValueError):
+        return []
+
+
+def svg(vals: list[float], color: str = '#0366d6', width: int = WIDTH, height: int = HEIGHT) -> str:
+    """One-line inline SVG polyline of the last POINTS values ('' for fewer than two)."""
+    vals = vals[-POINTS:]
+    if len(vals) < 2:
+        return ''
+    lo, hi = min(vals), max(vals)
+    span = hi - lo
+    step = (width - 2) / (len(vals) - 1)
+    pts = []
+    for i, v in enumerate(vals):
+        y = (height - 2) / 2 if span == 0 else (height - 2) * (hi - v) / span
+        pts.append(f'{1 + i * step:.1f},{1 + y:.1f}')
+    return (f'<svg class="sparkline" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+            f'role="img" aria-label="trend {fmt(lo)} to {fmt(hi)}">'
+            f'<polyline fill="none" stroke="{color}" stroke-width="1.5" points="{" ".join(pts)}"/></svg>')
+
+
+def fmt(v: float) -> str:
+    """Compact number: integers without decimals, others to at most two places."""
+    return f'{v:.2f}'.rstrip('0').rstrip('.') if v != int(v) else str(int(v))
+
+
+def delta(vals: list[float]) -> str:
+    """Arrow plus change since the previous sample ('' without one)."""
+    if len(vals) < 2:
+        return ''
+    d = vals[-1] - vals[-2]
+    if d == 0:
+        return '→ 0'
+    return f'{"↑" if d > 0 else "↓"} {"+" if d > 0 else "−"}{fmt(abs(d))}'
+
+
+def trend_cell(vals: list[float], color: str = '#0366d6') -> str:
+    """Table cell content: sparkline and delta, or '-' when there is no history yet."""
+    cell = ' '.join(p for p in (svg(vals, color), delta(vals)) if p)
+    return cell or '-'
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('series', help='History series JSON file')
+    p.add_argument('--key', default='value', help='Entry field to plot (default value)')
+    args = p.parse_args(argv)
+    print(trend_cell(load(pathlib.Path(args.series), args.key)))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
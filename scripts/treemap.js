@@ -0,0 +1,208 @@
+// Directory treemap for the metrics page, drawn from the tree.json that
+// collect_metrics.py (metrics_tree.py) writes next to this script.
+// The tree is fetched when the container scrolls into view, and only the
+// current directory's children are laid out (squarified). Clicking a directory
+// expands it in place and the breadcrumb goes back up, so even a monorepo with
+// thousands of directories only ever renders one level at a time.
+// Tiles are sized by the selected metric and coloured by statement coverage
+// (test functions per 100 LOC without coverage data).
+(function () {
+  const container = document.getElementById('metrics-treemap');
+  if (!container) return;
+  const script = document.currentScript;
+  const base = ((script && script.src) || '').replace(/[^/]*$/, '');
+  const MAX_TILES = 150;
+  const HEIGHT = 420;
+  const LABELS = {
+    loc: 'LOC',
+    files: 'Files',
+    tests: 'Test functions',
+    functions: 'Functions',
+    complexity_sum: 'Total complexity',
+    high_complexity: 'Complex functions',
+    stmts: 'Statements',
+    covered: 'Covered statements',
+  };
+
+  function el(tag, style, text) {
+    const e = document.createElement(tag);
+    if (style) e.style.cssText = style;
+    if (text !== undefined) e.textContent = text;
+    return e;
+  }
+
+  // worst aspect ratio of a row of areas laid along a side of length `side`
+  function worst(areas, side) {
+    const s = areas.reduce((a, b) => a + b, 0);
+    const max = Math.max(...areas);
+    const min = Math.min(...areas);
+    return Math.max((side * side * max) / (s * s), (s * s) / (side * side * min));
+  }
+
+  // items: [{size}] sorted by size descending (all > 0); returns [{item, x, y, w, h}]
+  function squarify(items, x, y, w, h) {
+    const total = items.reduce((a, it) => a + it.size, 0);
+    const areas = items.map((it) => (it.size * w * h) / total);
+    const out = [];
+    let i = 0;
+    while (i < items.length) {
+      const side = Math.min(w, h);
+      let j = i + 1;
+      while (j < items.length && worst(areas.slice(i, j + 1), side) <= worst(areas.slice(i, j), side)) j++;
+      const s = areas.slice(i, j).reduce((a, b) => a + b, 0);
+      if (w >= h) {
+        const cw = s / h;
+        let yy = y;
+        for (let k = i; k < j; k++) {
+          out.push({ item: items[k], x: x, y: yy, w: cw, h: areas[k] / cw });
+          yy += areas[k] / cw;
+        }
+        x += cw;
+        w -= cw;
+      } else {
+        const rh = s / w;
+        let xx = x;
+        for (let k = i; k < j; k++) {
+          out.push({ item: items[k], x: xx, y: y, w: areas[k] / rh, h: rh });
+          xx += areas[k] / rh;
+        }
+        y += rh;
+        h -= rh;
+      }
+      i = j;
+    }
+    return out;
+  }
+
+  function fmt(v) {
+    if (v >= 1e6) return (v / 1e6).toFixed(1) + 'M';
+    if (v >= 1e4) return (v / 1e3).toFixed(0) + 'k';
+    return String(Math.round(v * 100) / 100);
+  }
+
+  function start(doc) {
+    const keys = doc.keys || [];
+    const idx = {};
+    keys.forEach((k, i) => { idx[k] = i; });
+    const val = (node, key) => (idx[key] === undefined ? 0 : node[1][idx[key]] || 0);
+    const coverage = idx.stmts !== undefined && val(doc.tree, 'stmts') > 0;
+    const sizeKeys = ['loc', 'files', 'stmts', 'complexity_sum', 'functions'].filter((k) => val(doc.tree, k) > 0);
+    if (!sizeKeys.length) {
+      container.textContent = 'No per-directory metrics.';
+      return;
+    }
+    let sizeKey = sizeKeys[0];
+    const path = [doc.tree];
+
+    function color(node) {
+      let ratio;
+      if (coverage) {
+        const stmts = val(node, 'stmts');
+        if (!stmts) return '#c8c8c8';
+        ratio = val(node, 'covered') / stmts;
+      } else if (idx.tests !== undefined) {
+        const loc = val(node, 'loc');
+        if (!loc) return '#c8c8c8';
+        ratio = Math.min(1, val(node, 'tests') / loc * 100 / 5);
+      } else {
+        return '#8fb3d9';
+      }
+      return 'hsl(' + Math.round(ratio * 120) + ',55%,' + (node.length > 2 ? 55 : 70) + '%)';
+    }
+
+    function title(node, name) {
+      const lines = [name];
+      keys.forEach((k) => {
+        if (val(node, k)) lines.push((LABELS[k] || k) + ': ' + fmt(val(node, k)));
+      });
+      if (coverage && val(node, 'stmts')) lines.push('Coverage: ' + (val(node, 'covered') / val(node, 'stmts') * 100).toFixed(1) + '%');
+      return lines.join('\n');
+    }
+
+    function render() {
+      container.textContent = '';
+      const bar = el('div', 'margin:0 0 6px;font-size:13px');
+      path.forEach((node, i) => {
+        const name = i === 0 ? '(root)' : node[0];
+        if (i) bar.appendChild(document.createTextNode(' / '));
+        if (i === path.length - 1) {
+          bar.appendChild(el('strong', '', name));
+        } else {
+          const a = el('a', 'cursor:pointer', name);
+          a.href = '#';
+          a.onclick = (e) => {
+            e.preventDefault();
+            path.length = i + 1;
+            render();
+          };
+          bar.appendChild(a);
+        }
+      });
+      const select = el('select', 'margin-left:12px');
+      sizeKeys.forEach((k) => {
+        const o = el('option', '', 'Size: ' + (LABELS[k] || k));
+        o.value = k;
+        o.selected = k === sizeKey;
+        select.appendChild(o);
+      });
+      select.onchange = () => {
+        sizeKey = select.value;
+        render();
+      };
+      bar.appendChild(select);
+      container.appendChild(bar);
+
+      const current = path[path.length - 1];
+      const children = (current[2] || []).filter((c) => val(c, sizeKey) > 0);
+      children.sort((a, b) => val(b, sizeKey) - val(a, sizeKey));
+      const items = children.slice(0, MAX_TILES).map((c) => ({ node: c, size: val(c, sizeKey) }));
+      const rest = children.slice(MAX_TILES).reduce((a, c) => a + val(c, sizeKey), 0);
+      if (rest > 0) items.push({ node: null, size: rest, more: children.length - MAX_TILES });
+      const width = container.clientWidth || 800;
+      const area = el('div', 'position:relative;width:100%;height:' + HEIGHT + 'px;font:11px sans-serif');
+      if (!items.length) area.textContent = 'Nothing to show for this metric.';
+      squarify(items, 0, 0, width, HEIGHT).forEach((r) => {
+        const node = r.item.node;
+        const dir = node && node.length > 2;
+        const tile = el('div', 'position:absolute;box-sizing:border-box;overflow:hidden;border:1px solid #fff;padding:2px;' +
+          'left:' + (r.x / width * 100) + '%;top:' + r.y + 'px;width:' + (r.w / width * 100) + '%;height:' + r.h + 'px;' +
+          'background:' + (node ? color(node) : '#e0e0e0') + (dir ? ';cursor:pointer' : ''));
+        if (node) {
+          tile.title = title(node, node[0] + (dir ? '/' : ''));
+          if (r.w > 40 && r.h > 14) tile.textContent = node[0] + (dir ? '/' : '') + ' ' + fmt(r.item.size);
+          if (dir) {
+            tile.onclick = () => {
+              path.push(node);
+              render();
+            };
+          }
+        } else {
+          tile.title = r.item.more + ' smaller entries';
+          if (r.w > 40 && r.h > 14) tile.textContent = '+' + r.item.more + ' more';
+        }
+        area.appendChild(tile);
+      });
+      container.appendChild(area);
+    }
+
+    render();
+  }
+
+  function load() {
+    fetch(base + 'tree.json')
+      .then((r) => r.json())
+      .then(start)
+      .catch(() => {
+        container.textContent = 'Failed to load directory treemap.';
+      });
+  }
+
+  if (!('IntersectionObserver' in window)) return load();
+  const observer = new IntersectionObserver((entries) => {
+    if (entries.some((e) => e.isIntersecting)) {
+      observer.disconnect();
+      load();
+    }
+  });
+  observer.observe(container);
+})();
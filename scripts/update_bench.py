@@ -4,24 +4,37 @@
 Expects bench.out already produced in CWD.
 Stores JSON time series in a dedicated branch (BENCH_BRANCH), but this script
 assumes caller has fetched repository and has auth.
+
+Every entry is tagged with the machine class of the run and the run's full
+environment fingerprint is appended to bench/environments.json (bench_env.py).
+BENCH_REFERENCE names a benchmark whose ns/op every entry is also divided by
+(`normalized`), so series stay comparable across machine classes.
 """
 from __future__ import annotations
 
 import json
 import os
 import pathlib
+import statistics
 import subprocess
 import sys
 from datetime import datetime, timezone
 
+from assets import write_atomic  # published copies may be hardlinks
+from pipeline_trace import count, log, span
+import bench_env
+import schema_validator
+
 BENCH_BRANCH = os.environ.get('BENCH_BRANCH', 'bench-data')
 TOKEN = os.environ.get('TOKEN')
+REFERENCE = os.environ.get('BENCH_REFERENCE', '').strip()
 
 ROOT = pathlib.Path.cwd()
 WORKTREE = ROOT / 'bench_history_wt'
 DATA_DIR = ROOT / 'bench'
 OUT_SERIES = DATA_DIR / 'data'
 SUMMARY = DATA_DIR / 'summary.json'
+ENVIRONMENTS = DATA_DIR / 'environments.json'
 BENCH_OUT = ROOT / 'bench.out'
 
 
@@ -34,18 +47,25 @@ def run(cmd: list[str], check=True, capture=False):
     try:
         proc = subprocess.run(cmd, **kwargs)
     except FileNotFoundError:
-        print(f"Warning: command not found: {cmd[0]}")
+        log('warning', f"command not found: {cmd[0]}")
         return subprocess.CompletedProcess(cmd, 0, '', '') if capture else subprocess.CompletedProcess(cmd, 0)
     if check and proc.returncode != 0:
         raise RuntimeError(f"Command failed: {' '.join(cmd)}")
     return proc
 
 
-def parse_bench() -> dict[str, dict[str, float]]:
-    if not BENCH_OUT.exists():
+def series_file_name(name: str) -> str:
+    """History file name for a benchmark (also the stem used for its profiles)."""
+    return name.replace('/', '_') + '.json'
+
+
+def parse_samples(path: pathlib.Path | None = None) -> dict[str, dict[str, list[float]]]:
+    """Every sample in bench.out (one per -count / interleaved round), per benchmark and unit."""
+    path = path or BENCH_OUT
+    if not path.exists():
         return {}
-    results: dict[str, dict[str, float]] = {}
-    for line in BENCH_OUT.read_text(encoding='utf-8').splitlines():
+    samples: dict[str, dict[str, list[float]]] = {}
+    for line in path.read_text(encoding='utf-8').splitlines():
         if not line.startswith('Benchmark'):
             continue
         parts = line.split()
@@ -66,8 +86,17 @@ def parse_bench() -> dict[str, dict[str, float]]:
                 elif tok == 'allocs/op':
                     rec['allocs_per_op'] = val
         if rec:
-            results[name] = rec
-    return results
+            bucket = samples.setdefault(name, {})
+            for key, val in rec.items():
+                bucket.setdefault(key, []).append(val)
+    return samples
+
+
+def parse_bench() -> dict[str, dict[str, float]]:
+    """Parse bench.out; repeated samples of a benchmark (-count / interleaved
+    rounds from run_bench.py) are reduced to their per-unit median."""
+    samples = parse_samples()
+    return {name: {key: statistics.median(vals) for key, vals in rec.items()} for name, rec in samples.items()}
 
 
 def main() -> int:
@@ -84,7 +113,7 @@ def main() -> int:
             created_branch = True
             run(['git', 'worktree', 'add', '-f', str(WORKTREE), BENCH_BRANCH], check=False)
     else:
-        print(f"Info: history branch '{BENCH_BRANCH}' not found; skipping benchmark history persistence.")
+        log('info', f"history branch '{BENCH_BRANCH}' not found; skipping benchmark history persistence.")
 
     DATA_DIR.mkdir(exist_ok=True)
     OUT_SERIES.mkdir(parents=True, exist_ok=True)
@@ -98,42 +127,68 @@ def main() -> int:
             except Exception:
                 pass
 
-    parsed = parse_bench()
-    if not parsed:
+    with span('parse bench.out'):
+        raw = parse_samples()
+    if not raw:
         return 0
+    parsed = {name: {key: statistics.median(vals) for key, vals in rec.items()} for name, rec in raw.items()}
 
     timestamp = datetime.now(timezone.utc).isoformat()
-    summary = {'generated_at': timestamp, 'benchmarks': []}
+    env = bench_env.fingerprint(BENCH_OUT)
+    ref_ns = bench_env.reference_ns(parsed, REFERENCE)
+    if REFERENCE and ref_ns is None:
+        log('warning', f"reference benchmark '{REFERENCE}' not in bench.out; storing unnormalized results")
+    summary = {'generated_at': timestamp, 'machine': env['machine'], 'environment': env, 'benchmarks': []}
+    if ref_ns is not None:
+        summary['reference'] = REFERENCE
+        env = {**env, 'reference': REFERENCE, 'reference_ns': ref_ns}
+    log('info', f"benchmark machine class {env['machine']} ({env['cpu']}, {env['cores']} cores, {env['go'] or 'go ?'})")
+    entry_ok = schema_validator.load(schema_validator.schema_file('bench_series.schema.json'), items=True)
     for name, rec in sorted(parsed.items()):
-        file_safe = name.replace('/', '_') + '.json'
+        file_safe = series_file_name(name)
         series_file = OUT_SERIES / file_safe
-        series = []
-        if series_file.exists():
-            try:
-                series = json.loads(series_file.read_text(encoding='utf-8'))
-            except Exception:
-                series = []
-        entry = {'time': timestamp, **rec}
+        with span(f'validate {file_safe}'):
+            series = schema_validator.read_series(series_file, entry_ok)
+        entry = {'time': timestamp, **rec, 'machine': env['machine']}
+        if ref_ns is not None and 'ns_per_op' in rec:
+            entry['normalized'] = round(rec['ns_per_op'] / ref_ns, 6)
+        if len(raw[name].get('ns_per_op', [])) > 1:
+            entry['samples'] = raw[name]['ns_per_op']  # lets bench_compare.py test PRs against this run
         series.append(entry)
-        series_file.write_text(json.dumps(series, indent=2), encoding='utf-8')
+        with span(f'write {file_safe}', points=len(series)):
+            text = json.dumps(series, indent=2)
+            write_atomic(series_file, text)
+        count('history.files_written')
+        count('bytes_written', len(text))
         summary['benchmarks'].append({'name': name, 'file': file_safe})
-    SUMMARY.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    write_atomic(SUMMARY, json.dumps(summary, indent=2))
+    env_ok = schema_validator.load(schema_validator.schema_file('bench_env.schema.json'), items=True)
+    environments = schema_validator.read_series(ENVIRONMENTS, env_ok)
+    environments.append({'time': timestamp, **env})
+    write_atomic(ENVIRONMENTS, json.dumps(environments, indent=2))
 
     # Commit changes in worktree if any
-    if created_branch and WORKTREE.exists():
-        try:
-            os.chdir(WORKTREE)
-        except Exception:
-            return 0
-        target_bench = WORKTREE / 'bench'
-        target_bench.mkdir(exist_ok=True)
-        run(['rsync', '-aL', str(DATA_DIR) + '/', str(target_bench) + '/'], check=False)
-        run(['git', 'add', 'bench'], check=False)
-        if subprocess.run(['git', 'diff', '--cached', '--quiet']).returncode != 0:
-            run(['git', 'commit', '-m', 'Update benchmark history'], check=False)
-            run(['git', 'push', 'origin', BENCH_BRANCH], check=False)
+    if created_branch:
+        commit_history('Update benchmark history')
     return 0
 
 
+def commit_history(message: str) -> None:
+    """Sync DATA_DIR into the history worktree and push it when anything changed."""
+    if not WORKTREE.exists():
+        return
+    try:
+        os.chdir(WORKTREE)
+    except Exception:
+        return
+    target_bench = WORKTREE / 'bench'
+    target_bench.mkdir(exist_ok=True)
+    run(['rsync', '-aL', str(DATA_DIR) + '/', str(target_bench) + '/'], check=False)
+    run(['git', 'add', 'bench'], check=False)
+    if subprocess.run(['git', 'diff', '--cached', '--quiet']).returncode != 0:
+        run(['git', 'commit', '-m', message], check=False)
+        run(['git', 'push', 'origin', BENCH_BRANCH], check=False)
+
+
 if __name__ == '__main__':  # pragma: no cover
     sys.exit(main())
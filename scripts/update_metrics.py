@@ -12,6 +12,10 @@ import pathlib
 import subprocess
 from datetime import datetime, timezone
 
+from assets import write_atomic  # published copies may be hardlinks
+from pipeline_trace import count, log, span
+import schema_validator
+
 ROOT = pathlib.Path.cwd()
 METRICS_BRANCH = os.environ.get('METRICS_BRANCH', 'bench-data')
 TOKEN = os.environ.get('TOKEN')
@@ -26,7 +30,7 @@ def run(cmd: list[str], check=True):
     try:
         proc = subprocess.run(cmd)
     except FileNotFoundError:
-        print(f"Warning: command not found: {cmd[0]}")
+        log('warning', f"command not found: {cmd[0]}")
         return subprocess.CompletedProcess(cmd, 0)
     if check and proc.returncode != 0:
         raise RuntimeError('command failed: ' + ' '.join(cmd))
@@ -48,7 +52,7 @@ def main() -> int:
             subprocess.run(['git', 'worktree', 'add', '-f', str(WORKTREE), METRICS_BRANCH])
             created_branch = True
     else:
-        print(f"Info: history branch '{METRICS_BRANCH}' not found; skipping metrics history persistence.")
+        log('info', f"history branch '{METRICS_BRANCH}' not found; skipping metrics history persistence.")
 
     METRICS_DIR.mkdir(exist_ok=True)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -57,16 +61,25 @@ def main() -> int:
     timestamp = datetime.now(timezone.utc).isoformat()
     summary = {'generated_at': timestamp, 'metrics': []}
 
+    entry_ok = schema_validator.load(schema_validator.schema_file('series.schema.json'), items=True)
     for key, value in sorted(snapshot.items()):
         series_file = DATA_DIR / f'{key}.json'
-        try:
-            series = json.loads(series_file.read_text(encoding='utf-8')) if series_file.exists() else []
-        except Exception:
-            series = []
-        series.append({'time': timestamp, 'value': value})
-        series_file.write_text(json.dumps(series, indent=2), encoding='utf-8')
+        prev = WORKTREE / 'metrics' / 'data' / f'{key}.json'  # history persisted on the branch
+        with span(f'validate {key}.json'):
+            series = schema_validator.read_series(series_file if series_file.exists() else prev, entry_ok)
+        entry = {'time': timestamp, 'value': value}
+        err = entry_ok(entry) if entry_ok is not None else None
+        if err:
+            log('warning', f'skipping {key}: {err}')
+            continue
+        series.append(entry)
+        with span(f'write {key}.json', points=len(series)):
+            text = json.dumps(series, indent=2)
+            write_atomic(series_file, text)
+        count('history.files_written')
+        count('bytes_written', len(text))
         summary['metrics'].append({'name': key, 'file': f'{key}.json'})
-    SUMMARY.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    write_atomic(SUMMARY, json.dumps(summary, indent=2))
 
     # Commit via worktree
     if created_branch and WORKTREE.exists():
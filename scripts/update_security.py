@@ -3,6 +3,9 @@
 from __future__ import annotations
 import json, os, pathlib, subprocess
 from datetime import datetime, timezone
+from assets import write_atomic  # published copies may be hardlinks
+from pipeline_trace import count, log, span
+import schema_validator
 ROOT=pathlib.Path.cwd()
 SNAP=ROOT/'site_src'/'security.json'
 BRANCH=os.environ.get('METRICS_BRANCH','bench-data')
@@ -16,7 +19,7 @@ def run(cmd):
     try:
         subprocess.run(cmd, check=False)
     except FileNotFoundError:
-        print(f"Warning: command not found: {cmd[0]}")
+        log('warning', f"command not found: {cmd[0]}")
 
 def main()->int:
     if not SNAP.exists(): return 0
@@ -35,14 +38,21 @@ def main()->int:
     flat['total_vulns']=sum(sev.values()) if sev else 0
     if snap.get('code_scanning'): flat['code_scanning_open']=snap['code_scanning'].get('open',0)
     if snap.get('secret_scanning'): flat['secret_scanning_open']=snap['secret_scanning'].get('open',0)
+    alerts=snap.get('alerts') or {}
+    if alerts.get('mean_time_to_fix_days') is not None: flat['mean_time_to_fix_days']=alerts['mean_time_to_fix_days']
+    if 'fixed_last_30d' in alerts: flat['fixed_last_30d']=alerts['fixed_last_30d']
+    entry_ok=schema_validator.load(schema_validator.schema_file('series.schema.json'), items=True)
     for key,value in sorted(flat.items()):
         f=DATA_DIR/f'{key}.json'
-        try: series=json.loads(f.read_text()) if f.exists() else []
-        except Exception: series=[]
+        prev=WORKTREE/'security'/'data'/f'{key}.json'  # history persisted on the branch
+        src=f if f.exists() else prev
+        with span(f'validate {key}.json'): series=schema_validator.read_series(src, entry_ok)
         series.append({'time':ts,'value':value})
-        f.write_text(json.dumps(series, indent=2))
+        with span(f'write {key}.json', points=len(series)):
+            text=json.dumps(series, indent=2); write_atomic(f, text)
+        count('history.files_written'); count('bytes_written', len(text))
         summary['metrics'].append({'name':key,'file':f'{key}.json'})
-    SUMMARY.write_text(json.dumps(summary, indent=2))
+    write_atomic(SUMMARY, json.dumps(summary, indent=2))
     import os as _os; _os.chdir(WORKTREE)
     t=WORKTREE/'security'; t.mkdir(exist_ok=True)
     run(['rsync','-aL', str(SEC_DIR)+'/', str(t)+'/'])
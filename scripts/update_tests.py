@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Maintain per-test duration and outcome history, like bench/metrics history.
+
+Reads test-results.jsonl (one line per test, written by src/gotest.js) and
+appends this run to test_history/history.json, persisted on the history branch
+(METRICS_BRANCH) under test_history/. The file is columnar to stay small: runs[i]
+holds the run's time and commit, and every test keeps one duration (ms, null
+when it did not run) and one outcome character per run:
+
+    {"version": 1, "runs": [{"time": ..., "sha": ...}, ...],
+     "tests": {"<package> <Test>": {"d": [12, null, 15], "o": "P.F"}}}
+
+Outcomes: P pass, F fail, S skip, . not run. Only the last TESTS_HISTORY_RUNS
+runs (default 50) are kept; tests absent from all of them are dropped.
+
+gen_tests_md.py uses slowest(), trending() and flaky() for the Tests page.
+
+Env:
+    METRICS_BRANCH (default bench-data)   TESTS_HISTORY_RUNS (default 50)
+    TEST_RESULTS (default test-results.jsonl)
+"""
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+from assets import write_atomic
+from pipeline_trace import count, log, span
+import schema_validator
+
+ROOT = pathlib.Path.cwd()
+METRICS_BRANCH = os.environ.get('METRICS_BRANCH', 'bench-data')
+TOKEN = os.environ.get('TOKEN')
+WORKTREE = ROOT / 'tests_history_wt'
+RESULTS = pathlib.Path(os.environ.get('TEST_RESULTS', 'test-results.jsonl'))
+TESTS_DIR = ROOT / 'test_history'  # not tests/: projects keep their own tests there
+HISTORY = TESTS_DIR / 'history.json'
+MAX_RUNS = int(os.environ.get('TESTS_HISTORY_RUNS', '50') or 50)
+OUTCOME = {'pass': 'P', 'fail': 'F', 'skip': 'S'}
+
+
+def run(cmd: list[str], check=True):
+    try:
+        proc = subprocess.run(cmd)
+    except FileNotFoundError:
+        log('warning', f"command not found: {cmd[0]}")
+        return subprocess.CompletedProcess(cmd, 0)
+    if check and proc.returncode != 0:
+        raise RuntimeError('command failed: ' + ' '.join(cmd))
+    return proc
+
+
+def empty() -> dict:
+    return {'version': 1, 'runs': [], 'tests': {}}
+
+
+def load_history(path: pathlib.Path) -> dict:
+    """Stored history, or an empty one when missing or invalid against test_history.schema.json."""
+    try:
+        text = path.read_text(encoding='utf-8')
+    except OSError:
+        return empty()
+    return parse_history(text, str(path))
+
+
+def parse_history(text: str | None, source: str = 'test history') -> dict:
+    try:
+        data = json.loads(text) if text else None
+    except ValueError:
+        data = None
+    if data is None:
+        return empty()
+    validator = schema_validator.load(schema_validator.schema_file('test_history.schema.json'))
+    err = validator(data) if validator is not None else None
+    if err:
+        log('warning', f'ignoring invalid test history {source}: {err}')
+        return empty()
+    return data
+
+
+def read_results(path: pathlib.Path) -> dict[str, tuple[str, int]]:
+    """"<package> <Test>" -> (outcome char, duration ms); a test's last result wins (-count > 1)."""
+    out: dict[str, tuple[str, int]] = {}
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+                key = f"{rec['package']} {rec['test']}"
+                out[key] = (OUTCOME[rec['action']], max(0, round(float(rec.get('elapsed') or 0) * 1000)))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return out
+
+
+def append_run(history: dict, results: dict[str, tuple[str, int]], run_info: dict, max_runs: int = MAX_RUNS) -> dict:
+    """Add one run column, then keep the last max_runs columns and the tests still present in them."""
+    n = len(history['runs'])
+    tests = history['tests']
+    for key, rec in tests.items():
+        outcome, ms = results.get(key, ('.', None))
+        rec['d'].append(ms)
+        rec['o'] += outcome
+    for key, (outcome, ms) in results.items():
+        if key not in tests:
+            tests[key] = {'d': [None] * n + [ms], 'o': '.' * n + outcome}
+    history['runs'].append(run_info)
+    drop = max(0, len(history['runs']) - max_runs)
+    if drop:
+        history['runs'] = history['runs'][drop:]
+    for key in list(tests):
+        rec = tests[key]
+        if drop:
+            rec['d'] = rec['d'][drop:]
+            rec['o'] = rec['o'][drop:]
+        if not rec['o'].strip('.'):
+            del tests[key]
+    history['tests'] = dict(sorted(tests.items()))
+    return history
+
+
+def split_key(key: str) -> tuple[str, str]:
+    package, _, test = key.rpartition(' ')
+    return package, test
+
+
+def durations(rec: dict) -> list[float]:
+    return [float(d) for d, o in zip(rec['d'], rec['o']) if d is not None and o == 'P']
+
+
+def slowest(history: dict, limit: int = 20, window: int = 5) -> list[dict]:
+    """Tests by median duration of their last `window` passing runs."""
+    rows = []
+    for key, rec in history['tests'].items():
+        vals = durations(rec)
+        if vals:
+            package, test = split_key(key)
+            rows.append({'package': package, 'test': test, 'median_ms': statistics.median(vals[-window:]),
+                         'latest_ms': vals[-1], 'durations': vals})
+    rows.sort(key=lambda r: (-r['median_ms'], r['package'], r['test']))
+    return rows[:limit]
+
+
+def trending(history: dict, window: int = 5, ratio: float = 1.25, min_ms: float = 20.0, limit: int = 20) -> list[dict]:
+    """Tests whose median of the last `window` passing runs grew by `ratio` (and min_ms) over the window before."""
+    rows = []
+    for key, rec in history['tests'].items():
+        vals = durations(rec)
+        if len(vals) < 2 * window:
+            continue
+        before = statistics.median(vals[-2 * window:-window])
+        recent = statistics.median(vals[-window:])
+        if recent - before >= min_ms and recent >= before * ratio:
+            package, test = split_key(key)
+            rows.append({'package': package, 'test': test, 'before_ms': before, 'recent_ms': recent,
+                         'change_pct': round((recent - before) / before * 100, 1) if before else None,
+                         'durations': vals})
+    rows.sort(key=lambda r: (-(r['recent_ms'] - r['before_ms']), r['package'], r['test']))
+    return rows[:limit]
+
+
+def flaky(history: dict, min_flips: int = 2, limit: int = 20) -> list[dict]:
+    """Tests that flipped between pass and fail at least min_flips times across the stored runs."""
+    rows = []
+    for key, rec in history['tests'].items():
+        seq = [o for o in rec['o'] if o in 'PF']
+        flips = sum(1 for a, b in zip(seq, seq[1:]) if a != b)
+        if flips >= min_flips:
+            package, test = split_key(key)
+            rows.append({'package': package, 'test': test, 'flips': flips, 'failures': seq.count('F'),
+                         'runs': len(seq), 'outcomes': rec['o']})
+    rows.sort(key=lambda r: (-r['flips'], -r['failures'], r['package'], r['test']))
+    return rows[:limit]
+
+
+def main() -> int:
+    if not RESULTS.exists():
+        log('info', f'no {RESULTS}; skipping test history')
+        return 0
+    if TOKEN:
+        run(['git', 'config', '--global', 'user.name', 'github-actions'], check=False)
+        run(['git', 'config', '--global', 'user.email', 'github-actions@github.com'], check=False)
+    ls = subprocess.run(['git', 'ls-remote', '--heads', 'origin', METRICS_BRANCH], capture_output=True, text=True)
+    created_branch = False
+    if ls.stdout.strip():
+        fetch_proc = subprocess.run(['git', 'fetch', 'origin', f'{METRICS_BRANCH}:{METRICS_BRANCH}'])
+        if fetch_proc.returncode == 0:
+            subprocess.run(['git', 'worktree', 'add', '-f', str(WORKTREE), METRICS_BRANCH])
+            created_branch = True
+    else:
+        log('info', f"history branch '{METRICS_BRANCH}' not found; skipping test history persistence.")
+
+    prev = WORKTREE / 'test_history' / 'history.json'  # history persisted on the branch
+    with span('load test history'):
+        history = load_history(HISTORY if HISTORY.exists() else prev)
+    with span('read test results'):
+        results = read_results(RESULTS)
+    if not results:
+        return 0
+    sha = os.environ.get('GITHUB_SHA', '')
+    run_info = {'time': datetime.now(timezone.utc).isoformat(), **({'sha': sha[:12]} if sha else {})}
+    append_run(history, results, run_info)
+    text = json.dumps(history, separators=(',', ':'))
+    write_atomic(HISTORY, text + '\n')
+    count('tests.history_tests', len(history['tests']))
+    count('bytes_written', len(text))
+
+    if created_branch and WORKTREE.exists():
+        try:
+            os.chdir(WORKTREE)
+        except Exception:
+            return 0
+        target = WORKTREE / 'test_history'
+        target.mkdir(exist_ok=True)
+        run(['rsync', '-aL', str(TESTS_DIR) + '/', str(target) + '/'], check=False)
+        run(['git', 'add', 'test_history'], check=False)
+        if subprocess.run(['git', 'diff', '--cached', '--quiet']).returncode != 0:
+            run(['git', 'commit', '-m', 'Update test history'], check=False)
+            run(['git', 'push', 'origin', METRICS_BRANCH], check=False)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Local watch-and-serve mode: regenerate only the site stages a change affects.
+
+Instead of re-running the whole action (tests, benchmarks, every script, mkdocs
+build) this watches the project and maps each change to the stages that depend
+on it:
+
+    docs/ kb/ specs/   gen_site_structure.py (SITE_STAGES=docs)
+    README.md          gen_site_structure.py (SITE_STAGES=home)
+    *.go               gen_site_structure.py for that package's reference page
+                       (SITE_STAGES=reference, REFERENCE_PACKAGES=<dir>), then
+                       collect_metrics.py + gen_metrics_md.py
+    cover.out          go tool cover -html, then gen_coverage_md.py
+
+Changes are picked up with inotify (via ctypes, Linux) and a polling fallback;
+a burst of events (editor save = write + rename) is debounced into one batch.
+site_src is served with live reload: `mkdocs serve --dirtyreload` when mkdocs
+is installed, else a small built-in server that renders pages with
+render_site.py and reloads the browser whenever a batch changed site files
+(.site_changes.json).
+
+Flags:
+    --root (default .)  --host (default 127.0.0.1)  --port (default 8000, env WATCH_PORT)
+    --server auto|mkdocs|builtin|none (default auto)
+    --poll          force the polling watcher   --interval  polling period (default 0.3s)
+    --skip-initial  do not run every stage once at startup
+"""
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import html
+import http.server
+import json
+import os
+import pathlib
+import posixpath
+import select
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Iterable
+
+from collectors import SKIP_DIRS
+from pipeline_trace import log
+import render_site
+
+SCRIPTS = pathlib.Path(__file__).resolve().parent
+DOC_DIRS = ('docs', 'kb', 'specs')
+DEBOUNCE = 0.05
+IGNORED_DIRS = SKIP_DIRS | {'bench_history_wt', 'metrics_history_wt', 'tests_history_wt', 'test-shards', '.pytest_cache', '__pycache__'}
+
+IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x8, 0x40, 0x80
+IN_CREATE, IN_DELETE, IN_DELETE_SELF = 0x100, 0x200, 0x400
+IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT = struct.Struct('iIII')
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--root', default='.', help='Project root (default .)')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=int(os.environ.get('WATCH_PORT', '8000') or 8000))
+    p.add_argument('--server', choices=('auto', 'mkdocs', 'builtin', 'none'), default='auto')
+    p.add_argument('--poll', action='store_true', help='Use the polling watcher even where inotify works')
+    p.add_argument('--interval', type=float, default=0.3, help='Polling period in seconds (default 0.3)')
+    p.add_argument('--skip-initial', action='store_true', help='Do not run every stage once at startup')
+    return p.parse_args(argv)
+
+
+def plan(changed: Iterable[str], full: bool = False) -> list[tuple[str, list[str], dict[str, str]]]:
+    """Ordered (label, argv, env) steps for the changed root-relative POSIX paths."""
+    site: set[str] = {'home', 'reference', 'docs'} if full else set()
+    packages: set[str] = set()
+    metrics = coverage = full
+    for rel in changed:
+        top = rel.split('/', 1)[0]
+        if top in DOC_DIRS:
+            site.add('docs')
+        elif rel == 'README.md':
+            site.add('home')
+        elif rel.endswith('.go'):
+            site.add('reference')
+            packages.add(posixpath.dirname(rel) or '.')
+            metrics = True
+        elif rel == 'cover.out':
+            coverage = True
+    py = sys.executable
+    steps: list[tuple[str, list[str], dict[str, str]]] = []
+    if site:
+        env = {'SITE_STAGES': ','.join(sorted(site)), 'REFERENCE_PACKAGES': '' if full else ','.join(sorted(packages))}
+        steps.append(('gen_site_structure.py', [py, str(SCRIPTS / 'gen_site_structure.py')], env))
+    if metrics:
+        env = {'METRICS': os.environ.get('METRICS') or 'coverage,tests,files,loc'}
+        steps.append(('collect_metrics.py', [py, str(SCRIPTS / 'collect_metrics.py')], env))
+        steps.append(('gen_metrics_md.py', [py, str(SCRIPTS / 'gen_metrics_md.py')], {}))
+    if coverage:
+        if shutil.which('go'):
+            steps.append(('go tool cover', ['go', 'tool', 'cover', '-html', 'cover.out', '-o', 'cover.html'], {}))
+        steps.append(('gen_coverage_md.py', [py, str(SCRIPTS / 'gen_coverage_md.py')], {}))
+    return steps
+
+
+def run_steps(root: pathlib.Path, steps: list[tuple[str, list[str], dict[str, str]]]) -> list[str]:
+    """Run steps in root as one site_output run; returns the site paths they changed."""
+    run_id = f'watch-{os.getpid()}-{time.monotonic_ns()}'
+    for label, argv, env in steps:
+        start = time.perf_counter()
+        proc = subprocess.run(argv, cwd=root, env={**os.environ, **env, 'SITE_RUN_ID': run_id})
+        status = '' if proc.returncode == 0 else f' (exit {proc.returncode})'
+        log('info', f'{label} {time.perf_counter() - start:.2f}s{status}')
+    try:
+        manifest = json.loads((root / '.site_changes.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return []
+    return manifest.get('changed', []) if manifest.get('run_id') == run_id else []
+
+
+def _walk_dirs(root: pathlib.Path, top: pathlib.Path) -> Iterable[pathlib.Path]:
+    for dirpath, dirnames, _ in os.walk(top):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+        yield pathlib.Path(dirpath)
+
+
+class PollingWatcher:
+    """mtime/size snapshots of every watched file, diffed every interval."""
+
+    def __init__(self, root: pathlib.Path, interval: float = 0.3):
+        self.root = root
+        self.interval = interval
+        self.state = self._snapshot()
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        snap = {}
+        for d in _walk_dirs(self.root, self.root):
+            try:
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            for e in entries:
+                try:
+                    if e.is_file(follow_symlinks=False):
+                        st = e.stat(follow_symlinks=False)
+                        snap[pathlib.Path(e.path).relative_to(self.root).as_posix()] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+        return snap
+
+    def changes(self, timeout: float) -> set[str] | None:
+        time.sleep(min(timeout, self.interval))
+        new = self._snapshot()
+        old, self.state = self.state, new
+        return {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Recursive inotify watches (one per directory, added as directories appear)."""
+
+    def __init__(self, root: pathlib.Path):
+        name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(name, use_errno=True)
+        for fn in ('inotify_init1', 'inotify_add_watch'):
+            if not hasattr(self.libc, fn):
+                raise OSError(f'{fn} not available')
+        self.root = root
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs: dict[int, pathlib.Path] = {}
+        self._watch_tree(root)
+
+    def _watch_tree(self, top: pathlib.Path) -> set[str]:
+        """Watch top and its subdirectories; returns files already inside (created before the watch)."""
+        found = set()
+        for d in _walk_dirs(self.root, top):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd >= 0:
+                self.dirs[wd] = d
+            if d != self.root:
+                found.update(p.relative_to(self.root).as_posix() for p in d.iterdir() if p.is_file())
+        return found
+
+    def _read(self) -> tuple[set[str], bool]:
+        paths: set[str] = set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return paths, False
+        off = 0
+        overflow = False
+        while off + EVENT.size <= len(buf):
+            wd, mask, _, length = EVENT.unpack_from(buf, off)
+            name = buf[off + EVENT.size:off + EVENT.size + length].rstrip(b'\0')
+            off += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            base = self.dirs.get(wd)
+            if base is None:
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            if not name:
+                continue
+            path = base / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if path.name in IGNORED_DIRS:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    paths.update(self._watch_tree(path))
+                continue
+            paths.add(path.relative_to(self.root).as_posix())
+        return paths, overflow
+
+    def changes(self, timeout: float) -> set[str] | None:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        paths, overflow = self._read()
+        # collect the rest of the burst (editors write a temp file and rename it)
+        while select.select([self.fd], [], [], DEBOUNCE)[0]:
+            more, more_overflow = self._read()
+            paths |= more
+            overflow = overflow or more_overflow
+        return None if overflow else paths
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(root: pathlib.Path, poll: bool = False, interval: float = 0.3):
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            log('info', f'inotify unavailable ({e}); polling every {interval}s')
+    return PollingWatcher(root, interval)
+
+
+class Reloader:
+    """Generation counter the built-in server's pages long-poll for."""
+
+    def __init__(self):
+        self.generation = 0
+        self.cond = threading.Condition()
+
+    def bump(self) -> None:
+        with self.cond:
+            self.generation += 1
+            self.cond.notify_all()
+
+    def wait(self, seen: int, timeout: float = 25.0) -> int:
+        with self.cond:
+            self.cond.wait_for(lambda: self.generation != seen, timeout)
+            return self.generation
+
+
+RELOAD_JS = ("<script>(function(v){function poll(){fetch('/__livereload?v='+v).then(function(r){return r.text()})"
+             ".then(function(t){if(t!==String(v))location.reload();else poll()})"
+             ".catch(function(){setTimeout(poll,1000)})}poll()})(%d);</script>")
+
+
+def preview(site: pathlib.Path, target: pathlib.Path, text: str) -> str:
+    """A page rendered by render_site.py with the current nav (plain text if mkdocs.yml is missing)."""
+    config_path = site.parent / 'mkdocs.yml'
+    if not config_path.exists():
+        return f'<!doctype html><meta charset="utf-8"><title>{html.escape(target.name)}</title>' \
+               f'<pre style="white-space:pre-wrap">{html.escape(text)}</pre>'
+    config = render_site.read_config(config_path)
+    config['titles'] = render_site.nav_titles(config['nav'])
+    return render_site.page_html(config, target.relative_to(site).as_posix(), text)
+
+
+def make_handler(site: pathlib.Path, reloader: Reloader):
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, directory=str(site), **kw)
+
+        def log_message(self, *a):  # quiet; the watcher prints stage timings
+            pass
+
+        def _send(self, body: bytes, ctype: str) -> None:
+            self.send_response(200)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            route, _, query = self.path.partition('?')
+            if route == '/__livereload':
+                seen = int(query.split('v=', 1)[-1] or 0) if 'v=' in query else 0
+                self._send(str(reloader.wait(seen)).encode(), 'text/plain')
+                return
+            if route == f'/{render_site.ASSET_DIR}/site.css':
+                self._send(render_site.CSS.encode('utf-8'), 'text/css')
+                return
+            target = pathlib.Path(self.translate_path(route))
+            if target.is_dir() and (target / 'index.md').exists() and not (target / 'index.html').exists():
+                target = target / 'index.md'
+            if target.suffix == '.html' and not target.exists() and target.with_suffix('.md').is_file():
+                target = target.with_suffix('.md')  # render_site.py links pages as .html
+            if target.suffix in ('.md', '.html') and target.is_file():
+                text = target.read_text(encoding='utf-8', errors='replace')
+                if target.suffix == '.md':
+                    text = preview(site, target, text)
+                self._send((text + RELOAD_JS % reloader.generation).encode('utf-8'), 'text/html; charset=utf-8')
+                return
+            super().do_GET()
+
+    return Handler
+
+
+def serve(args: argparse.Namespace, root: pathlib.Path, reloader: Reloader):
+    """Start the preview server; returns a Popen (mkdocs), a server, or None."""
+    mode = args.server
+    if mode == 'auto':
+        mode = 'mkdocs' if shutil.which('mkdocs') else 'builtin'
+    if mode == 'none':
+        return None
+    if mode == 'mkdocs':
+        # mkdocs watches docs_dir (site_src) itself and live-reloads changed pages
+        return subprocess.Popen(['mkdocs', 'serve', '--dirtyreload', '-a', f'{args.host}:{args.port}'], cwd=root)
+    httpd = http.server.ThreadingHTTPServer((args.host, args.port), make_handler(root / 'site_src', reloader))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    log('info', f'serving site_src on http://{args.host}:{args.port}/ (live reload)')
+    return httpd
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    root = pathlib.Path(args.root).resolve()
+    (root / 'site_src').mkdir(exist_ok=True)
+    if not args.skip_initial:
+        run_steps(root, plan((), full=True))
+    reloader = Reloader()
+    server = serve(args, root, reloader)
+    watcher = make_watcher(root, args.poll, args.interval)
+    log('info', f'watching {root} ({type(watcher).__name__}); Ctrl-C to stop')
+    try:
+        while True:
+            changed = watcher.changes(1.0)
+            if changed is not None and not changed:
+                continue
+            steps = plan(changed or (), full=changed is None)
+            if not steps:
+                continue
+            start = time.perf_counter()
+            log('info', f"{', '.join(sorted(changed)[:5]) if changed else 'event overflow, full rebuild'}")
+            site_changed = run_steps(root, steps)
+            log('info', f'{len(site_changed)} site file(s) updated in {time.perf_counter() - start:.2f}s')
+            if site_changed:
+                reloader.bump()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if isinstance(server, subprocess.Popen):
+            server.terminate()
+        elif server is not None:
+            server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
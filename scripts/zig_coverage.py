@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Zig coverage ingestion shared by collect_metrics.py, gen_coverage_md.py and src/index.js.
+
+Reads kcov's machine-readable output instead of scraping the HTML report:
+
+  * cobertura.xml (preferred; kcov-merged/ first) - parsed with iterparse, each
+    <class> element is cleared once counted so memory stays flat;
+  * coverage.json (kcov per-file summaries);
+  * index.html - last resort, the percentage in the "Total" row only.
+
+The result (overall, per-file and per-directory rollups) is cached in
+.zig_coverage.json keyed by the source file's path, size and mtime, so every
+consumer in a run shares one parse.
+
+Usage:
+    zig_coverage.py [--dir DIR ...] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import re
+import xml.etree.ElementTree as ET
+
+from pipeline_trace import count, log, span
+
+ROOT = pathlib.Path.cwd()
+CACHE = ROOT / '.zig_coverage.json'
+SEARCH_DIRS = [
+    ROOT / 'site_src' / 'zig_coverage',
+    ROOT / 'zig-out' / 'coverage',
+    ROOT / 'zig-out' / 'coverage_html',
+    ROOT / 'zig-out' / 'docs' / 'coverage',
+    ROOT / 'zig-out' / 'doc' / 'coverage',
+]
+TOTAL_RE = re.compile(r'Total[^%]{0,200}?([0-9]+(?:\.[0-9]+)?)%', re.I | re.S)
+
+
+def find_source(dirs: list[pathlib.Path] | None = None) -> pathlib.Path | None:
+    """Best coverage artifact: cobertura.xml > coverage.json > index.html (merged reports first)."""
+    dirs = SEARCH_DIRS if dirs is None else dirs
+    for name in ('cobertura.xml', 'coverage.json', 'index.html'):
+        for d in dirs:
+            if not d.is_dir():
+                continue
+            for candidate in (d / 'kcov-merged' / name, d / name):
+                if candidate.is_file():
+                    return candidate
+            found = sorted(p for p in d.glob(f'*/{name}') if p.is_file())
+            if found:
+                return found[0]
+    return None
+
+
+def _rel(path: str) -> str:
+    p = pathlib.PurePosixPath(path.replace('\\', '/'))
+    try:
+        return p.relative_to(ROOT.resolve().as_posix()).as_posix()
+    except ValueError:
+        return p.as_posix()
+
+
+def parse_cobertura(path: pathlib.Path) -> dict[str, tuple[int, int]]:
+    """file -> (lines, covered lines); lines repeated across classes are merged."""
+    sources: list[str] = []
+    lines: dict[str, dict[int, bool]] = {}
+    for event, elem in ET.iterparse(path, events=('end',)):
+        if elem.tag == 'source' and elem.text:
+            sources.append(elem.text.strip())
+        elif elem.tag == 'class':
+            filename = elem.get('filename', '')
+            if filename and not os.path.isabs(filename) and sources:
+                filename = os.path.join(sources[0], filename)
+            seen = lines.setdefault(_rel(filename), {})
+            for line in elem.iter('line'):
+                try:
+                    number, hits = int(line.get('number', '0')), int(line.get('hits', '0'))
+                except ValueError:
+                    continue
+                seen[number] = seen.get(number, False) or hits > 0
+            elem.clear()
+    return {f: (len(v), sum(v.values())) for f, v in lines.items()}
+
+
+def parse_kcov_json(path: pathlib.Path) -> dict[str, tuple[int, int]]:
+    data = json.loads(path.read_text(encoding='utf-8'))
+    out: dict[str, tuple[int, int]] = {}
+    for rec in data.get('files', []):
+        try:
+            out[_rel(rec['file'])] = (int(rec['total_lines']), int(rec['covered_lines']))
+        except (KeyError, ValueError):
+            continue
+    return out
+
+
+def percent_from_html(path: pathlib.Path) -> float | None:
+    m = TOTAL_RE.search(path.read_text(encoding='utf-8', errors='ignore'))
+    return float(m.group(1)) if m else None
+
+
+def _pct(covered: int, total: int) -> float:
+    return round(covered / total * 100, 2) if total else 0.0
+
+
+def rollup(files: dict[str, tuple[int, int]]) -> dict:
+    dirs: dict[str, list[int]] = {}
+    for f, (total, covered) in files.items():
+        rec = dirs.setdefault(pathlib.PurePosixPath(f).parent.as_posix(), [0, 0])
+        rec[0] += total
+        rec[1] += covered
+    total = sum(t for t, _ in files.values())
+    covered = sum(c for _, c in files.values())
+    return {
+        'percent': _pct(covered, total),
+        'lines': total,
+        'covered': covered,
+        'files': [{'file': f, 'lines': t, 'covered': c, 'percent': _pct(c, t)} for f, (t, c) in sorted(files.items())],
+        'dirs': [{'dir': d, 'lines': t, 'covered': c, 'percent': _pct(c, t)} for d, (t, c) in sorted(dirs.items())],
+    }
+
+
+def parse(source: pathlib.Path) -> dict | None:
+    with span('parse zig coverage', source=source.name):
+        if source.name == 'cobertura.xml':
+            result = {'format': 'cobertura', **rollup(parse_cobertura(source))}
+        elif source.name == 'coverage.json':
+            result = {'format': 'kcov-json', **rollup(parse_kcov_json(source))}
+        else:
+            pct = percent_from_html(source)
+            if pct is None:
+                return None
+            result = {'format': 'html', 'percent': pct, 'files': [], 'dirs': []}
+    count('zig_coverage.files', len(result['files']))
+    return result
+
+
+def _key(source: pathlib.Path) -> dict:
+    st = source.stat()
+    return {'path': source.resolve().as_posix(), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def load(dirs: list[pathlib.Path] | None = None) -> dict | None:
+    """Cached coverage summary, or None when no Zig coverage output exists."""
+    source = find_source(dirs)
+    if source is None:
+        return None
+    key = _key(source)
+    try:
+        cached = json.loads(CACHE.read_text(encoding='utf-8'))
+        if cached.get('key') == key:
+            return cached.get('result')
+    except (OSError, ValueError):
+        pass
+    try:
+        result = parse(source)
+    except (OSError, ValueError, ET.ParseError) as e:
+        log('warning', f'failed to parse Zig coverage {source}: {e}')
+        result = None
+    if result is not None:
+        result['source'] = _rel(source.resolve().as_posix())
+    try:
+        CACHE.write_text(json.dumps({'key': key, 'result': result}) + '\n', encoding='utf-8')
+    except OSError:
+        pass
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(add_help=True)
+    p.add_argument('--dir', action='append', default=[], help='Directory to search (repeatable; default kcov locations)')
+    p.add_argument('--json', action='store_true', help='Print the full summary as JSON')
+    args = p.parse_args(argv)
+    result = load([pathlib.Path(d) for d in args.dir] or None)
+    if result is None:
+        log('info', 'no Zig coverage output found')
+        return 0
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Zig coverage: {result['percent']:.2f}% ({result['format']}, {len(result['files'])} files)")
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+// Streaming consumer for `go test -json` (test2json) output.
+// Events are handled as stdout chunks arrive: test output is appended to the log,
+// per-test results to a JSON Lines file and benchmark samples to bench.out (the
+// text format update_bench.py reads, including the goos/goarch/pkg/cpu headers it
+// fingerprints the machine from) plus bench.jsonl. Only bounded state is kept
+// in memory: per-package counters, the last FAIL_TAIL output lines of running
+// tests and at most MAX_FAILURES failure excerpts.
+const exec = require('@actions/exec');
+const fs = require('fs');
+const path = require('path');
+
+const FAIL_TAIL = 40;
+const MAX_FAILURES = 50;
+const BENCH_LINE = /^(Benchmark\S*)\s+(\d+)\s+(\d.*)$/;
+const BENCH_HEADER = /^(goos|goarch|pkg|cpu): \S/;
+
+function openOut(file) {
+  if (!file) return null;
+  fs.mkdirSync(path.dirname(path.resolve(file)), { recursive: true });
+  return fs.openSync(file, 'w');
+}
+
+class GoTestStream {
+  // files: { log, results, bench, benchJson } (each optional)
+  constructor(files = {}) {
+    this.fds = {};
+    for (const key of ['log', 'results', 'bench', 'benchJson']) this.fds[key] = openOut(files[key]);
+    this.partial = '';
+    this.packages = new Map();
+    this.tails = new Map();
+    this.benchLines = new Map();
+    this.failures = [];
+    this.totals = { passed: 0, failed: 0, skipped: 0 };
+    this.benchmarks = 0;
+  }
+
+  emit(key, text) {
+    if (this.fds[key] !== null) fs.writeSync(this.fds[key], text);
+  }
+
+  write(chunk) {
+    const lines = (this.partial + chunk.toString()).split('\n');
+    this.partial = lines.pop();
+    lines.forEach((line) => this.line(line));
+  }
+
+  line(line) {
+    if (!line.trim()) return;
+    let ev;
+    try {
+      ev = JSON.parse(line);
+    } catch {
+      // build failures and vet output are printed as plain text
+      this.emit('log', line + '\n');
+      return;
+    }
+    if (ev && typeof ev === 'object') this.event(ev);
+  }
+
+  pkg(name) {
+    let rec = this.packages.get(name);
+    if (!rec) {
+      rec = { package: name, status: 'running', elapsed: 0, passed: 0, failed: 0, skipped: 0 };
+      this.packages.set(name, rec);
+    }
+    return rec;
+  }
+
+  event(ev) {
+    const name = ev.Package || '';
+    const key = `${name}\u0000${ev.Test || ''}`;
+    if (typeof ev.Output === 'string') {
+      this.emit('log', ev.Output);
+      if (ev.Test) {
+        const tail = this.tails.get(key) || [];
+        tail.push(ev.Output);
+        if (tail.length > FAIL_TAIL) tail.shift();
+        this.tails.set(key, tail);
+      }
+      this.benchOutput(name, ev.Output);
+    }
+    if (!['pass', 'fail', 'skip'].includes(ev.Action)) return;
+    const rec = this.pkg(name);
+    const elapsed = typeof ev.Elapsed === 'number' ? ev.Elapsed : 0;
+    if (!ev.Test) {
+      rec.status = ev.Action;
+      rec.elapsed = elapsed;
+      this.tails.delete(key);
+      return;
+    }
+    const field = { pass: 'passed', fail: 'failed', skip: 'skipped' }[ev.Action];
+    rec[field]++;
+    this.totals[field]++;
+    this.emit('results', JSON.stringify({ package: name, test: ev.Test, action: ev.Action, elapsed }) + '\n');
+    if (ev.Action === 'fail' && this.failures.length < MAX_FAILURES) {
+      this.failures.push({ package: name, test: ev.Test, elapsed, output: (this.tails.get(key) || []).join('') });
+    }
+    this.tails.delete(key);
+  }
+
+  // Benchmark names and results can arrive in separate output events; join per package.
+  benchOutput(pkgName, text) {
+    const lines = ((this.benchLines.get(pkgName) || '') + text).split('\n');
+    const rest = lines.pop();
+    if (rest) this.benchLines.set(pkgName, rest);
+    else this.benchLines.delete(pkgName);
+    for (const raw of lines) {
+      if (BENCH_HEADER.test(raw)) {
+        this.emit('bench', raw.trim() + '\n');
+        continue;
+      }
+      const m = BENCH_LINE.exec(raw.trim());
+      if (!m || !/ ns\/op\b/.test(m[3])) continue;
+      const metrics = {};
+      const parts = m[3].trim().split(/\s+/);
+      for (let i = 0; i + 1 < parts.length; i += 2) {
+        const v = Number(parts[i]);
+        if (Number.isFinite(v)) metrics[parts[i + 1]] = v;
+      }
+      this.benchmarks++;
+      this.emit('bench', raw.trim() + '\n');
+      this.emit('benchJson', JSON.stringify({ package: pkgName, name: m[1], iterations: Number(m[2]), metrics }) + '\n');
+    }
+  }
+
+  end() {
+    if (this.partial) this.line(this.partial);
+    this.partial = '';
+    for (const [pkgName, rest] of this.benchLines) this.benchOutput(pkgName, rest + '\n');
+    for (const key of Object.keys(this.fds)) {
+      if (this.fds[key] !== null) fs.closeSync(this.fds[key]);
+      this.fds[key] = null;
+    }
+    return this.summary();
+  }
+
+  summary() {
+    const packages = [...this.packages.values()].sort((a, b) => a.package.localeCompare(b.package));
+    return { totals: { ...this.totals, packages: packages.length }, packages, failures: this.failures, benchmarks: this.benchmarks };
+  }
+}
+
+// Run `go <args>` (args must include -json) and stream its events into files.
+// Resolves to { exitCode, summary }; files.summary, when set, receives the summary JSON.
+async function runGoTestJson(args, files = {}, options = {}) {
+  const stream = new GoTestStream(files);
+  let exitCode = null;
+  try {
+    exitCode = await exec.exec('go', args, {
+      ...options,
+      ignoreReturnCode: true,
+      silent: true,
+      listeners: {
+        stdout: (data) => stream.write(data),
+        stderr: (data) => stream.emit('log', data.toString()),
+      },
+    });
+  } catch (err) {
+    stream.emit('log', `go ${args.join(' ')}: ${err.message}\n`);
+  }
+  const summary = stream.end();
+  if (files.summary) fs.writeFileSync(files.summary, JSON.stringify(summary, null, 1) + '\n', 'utf-8');
+  return { exitCode, summary };
+}
+
+module.exports = { GoTestStream, runGoTestJson };
@@ -2,18 +2,57 @@ const core = require('@actions/core');
 const exec = require('@actions/exec');
 const path = require('path');
 const fs = require('fs');
+const os = require('os');
+const { GoTestStream, runGoTestJson } = require('./gotest');
 
-async function runPython(script, env = {}) {
+function nowUs() {
+  return Date.now() * 1000;
+}
+
+// Append one JSON Lines event to PIPELINE_TRACE (shared with scripts/pipeline_trace.py).
+function traceEvent(event) {
+  const file = process.env.PIPELINE_TRACE;
+  if (!file) return;
+  try {
+    fs.appendFileSync(file, JSON.stringify({ pid: process.pid, tid: process.pid, ...event }) + '\n');
+  } catch (e) {
+    // tracing is best-effort
+  }
+}
+
+async function timed(name, fn, args = {}) {
+  const ts = nowUs();
+  const start = process.hrtime.bigint();
+  try {
+    return await fn();
+  } finally {
+    const dur = Number((process.hrtime.bigint() - start) / 1000n);
+    traceEvent({ type: 'span', name, cat: 'index.js', ts, dur, args });
+  }
+}
+
+// Runs scripts/<script>; resolves to its exit code (null when it could not be started).
+async function runPython(script, env = {}, args = []) {
   const scriptPath = path.join(__dirname, '..', 'scripts', script);
   if (!fs.existsSync(scriptPath)) {
     core.warning(`Script ${script} not found at ${scriptPath}`);
-    return;
-  }
-  try {
-    await exec.exec('python3', [scriptPath], { env: { ...process.env, ...env } });
-  } catch (err) {
-    core.warning(`Script ${script} failed: ${err.message}`);
+    return null;
   }
+  return timed(`python ${script}`, async () => {
+    try {
+      const code = await exec.exec('python3', [scriptPath, ...args], {
+        env: { ...process.env, ...env },
+        ignoreReturnCode: true,
+      });
+      if (code !== 0) {
+        core.warning(`Script ${script} failed with exit code ${code}`);
+      }
+      return code;
+    } catch (err) {
+      core.warning(`Script ${script} failed: ${err.message}`);
+      return null;
+    }
+  });
 }
 
 async function capture(cmd, args, options = {}) {
@@ -35,16 +74,111 @@ async function hasCommand(cmd) {
   return exitCode === 0;
 }
 
-function extractZigCoverageFromHtml(html) {
-  const totalMatch = html.match(/Total[^%]{0,200}([0-9]+(?:\.[0-9]+)?)%/is);
-  if (totalMatch) return parseFloat(totalMatch[1]);
-  const anyMatch = html.match(/([0-9]+(?:\.[0-9]+)?)%/);
-  if (anyMatch) return parseFloat(anyMatch[1]);
-  return null;
+// Overall Zig coverage from the .zig_coverage.json cache written by scripts/zig_coverage.py.
+function readZigCoverage() {
+  try {
+    const cache = JSON.parse(fs.readFileSync('.zig_coverage.json', 'utf-8'));
+    return cache.result && typeof cache.result.percent === 'number' ? cache.result.percent : null;
+  } catch {
+    return null;
+  }
 }
 
-async function ensureDeps() {
-  if (!(await hasCommand('mkdocs'))) {
+// Paths scripts/site_output.py changed during this run, or null without a manifest for it.
+function readSiteChanges() {
+  try {
+    const manifest = JSON.parse(fs.readFileSync('.site_changes.json', 'utf-8'));
+    return manifest.run_id === process.env.SITE_RUN_ID ? manifest.changed || [] : null;
+  } catch {
+    return null;
+  }
+}
+
+// Benchmark mode for this event: 'compare' on pull requests (or bench_compare=true), 'persist' on
+// the default branch, 'skip' for other refs so branch results never reach the history.
+function benchMode(input) {
+  const event = process.env.GITHUB_EVENT_NAME || '';
+  if (input === 'true' || (input !== 'false' && event.startsWith('pull_request'))) return 'compare';
+  return onDefaultBranch() ? 'persist' : 'skip';
+}
+
+// True on default-branch runs and local runs (no ref); only these append to the history branch.
+function onDefaultBranch() {
+  let defaultBranch = '';
+  try {
+    const payload = JSON.parse(fs.readFileSync(process.env.GITHUB_EVENT_PATH || '', 'utf-8'));
+    defaultBranch = (payload.repository && payload.repository.default_branch) || '';
+  } catch {
+    // no event payload (local runs): keep persisting
+  }
+  const ref = process.env.GITHUB_REF_NAME || '';
+  if (!ref) return true;
+  return defaultBranch ? ref === defaultBranch : ['main', 'master'].includes(ref);
+}
+
+const COVER_ARGS = ['test', '-json', '-covermode=atomic', '-coverpkg', './...'];
+const SHARD_DIR = 'test-shards';
+
+// Go tests + coverage. One `go test ./...` by default; with test_shards=N the packages are split
+// into N duration-balanced shards (scripts/shard_tests.py) that run in parallel and are merged
+// back into cover.out, test-results.jsonl, test-summary.json and site_src/tests.txt.
+// test_shard=i/N runs a single shard of a workflow matrix; test_shards_dir merges the legs' outputs.
+async function goTests(env, { shards = 1, shard = '', shardsDir = '' } = {}) {
+  if (shards <= 1 && !shard && !shardsDir) {
+    return runGoTestJson([...COVER_ARGS, '-coverprofile', 'cover.out', './...'], {
+      log: path.join('site_src', 'tests.txt'),
+      results: 'test-results.jsonl',
+      summary: 'test-summary.json',
+    });
+  }
+  let exitCode = null;
+  if (!shardsDir) {
+    const [index, count] = shard ? shard.split('/').map(Number) : [null, shards];
+    const planFile = path.join(SHARD_DIR, 'plan.json');
+    await runPython('shard_tests.py', env, ['plan', '--shards', String(count), '--output', planFile]);
+    let plan = null;
+    try {
+      plan = JSON.parse(fs.readFileSync(planFile, 'utf-8'));
+    } catch {
+      core.warning('no test shard plan; running all packages in one process');
+      return goTests(env);
+    }
+    const selected = plan.shards.filter((s) => index === null || s.index === index);
+    // local shards share the runner: split go test's package parallelism between them
+    const procs = index === null ? ['-p', String(Math.max(1, Math.floor(os.cpus().length / plan.shards.length)))] : [];
+    const results = await Promise.all(
+      selected.map((s) => {
+        const dir = path.join(SHARD_DIR, `shard-${s.index}`);
+        fs.mkdirSync(dir, { recursive: true });
+        fs.writeFileSync(path.join(dir, 'plan.json'), JSON.stringify(s) + '\n', 'utf-8');
+        return timed(`go test shard ${s.index}`, () =>
+          runGoTestJson([...COVER_ARGS, ...procs, '-coverprofile', path.join(dir, 'cover.out'), ...s.packages], {
+            log: path.join(dir, 'tests.txt'),
+            results: path.join(dir, 'test-results.jsonl'),
+            summary: path.join(dir, 'test-summary.json'),
+          }),
+        );
+      }),
+    );
+    exitCode = results.reduce((code, r) => (r.exitCode === 0 ? code : r.exitCode ?? 1), 0);
+    if (index !== null) {
+      if (!results.length) core.warning(`test_shard ${shard}: no such shard in the plan`);
+      return results[0] || { exitCode: 0, summary: new GoTestStream().end() };
+    }
+  }
+  await runPython('shard_tests.py', env, ['merge', '--dir', shardsDir || SHARD_DIR]);
+  let summary;
+  try {
+    summary = JSON.parse(fs.readFileSync('test-summary.json', 'utf-8'));
+  } catch {
+    summary = new GoTestStream().end();
+  }
+  if (exitCode === null) exitCode = summary.packages.some((p) => p.status === 'fail') ? 1 : 0;
+  return { exitCode, summary };
+}
+
+async function ensureDeps(renderer) {
+  if (renderer !== 'builtin' && !(await hasCommand('mkdocs'))) {
     try {
       await exec.exec('python3', ['-m', 'pip', 'install', 'mkdocs', 'mkdocs-material']);
     } catch (err) {
@@ -58,27 +192,65 @@ async function run() {
     const token = core.getInput('github_token', { required: true });
     const runBench = core.getInput('run_benchmarks') !== 'false';
     const benchBranch = core.getInput('bench_branch') || 'bench-data';
+    const benchWorkers = core.getInput('bench_workers') || '';
+    let benchCount = parseInt(core.getInput('bench_count') || '1', 10);
+    if (!(benchCount >= 1)) {
+      core.warning(`invalid bench_count "${core.getInput('bench_count')}"; using 1`);
+      benchCount = 1;
+    }
+    const benchProfile = core.getInput('bench_profile') || '';
+    const benchCompare = core.getInput('bench_compare') || 'auto';
+    const incremental = core.getInput('incremental_build') === 'true';
+    const precompress = core.getInput('precompress') !== 'false';
+    const sizeBudget = core.getInput('size_budget') || '';
+    const securityStore = core.getInput('security_store') !== 'false';
+    const securityRepos = core.getInput('security_repos') || '';
+    const metricsInput = core.getInput('metrics') || '';
+    const renderer = core.getInput('renderer') || 'mkdocs';
     const env = {
       SITE_NAME: core.getInput('site_name') || '',
       EXTRA_DOCS: core.getInput('extra_nav_docs') !== 'false' ? 'true' : 'false',
-      NAV_ORDER: core.getInput('nav_order') || 'home,reference,coverage,metrics,security,bench,docs',
+      NAV_ORDER: core.getInput('nav_order') || 'home,reference,coverage,tests,metrics,security,bench,docs',
       EMBED_COVERAGE: core.getInput('embed_coverage_html') !== 'false' ? 'true' : 'false',
       TOKEN: token,
       BENCH_BRANCH: benchBranch,
+      BENCH_REFERENCE: core.getInput('bench_reference') || '',
+      INTERACTIVE_CHARTS: core.getInput('interactive_charts') !== 'false' ? 'true' : 'false',
     };
     const failOnTestFailure = core.getInput('fail_on_test_failure') === 'true';
+    const runStartUs = nowUs();
+    const runStart = process.hrtime.bigint();
+    if (core.getInput('trace') !== 'false') {
+      process.env.PIPELINE_TRACE = path.resolve('trace.jsonl');
+      fs.writeFileSync(process.env.PIPELINE_TRACE, '', 'utf-8');
+    }
+    // Groups every script's writes into one .site_changes.json manifest (scripts/site_output.py).
+    process.env.SITE_RUN_ID = `${process.env.GITHUB_RUN_ID || 'local'}-${process.env.GITHUB_RUN_ATTEMPT || '1'}-${Date.now()}`;
 
-    await ensureDeps();
+    if (!core.getInput('test_shard')) await timed('ensure deps', () => ensureDeps(renderer));
 
-    // Go tests + coverage
-    const testArgs = ['test', '-covermode=atomic', '-coverpkg', './...', '-coverprofile', 'cover.out', './...'];
-    const testResult = await exec.getExecOutput('go', testArgs, { ignoreReturnCode: true });
-    try {
-      fs.mkdirSync('site_src', { recursive: true });
-      fs.writeFileSync('site_src/tests.txt', testResult.stdout + (testResult.stderr || ''), 'utf-8');
-    } catch (e) {
-      core.warning(`Failed to persist test log: ${e.message}`);
+    // Go tests + coverage, streamed as test2json events: log, per-test results and summary
+    // are written as events arrive (scripts/gen_tests_md.py renders the tests page).
+    const testShard = core.getInput('test_shard') || '';
+    const testResult = await timed('go test', () =>
+      goTests(env, {
+        shards: parseInt(core.getInput('test_shards') || '1', 10) || 1,
+        shard: testShard,
+        shardsDir: core.getInput('test_shards_dir') || '',
+      }),
+    );
+    const { totals } = testResult.summary;
+    core.info(`go test: ${totals.passed} passed, ${totals.failed} failed, ${totals.skipped} skipped in ${totals.packages} packages`);
+    if (testShard) {
+      // matrix leg: the merge job (test_shards_dir) builds the site from every leg's outputs
+      core.info(`test shard ${testShard} written to ${SHARD_DIR}/`);
+      if (testResult.exitCode !== 0 && failOnTestFailure) core.setFailed(`Go tests failed (exit ${testResult.exitCode})`);
+      return;
     }
+    if (onDefaultBranch()) {
+      await timed('update test history', () => runPython('update_tests.py', { ...env, METRICS_BRANCH: benchBranch }));
+    }
+    await runPython('gen_tests_md.py', env);
     if (testResult.exitCode !== 0) {
       const msg = `Go tests failed (exit ${testResult.exitCode}); proceeding with available coverage data.`;
       if (failOnTestFailure) {
@@ -87,10 +259,16 @@ async function run() {
       }
       core.warning(msg);
     }
+    // One profile for every consumer: blocks repeated by several test binaries are combined and extra
+    // profiles (cover_profiles) merged in; cover_merge.py also records per-file totals for the coverage page.
+    const coverProfiles = (core.getInput('cover_profiles') || '').split(/[\s,]+/).filter(Boolean);
+    if (fs.existsSync('cover.out') || coverProfiles.length) {
+      await runPython('cover_merge.py', env, ['--output', 'cover.out', 'cover.out', ...coverProfiles]);
+    }
     if (fs.existsSync('cover.out')) {
       try {
-        await exec.exec('go', ['tool', 'cover', '-html', 'cover.out', '-o', 'cover.html']);
-        const covOutput = await capture('go', ['tool', 'cover', '-func', 'cover.out']);
+        await timed('go tool cover -html', () => exec.exec('go', ['tool', 'cover', '-html', 'cover.out', '-o', 'cover.html']));
+        const covOutput = await timed('go tool cover -func', () => capture('go', ['tool', 'cover', '-func', 'cover.out']));
         const lastLine = covOutput.trim().split('\n').pop() || '';
         const pctMatch = lastLine.match(/total:\s*\(statements\)\s*([\d.]+)%/);
         const pct = pctMatch ? pctMatch[1] : '0';
@@ -109,7 +287,7 @@ async function run() {
     try {
       const hasZig = (await hasCommand('zig')) && fs.existsSync('build.zig');
       if (hasZig) {
-        await exec.getExecOutput('zig', ['build', 'test', '-Dcoverage'], { ignoreReturnCode: true });
+        await timed('zig build test', () => exec.getExecOutput('zig', ['build', 'test', '-Dcoverage'], { ignoreReturnCode: true }));
         const candidates = [
           path.join('zig-out', 'coverage'),
           path.join('zig-out', 'coverage_html'),
@@ -145,17 +323,15 @@ async function run() {
         }
         if (copied) {
           try {
-            const idxPath = path.join(dest, 'index.html');
-            if (fs.existsSync(idxPath)) {
-              const html = fs.readFileSync(idxPath, 'utf-8');
-              const pct = extractZigCoverageFromHtml(html);
-              if (pct !== null) {
-                const current = fs.existsSync('.coverage_percent') ? fs.readFileSync('.coverage_percent', 'utf-8').trim() : '';
-                if (!current || current === '0') {
-                  const str = String(pct);
-                  core.setOutput('coverage_percent', str);
-                  fs.writeFileSync('.coverage_percent', str, 'utf-8');
-                }
+            // Parses kcov's cobertura/JSON output once; later scripts reuse the cache.
+            await runPython('zig_coverage.py', env);
+            const pct = readZigCoverage();
+            if (pct !== null) {
+              const current = fs.existsSync('.coverage_percent') ? fs.readFileSync('.coverage_percent', 'utf-8').trim() : '';
+              if (!current || current === '0') {
+                const str = String(pct);
+                core.setOutput('coverage_percent', str);
+                fs.writeFileSync('.coverage_percent', str, 'utf-8');
               }
             }
           } catch (e) {
@@ -168,35 +344,107 @@ async function run() {
     }
 
     if (runBench) {
-      try {
-        await exec.exec('bash', ['-lc', 'go test -run=^$ -bench=. -benchmem ./... | tee bench.out']);
-      } catch (e) {
-        await exec.exec('go', ['test', '-run=^$', '-bench=.', '-benchmem', './...']);
+      if (benchWorkers) {
+        // Sharded, CPU-pinned runner; writes a merged bench.out
+        await runPython('run_bench.py', { ...env, BENCH_WORKERS: benchWorkers, BENCH_COUNT: String(benchCount) });
+      } else {
+        // Samples go to bench.out (read by update_bench.py) and bench.jsonl as they are reported
+        await timed('go test -bench', () =>
+          runGoTestJson(['test', '-json', '-run=^$', '-bench=.', '-benchmem', `-count=${benchCount}`, './...'], {
+            bench: 'bench.out',
+            benchJson: 'bench.jsonl',
+          }),
+        );
+      }
+      const mode = benchMode(benchCompare);
+      if (mode === 'compare') {
+        // Reads the base results from the history branch; writes nothing to it.
+        await runPython('bench_compare.py', env);
+      } else if (mode === 'persist') {
+        await runPython('update_bench.py', env);
+      } else {
+        core.info('Benchmark history is only updated from the default branch; skipping update_bench.py');
+      }
+      if (benchProfile) {
+        await runPython('bench_profiles.py', { ...env, BENCH_PROFILE: benchProfile });
       }
-      await runPython('update_bench.py', env);
     }
     await runPython('gen_bench_md.py', env);
 
-    if (await hasCommand('gocyclo')) {
-      process.env.METRICS = 'coverage,tests,files,loc,avg_complexity,high_complexity';
+    if (metricsInput) {
+      process.env.METRICS = metricsInput;
     } else {
-      process.env.METRICS = 'coverage,tests,files,loc';
+      const selected = ['coverage', 'tests', 'files', 'loc'];
+      if (await hasCommand('gocyclo')) {
+        selected.push('avg_complexity', 'high_complexity');
+      }
+      if (fs.existsSync('build.zig')) {
+        selected.push('zig_files', 'zig_tests', 'zig_loc');
+      }
+      process.env.METRICS = selected.join(',');
     }
     await runPython('collect_metrics.py', env);
     await runPython('update_metrics.py', env);
     await runPython('gen_metrics_md.py', env);
 
-    await runPython('collect_security.py', env);
+    if (securityStore) {
+      // Incremental alert sync; update_security.py persists security/ (store + history) to the bench branch.
+      await runPython('collect_security.py', { ...env, SECURITY_STORE: path.join('security', 'alerts.json'), METRICS_BRANCH: benchBranch });
+    } else {
+      await runPython('collect_security.py', env);
+    }
+    if (securityRepos) {
+      // Org roll-up; the checkpoint lives under security/ so an interrupted run resumes next time.
+      const orgArgs = ['--repos', securityRepos, '--checkpoint', path.join('security', 'org_checkpoint.json')];
+      if (securityStore) orgArgs.push('--store', path.join('security', 'repos'));
+      await runPython('collect_security.py', { ...env, SECURITY_STORE: '', METRICS_BRANCH: benchBranch }, orgArgs);
+    }
+    if ((securityStore || securityRepos) && onDefaultBranch()) {
+      // Pull request runs read the store from the bench branch but never write it back.
+      await runPython('update_security.py', { ...env, METRICS_BRANCH: benchBranch });
+    }
     await runPython('gen_security_md.py', env);
 
     await runPython('gen_coverage_md.py', env);
     await runPython('gen_site_structure.py', env);
 
-    try {
-      await exec.exec('mkdocs', ['build', '--site-dir', 'site_build']);
-      core.setOutput('site_dir', 'site_build');
-    } catch (err) {
-      core.warning(`mkdocs not found: ${err.message}`);
+    if (renderer === 'builtin') {
+      // scripts/render_site.py keeps its own manifest in site_build and only re-renders changed pages
+      const code = await timed('render site', () => runPython('render_site.py', env, ['--site-dir', 'site_build']));
+      if (code === 0) core.setOutput('site_dir', 'site_build');
+    } else {
+      try {
+        const mkdocsArgs = ['build', '--site-dir', 'site_build'];
+        const changes = readSiteChanges();
+        if (changes) {
+          core.info(`${changes.length} site file(s) changed this run`);
+        }
+        // --dirty only re-renders pages whose sources are newer than site_build; a changed
+        // mkdocs.yml (nav, theme) affects every page, so fall back to a clean build then.
+        if (incremental && changes && fs.existsSync('site_build') && !changes.includes('mkdocs.yml')) {
+          mkdocsArgs.push('--dirty');
+        }
+        await timed('mkdocs build', () => exec.exec('mkdocs', mkdocsArgs), { dirty: mkdocsArgs.includes('--dirty') });
+        core.setOutput('site_dir', 'site_build');
+      } catch (err) {
+        core.warning(`mkdocs not found: ${err.message}`);
+      }
+    }
+
+    if (fs.existsSync('site_build') && (precompress || sizeBudget)) {
+      const postArgs = ['--site-dir', 'site_build'];
+      if (!precompress) postArgs.push('--no-compress');
+      const code = await runPython('postbuild.py', { SIZE_BUDGETS: sizeBudget }, postArgs);
+      if (code === 3) {
+        core.setFailed('Site size budget exceeded (see size report in the job summary)');
+      }
+    }
+
+    if (process.env.PIPELINE_TRACE) {
+      const dur = Number((process.hrtime.bigint() - runStart) / 1000n);
+      const rss = process.resourceUsage().maxRSS;
+      traceEvent({ type: 'span', name: 'index.js', cat: 'index.js', ts: runStartUs, dur, args: { process: true, peak_rss_kb: rss } });
+      await runPython('pipeline_trace.py', {}, ['--input', process.env.PIPELINE_TRACE, '--output', 'trace.json']);
     }
   } catch (error) {
     core.setFailed(error.message);
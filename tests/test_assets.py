@@ -0,0 +1,60 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+
+def run(root, script):
+    env = {k: v for k, v in os.environ.items() if k != 'PIPELINE_TRACE'}
+    subprocess.check_call([sys.executable, f'scripts/{script}'], cwd=root, env=env)
+
+
+def test_history_published_once_under_content_hash(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    data = tmp_path / 'metrics' / 'data'
+    data.mkdir(parents=True)
+    (data / 'loc.json').write_text(json.dumps([{'time': 't0', 'value': 1}]))
+    (data / 'go_files.json').write_text(json.dumps([{'time': 't0', 'value': 2}]))
+    (tmp_path / 'metrics' / 'summary.json').write_text(json.dumps(
+        {'metrics': [{'name': 'loc', 'file': 'loc.json'}, {'name': 'go_files', 'file': 'go_files.json'}]}))
+    legacy = tmp_path / 'site_src' / 'metrics' / 'metrics' / 'data'
+    legacy.mkdir(parents=True)
+    (legacy / 'loc.json').write_text('[]')
+    run(tmp_path, 'gen_metrics_md.py')
+
+    site = tmp_path / 'site_src'
+    published = sorted(p.name for p in (site / 'assets' / 'metrics').iterdir())
+    assert len(published) == 3 and all(len(name.split('.')[-2]) == 12 for name in published)
+    assert not legacy.exists() and not (site / 'metrics' / 'summary.json').exists()
+    outer = json.loads((site / 'metrics' / 'manifest.json').read_text())
+    inner = json.loads((site / 'metrics' / 'metrics' / 'manifest.json').read_text())
+    assert outer['data/loc.json'].startswith('../assets/metrics/data__loc.')
+    assert inner['data/loc.json'] == '../' + outer['data/loc.json']
+    asset = (site / 'metrics' / outer['data/loc.json']).resolve()
+    assert os.path.samefile(asset, data / 'loc.json')  # hardlinked, not copied
+    assert (site / 'metrics' / 'metrics' / 'charts.js').exists()
+
+    # an appended point gets a new immutable name; the stale one is pruned, the rest reused
+    sys.path.insert(0, str(tmp_path / 'scripts'))
+    try:
+        import assets
+        assets.write_atomic(data / 'loc.json', json.dumps([{'time': 't0', 'value': 1}, {'time': 't1', 'value': 3}]))
+    finally:
+        sys.path.pop(0)
+    assert json.loads(asset.read_text()) == [{'time': 't0', 'value': 1}]  # published copy untouched
+    run(tmp_path, 'gen_metrics_md.py')
+    again = json.loads((site / 'metrics' / 'manifest.json').read_text())
+    assert again['data/loc.json'] != outer['data/loc.json']
+    assert again['data/go_files.json'] == outer['data/go_files.json']
+    assert not asset.exists() and len(list((site / 'assets' / 'metrics').iterdir())) == 3
+
+
+def test_bench_page_links_hashed_summary(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    (tmp_path / 'bench' / 'data').mkdir(parents=True)
+    (tmp_path / 'bench' / 'summary.json').write_text(json.dumps({'benchmarks': [{'name': 'BenchmarkX-8', 'file': 'BenchmarkX-8.json'}]}))
+    (tmp_path / 'bench' / 'data' / 'BenchmarkX-8.json').write_text(json.dumps([{'time': 't', 'ns_per_op': 1.0}]))
+    run(tmp_path, 'gen_bench_md.py')
+    md = (tmp_path / 'site_src' / 'bench.md').read_text()
+    link = md.split('[summary.json](')[1].split(')')[0]
+    assert link.startswith('assets/bench/summary.') and (tmp_path / 'site_src' / link).exists()
+    assert json.loads((tmp_path / 'site_src' / 'bench' / 'bench' / 'manifest.json').read_text())['data/BenchmarkX-8.json']
@@ -0,0 +1,63 @@
+import json, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import bench_compare  # noqa: E402
+
+
+def test_mann_whitney_exact_and_normal():
+    # fully separated 5+5 samples: exact two-sided p = 2 / C(10, 5)
+    _, p = bench_compare.mann_whitney([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+    assert abs(p - 2 / 252) < 1e-12
+    _, p = bench_compare.mann_whitney([1, 2, 3], [1, 2, 3])
+    assert p == 1.0
+    # ties -> normal approximation, still clearly significant for separated groups
+    _, p = bench_compare.mann_whitney([1, 1, 2, 2, 3, 3] * 2, [7, 7, 8, 8, 9, 9] * 2)
+    assert p < 0.001
+
+
+def _bench_out(values: dict[str, list[float]]) -> str:
+    lines = []
+    for name, vals in values.items():
+        lines += [f'{name}-8 \t 1000\t {v} ns/op\t 16 B/op\t 1 allocs/op' for v in vals]
+    return '\n'.join(lines) + '\n'
+
+
+def test_compare_writes_table_without_touching_history(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    base = tmp_path / 'base' / 'bench'
+    (base / 'data').mkdir(parents=True)
+    (base / 'summary.json').write_text(json.dumps({'benchmarks': [{'name': 'BenchmarkA-8', 'file': 'BenchmarkA-8.json'}]}))
+    series = [{'time': 't1', 'ns_per_op': 120.0},
+              {'time': 't2', 'ns_per_op': 101.0, 'samples': [100, 101, 102, 103, 104]}]
+    (base / 'data' / 'BenchmarkA-8.json').write_text(json.dumps(series))
+    before = (base / 'data' / 'BenchmarkA-8.json').read_text()
+    (tmp_path / 'bench.out').write_text(_bench_out({'BenchmarkA': [80, 81, 82, 83, 84], 'BenchmarkB': [5, 6]}))
+    summary = tmp_path / 'step_summary.md'
+    proc = subprocess.run([sys.executable, 'scripts/bench_compare.py', '--base-dir', str(tmp_path / 'base'),
+                           '--summary', str(summary)], cwd=tmp_path, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    rows = {r['name']: r for r in json.loads((tmp_path / 'bench_compare.json').read_text())['rows']}
+    a = rows['BenchmarkA-8']
+    assert a['base'] == 102 and a['pr'] == 82 and a['verdict'] == 'faster'
+    assert a['delta_pct'] == -19.61 and a['p'] < 0.05 and a['base_n'] == 5
+    assert rows['BenchmarkB-8']['verdict'] == 'new'
+    md = (tmp_path / 'bench_compare.md').read_text()
+    assert '| `BenchmarkA-8` | 102 | 82 | -19.61% |' in md and '✅ faster' in md
+    assert summary.read_text().startswith('## Benchmark Comparison')
+    assert (base / 'data' / 'BenchmarkA-8.json').read_text() == before
+    assert not (tmp_path / 'bench').exists()
+
+    # bench.md shows the comparison even without local history
+    proc = subprocess.run([sys.executable, 'scripts/gen_bench_md.py'], cwd=tmp_path, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    page = (tmp_path / 'site_src' / 'bench.md').read_text()
+    assert page.startswith('# Benchmarks\n\n## Benchmark Comparison') and '_No benchmark history yet._' in page
+
+
+def test_base_sample_falls_back_to_recent_medians():
+    series = [{'time': str(i), 'ns_per_op': float(i)} for i in range(15)]
+    assert bench_compare.base_sample(series, 10) == [float(i) for i in range(5, 15)]
+    assert bench_compare.base_sample([], 10) == []
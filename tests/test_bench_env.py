@@ -0,0 +1,82 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import bench_compare  # noqa: E402
+import bench_env  # noqa: E402
+
+BENCH_OUT = '''goos: linux
+goarch: amd64
+pkg: example.com/m/a
+cpu: AMD EPYC 7763 64-Core Processor
+BenchmarkRef-4 \t 1000\t 200 ns/op
+BenchmarkA-4 \t 1000\t 100 ns/op\t 16 B/op\t 1 allocs/op
+PASS
+goos: linux
+goarch: amd64
+pkg: example.com/m/b
+cpu: AMD EPYC 7763 64-Core Processor
+BenchmarkB-4 \t 1000\t 50 ns/op
+'''
+
+
+def test_fingerprint_from_bench_headers(tmp_path):
+    (tmp_path / 'bench.out').write_text(BENCH_OUT)
+    env = bench_env.fingerprint(tmp_path / 'bench.out')
+    assert (env['goos'], env['goarch'], env['cpu'], env['packages']) == ('linux', 'amd64', 'AMD EPYC 7763 64-Core Processor', 2)
+    assert env['machine'] == f"linux-amd64-amd-epyc-7763-64-core-processor-{env['cores']}c"
+    long = bench_env.machine_class({'goos': 'linux', 'goarch': 'amd64', 'cpu': 'x' * 200, 'cores': 2})
+    assert len(long) == bench_env.MAX_CLASS_LEN
+    assert bench_env.reference_ns({'BenchmarkRef-8': {'ns_per_op': 40.0}}, 'BenchmarkRef-4') == 40.0
+    legacy = [{'time': 't0', 'ns_per_op': 1}]
+    assert bench_env.like_for_like(legacy, 'm1') == legacy
+    tagged = legacy + [{'time': 't1', 'ns_per_op': 2, 'machine': 'm2'}, {'time': 't2', 'ns_per_op': 3, 'machine': 'm1'}]
+    assert [e['time'] for e in bench_env.like_for_like(tagged, 'm1')] == ['t2']
+
+
+def test_update_bench_tags_entries_and_page_uses_one_machine_class(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    (tmp_path / 'bench.out').write_text(BENCH_OUT)
+    data = tmp_path / 'bench' / 'data'
+    data.mkdir(parents=True)
+    # an earlier run on another machine class: not shown as the latest value
+    (data / 'BenchmarkA-4.json').write_text(json.dumps([{'time': 't0', 'ns_per_op': 999.0, 'machine': 'other'}]))
+    env = {**os.environ, 'BENCH_REFERENCE': 'BenchmarkRef', 'BENCH_BRANCH': 'missing-branch'}
+    subprocess.check_call([sys.executable, 'scripts/update_bench.py'], cwd=tmp_path, env=env)
+    machine = bench_env.fingerprint(tmp_path / 'bench.out')['machine']
+    series = json.loads((data / 'BenchmarkA-4.json').read_text())
+    assert series[-1]['machine'] == machine and series[-1]['normalized'] == 0.5
+    summary = json.loads((tmp_path / 'bench' / 'summary.json').read_text())
+    assert summary['machine'] == machine and summary['reference'] == 'BenchmarkRef'
+    envs = json.loads((tmp_path / 'bench' / 'environments.json').read_text())
+    assert len(envs) == 1 and envs[0]['cpu'] == 'AMD EPYC 7763 64-Core Processor' and envs[0]['reference_ns'] == 200
+
+    subprocess.check_call([sys.executable, 'scripts/gen_bench_md.py'], cwd=tmp_path)
+    page = (tmp_path / 'site_src' / 'bench.md').read_text()
+    assert f'Latest run on machine class `{machine}` (AMD EPYC 7763 64-Core Processor' in page
+    assert '| `BenchmarkA-4` | 100 | 0.5 | 16 | 1 | - |' in page
+
+
+class _Base:
+    def __init__(self, series):
+        self._series = series
+
+    def series(self, name):
+        return self._series.get(name, [])
+
+
+def test_compare_only_uses_same_machine_or_normalized_values():
+    pr = {'BenchmarkA-4': {'ns_per_op': [50, 51, 52]}, 'BenchmarkRef-4': {'ns_per_op': [100, 100, 100]}}
+    base = _Base({
+        'BenchmarkA-4': [{'time': 't', 'ns_per_op': 90.0, 'normalized': 0.6, 'machine': 'old'}],
+        'BenchmarkRef-4': [{'time': 't', 'ns_per_op': 150.0, 'normalized': 1.0, 'machine': 'old'}],
+    })
+    rows = {r['name']: r for r in bench_compare.compare(pr, base, 0.05, 10, 'new')}
+    assert rows['BenchmarkA-4']['verdict'] == 'other machine' and rows['BenchmarkA-4']['base'] is None
+    rows = {r['name']: r for r in bench_compare.compare(pr, base, 0.05, 10, 'new', 'BenchmarkRef')}
+    a = rows['BenchmarkA-4']
+    assert a['normalized'] and a['base'] == 0.6 and a['pr'] == 0.51 and a['delta_pct'] == -15.0
+    md = bench_compare.markdown(list(rows.values()), 0.05, 'bench-data', 'new', 'BenchmarkRef')
+    assert '| `BenchmarkA-4` ≈ | 0.6 | 0.51 |' in md and 'same machine class (`new`)' in md
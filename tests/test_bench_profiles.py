@@ -0,0 +1,61 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import bench_profiles  # noqa: E402
+
+RAW = """PeriodType: cpu nanoseconds
+Period: 10000000
+Samples:
+samples/count cpu/nanoseconds[dflt]
+          3   30000000: 1 2 3
+          1   10000000: 4 3
+                bytes:[64]
+Locations
+     1: 0x4a2b3c M=1 main.leaf /src/x.go:10:2 s=8
+             main.inlined /src/x.go:20:3 s=18
+     2: 0x4a2c00 M=1 main.mid /src/x.go:30:1 s=28
+     3: 0x4a2d00 M=1 main.BenchmarkX /src/x_test.go:5:1 s=4
+     4: 0x4a2e00 M=1 runtime.mallocgc /go/src/runtime/malloc.go:1:1 s=1
+Mappings
+1: 0x400000/0x500000/0x0 /tmp/bench.test  [FN]
+"""
+
+
+def test_fold_raw_builds_root_first_stacks():
+    folded = bench_profiles.fold_raw(RAW)
+    assert folded == {
+        'main.BenchmarkX;main.mid;main.inlined;main.leaf': 30000000,
+        'main.BenchmarkX;runtime.mallocgc': 10000000,
+    }
+    text = bench_profiles.format_folded(folded)
+    assert bench_profiles.parse_folded(text) == folded
+    assert text.splitlines() == sorted(text.splitlines())
+
+
+def test_flamegraph_and_diff_render():
+    folded = bench_profiles.fold_raw(RAW)
+    svg = bench_profiles.render_flamegraph(folded, 'BenchmarkX (cpu)')
+    assert svg.startswith('<svg') and svg.count('<rect') == 5
+    assert 'main.leaf (30000000 samples, 75.00%)' in svg
+    previous = {'main.BenchmarkX;runtime.mallocgc': 10}
+    diff = bench_profiles.render_flamegraph(folded, 'diff', previous)
+    # mallocgc went from 100% to 25% of samples -> rendered blue
+    assert 'runtime.mallocgc (25.00%, -75.00 pts)' in diff
+    assert bench_profiles.bench_regex('BenchmarkX/size=10-8') == '^BenchmarkX$/^size=10$'
+
+
+def test_bench_page_links_profiles(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    (tmp_path / 'bench' / 'data').mkdir(parents=True)
+    (tmp_path / 'bench' / 'summary.json').write_text(json.dumps(
+        {'benchmarks': [{'name': 'BenchmarkX-8', 'file': 'BenchmarkX-8.json'}]}))
+    (tmp_path / 'bench' / 'data' / 'BenchmarkX-8.json').write_text(json.dumps(
+        [{'time': 't', 'ns_per_op': 120.5, 'bytes_per_op': 16, 'allocs_per_op': 1}]))
+    prof = tmp_path / 'site_src' / 'bench' / 'profiles'
+    prof.mkdir(parents=True)
+    (prof / 'BenchmarkX-8.cpu.svg').write_text('<svg/>')
+    subprocess.check_call([sys.executable, 'scripts/gen_bench_md.py'], cwd=tmp_path, env=os.environ.copy())
+    md = (tmp_path / 'site_src' / 'bench.md').read_text()
+    assert '| `BenchmarkX-8` | 120.5 | 16 | 1 | [cpu](bench/profiles/BenchmarkX-8.cpu.svg) |' in md
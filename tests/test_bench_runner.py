@@ -0,0 +1,65 @@
+import json, os, pathlib, subprocess, sys, textwrap
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+FAKE_GO = textwrap.dedent('''\
+    #!{python}
+    import os, sys
+    args = sys.argv[1:]
+    if args[:1] == ['list']:
+        print('example.com/m/a')
+        print('example.com/m/b')
+        sys.exit(0)
+    pkg = args[-1]
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+    with open(os.environ['FAKE_GO_LOG'], 'a') as f:
+        f.write(pkg + ' ' + os.environ.get('GOMAXPROCS', '') + ' ' + str(len(cores)) + '\\n')
+    name = 'BenchmarkA' if pkg.endswith('/a') else 'BenchmarkB'
+    ns = {{'BenchmarkA': 100, 'BenchmarkB': 200}}[name] + len(open(os.environ['FAKE_GO_LOG']).readlines())
+    print('goos: linux')
+    print('pkg: ' + pkg)
+    print(name + '-1   \\t 1000\\t ' + str(ns) + ' ns/op\\t 16 B/op\\t 1 allocs/op')
+    print('PASS')
+''')
+
+
+def test_run_bench_interleaves_and_pins(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    go = bin_dir / 'go'
+    go.write_text(FAKE_GO.format(python=sys.executable))
+    go.chmod(0o755)
+    log = tmp_path / 'go.log'
+    env = {**os.environ, 'PATH': f'{bin_dir}{os.pathsep}{os.environ["PATH"]}', 'FAKE_GO_LOG': str(log)}
+    proc = subprocess.run([sys.executable, str(REPO / 'scripts' / 'run_bench.py'), '--workers', '1', '--count', '3'],
+                          cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    calls = [line.split() for line in log.read_text().splitlines()]
+    # Rounds are rotated so no package always runs first
+    assert [c[0][-1] for c in calls] == ['a', 'b', 'b', 'a', 'a', 'b']
+    # Each job is pinned to exactly the cores GOMAXPROCS advertises
+    assert all(c[1] == '1' and c[2] == '1' for c in calls)
+    merged = (tmp_path / 'bench.out').read_text()
+    assert merged.count('BenchmarkA-1') == 3 and merged.count('BenchmarkB-1') == 3
+
+    # update_bench.parse_bench consumes the merged file, reducing rounds to the median
+    code = 'import json, update_bench; print(json.dumps(update_bench.parse_bench()))'
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=tmp_path, text=True,
+                                  env={**os.environ, 'PYTHONPATH': str(REPO / 'scripts')})
+    parsed = json.loads(out)
+    assert parsed['BenchmarkA-1']['ns_per_op'] == 104
+    assert parsed['BenchmarkB-1']['bytes_per_op'] == 16
+
+
+def test_run_bench_fails_when_no_job_succeeds(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    go = bin_dir / 'go'
+    go.write_text(f"#!{sys.executable}\nimport sys\nif sys.argv[1] == 'list':\n    print('example.com/m/a')\n"
+                  "    sys.exit(0)\nprint('# example.com/m/a: build failed')\nsys.exit(1)\n")
+    go.chmod(0o755)
+    env = {**os.environ, 'PATH': f'{bin_dir}{os.pathsep}{os.environ["PATH"]}'}
+    proc = subprocess.run([sys.executable, str(REPO / 'scripts' / 'run_bench.py'), '--workers', '1', '--count', '2'],
+                          cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert proc.returncode == 1
+    assert 'every benchmark job failed' in proc.stderr
@@ -0,0 +1,58 @@
+import json, pathlib, random, shutil, subprocess, sys
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import cover_merge  # noqa: E402
+
+
+def test_merge_sums_counts_and_checks_mode(tmp_path):
+    (tmp_path / 'a.out').write_text('mode: atomic\nm/a/a.go:10.2,12.3 2 0\nm/a/a.go:3.1,5.2 1 4\n')
+    (tmp_path / 'b.out').write_text('mode: count\nm/a/a.go:10.2,12.3 2 3\nm/a/a.go:3.1,5.2 1 1\nm/a/b.go:1.1,2.1 4 0\n')
+    result = cover_merge.merge([tmp_path / 'a.out', tmp_path / 'b.out'], tmp_path / 'cover.out')
+    assert (tmp_path / 'cover.out').read_text() == (
+        'mode: atomic\nm/a/a.go:3.1,5.2 1 5\nm/a/a.go:10.2,12.3 2 3\nm/a/b.go:1.1,2.1 4 0\n')
+    assert result['files'] == [{'file': 'm/a/a.go', 'stmts': 3, 'covered': 3},
+                               {'file': 'm/a/b.go', 'stmts': 4, 'covered': 0}]
+    (tmp_path / 'c.out').write_text('mode: set\nm/a/a.go:3.1,5.2 1 1\n')
+    with pytest.raises(ValueError, match='incompatible modes'):
+        cover_merge.merge([tmp_path / 'a.out', tmp_path / 'c.out'], tmp_path / 'x.out')
+    (tmp_path / 'd.out').write_text('mode: set\nm/a/a.go:3.1,5.2 1 0\n')
+    cover_merge.merge([tmp_path / 'c.out', tmp_path / 'd.out'], tmp_path / 'set.out')
+    assert (tmp_path / 'set.out').read_text() == 'mode: set\nm/a/a.go:3.1,5.2 1 1\n'
+    (tmp_path / 'e.out').write_text('mode: count\nm/a/a.go:3.1,5.2 2 1\n')
+    with pytest.raises(ValueError, match='statements'):
+        cover_merge.merge([tmp_path / 'a.out', tmp_path / 'e.out'], tmp_path / 'x.out')
+    assert not (tmp_path / 'x.out').exists() and not (tmp_path / 'x.out.tmp').exists()
+
+
+def test_spilled_runs_match_in_memory_merge(tmp_path):
+    rng = random.Random(7)
+    blocks = [f'm/p{f}/f.go:{line}.1,{line}.9 {1 + line % 3}' for f in range(5) for line in range(1, 60)]
+    for i in range(3):
+        lines = [f'{b} {rng.randint(0, 2)}' for b in blocks if rng.random() < 0.8]
+        rng.shuffle(lines)
+        (tmp_path / f'p{i}.out').write_text('mode: atomic\n' + '\n'.join(lines) + '\n')
+    inputs = [tmp_path / f'p{i}.out' for i in range(3)]
+    whole = cover_merge.merge(inputs, tmp_path / 'whole.out')
+    spilled = cover_merge.merge(inputs, tmp_path / 'spilled.out', chunk=17)
+    assert (tmp_path / 'whole.out').read_text() == (tmp_path / 'spilled.out').read_text()
+    assert whole == spilled and len(whole['files']) == 5
+
+
+def test_cli_writes_files_json_used_by_coverage_page(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    (tmp_path / 'cover.out').write_text('mode: atomic\nm/a.go:1.1,2.1 2 1\nm/a.go:1.1,2.1 2 0\nm/b.go:1.1,2.1 2 0\n')
+    (tmp_path / 'integration').mkdir()
+    (tmp_path / 'integration' / 'linux.out').write_text('mode: atomic\nm/b.go:1.1,2.1 2 5\n')
+    subprocess.check_call([sys.executable, 'scripts/cover_merge.py', 'cover.out', 'integration/*.out'], cwd=tmp_path)
+    assert (tmp_path / 'cover.out').read_text() == 'mode: atomic\nm/a.go:1.1,2.1 2 1\nm/b.go:1.1,2.1 2 5\n'
+    files = json.loads((tmp_path / 'coverage_files.json').read_text())
+    assert (files['stmts'], files['covered']) == (4, 4)
+    subprocess.check_call([sys.executable, 'scripts/gen_coverage_md.py'], cwd=tmp_path)
+    assert 'Overall Go statements coverage: **100.00%**' in (tmp_path / 'site_src' / 'coverage.md').read_text()
+    (tmp_path / 'bad.out').write_text('mode: set\nm/a.go:1.1,2.1 2 1\n')
+    proc = subprocess.run([sys.executable, 'scripts/cover_merge.py', 'cover.out', 'bad.out'], cwd=tmp_path)
+    assert proc.returncode == 2
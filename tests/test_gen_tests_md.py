@@ -0,0 +1,33 @@
+import json, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+SUMMARY = {
+    'totals': {'passed': 3, 'failed': 2, 'skipped': 1, 'packages': 2},
+    'packages': [
+        {'package': 'example.com/m/a', 'status': 'fail', 'elapsed': 0.5, 'passed': 1, 'failed': 2, 'skipped': 1},
+        {'package': 'example.com/m/b', 'status': 'pass', 'elapsed': 75.25, 'passed': 2, 'failed': 0, 'skipped': 0},
+    ],
+    'failures': [{'package': 'example.com/m/a', 'test': 'TestBad', 'elapsed': 0.02, 'output': 'want 1, got 2\n'}],
+    'benchmarks': 0,
+}
+
+
+def test_tests_page_renders_summary_and_failures(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    (tmp_path / 'test-summary.json').write_text(json.dumps(SUMMARY))
+    (tmp_path / 'site_src').mkdir()
+    (tmp_path / 'site_src' / 'tests.txt').write_text('log\n')
+    subprocess.check_call([sys.executable, 'scripts/gen_tests_md.py'], cwd=tmp_path)
+    md = (tmp_path / 'site_src' / 'tests.md').read_text()
+    assert '**3 passed · 2 failed · 1 skipped** in 2 packages (1m15.8s package time)' in md
+    assert '| `example.com/m/a` | ❌ fail | 1 | 2 | 1 | 0.50s |' in md
+    assert '| `example.com/m/b` | ✅ pass | 2 | 0 | 0 | 1m15.2s |' in md
+    assert '### `TestBad` (example.com/m/a)' in md and 'want 1, got 2' in md
+    assert '_1 more failures; see the full log._' in md and md.endswith('[Full test log](tests.txt)\n')
+
+
+def test_missing_summary_writes_no_page(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    subprocess.check_call([sys.executable, 'scripts/gen_tests_md.py'], cwd=tmp_path)
+    assert not (tmp_path / 'site_src' / 'tests.md').exists()
@@ -0,0 +1,88 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import go_packages  # noqa: E402
+
+
+def test_from_go_list_keeps_local_packages_and_external_deps(tmp_path):
+    root = tmp_path.resolve()
+    records = [
+        {'ImportPath': 'fmt', 'Standard': True, 'DepOnly': True},
+        {'ImportPath': 'golang.org/x/sync/errgroup', 'DepOnly': True, 'Module': {'Path': 'golang.org/x/sync'}},
+        {'ImportPath': 'example.com/m/internal/util', 'Dir': str(root / 'internal' / 'util'), 'Name': 'util',
+         'GoFiles': ['util.go'], 'TestGoFiles': ['util_test.go'], 'DepOnly': True, 'Module': {'Path': 'example.com/m'}},
+        {'ImportPath': 'example.com/m', 'Dir': str(root), 'Name': 'm', 'Doc': 'Package m does things.',
+         'GoFiles': ['m.go'], 'XTestGoFiles': ['m_ext_test.go'], 'Imports': ['fmt'], 'Deps': ['fmt']},
+        {'ImportPath': 'example.com/m/vendor/x', 'Dir': str(root / 'vendor' / 'x'), 'GoFiles': ['x.go']},
+    ]
+    (tmp_path / 'go.mod').write_text('module example.com/m\n\ngo 1.22\n')
+    model = go_packages.from_go_list(tmp_path, records)
+    assert [p.import_path for p in model.packages] == ['example.com/m']
+    assert model.packages[0].files == ['m.go', 'm_ext_test.go'] and model.packages[0].doc == 'Package m does things.'
+    assert model.external == ['golang.org/x/sync/errgroup']
+    again = go_packages.Model.from_json(json.loads(json.dumps(model.to_json())))
+    assert again.by_dir['.'].imports == ['fmt']
+
+
+def test_walk_model_is_cached_by_go_mod_and_file_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(go_packages.shutil, 'which', lambda name: None)
+    (tmp_path / 'go.mod').write_text('module example.com/m\n')
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'a' / 'a.go').write_text('package a\n')
+    (tmp_path / 'a' / 'a_test.go').write_text('package a\n')
+    (tmp_path / 'a' / 'testdata').mkdir()
+    (tmp_path / 'a' / 'testdata' / 'fixture.go').write_text('package fixture\n')
+    model = go_packages.load(tmp_path)
+    assert [(p.import_path, p.go_files, p.test_files) for p in model.packages] == [
+        ('example.com/m/a', ['a/a.go'], ['a/a_test.go'])]
+    cache = json.loads((tmp_path / '.go_packages.json').read_text())
+    assert cache['key'] == model.key
+
+    (tmp_path / 'a' / 'a.go').write_text('package a\n\nfunc A() {}\n')  # content edits keep the key
+    assert go_packages.load(tmp_path).key == model.key
+    (tmp_path / 'b.go').write_text('package m\n')
+    fresh = go_packages.load(tmp_path)
+    assert fresh.key != model.key and 'example.com/m' in fresh.by_import
+
+    rollup = fresh.rollup({'example.com/m/a/a.go': {'stmts': 4, 'covered': 3}, 'a/a_test.go': {'stmts': 1, 'covered': 1},
+                           'other/x.go': {'stmts': 2, 'covered': 0}})
+    assert rollup == {'example.com/m/a': {'stmts': 5, 'covered': 4}, 'other': {'stmts': 2, 'covered': 0}}
+
+
+def test_go_list_error_records_fall_back_to_the_walk(tmp_path, monkeypatch):
+    # go list -e exits 0 and reports the failure as an Error-only record
+    go = tmp_path / 'bin' / 'go'
+    go.parent.mkdir()
+    go.write_text(f'#!{sys.executable}\nprint(\'{{"ImportPath": "./...", "Error": {{"Err": "go: no modules"}}}}\')\n')
+    go.chmod(0o755)
+    monkeypatch.setattr(go_packages.shutil, 'which', lambda name: str(go))
+    (tmp_path / 'go.mod').write_text('module example.com/m\n')
+    (tmp_path / 'm.go').write_text('package m\n')
+    model = go_packages.load(tmp_path)
+    assert not model.from_toolchain and [p.import_path for p in model.packages] == ['example.com/m']
+
+
+def test_coverage_and_metrics_pages_roll_up_per_package(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    (tmp_path / 'go.mod').write_text('module example.com/m\n')
+    (tmp_path / 'm.go').write_text('package m\n\nfunc M() {}\n')
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'pkg' / 'p.go').write_text('package pkg\n\nfunc P() int {\n\treturn 1\n}\n')
+    (tmp_path / 'pkg' / 'p_test.go').write_text('package pkg\n\nfunc TestP(t *testing.T) {}\n')
+    (tmp_path / 'cover.out').write_text('mode: atomic\n'
+                                        'example.com/m/m.go:3.12,3.13 1 0\n'
+                                        'example.com/m/pkg/p.go:3.14,5.2 1 1\n'
+                                        'example.com/m/pkg/p.go:5.2,5.3 1 0\n')
+    env = {**os.environ, 'PATH': os.path.dirname(sys.executable)}  # no go toolchain: walk-derived model
+    subprocess.check_call([sys.executable, 'scripts/gen_coverage_md.py'], cwd=tmp_path, env=env)
+    md = (tmp_path / 'site_src' / 'coverage.md').read_text()
+    assert '| `example.com/m/pkg` | 2 | 1 | 50.00% |' in md and '| `example.com/m` | 1 | 0 | 0.00% |' in md
+
+    subprocess.check_call([sys.executable, 'scripts/collect_metrics.py', '--metrics', 'files,tests,loc'],
+                          cwd=tmp_path, env=env)
+    packages = json.loads((tmp_path / 'site_src' / 'packages.json').read_text())
+    assert packages['example.com/m/pkg'] == {'files': 2, 'loc': 4, 'tests': 1}
+    assert '| `example.com/m/pkg` | 2 | 4 | 1 |' in (tmp_path / 'site_src' / 'metrics.md').read_text()
@@ -0,0 +1,34 @@
+import json, os, pathlib, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+
+def test_go_zig_and_todo_collectors_share_one_walk(tmp_path):
+    (tmp_path / 'main.go').write_text('package main\n\n// TODO: flags\nfunc main() {}\n')
+    (tmp_path / 'main_test.go').write_text('package main\nfunc TestA(t *testing.T) {}\n')
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'lib.zig').write_text(
+        'const std = @import("std");\n\npub fn add(a: i32, b: i32) i32 {\n    return a + b; // FIXME overflow\n}\n'
+        'test "add" {\n    try std.testing.expect(add(1, 2) == 3);\n}\ntest add {\n}\n')
+    (tmp_path / 'zig-cache').mkdir()
+    (tmp_path / 'zig-cache' / 'gen.zig').write_text('test "ignored" {}\n')
+    trace = tmp_path / 'trace.jsonl'
+    env = {**os.environ, 'PIPELINE_TRACE': str(trace)}
+    subprocess.check_call([sys.executable, str(REPO / 'scripts' / 'collect_metrics.py'), '--root', str(tmp_path),
+                           '--output-dir', str(tmp_path / 'site_src'),
+                           '--metrics', 'files,tests,zig_files,zig_tests,zig_loc,todo'], cwd=REPO, env=env)
+    metrics = json.loads((tmp_path / 'site_src' / 'metrics.json').read_text())
+    assert metrics == {'go_files': 2, 'test_functions': 1, 'zig_files': 1, 'zig_tests': 2, 'zig_loc': 9,
+                       'todo_markers': 2}
+    md = (tmp_path / 'site_src' / 'metrics.md').read_text()
+    assert md.index('| Go Files | 2 |') < md.index('| Zig Files | 1 |') < md.index('| TODO/FIXME Markers | 2 |')
+    counters = next(json.loads(line) for line in trace.read_text().splitlines() if '"counter"' in line)['values']
+    assert counters['metrics.files_scanned'] == 3
+
+
+def test_unselected_collectors_are_not_imported():
+    code = ('import sys, collectors; mods = collectors.load({"files", "loc"}); '
+            'print(sorted(m for m in sys.modules if m.startswith("collectors.")))')
+    out = subprocess.check_output([sys.executable, '-c', code], text=True,
+                                  env={**os.environ, 'PYTHONPATH': str(REPO / 'scripts')})
+    assert out.strip() == "['collectors.go']"
@@ -0,0 +1,79 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import metrics_tree  # noqa: E402
+
+PER_FILE = {
+    'main.go': {'files': 1, 'loc': 10},
+    'cmd/tool/internal/run/run.go': {'files': 1, 'loc': 40, 'functions': 2, 'complexity_sum': 30, 'high_complexity': 1},
+    'pkg/a/a.go': {'files': 1, 'loc': 100, 'functions': 5, 'complexity_sum': 10, 'stmts': 50, 'covered': 45},
+    'pkg/a/a_test.go': {'files': 1, 'tests': 4},
+    'pkg/b/b.go': {'files': 1, 'loc': 20, 'functions': 1, 'complexity_sum': 12, 'high_complexity': 1,
+                   'stmts': 10, 'covered': 1},
+}
+
+
+def test_tree_totals_collapse_and_queries():
+    root = metrics_tree.build(PER_FILE)
+    assert root.values['loc'] == 170 and root.values['files'] == 5
+    assert [path for path, _ in metrics_tree.directories(root)] == ['cmd/tool/internal/run', 'pkg', 'pkg/a', 'pkg/b']
+    assert root.children['pkg'].values == {'files': 3, 'loc': 120, 'functions': 6, 'complexity_sum': 22,
+                                           'stmts': 60, 'covered': 46, 'tests': 4, 'high_complexity': 1}
+    assert [p for p, _ in metrics_tree.top(root, 'largest', 2)] == ['pkg', 'pkg/a']
+    # ties on complex functions are broken by average complexity (15 vs 12)
+    assert [p for p, _ in metrics_tree.top(root, 'complex', 2)] == ['cmd/tool/internal/run', 'pkg/b']
+    assert [p for p, _ in metrics_tree.top(root, 'untested', 3)] == ['pkg/b', 'pkg', 'pkg/a']
+    no_cov = metrics_tree.build({k: {m: v for m, v in rec.items() if m not in ('stmts', 'covered')}
+                                 for k, rec in PER_FILE.items()})
+    assert [p for p, _ in metrics_tree.top(no_cov, 'untested', 1)] == ['cmd/tool/internal/run']
+    assert metrics_tree.top(metrics_tree.build({'x/a.zig': {'files': 1, 'loc': 3}}), 'complex') == []
+
+
+def test_compact_json_round_trip():
+    root = metrics_tree.build(PER_FILE)
+    doc = json.loads(metrics_tree.dumps(root))
+    assert doc['keys'] == ['files', 'loc', 'tests', 'functions', 'complexity_sum', 'high_complexity', 'stmts', 'covered']
+    assert doc['tree'][2][0] == ['cmd/tool/internal/run', [1, 40, 0, 2, 30, 1], [['run.go', [1, 40, 0, 2, 30, 1]]]]
+    again = metrics_tree.from_json(doc)
+    assert [(p, n.values) for p, n in metrics_tree.directories(again)] == \
+        [(p, n.values) for p, n in metrics_tree.directories(root)]
+
+
+def test_collect_metrics_writes_tree_hotspots_and_treemap(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    (tmp_path / 'go.mod').write_text('module example.com/m\n')
+    (tmp_path / 'pkg' / 'a').mkdir(parents=True)
+    (tmp_path / 'pkg' / 'a' / 'a.go').write_text('package a\n\nfunc A() int {\n\treturn 1\n}\n')
+    (tmp_path / 'pkg' / 'a' / 'a_test.go').write_text('package a\nfunc TestA(t *testing.T) {}\n')
+    (tmp_path / 'pkg' / 'b').mkdir()
+    (tmp_path / 'pkg' / 'b' / 'b.go').write_text('package b\nfunc B() {}\n')
+    (tmp_path / 'lib.zig').write_text('test "x" {}\n')
+    (tmp_path / 'cover.out').write_text('mode: atomic\nexample.com/m/pkg/a/a.go:3.14,5.2 2 1\n'
+                                        'example.com/m/pkg/b/b.go:2.1,2.2 1 0\n')
+    env = {**os.environ, 'PATH': os.path.dirname(sys.executable)}  # no go toolchain: walk-derived model
+    subprocess.check_call([sys.executable, 'scripts/cover_merge.py', 'cover.out'], cwd=tmp_path, env=env)
+    # no Go metric selected: the package model is never built, even with coverage data present
+    subprocess.check_call([sys.executable, 'scripts/collect_metrics.py', '--metrics', 'zig_files'], cwd=tmp_path, env=env)
+    assert not (tmp_path / '.go_packages.json').exists()
+    assert metrics_tree.load(tmp_path / 'site_src' / 'metrics' / 'tree.json').values == {'files': 1}
+    subprocess.check_call([sys.executable, 'scripts/collect_metrics.py', '--metrics', 'files,tests,loc,zig_files'],
+                          cwd=tmp_path, env=env)
+    site = tmp_path / 'site_src'
+    tree = metrics_tree.load(site / 'metrics' / 'tree.json')
+    assert tree.children['lib.zig'].values == {'files': 1}
+    assert tree.children['pkg'].values == {'files': 3, 'loc': 6, 'tests': 1, 'stmts': 3, 'covered': 2}
+    assert (site / 'metrics' / 'metrics' / 'tree.json').exists() and (site / 'metrics' / 'treemap.js').exists()
+    md = (site / 'metrics.md').read_text()
+    assert '### Least Tested\n\n| Directory | Coverage (%) | Stmts |\n|---|---|---|\n| `pkg/b/` | 0 | 1 |' in md
+    assert '<script src="metrics/treemap.js"></script>' in md
+
+    # gen_metrics_md.py re-renders the page from the stored tree; interactive_charts: false keeps only the tables
+    (tmp_path / 'metrics').mkdir()
+    (tmp_path / 'metrics' / 'summary.json').write_text('{"metrics": []}')
+    subprocess.check_call([sys.executable, 'scripts/gen_metrics_md.py'], cwd=tmp_path,
+                          env={**env, 'INTERACTIVE_CHARTS': 'false'})
+    md = (site / 'metrics.md').read_text()
+    assert '| `pkg/a/` | 4 | 2 |' in md and 'metrics-treemap' not in md
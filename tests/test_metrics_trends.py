@@ -6,9 +6,8 @@ def test_metrics_trends(tmp_path):
     # work in isolated copy so we don't pollute real repo
     with tempfile.TemporaryDirectory() as td:
         td_path = Path(td)
-        # copy script directory minimally
-        (td_path / 'scripts').mkdir()
-        shutil.copy2(repo_root / 'scripts' / 'gen_metrics_md.py', td_path / 'scripts' / 'gen_metrics_md.py')
+        # copy script directory (gen_metrics_md imports shared helpers from it)
+        shutil.copytree(repo_root / 'scripts', td_path / 'scripts')
         # create metrics history
         (td_path / 'metrics' / 'data').mkdir(parents=True)
         (td_path / 'metrics' / 'summary.json').write_text('{"metrics": {"coverage": []}}')
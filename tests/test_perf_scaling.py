@@ -0,0 +1,29 @@
+import json, pathlib, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'perf'))
+
+import run_perf  # noqa: E402
+
+
+def test_scripts_scale_without_superlinear_growth(tmp_path):
+    # 1k/10k keeps the suite fast; perf/run_perf.py defaults to 1k/10k/100k.
+    # Growth exponents and exit codes fail the run on any machine; the wall-clock
+    # baseline comparison (--check-baseline) is left to dedicated perf runs.
+    proc = subprocess.run([sys.executable, str(REPO / 'perf' / 'run_perf.py'), '--scales', '1000,10000',
+                           '--output', str(tmp_path / 'perf.json')], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert 'collect_security.py | 10000' in proc.stdout
+    results = json.loads((tmp_path / 'perf.json').read_text())['results']
+    assert all(set(by_scale) == {'1000', '10000'} for by_scale in results.values())
+
+
+def test_growth_failures_are_reported_separately_from_slowdowns():
+    args = run_perf.parse_args(['--noise-floor', '0'])
+    rec = lambda seconds, units: {'seconds': seconds, 'units': units, 'exit': 0}
+    current = {'calibration_s': 1.0, 'results': {'x.py': {'1000': rec(0.1, 100), '10000': rec(10.0, 1000)}}}
+    baseline = {'calibration_s': 1.0, 'results': {'x.py': {'1000': rec(0.01, 100)}}}
+    failures, slowdowns = run_perf.check(current, baseline, args)
+    assert failures == ['x.py: growth exponent 2.00 from 1000 to 10000 (> 1.4)']
+    assert slowdowns == ['x.py @ 1000: 0.100s > 0.025s allowed']
+    assert run_perf.check(current, None, args)[1] == []
@@ -0,0 +1,39 @@
+import json, os, pathlib, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+
+def test_trace_spans_counters_and_chrome_export(tmp_path):
+    (tmp_path / 'a.go').write_text('package a\n\nfunc A() {}\n')
+    (tmp_path / 'a_test.go').write_text('package a\nfunc TestA(t *testing.T) {}\n')
+    trace = tmp_path / 'trace.jsonl'
+    env = {**os.environ, 'PIPELINE_TRACE': str(trace)}
+    subprocess.check_call([sys.executable, str(REPO / 'scripts' / 'collect_metrics.py'), '--root', str(tmp_path),
+                           '--output-dir', str(tmp_path / 'site_src'), '--metrics', 'files,loc'], env=env)
+    events = [json.loads(line) for line in trace.read_text().splitlines()]
+    proc_span = next(e for e in events if e['type'] == 'span' and e['args'].get('process'))
+    assert proc_span['name'] == 'collect_metrics.py'
+    assert proc_span['args']['peak_rss_kb'] > 0
+    counters = next(e for e in events if e['type'] == 'counter')['values']
+    assert counters['metrics.files_scanned'] == 2
+    assert counters['bytes_written'] > 0
+
+    summary = tmp_path / 'summary.md'
+    subprocess.check_call([sys.executable, str(REPO / 'scripts' / 'pipeline_trace.py'), '--input', str(trace),
+                           '--output', str(tmp_path / 'trace.json'), '--summary', str(summary)],
+                          env={k: v for k, v in os.environ.items() if k != 'PIPELINE_TRACE'}, stdout=subprocess.DEVNULL)
+    chrome = json.loads((tmp_path / 'trace.json').read_text())
+    phases = {e['ph'] for e in chrome['traceEvents']}
+    assert {'X', 'C', 'M'} <= phases
+    md = summary.read_text()
+    assert '`collect_metrics.py`' in md and '| metrics.files_scanned | 2 |' in md
+
+
+def test_script_messages_are_printed_and_traced_as_log_events(tmp_path):
+    trace = tmp_path / 'trace.jsonl'
+    out = subprocess.run([sys.executable, str(REPO / 'scripts' / 'gen_tests_md.py')], cwd=tmp_path, text=True,
+                         env={**os.environ, 'PIPELINE_TRACE': str(trace)}, capture_output=True, check=True).stdout
+    assert out.startswith('Info: no test summary at ')
+    logs = [e for e in map(json.loads, trace.read_text().splitlines()) if e['type'] == 'log']
+    assert [(e['level'], e['script']) for e in logs] == [('INFO', 'gen_tests_md.py')]
+    assert out.rstrip('\n') == f"Info: {logs[0]['msg']}"
@@ -0,0 +1,52 @@
+import gzip, json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+
+def build_site(root: pathlib.Path) -> pathlib.Path:
+    site = root / 'site_build'
+    (site / 'reference' / 'pkg').mkdir(parents=True)
+    (site / 'metrics' / 'data').mkdir(parents=True)
+    (site / 'reference' / 'pkg' / 'index.html').write_text('<p>func F() int</p>\n' * 500)
+    (site / 'metrics' / 'data' / 'loc.json').write_text(json.dumps([{'time': 't', 'value': i} for i in range(200)], indent=2))
+    (site / 'index.html').write_text('<html></html>')
+    return site
+
+
+def run(root: pathlib.Path, *args: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if k != 'GITHUB_STEP_SUMMARY'}
+    return subprocess.run([sys.executable, 'scripts/postbuild.py', '--workers', '2', *args], cwd=root, env=env,
+                          capture_output=True, text=True)
+
+
+def test_minify_compress_and_report(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    site = build_site(tmp_path)
+    proc = run(tmp_path, '--budgets', 'reference=1M,total=2M')
+    assert proc.returncode == 0, proc.stderr
+
+    data = site / 'metrics' / 'data' / 'loc.json'
+    assert b' ' not in data.read_bytes() and len(json.loads(data.read_text())) == 200
+    page = site / 'reference' / 'pkg' / 'index.html'
+    gz = page.with_name('index.html.gz')
+    assert gzip.decompress(gz.read_bytes()) == page.read_bytes()
+    assert not (site / 'index.html.gz').exists()  # below --min-size
+
+    report = json.loads((tmp_path / 'size-report.json').read_text())
+    assert report['sections']['reference']['raw'] == page.stat().st_size
+    assert report['sections']['reference']['gzip'] == gz.stat().st_size
+    assert report['sections']['total']['files'] == 3
+    assert '| reference | 1 |' in proc.stdout
+
+    first = gz.read_bytes()
+    gz.unlink()
+    assert run(tmp_path).returncode == 0
+    assert gz.read_bytes() == first  # reproducible (mtime=0)
+
+
+def test_budget_exceeded_exits_3(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    build_site(tmp_path)
+    proc = run(tmp_path, '--budgets', 'reference=1K', '--no-compress')
+    assert proc.returncode == 3
+    assert 'BUDGET_EXCEEDED: reference' in proc.stderr
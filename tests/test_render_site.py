@@ -0,0 +1,77 @@
+import pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import render_site  # noqa: E402
+
+MKDOCS_YML = '''site_name: "demo"
+repo_url: "https://github.com/o/r"
+docs_dir: site_src
+theme:
+    name: material
+extra_javascript:
+    - extra_badges.js
+markdown_extensions:
+  - admonition
+  - toc:
+      permalink: true
+nav:
+  - Home: index.md
+  - Reference:
+      - Go: reference/go/index.md
+  - Tests: tests.md
+'''
+
+
+def test_markdown_subset():
+    body, title, toc = render_site.render_markdown(
+        '# Title *x*\n\nText & `a<b>` [t](tests.md#s) <b>raw</b>\n\n'
+        '!!! note "N"\n    **inside**\n\n'
+        '- a\n- b\n    - c\n\n'
+        '| K | V |\n|---|--:|\n| `x|y` | <svg width="8"></svg> |\n\n'
+        '```go\nfunc <T>()\n```\n\n## Sub\n## Sub\n')
+    assert title == 'Title x'
+    assert '<p>Text &amp; <code>a&lt;b&gt;</code> <a href="tests.html#s">t</a> <b>raw</b></p>' in body
+    assert '<div class="admonition note"><p class="admonition-title">N</p><p><strong>inside</strong></p></div>' in body
+    assert '<li>b\n<ul>\n<li>c</li>\n</ul></li>' in body
+    assert '<td><code>x|y</code></td><td style="text-align:right"><svg width="8"></svg></td>' in body
+    assert '<pre><code class="language-go">func &lt;T&gt;()</code></pre>' in body
+    assert [t[1] for t in toc] == ['sub', 'sub_1']
+
+
+def test_config_nav(tmp_path):
+    (tmp_path / 'mkdocs.yml').write_text(MKDOCS_YML)
+    config = render_site.read_config(tmp_path / 'mkdocs.yml')
+    assert config['site_name'] == 'demo' and config['docs_dir'] == 'site_src'
+    assert config['extra_javascript'] == ['extra_badges.js']
+    assert config['nav'] == [['Home', 'index.md'], ['Reference', [['Go', 'reference/go/index.md']]], ['Tests', 'tests.md']]
+
+
+def test_incremental_build(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    (tmp_path / 'mkdocs.yml').write_text(MKDOCS_YML)
+    src = tmp_path / 'site_src'
+    (src / 'reference' / 'go').mkdir(parents=True)
+    (src / 'index.md').write_text('# Home\n\nSee [tests](tests.md).\n')
+    (src / 'tests.md').write_text('# Tests\n')
+    (src / 'reference' / 'go' / 'index.md').write_text('# Go\n')
+    (src / 'extra_badges.js').write_text('// js\n')
+
+    def run(*args):
+        return subprocess.run([sys.executable, 'scripts/render_site.py', *args], cwd=tmp_path,
+                              capture_output=True, text=True, check=True).stdout
+
+    assert 'rendered 3 pages, copied 1 files' in run()
+    out = tmp_path / 'site_build'
+    page = (out / 'reference' / 'go' / 'index.html').read_text()
+    assert '<a class="active" href="index.html">Go</a>' in page and 'href="../../tests.html"' in page
+    assert '<script src="../../extra_badges.js"></script>' in page and (out / '_render' / 'site.css').exists()
+    assert 'rendered 0 pages, copied 0 files, removed 0, 4 unchanged' in run()
+    (src / 'tests.md').write_text('# Tests\n\nchanged\n')
+    (src / 'index.md').unlink()
+    assert 'rendered 1 pages, copied 0 files, removed 1, 2 unchanged' in run()
+    assert not (out / 'index.html').exists() and 'changed' in (out / 'tests.html').read_text()
+    (tmp_path / 'mkdocs.yml').write_text(MKDOCS_YML.replace('"demo"', '"renamed"'))
+    assert 'rendered 2 pages' in run()
+    assert '| builtin, 1 process |' in run('--bench', '--workers', '1')
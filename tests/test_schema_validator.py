@@ -0,0 +1,49 @@
+import json, os, pathlib, shutil, subprocess, sys, time
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import schema_validator  # noqa: E402
+
+
+def test_snapshot_schemas_compile_and_report_first_error():
+    metrics = schema_validator.load(REPO / 'schema' / 'metrics.schema.json')
+    assert metrics({'coverage_percent': 81.5, 'zig_coverage_percent': 50, 'go_files': 3}) is None
+    assert metrics({'go_files': 2.5}) == '$.go_files: expected integer'
+    assert metrics({'loc': True}) == '$.loc: expected integer'
+    assert metrics({'made_up': 1}) == "$: unexpected property 'made_up'"
+
+    security = schema_validator.load(REPO / 'schema' / 'security.schema.json')
+    snap = {'severity': {'high': 1}, 'code_scanning': {'open': 0}, 'secret_scanning': {'open': 0},
+            'alerts': {'mean_time_to_fix_days': None, 'open_age_days': {'gt_90d': 2}}}
+    assert security(snap) is None
+    assert security({**snap, 'secret_scanning': {'open': -1}}) == '$.secret_scanning.open: -1 < 0'
+    assert security({'severity': {}}) == "$: missing required 'code_scanning'"
+    assert schema_validator.load(REPO / 'schema' / 'nope.json') is None
+
+
+def test_bulk_history_validation_is_fast():
+    entry_ok = schema_validator.load(REPO / 'schema' / 'series.schema.json', items=True)
+    series = [{'time': f'2024-01-01T00:00:{i % 60:02d}+00:00', 'value': i * 0.5} for i in range(100_000)]
+    series[10] = {'time': '2024-01-01', 'value': 'NaN'}
+    series[20] = {'value': 1}
+    start = time.perf_counter()
+    kept, dropped = schema_validator.filter_valid(entry_ok, series)
+    assert time.perf_counter() - start < 1.0
+    assert (len(kept), dropped) == (99_998, 2)
+
+
+def test_update_metrics_drops_corrupt_history_entries(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    (tmp_path / 'site_src').mkdir()
+    (tmp_path / 'site_src' / 'metrics.json').write_text(json.dumps({'loc': 12}))
+    data = tmp_path / 'metrics' / 'data'
+    data.mkdir(parents=True)
+    (data / 'loc.json').write_text(json.dumps([{'time': 't0', 'value': 10}, {'time': 't1', 'value': {'x': 1}}, 'junk']))
+    env = {k: v for k, v in os.environ.items() if k not in ('PIPELINE_TRACE', 'TOKEN')}
+    out = subprocess.run([sys.executable, 'scripts/update_metrics.py'], cwd=tmp_path, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    assert 'dropped 2 invalid entries' in out
+    series = json.loads((data / 'loc.json').read_text())
+    assert [e['value'] for e in series] == [10, 12]
@@ -0,0 +1,97 @@
+import json, os, pathlib, re, shutil, subprocess, sys, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+REPOS = [f'acme/svc-{i:03d}' for i in range(120)] + ['acme/tools']
+
+
+class Stub:
+    """Serves /orgs/acme/repos (paged by 100) and one critical dependabot alert per svc repo;
+    dependabot listings of repos in `failing` answer 500."""
+
+    def __init__(self):
+        self.requests = []
+        self.failing = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                path = self.path.split('?')[0]
+                page = int((re.search(r'[?&]page=(\d+)', self.path) or [0, 1])[1])
+                headers = {}
+                if path.endswith('/dependabot/alerts') and path.split('/')[3] in stub.failing:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                if path == '/orgs/acme/repos':
+                    body = [{'full_name': r} for r in REPOS[(page - 1) * 100:page * 100]]
+                    if page * 100 < len(REPOS):
+                        headers['Link'] = f'<http://127.0.0.1:{self.server.server_address[1]}{path}?per_page=100&page={page + 1}>; rel="next"'
+                elif path.endswith('/dependabot/alerts') and '/svc-' in path:
+                    body = [{'number': 1, 'state': 'open', 'security_advisory': {'severity': 'critical'}}]
+                else:
+                    body = []
+                self.send_response(200)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def run(tmp_path, stub, *args):
+    env = {k: v for k, v in os.environ.items() if k not in ('PIPELINE_TRACE', 'SECURITY_STORE')}
+    env.update({'GITHUB_TOKEN': 'test', 'SECURITY_API_BASE': f'http://127.0.0.1:{stub.server.server_address[1]}/repos'})
+    stub.requests.clear()
+    stub.output = subprocess.run([sys.executable, 'scripts/collect_security.py', '--rate', '500', '--concurrency', '16',
+                                  *args], cwd=tmp_path, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads((tmp_path / 'site_src' / 'security_org.json').read_text())
+
+
+def test_org_rollup_with_glob_file_and_resume(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    (tmp_path / 'repos.txt').write_text('# services\nacme/svc-*\nacme/tools\n')
+    stub = Stub()
+    try:
+        rollup = run(tmp_path, stub, '--repos', '@repos.txt')
+        assert rollup['complete'] and len(rollup['repos']) == 121
+        assert rollup['totals']['critical'] == 120
+        assert len([r for r in stub.requests if r.startswith('/orgs/')]) == 2
+        assert len(stub.requests) == 2 + 121 * 3
+        assert (tmp_path / 'site_src' / 'security' / 'repos' / 'acme__tools.json').exists()
+        md = (tmp_path / 'site_src' / 'security_org.md').read_text()
+        assert '| **Total** | 120 | 0 | 0 | 0 | 0 | 0 |' in md
+        assert json.loads((tmp_path / '.security_checkpoint.json').read_text()) == {'complete': True}
+
+        # an interrupted run left a checkpoint: only the remaining repos are fetched
+        done = {r: rollup['repos'][r] for r in REPOS[:100]}
+        (tmp_path / '.security_checkpoint.json').write_text(json.dumps({'repos': REPOS, 'done': done}))
+        rollup = run(tmp_path, stub, '--repos', ','.join(REPOS))
+        assert rollup['complete'] and len(rollup['repos']) == 121
+        assert len(stub.requests) == 21 * 3
+
+        # a repo whose alerts could not all be listed stays pending instead of being marked done
+        stub.failing.add('tools')
+        (tmp_path / '.security_checkpoint.json').unlink()
+        rollup = run(tmp_path, stub, '--repos', 'acme/svc-000,acme/tools')
+        assert not rollup['complete'] and rollup['pending'] == ['acme/tools']
+        saved = json.loads((tmp_path / '.security_checkpoint.json').read_text())
+        assert list(saved['done']) == ['acme/svc-000'] and saved['attempts'] == {'acme/tools': 1}
+        assert 'could not all be listed' in stub.output and 'deadline reached' not in stub.output
+
+        # ...but only for --max-attempts runs, so it cannot hold the roll-up incomplete forever
+        rollup = run(tmp_path, stub, '--repos', 'acme/svc-000,acme/tools', '--max-attempts', '2')
+        assert rollup['complete'] and rollup['failed'] == ['acme/tools'] and list(rollup['repos']) == ['acme/svc-000']
+        assert 'giving up on acme/tools after 2 incomplete runs' in stub.output
+        assert json.loads((tmp_path / '.security_checkpoint.json').read_text()) == {'complete': True}
+        assert '_Not included: alerts of `acme/tools` could not be listed._' in \
+            (tmp_path / 'site_src' / 'security_org.md').read_text()
+    finally:
+        stub.server.shutdown()
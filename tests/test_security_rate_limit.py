@@ -0,0 +1,83 @@
+import json, os, pathlib, re, shutil, subprocess, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import collect_security  # noqa: E402
+
+
+class Stub:
+    """Secondary limit on the first dependabot call, primary budget exhausted after page 1,
+    and a permission 403 for code scanning."""
+
+    def __init__(self):
+        self.requests = []
+        self.times = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def reply(self, status, body, **headers):
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k.replace('_', '-'), str(v))
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                stub.times.append(time.time())
+                path = self.path.split('?')[0]
+                page = int((re.search(r'[?&]page=(\d+)', self.path) or [0, 1])[1])
+                if path.endswith('/dependabot/alerts'):
+                    if len([r for r in stub.requests if 'dependabot' in r]) == 1:
+                        return self.reply(403, {'message': 'You have exceeded a secondary rate limit.'}, Retry_After=1)
+                    if page == 1:
+                        nxt = f'<http://127.0.0.1:{self.server.server_address[1]}{path}?page=2>; rel="next"'
+                        return self.reply(200, [{'security_advisory': {'severity': 'high'}}], Link=nxt,
+                                          X_RateLimit_Remaining=0, X_RateLimit_Reset=int(time.time()) + 1)
+                    return self.reply(200, [{'security_advisory': {'severity': 'low'}}], X_RateLimit_Remaining=4999,
+                                      X_RateLimit_Reset=int(time.time()) + 3600)
+                if path.endswith('/code-scanning/alerts'):
+                    return self.reply(403, {'message': 'Resource not accessible by integration'},
+                                      X_RateLimit_Remaining=4998)
+                return self.reply(200, [{}])
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def test_rate_limits_are_waited_out_and_permission_errors_not_retried(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    stub = Stub()
+    env = {k: v for k, v in os.environ.items() if k not in ('PIPELINE_TRACE', 'SECURITY_STORE')}
+    env.update({'GITHUB_REPOSITORY': 'acme/x', 'GITHUB_TOKEN': 'test',
+                'SECURITY_API_BASE': f'http://127.0.0.1:{stub.server.server_address[1]}/repos'})
+    try:
+        out = subprocess.run([sys.executable, 'scripts/collect_security.py'], cwd=tmp_path, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    finally:
+        stub.server.shutdown()
+    snap = json.loads((tmp_path / 'site_src' / 'security.json').read_text())
+    assert snap['severity'] == {'critical': 0, 'high': 1, 'medium': 0, 'low': 1}  # nothing truncated
+    assert snap['secret_scanning'] == {'open': 1}
+    assert len([r for r in stub.requests if 'code-scanning' in r]) == 1
+    assert 'permission denied' in out
+    dep = [t for r, t in zip(stub.requests, stub.times) if 'dependabot' in r]
+    assert dep[1] - dep[0] >= 0.9  # honoured Retry-After
+    assert dep[2] - dep[1] >= 0.9  # waited for X-RateLimit-Reset
+    assert re.search(r'rate limits: [\d.]+s throttled \(primary [\d.]+s, secondary [\d.]+s\)', out)
+
+
+def test_exhausted_budget_without_reset_backs_off():
+    limiter = collect_security.RateLimiter(secondary_backoff=10)
+    start = time.time()
+    assert limiter.update(403, {'x-ratelimit-remaining': '0'}) == 'retry'
+    first = limiter.blocked_until - start
+    assert limiter.update(403, {'x-ratelimit-remaining': '0', 'x-ratelimit-reset': str(int(start) - 5)}) == 'retry'
+    assert 10 <= first < 11 and limiter.blocked_until - start >= 20
+    assert limiter.wait(deadline_at=time.time() + 1) is False  # gives up at the deadline instead of spinning
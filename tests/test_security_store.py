@@ -0,0 +1,76 @@
+import json, os, pathlib, re, shutil, subprocess, sys, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+PER_PAGE = 100
+
+
+def dependabot(n, state='open', fixed=None, updated='2024-01-01T00:00:00Z'):
+    return {'number': n, 'state': state, 'security_advisory': {'severity': 'high' if n % 2 else 'low'},
+            'created_at': '2023-12-01T00:00:00Z', 'updated_at': updated, 'fixed_at': fixed}
+
+
+class Stub:
+    def __init__(self):
+        self.alerts = {'dependabot': [dependabot(i) for i in range(1, 151)],
+                       'code-scanning': [{'number': 1, 'state': 'open', 'rule': {'security_severity_level': 'high'},
+                                          'created_at': '2024-01-01T00:00:00Z', 'updated_at': '2024-01-01T00:00:00Z'}],
+                       'secret-scanning': []}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                kind = self.path.split('/')[4]
+                page = int((re.search(r'[?&]page=(\d+)', self.path) or [0, 1])[1])
+                items = sorted(stub.alerts[kind], key=lambda a: a['updated_at'], reverse=True)
+                body = items[(page - 1) * PER_PAGE:page * PER_PAGE]
+                self.send_response(200)
+                if page * PER_PAGE < len(items):
+                    base = f'http://127.0.0.1:{self.server.server_address[1]}' + self.path.split('?')[0]
+                    self.send_header('Link', f'<{base}?sort=updated&direction=desc&per_page=100&page={page + 1}>; rel="next"')
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def run(tmp_path, stub):
+    env = {k: v for k, v in os.environ.items() if k != 'PIPELINE_TRACE'}
+    env.update({'GITHUB_REPOSITORY': 'acme/x', 'GITHUB_TOKEN': 'test', 'SECURITY_STORE': 'security/alerts.json',
+                'SECURITY_API_BASE': f'http://127.0.0.1:{stub.server.server_address[1]}/repos'})
+    stub.requests.clear()
+    subprocess.check_call([sys.executable, 'scripts/collect_security.py'], cwd=tmp_path, env=env)
+    return json.loads((tmp_path / 'site_src' / 'security.json').read_text())
+
+
+def test_incremental_sync_stops_at_cursor(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    stub = Stub()
+    try:
+        first = run(tmp_path, stub)
+        assert len(stub.requests) == 4  # two dependabot pages, one each for code/secret scanning
+        assert first['severity'] == {'critical': 0, 'high': 75, 'medium': 0, 'low': 75}
+        assert first['code_scanning'] == {'open': 1}
+        assert first['alerts']['mean_time_to_fix_days'] is None
+
+        stub.alerts['dependabot'][0] = dependabot(1, 'fixed', fixed='2023-12-11T00:00:00Z',
+                                                  updated='2024-02-01T00:00:00Z')
+        second = run(tmp_path, stub)
+        assert len(stub.requests) == 3  # one page per kind
+        assert second['severity']['high'] == 74
+        assert second['alerts']['mean_time_to_fix_days'] == 10.0
+        assert second['alerts']['open_age_days']['gt_90d'] == 150
+
+        store = json.loads((tmp_path / 'security' / 'alerts.json').read_text())
+        assert store['kinds']['dependabot']['cursor'] == '2024-02-01T00:00:00Z'
+        assert store['kinds']['dependabot']['alerts']['1']['state'] == 'fixed'
+        assert '| Mean Time to Fix (days) | 10.0 |' in (tmp_path / 'site_src' / 'security.md').read_text()
+    finally:
+        stub.server.shutdown()
@@ -0,0 +1,51 @@
+import json, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import shard_tests  # noqa: E402
+
+
+def test_plan_balances_by_duration():
+    packages = [('m/a', True), ('m/b', True), ('m/c', True), ('m/d', True), ('m/docs', False)]
+    durations = {'m/a': 9.0, 'm/b': 5.0, 'm/c': 4.0, 'm/d': 3.0}
+    shards = shard_tests.plan(packages, durations, 2, overhead=0)
+    assert [s['packages'] for s in shards] == [['m/a', 'm/d'], ['m/b', 'm/c', 'm/docs']]
+    assert [s['estimate_s'] for s in shards] == [12.0, 9.0]
+    assert len(shard_tests.plan(packages[:2], durations, 8)) == 2
+
+
+def test_package_durations_skip_subtests():
+    history = {'runs': [{}, {}], 'tests': {
+        'm/a TestX': {'d': [100, 300], 'o': 'PP'},
+        'm/a TestX/sub': {'d': [90, 290], 'o': 'PP'},
+        'm/a TestY': {'d': [None, 1000], 'o': '.F'},
+    }}
+    assert shard_tests.package_durations(history) == {'m/a': 1.2}
+
+
+def test_merge_matches_single_run(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    blocks = ['m/a/a.go:1.1,2.2 2 {}', 'm/b/b.go:1.1,2.2 3 {}', 'm/b/b.go:4.1,5.2 1 {}']
+    shard_counts = [(1, 0, 0), (0, 2, 0)]  # shard 0 tests m/a, shard 1 tests m/b
+    for i, counts in enumerate(shard_counts):
+        d = tmp_path / 'test-shards' / f'shard-{i}'
+        d.mkdir(parents=True)
+        pkg = ['m/a', 'm/b'][i]
+        (d / 'cover.out').write_text('mode: atomic\n' + '\n'.join(b.format(c) for b, c in zip(blocks, counts)) + '\n')
+        (d / 'test-results.jsonl').write_text(json.dumps({'package': pkg, 'test': 'TestX', 'action': 'pass', 'elapsed': 0.1}) + '\n')
+        (d / 'tests.txt').write_text(f'ok {pkg}\n')
+        (d / 'plan.json').write_text(json.dumps({'index': i, 'packages': [pkg]}))
+        (d / 'test-summary.json').write_text(json.dumps({
+            'totals': {'passed': 1, 'failed': 0, 'skipped': 0, 'packages': 1},
+            'packages': [{'package': pkg, 'status': 'pass', 'elapsed': 0.1, 'passed': 1, 'failed': 0, 'skipped': 0}],
+            'failures': [], 'benchmarks': 0}))
+    out = subprocess.run([sys.executable, 'scripts/shard_tests.py', 'merge'], cwd=tmp_path,
+                         capture_output=True, text=True, check=True).stdout
+    assert 'Warning' not in out
+    assert (tmp_path / 'cover.out').read_text() == 'mode: atomic\n' + '\n'.join(
+        b.format(c) for b, c in zip(blocks, (1, 2, 0))) + '\n'
+    summary = json.loads((tmp_path / 'test-summary.json').read_text())
+    assert summary['totals'] == {'passed': 2, 'failed': 0, 'skipped': 0, 'packages': 2}
+    assert len((tmp_path / 'test-results.jsonl').read_text().splitlines()) == 2
+    assert (tmp_path / 'site_src' / 'tests.txt').read_text() == 'ok m/a\nok m/b\n'
@@ -0,0 +1,41 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+WRITER = """
+import sys
+from site_output import write_text
+for arg in sys.argv[1:]:
+    path, text = arg.split('=', 1)
+    print(write_text(path, text))
+"""
+
+
+def run(tmp_path, *pairs, run_id='run-1'):
+    env = os.environ.copy()
+    env['SITE_RUN_ID'] = run_id
+    env['PYTHONPATH'] = str(tmp_path / 'scripts')
+    out = subprocess.check_output([sys.executable, '-c', WRITER, *pairs], cwd=tmp_path, env=env, text=True)
+    return out.split()
+
+
+def test_skips_unchanged_and_restores_mtime(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    page = tmp_path / 'site_src' / 'page.md'
+    assert run(tmp_path, 'site_src/page.md=v1', run_id='run-0') == ['True']
+    os.utime(page, ns=(1_000_000_000, 1_000_000_000))
+
+    # identical content: nothing written, mtime kept
+    assert run(tmp_path, 'site_src/page.md=v1') == ['False']
+    assert page.stat().st_mtime_ns == 1_000_000_000
+
+    # rewritten and reverted by two scripts in the same run: original mtime restored
+    assert run(tmp_path, 'site_src/page.md=partial') == ['True']
+    assert run(tmp_path, 'site_src/page.md=v1', 'site_src/new.md=x') == ['True', 'True']
+    assert page.read_text() == 'v1'
+    assert page.stat().st_mtime_ns == 1_000_000_000
+
+    manifest = json.loads((tmp_path / '.site_changes.json').read_text())
+    assert manifest['run_id'] == 'run-1'
+    assert manifest['changed'] == ['site_src/new.md']
+    assert not [p for p in page.parent.iterdir() if p.name.startswith('.')]
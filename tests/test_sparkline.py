@@ -0,0 +1,49 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+
+def history(root, kind, series):
+    data = root / kind / 'data'
+    data.mkdir(parents=True)
+    for key, vals in series.items():
+        (data / f'{key}.json').write_text(json.dumps([{'time': f't{i}', 'value': v} for i, v in enumerate(vals)]))
+    (root / kind / 'summary.json').write_text(json.dumps({'metrics': [{'name': k, 'file': f'{k}.json'} for k in series]}))
+
+
+def run(root, script, **extra):
+    env = {k: v for k, v in os.environ.items() if k not in ('PIPELINE_TRACE', 'INTERACTIVE_CHARTS')}
+    subprocess.check_call([sys.executable, f'scripts/{script}'], cwd=root, env={**env, **extra})
+
+
+def test_metrics_table_embeds_sparklines(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    history(tmp_path, 'metrics', {'loc': [10, 14, 12], 'go_files': [3]})
+    (tmp_path / 'site_src').mkdir()
+    (tmp_path / 'site_src' / 'metrics.json').write_text(json.dumps({'go_files': 3, 'loc': 12}))
+    run(tmp_path, 'gen_metrics_md.py')
+    md = (tmp_path / 'site_src' / 'metrics.md').read_text()
+    assert '| Metric | Value | Trend |' in md
+    assert '| Go Files | 3 | - |' in md
+    row = next(line for line in md.splitlines() if line.startswith('| Lines of Code'))
+    assert row.startswith('| Lines of Code (non-test) | 12 | <svg class="sparkline"')
+    assert 'points="1.0,17.0 40.0,1.0 79.0,9.0"' in row and row.endswith('↓ −2 |')
+    assert '<script src="metrics/metrics.js"></script>' in md
+
+    run(tmp_path, 'gen_metrics_md.py', INTERACTIVE_CHARTS='false')
+    md = (tmp_path / 'site_src' / 'metrics.md').read_text()
+    assert 'metrics-charts' not in md and '<svg' in md
+
+
+def test_security_trends_table_is_regenerated(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    history(tmp_path, 'security', {'severity_high': [2, 5], 'total_vulns': [7]})
+    (tmp_path / 'site_src').mkdir()
+    (tmp_path / 'site_src' / 'security.md').write_text('# Security Overview\n\n| Severity | Count |\n')
+    run(tmp_path, 'gen_security_md.py')
+    run(tmp_path, 'gen_security_md.py')
+    md = (tmp_path / 'site_src' / 'security.md').read_text()
+    assert md.count('## Trends') == 1 and md.startswith('# Security Overview')
+    assert '| Severity High | 5 | <svg' in md and '↑ +3 |' in md
+    assert '| Total Vulnerabilities | 7 | - |' in md
+    assert md.index('| Series |') < md.index('id="security-charts"')
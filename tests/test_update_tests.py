@@ -0,0 +1,59 @@
+import json, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import update_tests  # noqa: E402
+
+
+def history_of(runs):
+    history = update_tests.empty()
+    for i, results in enumerate(runs):
+        update_tests.append_run(history, results, {'time': f't{i}'}, max_runs=12)
+    return history
+
+
+def test_append_run_keeps_columns_aligned_and_trims():
+    history = history_of([{'p TestA': ('P', 10)}, {'p TestB': ('F', 3)}, {'p TestA': ('P', 12), 'p TestB': ('P', 4)}])
+    assert history['tests']['p TestA'] == {'d': [10, None, 12], 'o': 'P.P'}
+    assert history['tests']['p TestB'] == {'d': [None, 3, 4], 'o': '.FP'}
+    update_tests.append_run(history, {'p TestB': ('P', 5)}, {'time': 't3'}, max_runs=1)
+    assert [r['time'] for r in history['runs']] == ['t3']
+    assert history['tests'] == {'p TestB': {'d': [5], 'o': 'P'}}
+
+
+def test_slowest_trending_and_flaky():
+    runs = [{'p TestSlow': ('P', 500), 'p TestGrow': ('P', 100 if i < 5 else 200),
+             'p TestFlaky': ('P' if i % 2 else 'F', 1)} for i in range(10)]
+    history = history_of(runs)
+    slow = update_tests.slowest(history)
+    assert [r['test'] for r in slow] == ['TestSlow', 'TestGrow', 'TestFlaky']
+    assert slow[1]['median_ms'] == 200 and slow[1]['package'] == 'p'
+    grow = update_tests.trending(history)
+    assert [(r['test'], r['before_ms'], r['recent_ms'], r['change_pct']) for r in grow] == [('TestGrow', 100, 200, 100.0)]
+    flaky = update_tests.flaky(history)
+    assert [(r['test'], r['flips'], r['failures']) for r in flaky] == [('TestFlaky', 9, 5)]
+
+
+def test_history_persisted_and_rendered(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    shutil.copytree(REPO / 'schema', tmp_path / 'schema')
+    subprocess.check_call(['git', 'init', '-q'], cwd=tmp_path)
+    for i in range(3):
+        results = [{'package': 'example.com/m', 'test': 'TestX', 'action': 'pass' if i != 1 else 'fail', 'elapsed': 1.5},
+                   {'package': 'example.com/m', 'test': 'TestY', 'action': 'pass', 'elapsed': 0.004}]
+        (tmp_path / 'test-results.jsonl').write_text('\n'.join(json.dumps(r) for r in results) + '\n')
+        subprocess.check_call([sys.executable, 'scripts/update_tests.py'], cwd=tmp_path)
+    history = json.loads((tmp_path / 'test_history' / 'history.json').read_text())
+    assert len(history['runs']) == 3
+    assert history['tests']['example.com/m TestX'] == {'d': [1500, 1500, 1500], 'o': 'PFP'}
+
+    summary = {'totals': {'passed': 2, 'failed': 0, 'skipped': 0, 'packages': 1}, 'packages': [], 'failures': []}
+    (tmp_path / 'test-summary.json').write_text(json.dumps(summary))
+    subprocess.check_call([sys.executable, 'scripts/gen_tests_md.py'], cwd=tmp_path)
+    md = (tmp_path / 'site_src' / 'tests.md').read_text()
+    assert '_Trends over the last 3 default-branch runs._' in md
+    assert '## Slowest Tests' in md and '| `TestX` | `example.com/m` | 1.50s | 1.50s | <svg' in md
+    assert '| `TestY` | `example.com/m` | 4ms | 4ms |' in md
+    assert '## Flaky Tests' in md and '| `TestX` | `example.com/m` | 2 | 1/3 | `PFP` |' in md
+    assert '## Getting Slower' not in md
@@ -0,0 +1,71 @@
+import pathlib, sys, time
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / 'scripts'))
+
+import watch  # noqa: E402
+
+
+def _labels(steps):
+    return [label for label, _, _ in steps]
+
+
+def test_plan_maps_changes_to_stages():
+    steps = watch.plan(['docs/guide/intro.md', 'pkg/a/a.go', 'pkg/a/a_test.go', 'main.go', 'go.sum'])
+    assert _labels(steps) == ['gen_site_structure.py', 'collect_metrics.py', 'gen_metrics_md.py']
+    env = steps[0][2]
+    assert env['SITE_STAGES'] == 'docs,reference' and env['REFERENCE_PACKAGES'] == '.,pkg/a'
+    assert _labels(watch.plan(['cover.out']))[-1] == 'gen_coverage_md.py'
+    assert watch.plan(['README.md'])[0][2]['SITE_STAGES'] == 'home'
+    assert watch.plan(['notes.txt', '.site_changes.json']) == []
+    full = watch.plan([], full=True)
+    assert full[0][2] == {'SITE_STAGES': 'docs,home,reference', 'REFERENCE_PACKAGES': ''}
+
+
+def _wait_for(watcher, want, timeout=5.0):
+    seen = set()
+    deadline = time.monotonic() + timeout
+    while want - seen and time.monotonic() < deadline:
+        seen |= watcher.changes(0.5) or set()
+    return seen
+
+
+@pytest.mark.parametrize('poll', [False, True])
+def test_watchers_report_edits_and_new_directories(tmp_path, poll):
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'a.md').write_text('# A\n')
+    (tmp_path / 'site_src').mkdir()
+    watcher = watch.make_watcher(tmp_path, poll=poll, interval=0.05)
+    if not poll and not isinstance(watcher, watch.InotifyWatcher):
+        pytest.skip('inotify not available')
+    try:
+        time.sleep(0.02)
+        (tmp_path / 'docs' / 'a.md').write_text('# A2\n')
+        (tmp_path / 'docs' / 'new').mkdir()
+        (tmp_path / 'docs' / 'new' / 'b.md').write_text('# B\n')
+        (tmp_path / 'site_src' / 'ignored.md').write_text('x')
+        seen = _wait_for(watcher, {'docs/a.md', 'docs/new/b.md'})
+    finally:
+        watcher.close()
+    assert {'docs/a.md', 'docs/new/b.md'} <= seen
+    assert not any(p.startswith('site_src/') for p in seen)
+
+
+def test_docs_edit_regenerates_only_docs(tmp_path):
+    (tmp_path / 'README.md').write_text('# Project\n')
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'guide.md').write_text('# Guide\n')
+    watch.run_steps(tmp_path, watch.plan([], full=True))
+    assert (tmp_path / 'site_src' / 'docs' / 'guide.md').exists()
+
+    (tmp_path / 'docs' / 'guide.md').write_text('# Guide v2\n')
+    (tmp_path / 'README.md').write_text('# Changed but not watched in this batch\n')
+    steps = watch.plan(['docs/guide.md'])
+    assert _labels(steps) == ['gen_site_structure.py']
+    changed = watch.run_steps(tmp_path, steps)
+    assert (tmp_path / 'site_src' / 'docs' / 'guide.md').read_text() == '# Guide v2\n'
+    assert (tmp_path / 'site_src' / 'index.md').read_text() == '# Project\n'
+    # the new title also updates the docs index and the nav; nothing outside docs is rewritten
+    assert sorted(changed) == ['mkdocs.yml', 'site_src/docs/guide.md', 'site_src/docs/index.md']
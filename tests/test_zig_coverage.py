@@ -0,0 +1,65 @@
+import json, os, pathlib, shutil, subprocess, sys
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+COBERTURA = """<?xml version="1.0" ?>
+<coverage line-rate="0.5" version="1.9">
+  <sources><source>{root}/</source></sources>
+  <packages>
+    <package name="test">
+      <classes>
+        <class name="main_zig" filename="src/main.zig" line-rate="0.5">
+          <lines><line number="1" hits="1"/><line number="2" hits="0"/><line number="3" hits="0"/></lines>
+        </class>
+        <class name="main_zig" filename="src/main.zig" line-rate="0.5">
+          <lines><line number="2" hits="4"/></lines>
+        </class>
+        <class name="util_zig" filename="src/lib/util.zig" line-rate="0.0">
+          <lines><line number="10" hits="0"/></lines>
+        </class>
+      </classes>
+    </package>
+  </packages>
+</coverage>
+"""
+
+
+def run(cwd, script, *args):
+    env = {k: v for k, v in os.environ.items() if k != 'PIPELINE_TRACE'}
+    return subprocess.run([sys.executable, f'scripts/{script}', *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_cobertura_rollups_and_cache(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    merged = tmp_path / 'site_src' / 'zig_coverage' / 'kcov-merged'
+    merged.mkdir(parents=True)
+    (merged.parent / 'index.html').write_text('<td>Total</td><td>99.0%</td>')
+    (merged / 'cobertura.xml').write_text(COBERTURA.format(root=tmp_path.resolve()))
+
+    result = json.loads(run(tmp_path, 'zig_coverage.py', '--json'))
+    assert result['format'] == 'cobertura'
+    assert (result['lines'], result['covered'], result['percent']) == (4, 2, 50.0)
+    assert result['files'] == [
+        {'file': 'src/lib/util.zig', 'lines': 1, 'covered': 0, 'percent': 0.0},
+        {'file': 'src/main.zig', 'lines': 3, 'covered': 2, 'percent': 66.67},
+    ]
+    assert [d['dir'] for d in result['dirs']] == ['src', 'src/lib']
+
+    # consumers reuse the cached parse while the source is unchanged
+    cache = json.loads((tmp_path / '.zig_coverage.json').read_text())
+    cache['result']['percent'] = 12.5
+    (tmp_path / '.zig_coverage.json').write_text(json.dumps(cache))
+    run(tmp_path, 'gen_coverage_md.py')
+    md = (tmp_path / 'site_src' / 'coverage.md').read_text()
+    assert 'Overall Zig coverage: **12.50%**' in md
+    assert '| `src/main.zig` | 3 | 2 | 66.67% |' in md
+    assert '## Per-directory Zig Coverage' in md
+
+
+def test_html_fallback_reads_total_row(tmp_path):
+    shutil.copytree(REPO / 'scripts', tmp_path / 'scripts')
+    cov = tmp_path / 'zig-out' / 'coverage'
+    cov.mkdir(parents=True)
+    (cov / 'index.html').write_text('<p>Low 25%</p><tr><td>Total</td><td>lines</td><td>85.5%</td></tr>')
+    assert 'Zig coverage: 85.50% (html, 0 files)' in run(tmp_path, 'zig_coverage.py')